@@ -3,21 +3,111 @@ backend.admin package initiliaser
 """
 
 from functools import wraps
-from flask import Blueprint, current_app, session, jsonify
+from flask import Blueprint, current_app, session, jsonify, request
+from utils.logging_utils import get_logger, sampled
+
+logger = get_logger(__name__)
 
 admin_bp = Blueprint("admin", __name__)
 
+# Admin path prefixes whose writes change the route topology cache
+_TOPOLOGY_PATHS = ("/admin/routes", "/admin/stops", "/admin/services")
+
+
+@admin_bp.after_request
+def invalidate_route_topology(response):
+    """Drop the cached route topology after a successful route/stop write"""
+    if (
+        request.method in ("POST", "PUT", "PATCH", "DELETE")
+        and response.status_code < 400
+        and request.path.startswith(_TOPOLOGY_PATHS)
+    ):
+        from utils.route_topology import route_topology
+
+        route_topology.invalidate()
+    return response
+
+
+@admin_bp.after_request
+def refresh_journey_timetable(response):
+    """Rebuild the journey planner timetable after a successful route/stop/trip write"""
+    if (
+        request.method in ("POST", "PUT", "PATCH", "DELETE")
+        and response.status_code < 400
+        and request.path.startswith(_TOPOLOGY_PATHS + ("/admin/trips",))
+    ):
+        from utils.journey_planner import timetable_refresher
+
+        timetable_refresher.wake()
+    return response
+
+
+@admin_bp.after_request
+def invalidate_total_counts(response):
+    """Drop cached list totals after any successful admin write"""
+    if (
+        request.method in ("POST", "PUT", "PATCH", "DELETE")
+        and response.status_code < 400
+    ):
+        from utils.pagination import total_counts
+
+        total_counts.invalidate()
+    return response
+
+
+@admin_bp.after_request
+def invalidate_prefix_indexes(response):
+    """Drop the typeahead indexes after a successful user/stop write"""
+    if (
+        request.method in ("POST", "PUT", "PATCH", "DELETE")
+        and response.status_code < 400
+    ):
+        from utils.prefix_index import stop_index, user_index
+
+        if request.path.startswith("/admin/users"):
+            user_index.invalidate()
+        elif request.path.startswith("/admin/stops"):
+            stop_index.invalidate()
+    return response
+
+
+@admin_bp.after_request
+def invalidate_report_cache(response):
+    """Drop cached dashboard payloads after any successful admin write"""
+    if (
+        request.method in ("POST", "PUT", "PATCH", "DELETE")
+        and response.status_code < 400
+    ):
+        from .repos.reports import dashboard_cache
+
+        dashboard_cache.invalidate()
+    return response
+
+
+def parse_list_options():
+    """
+    Keyset paging options shared by the admin list endpoints.
+    Returns (cursor_token, include_total); raises ValueError for a bad
+    include_total. The cursor itself is validated by the repo.
+    """
+    from utils.pagination import parse_include_total
+
+    cursor_token = request.args.get("cursor") or None
+    return cursor_token, parse_include_total(request.args.get("include_total"))
+
 
 def admin_required(f):
     """
-    Session-based admin check with detailed logging
+    Session-based admin check; denials are logged, grants only at DEBUG
     """
 
     @wraps(f)
     def wrapped(*args, **kwargs):
         # Check if user is logged in
         if not session.get("loggedin") or not session.get("user_id"):
-            print(f"DEBUG: Authentication failed. Session data: {dict(session)}")
+            logger.info(
+                "Admin authentication required", extra={"path": request.path}
+            )
             return jsonify({"error": "Authentication required"}), 401
 
         # Check if user has admin role
@@ -26,13 +116,17 @@ def admin_required(f):
         username = session.get("username")
 
         if str(role).lower() != "admin":
-            print(
-                f"DEBUG: Access denied. User: {username} (ID: {user_id}), Role: {role}"
+            logger.warning(
+                "Admin access denied",
+                extra={"user_id": user_id, "username": username, "role": role},
             )
             return jsonify({"error": "Admin role required", "current_role": role}), 403
 
-        # Log successful admin access
-        print(f"DEBUG: Admin access granted. User: {username} (ID: {user_id})")
+        # Log successful admin access (one per request, sampled)
+        logger.debug(
+            "Admin access granted",
+            extra={"user_id": user_id, "path": request.path, **sampled(50)},
+        )
         return f(*args, **kwargs)
 
     return wrapped
@@ -112,6 +206,7 @@ def init_app(app):
             bookings,
             payments,
             tickets,
+            exports,
         )
     except Exception:
         app.logger.exception("Failed to import admin submodules")
@@ -2,10 +2,18 @@
 Admin routes for managing bookings.
 """
 
+from datetime import datetime
+
 from flask import request, jsonify, session
-from . import admin_bp, get_mysql, admin_required
+from utils.prefix_index import stop_index, user_index
+from utils.tickets import ticket_revocations
+from . import admin_bp, get_mysql, admin_required, parse_list_options
 from .repos import bookings as bookings_repo
 
+# Typeahead dropdowns never return more than this many rows
+DROPDOWN_DEFAULT_LIMIT = 20
+DROPDOWN_MAX_LIMIT = 50
+
 
 @admin_bp.route("/bookings", methods=["GET"])
 @admin_required
@@ -13,10 +21,17 @@ def list_bookings():
     """List all bookings with pagination."""
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", 10, type=int)
-
-    result = bookings_repo.list_bookings(
-        mysql=get_mysql(), page=page, per_page=per_page
-    )
+    try:
+        cursor_token, include_total = parse_list_options()
+        result = bookings_repo.list_bookings(
+            mysql=get_mysql(),
+            page=page,
+            per_page=per_page,
+            cursor_token=cursor_token,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     return jsonify(result), 200
 
 
@@ -101,6 +116,11 @@ def update_booking(booking_id):
             booking_date=data["booking_date"],
             status=data["status"],
         )
+        # Tickets of a cancelled booking stop validating at the gates
+        if data["status"] == "confirmed":
+            ticket_revocations.restore(booking_id)
+        else:
+            ticket_revocations.revoke(booking_id)
         return jsonify({"message": "Booking updated"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -117,39 +137,78 @@ def delete_booking(booking_id):
 
     try:
         bookings_repo.delete_booking(mysql=get_mysql(), booking_id=booking_id)
+        ticket_revocations.revoke(booking_id, deleted=True)
         return jsonify({"message": "Booking deleted"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 # Dropdown endpoints for foreign keys
+def _typeahead_args():
+    """(q, limit) for the dropdown endpoints; raises ValueError on a bad limit"""
+    q = (request.args.get("q") or "").strip()
+    limit = request.args.get("limit", DROPDOWN_DEFAULT_LIMIT, type=int)
+    if limit is None or limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return q, min(limit, DROPDOWN_MAX_LIMIT)
+
+
 @admin_bp.route("/bookings/users", methods=["GET"])
 @admin_required
 def get_users_for_bookings():
-    """Get list of users for dropdown."""
-    mysql = get_mysql()
-    cursor = mysql.connection.cursor()
-    cursor.execute("SELECT user_id, username, full_name FROM users ORDER BY username")
-    users = cursor.fetchall()
-    cursor.close()
-    return jsonify(users), 200
+    """Typeahead for the user dropdown: prefix match on username / full name."""
+    try:
+        q, limit = _typeahead_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    user_index.ensure_loaded(get_mysql())
+    return jsonify(user_index.search(q, limit)), 200
 
 
 @admin_bp.route("/bookings/trips", methods=["GET"])
 @admin_required
 def get_trips_for_bookings():
-    """Get list of trips for dropdown."""
+    """
+    Typeahead for the trip dropdown: upcoming trips (from `from`, default
+    now) in departure order, optionally by route or route-name prefix `q`;
+    a numeric `q` looks up that trip id.
+    """
+    try:
+        q, limit = _typeahead_args()
+        route_id = request.args.get("route_id", type=int)
+        start = request.args.get("from")
+        start = datetime.fromisoformat(start) if start else datetime.now()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    where = ["t.departure_time >= %s"]
+    params = [start]
+    if q.isdigit():
+        where = ["t.trip_id = %s"]
+        params = [int(q)]
+    elif q:
+        # Prefix LIKE stays on idx_routes_name; escape the LIKE wildcards
+        escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where.append("r.route_name LIKE %s")
+        params.append(escaped + "%")
+    if route_id is not None:
+        where.append("t.route_id = %s")
+        params.append(route_id)
+
     mysql = get_mysql()
     cursor = mysql.connection.cursor()
     cursor.execute(
-        """
+        f"""
         SELECT t.trip_id, r.route_name, t.departure_time, t.status
         FROM trips t
         JOIN routes r ON t.route_id = r.route_id
-        ORDER BY t.departure_time DESC
-    """
+        WHERE {" AND ".join(where)}
+        ORDER BY t.departure_time ASC, t.trip_id ASC
+        LIMIT %s
+    """,
+        params + [limit],
     )
-    trips = cursor.fetchall()
+    trips = [bookings_repo._row_to_dict(cursor, row) for row in cursor.fetchall()]
     cursor.close()
     return jsonify(trips), 200
 
@@ -157,10 +216,10 @@ def get_trips_for_bookings():
 @admin_bp.route("/bookings/stops", methods=["GET"])
 @admin_required
 def get_stops_for_bookings():
-    """Get list of stops for dropdown."""
-    mysql = get_mysql()
-    cursor = mysql.connection.cursor()
-    cursor.execute("SELECT stop_id, stop_name FROM stops ORDER BY stop_name")
-    stops = cursor.fetchall()
-    cursor.close()
-    return jsonify(stops), 200
+    """Typeahead for the stop dropdown: prefix match on any word of the name."""
+    try:
+        q, limit = _typeahead_args()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    stop_index.ensure_loaded(get_mysql())
+    return jsonify(stop_index.search(q, limit)), 200
@@ -1,6 +1,6 @@
 from typing import Dict, Any, Optional
 from flask import request, jsonify, current_app, make_response
-from . import admin_bp, admin_required, get_mysql
+from . import admin_bp, admin_required, get_mysql, parse_list_options
 from .repos import drivers_assignments as drivers_assignments_repo
 
 
@@ -41,12 +41,23 @@ def list_drivers_assignments():
         per_page = int(request.args.get("per_page", 50))
     except (ValueError, TypeError):
         return jsonify({"error": "Invalid per_page parameter"}), 400
+    try:
+        cursor_token, include_total = parse_list_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     search = request.args.get("search")
     try:
         result = drivers_assignments_repo.list_drivers_assignments(
-            mysql=get_mysql(), page=page, per_page=per_page, search=search
+            mysql=get_mysql(),
+            page=page,
+            per_page=per_page,
+            search=search,
+            cursor_token=cursor_token,
+            include_total=include_total,
         )
         return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception:
         current_app.logger.exception("Failed to list driver assignments")
         return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,55 @@
+"""
+Admin routes for streaming dataset exports (CSV / Arrow / Parquet).
+"""
+
+from flask import Response, current_app, jsonify, request
+
+from . import admin_bp, admin_required
+from .reports import _parse_date_param
+from .repos import exports as exports_repo
+
+
+@admin_bp.route("/exports/<dataset>", methods=["GET"])
+@admin_required
+def export_dataset(dataset):
+    """
+    Stream a raw table or per-day aggregate as a download.
+
+    Query params: format=csv|arrow|parquet (default csv), start_date, end_date
+    (ISO, inclusive, filter the dataset's date column). Arrow and Parquet need
+    pyarrow on the server.
+    """
+    if dataset not in exports_repo.DATASETS:
+        return (
+            jsonify(
+                {
+                    "error": f"Unknown dataset '{dataset}'",
+                    "datasets": sorted(exports_repo.DATASETS),
+                }
+            ),
+            404,
+        )
+
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in exports_repo.FORMATS:
+        return jsonify({"error": "format must be one of: csv, arrow, parquet"}), 400
+    if not exports_repo.format_available(fmt):
+        return jsonify({"error": f"format '{fmt}' requires pyarrow on the server"}), 400
+
+    try:
+        start = _parse_date_param("start_date")
+        end = _parse_date_param("end_date")
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    try:
+        stream = exports_repo.open_export(dataset, fmt, start_date=start, end_date=end)
+    except Exception:
+        current_app.logger.exception("Failed to start %s export", dataset)
+        return jsonify({"error": "Internal server error"}), 500
+
+    mimetype, extension = exports_repo.FORMATS[fmt]
+    response = Response(stream, mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{dataset}.{extension}"'
+    response.headers["X-Accel-Buffering"] = "no"  # Let proxies pass chunks through
+    return response
@@ -22,12 +22,39 @@ def _parse_date_param(name: str) -> Optional[datetime]:
     return dt
 
 
+# Most values a list filter may expand to (route_id=1-2147483647 would
+# otherwise build a list of two billion ids)
+MAX_INT_LIST_VALUES = 1000
+
+
+def _parse_int_list(name: str, low: int, high: int) -> Optional[list]:
+    """Comma separated ints and inclusive ranges, e.g. `7-9,17-19`"""
+    v = request.args.get(name)
+    if not v:
+        return None
+    values = []
+    for part in v.split(","):
+        first, _, last = part.strip().partition("-")
+        try:
+            first, last = int(first), int(last or first)
+        except ValueError:
+            raise ValueError(f"Invalid value for '{name}', expected comma separated numbers or ranges")
+        if first > last:
+            raise ValueError(f"Invalid range '{part.strip()}' for '{name}': start is after end")
+        if not (low <= first and last <= high):
+            raise ValueError(f"'{name}' values must be between {low} and {high}")
+        if len(values) + last - first + 1 > MAX_INT_LIST_VALUES:
+            raise ValueError(f"'{name}' may list at most {MAX_INT_LIST_VALUES} values")
+        values.extend(range(first, last + 1))
+    return values
+
+
 @admin_bp.route("/reports/bookings/daily", methods=["GET"])
 @admin_required
 def bookings_daily():
     """
-    Enhanced daily booking analytics using MySQL stored procedure.
-    Supports date ranges by calling get_daily_booking_analytics() for each day.
+    Daily booking analytics (the get_daily_booking_analytics() metrics) for
+    a date range of up to 90 days, computed in one query.
     Returns array format for frontend compatibility.
     """
     try:
@@ -79,45 +106,39 @@ def bookings_daily():
         if start_date > end_date:
             start_date, end_date = end_date, start_date
         
-        # Limit to 90 days to prevent excessive queries
+        # Limit to 90 days to keep the response bounded
         date_diff = (end_date - start_date).days
         if date_diff > 90:
             return jsonify({"error": "Date range too large. Maximum 90 days allowed."}), 400
         
-        mysql = get_mysql()
+        # One set-based query for the whole range (replaces a
+        # get_daily_booking_analytics() call per day)
+        by_day = {
+            row["booking_date"]: row
+            for row in reports_repo.daily_booking_analytics(
+                mysql=get_mysql(), start_day=start_date, end_day=end_date
+            )
+        }
+
         results = []
-        
-        # Iterate over each day in the range
         current_date = start_date
         while current_date <= end_date:
-            cursor = mysql.connection.cursor()
-            try:
-                # Call stored procedure for this specific day
-                cursor.callproc('get_daily_booking_analytics', [current_date])
-                result = cursor.fetchone()
-                
-                if result:
-                    # Convert to dictionary
-                    columns = [desc[0] for desc in cursor.description]
-                    day_data = dict(zip(columns, result))
-                    # Format the date as string for frontend compatibility
-                    day_data['day'] = str(current_date)
-                    # Extract bookings count for backward compatibility
-                    day_data['bookings'] = day_data.get('total_bookings', 0)
-                    results.append(day_data)
-                else:
-                    # No bookings for this day - include it with zero count
-                    results.append({
-                        "day": str(current_date),
-                        "bookings": 0,
-                        "total_bookings": 0,
-                        "confirmed_bookings": 0,
-                        "cancelled_bookings": 0
-                    })
-            finally:
-                cursor.close()
-            
-            # Move to next day
+            day_data = by_day.get(current_date)
+            if day_data:
+                # Format the date as string for frontend compatibility
+                day_data['day'] = str(current_date)
+                # Extract bookings count for backward compatibility
+                day_data['bookings'] = day_data.get('total_bookings', 0)
+                results.append(day_data)
+            else:
+                # No bookings for this day - include it with zero count
+                results.append({
+                    "day": str(current_date),
+                    "bookings": 0,
+                    "total_bookings": 0,
+                    "confirmed_bookings": 0,
+                    "cancelled_bookings": 0
+                })
             current_date += timedelta(days=1)
         
         # Return array of daily analytics
@@ -275,6 +296,158 @@ def dashboard_overview():
         return jsonify({"error": "Internal server error"}), 500
 
 
+@admin_bp.route("/reports/dashboard/stats", methods=["GET"])
+@admin_required
+def dashboard_stats():
+    """Dashboard cache hit ratio, per-query timings and connection pool usage"""
+    from utils.db_pool import db_pool
+    from utils.metrics import report_timings
+
+    return jsonify(
+        {
+            "cache": reports_repo.dashboard_cache.stats(),
+            "queries": report_timings.snapshot(),
+            "pool": db_pool.stats(),
+        }
+    ), 200
+
+
+@admin_bp.route("/reports/sketch-summary", methods=["GET"])
+@admin_required
+def sketch_summary():
+    """
+    Approximate multi-day metrics merged from the per-day booking sketches:
+    unique passengers, trips booked, top routes / services / passengers.
+    Query: start_date, end_date (inclusive days, default the last 30), limit.
+    """
+    try:
+        start = _parse_date_param("start_date")
+        end = _parse_date_param("end_date")
+        limit = int(request.args.get("limit", 5))
+        if not 1 <= limit <= 20:
+            raise ValueError("limit must be between 1 and 20")
+        if start and end and start.date() > end.date():
+            raise ValueError("start_date must not be after end_date")
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    try:
+        data = reports_repo.sketch_summary(
+            mysql=get_mysql(),
+            start_date=start.date() if start else None,
+            end_date=end.date() if end else None,
+            limit=limit,
+        )
+        if data is None:
+            return jsonify({"error": "Booking sketches are not set up (run database/migrations/booking_sketches.sql)"}), 503
+        return jsonify(data), 200
+    except Exception:
+        current_app.logger.exception("Failed to generate sketch summary")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@admin_bp.route("/reports/demand-cube", methods=["GET"])
+@admin_required
+def demand_cube_slice():
+    """
+    Route x weekday x hour booking demand from the in-memory demand cube
+    (utils/demand_cube.py); no database query.
+    Query: start_date, end_date, route_id, weekday (0 = Monday), hour
+    (lists / ranges like `7-9,17-19`), group_by (any of route,weekday,hour;
+    default weekday,hour), average (per-day mean instead of totals).
+    """
+    from utils.demand_cube import DIMENSIONS, demand_cube
+
+    try:
+        start = _parse_date_param("start_date")
+        end = _parse_date_param("end_date")
+        route_ids = _parse_int_list("route_id", 1, 2**31 - 1)
+        weekdays = _parse_int_list("weekday", 0, 6)
+        hours = _parse_int_list("hour", 0, 23)
+        group_by = [g.strip() for g in request.args.get("group_by", "weekday,hour").split(",") if g.strip()]
+        unknown = set(group_by) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"group_by must be a subset of {', '.join(DIMENSIONS)}")
+        average = request.args.get("average", "false").lower() in ("1", "true", "yes")
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    if not demand_cube.ready:
+        return jsonify({"error": "Demand cube is still loading, retry shortly"}), 503
+    try:
+        data = demand_cube.query(
+            start_day=start.date() if start else None,
+            end_day=end.date() if end else None,
+            route_ids=route_ids,
+            weekdays=weekdays,
+            hours=hours,
+            group_by=group_by,
+            average=average,
+        )
+        return jsonify(data), 200
+    except Exception:
+        current_app.logger.exception("Failed to slice demand cube")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@admin_bp.route("/reports/od-matrix/<int:route_id>", methods=["GET"])
+@admin_required
+def route_od_matrix(route_id: int):
+    """
+    Origin-destination matrix, per-segment load and peak load point of a
+    route for trips departing start_date..end_date (default last 30 days).
+    """
+    from utils.od_matrix import od_engine
+
+    try:
+        start = _parse_date_param("start_date")
+        end = _parse_date_param("end_date")
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    if not od_engine.ready:
+        return jsonify({"error": "OD matrices are still loading, retry shortly"}), 503
+
+    try:
+        data = reports_repo.route_od_matrix(
+            mysql=get_mysql(),
+            route_id=route_id,
+            start_date=start.date() if start else None,
+            end_date=end.date() if end else None,
+        )
+        if data is None:
+            return jsonify({"error": "Route not found"}), 404
+        return jsonify(data), 200
+    except Exception:
+        current_app.logger.exception("Failed to build OD matrix")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@admin_bp.route("/reports/peak-load", methods=["GET"])
+@admin_required
+def route_peak_loads():
+    """Busiest segment of every route for trips departing start_date..end_date"""
+    from utils.od_matrix import od_engine
+
+    try:
+        start = _parse_date_param("start_date")
+        end = _parse_date_param("end_date")
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    if not od_engine.ready:
+        return jsonify({"error": "OD matrices are still loading, retry shortly"}), 503
+
+    try:
+        data = reports_repo.route_peak_loads(
+            mysql=get_mysql(),
+            start_date=start.date() if start else None,
+            end_date=end.date() if end else None,
+        )
+        return jsonify(data), 200
+    except Exception:
+        current_app.logger.exception("Failed to compute route peak loads")
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @admin_bp.route("/reports/users", methods=["GET"])
 @admin_required
 def user_analytics():
@@ -10,6 +10,7 @@ Table schema (from database/ksts_schema.sql):
 """
 
 from typing import Optional, Dict, Any, List
+from utils.pagination import decode_cursor, keyset_page, keyset_predicate, resolve_total
 from .. import get_mysql
 
 
@@ -19,7 +20,12 @@ def _row_to_dict(cursor, row):
 
 
 def list_drivers_assignments(
-    mysql=None, page: int = 1, per_page: int = 50, search: Optional[str] = None
+    mysql=None,
+    page: int = 1,
+    per_page: int = 50,
+    search: Optional[str] = None,
+    cursor_token: Optional[str] = None,
+    include_total: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     List driver assignments using driver_assignment_details_view.
@@ -28,28 +34,48 @@ def list_drivers_assignments(
     - Uses driver_assignment_details_view (3-table JOIN pre-computed)
     - Includes driver info, bus details, license number, phone
     - Includes computed assignment_status and assignment_duration_hours
+
+    Ordered by start_time DESC, then the rest of the primary key. With
+    `cursor_token` the page starts after the cursor (keyset) and `page` is
+    ignored; `total` is only computed with `include_total`.
     """
     mysql = mysql or get_mysql()
-    offset = max(0, (page - 1)) * per_page
+    after = decode_cursor(cursor_token, 3)
+    offset = 0 if after else max(0, (page - 1)) * per_page
     cursor = None
     try:
         conn = mysql.connection
         cursor = conn.cursor()
+        clauses: List[str] = []
         params: List[Any] = []
-        where = ""
         if search:
-            where = "WHERE v.driver_name LIKE %s OR v.number_plate LIKE %s"
+            clauses.append("(v.driver_name LIKE %s OR v.number_plate LIKE %s)")
             like = f"%{search}%"
             params.extend([like, like])
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
         # Total count from view
-        cursor.execute(
+        totals = resolve_total(
+            cursor,
+            include_total,
             f"""
             SELECT COUNT(*)
             FROM driver_assignment_details_view v {where}""",
             params,
+            table="drivers_assignments",
         )
-        total = cursor.fetchone()[0]
-        params_with_limit = params + [per_page, offset]
+        if after:
+            predicate, key_params = keyset_predicate(
+                [
+                    ("v.start_time", "DESC"),
+                    ("v.driver_id", "DESC"),
+                    ("v.bus_id", "DESC"),
+                ],
+                after,
+            )
+            clauses.append(predicate)
+            params = params + key_params
+            where = "WHERE " + " AND ".join(clauses)
+        params_with_limit = params + [per_page + 1, offset]
         # Query from driver_assignment_details_view
         query = f"""
             SELECT v.driver_id, v.driver_name, v.license_number, v.driver_phone,
@@ -58,13 +84,23 @@ def list_drivers_assignments(
                    v.assignment_duration_hours
             FROM driver_assignment_details_view v
             {where}
-            ORDER BY v.start_time DESC
+            ORDER BY v.start_time DESC, v.driver_id DESC, v.bus_id DESC
             LIMIT %s OFFSET %s
         """
         cursor.execute(query, params_with_limit)
         rows = cursor.fetchall()
-        items = [_row_to_dict(cursor, r) for r in rows]
-        return {"items": items, "total": total, "page": page, "per_page": per_page}
+        items, next_cursor = keyset_page(
+            [_row_to_dict(cursor, r) for r in rows],
+            per_page,
+            ["start_time", "driver_id", "bus_id"],
+        )
+        return {
+            "items": items,
+            **totals,
+            "page": None if after else page,
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+        }
     finally:
         if cursor:
             cursor.close()
@@ -0,0 +1,275 @@
+"""
+Streaming exports of raw tables and per-day report aggregates.
+
+Rows are read with an unbuffered server-side cursor (`SSCursor`) on a
+dedicated connection and encoded chunk by chunk, so memory stays at one
+chunk (`CHUNK_ROWS` rows) however many rows the export has:
+
+- csv     : text/csv, header + rows
+- arrow   : Arrow IPC stream, one record batch per chunk
+- parquet : Parquet file, one row group per chunk
+
+Arrow and Parquet need the optional `pyarrow` package (`format_available`).
+`open_export` runs the query up front so errors surface before the response
+starts; the returned `ExportStream` is the response body and closes the
+connection when the download finishes or is abandoned.
+"""
+
+import csv
+import io
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import MySQLdb.cursors
+from MySQLdb.constants import FIELD_TYPE
+
+from utils.db_pool import db_pool
+from .reports import _date_range
+
+CHUNK_ROWS = 10000
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# dataset -> (SELECT ... with {where} placeholder, date column for start/end filters)
+DATASETS: Dict[str, Tuple[str, str]] = {
+    "bookings": (
+        """
+        SELECT booking_id, user_id, trip_id, seat_number, origin_stop_id,
+               destination_stop_id, booking_date, status
+        FROM bookings {where}
+        ORDER BY booking_id
+        """,
+        "booking_date",
+    ),
+    "payments": (
+        """
+        SELECT payment_id, booking_id, amount, payment_date, method, status,
+               transaction_reference
+        FROM payments {where}
+        ORDER BY payment_id
+        """,
+        "payment_date",
+    ),
+    "trips": (
+        """
+        SELECT trip_id, bus_id, route_id, direction, departure_time, arrival_time,
+               origin_trip_id, status
+        FROM trips {where}
+        ORDER BY trip_id
+        """,
+        "departure_time",
+    ),
+    # QR codes are signed ticket credentials and are not exported
+    "tickets": (
+        """
+        SELECT ticket_id, booking_id, issue_date
+        FROM tickets {where}
+        ORDER BY ticket_id
+        """,
+        "issue_date",
+    ),
+    "bookings_daily": (
+        """
+        SELECT booking_day AS day,
+               COUNT(*) AS bookings,
+               SUM(CASE WHEN status = 'confirmed' THEN 1 ELSE 0 END) AS confirmed,
+               SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) AS cancelled
+        FROM bookings {where}
+        GROUP BY booking_day
+        ORDER BY day
+        """,
+        "booking_date",
+    ),
+    "revenue_daily": (
+        """
+        SELECT payment_day AS day, COUNT(*) AS paid_payments, SUM(amount) AS revenue
+        FROM payments {where}
+        GROUP BY payment_day
+        ORDER BY day
+        """,
+        "payment_date",
+    ),
+}
+
+# revenue_daily only counts paid payments
+_EXTRA_FILTERS = {"revenue_daily": ["status = 'paid'"]}
+
+
+def format_available(fmt: str) -> bool:
+    if fmt == "csv":
+        return True
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ExportStream:
+    """
+    Response body for one export: iterating yields encoded chunks; close()
+    (called by the WSGI server, also for abandoned downloads) releases the
+    connection without draining the remaining rows.
+    """
+
+    def __init__(self, conn, cursor, fmt: str):
+        self._conn = conn
+        self._cursor = cursor
+        self._fmt = fmt
+        self._closed = False
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            if self._fmt == "csv":
+                yield from _encode_csv(self._cursor)
+            else:
+                yield from _encode_arrow(self._cursor, parquet=self._fmt == "parquet")
+        finally:
+            self.close()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        # Closing the connection first drops an unread result set instead of
+        # fetching the rest of it, which is what SSCursor.close() would do
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        try:
+            self._cursor.close()
+        except Exception:
+            pass
+
+
+def open_export(
+    dataset: str,
+    fmt: str = "csv",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> ExportStream:
+    """Run the export query on a dedicated connection; raises KeyError for an unknown dataset"""
+    template, date_column = DATASETS[dataset]
+    clauses, params = _date_range(date_column, start_date, end_date)
+    clauses = _EXTRA_FILTERS.get(dataset, []) + clauses
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+    conn = db_pool.connect()
+    try:
+        cursor = conn.cursor(MySQLdb.cursors.SSCursor)
+        cursor.execute(template.format(where=where), params)
+    except Exception:
+        conn.close()
+        raise
+    return ExportStream(conn, cursor, fmt)
+
+
+def _chunks(cursor) -> Iterator[List[tuple]]:
+    while True:
+        rows = cursor.fetchmany(CHUNK_ROWS)
+        if not rows:
+            return
+        yield rows
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(cursor) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([c[0] for c in cursor.description])
+    for rows in _chunks(cursor):
+        writer.writerows([_csv_value(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back what was written since the last take()"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_schema(description):
+    import pyarrow as pa
+
+    ints = {FIELD_TYPE.TINY, FIELD_TYPE.SHORT, FIELD_TYPE.LONG, FIELD_TYPE.LONGLONG, FIELD_TYPE.INT24}
+    fields = []
+    for name, type_code, *_ in description:
+        if type_code in ints:
+            arrow_type = pa.int64()
+        elif type_code in (FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL, FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE):
+            arrow_type = pa.float64()
+        elif type_code in (FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP):
+            arrow_type = pa.timestamp("s")
+        elif type_code in (FIELD_TYPE.DATE, FIELD_TYPE.NEWDATE):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def _encode_arrow(cursor, parquet: bool) -> Iterator[bytes]:
+    import pyarrow as pa
+
+    schema = _arrow_schema(cursor.description)
+    float_columns = [i for i, f in enumerate(schema) if pa.types.is_floating(f.type)]
+    sink = _ChunkSink()
+    if parquet:
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for rows in _chunks(cursor):
+            columns = [list(col) for col in zip(*rows)]
+            for i in float_columns:  # DECIMAL sums arrive as Decimal
+                columns[i] = [None if v is None else float(v) for v in columns[i]]
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(col, type=f.type) for col, f in zip(columns, schema)],
+                schema=schema,
+            )
+            if parquet:
+                writer.write_table(pa.Table.from_batches([batch]))  # One row group
+            else:
+                writer.write_batch(batch)
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
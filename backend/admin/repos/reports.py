@@ -8,16 +8,61 @@ Provides small, focused report queries using the existing schema:
 All SQL is parameterised. Functions return plain dict/list structures that the route layer can return as JSON responses
 """
 
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, List, Tuple
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from utils.booking_sketches import sketch_store, sketches_available
+from utils.db_pool import db_pool
+from utils.metrics import report_timings
+from utils.od_matrix import od_engine
+from utils.report_rollups import rollup_window, rollups_available
+from utils.route_topology import route_topology
+from utils.ttl_cache import TTLCache
 from .. import get_mysql
 
+# Dashboard payloads per date range, cleared by admin writes (admin/__init__.py)
+dashboard_cache = TTLCache(int(os.getenv("ADMIN_DASHBOARD_CACHE_SECONDS", "15")))
+# One worker per pooled connection
+_dashboard_executor = ThreadPoolExecutor(
+    max_workers=db_pool.size, thread_name_prefix="dashboard"
+)
+
 
 def _row_to_dict(cursor, row):
     cols = [c[0] for c in cursor.description]
     return dict(zip(cols, row))
 
 
+def _exclusive_end(end):
+    """First instant after an inclusive range end (the next day for a date)"""
+    if isinstance(end, datetime):
+        # DATETIME columns have whole seconds, so `<= end` == `< end + 1s`
+        return end.replace(microsecond=0) + timedelta(seconds=1)
+    return end + timedelta(days=1)
+
+
+def _date_range(
+    column: str, start: Optional[date] = None, end: Optional[date] = None
+) -> Tuple[List[str], List[Any]]:
+    """
+    Predicates for an inclusive [start, end] report range on `column`, as a
+    half-open `column >= start AND column < next(end)` on the raw column so
+    the index on it is used (never DATE(column) or other wrappers). Either
+    bound may be None. Returns (clauses, params) to AND into a WHERE / ON.
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    if start is not None:
+        clauses.append(f"{column} >= %s")
+        params.append(start)
+    if end is not None:
+        clauses.append(f"{column} < %s")
+        params.append(_exclusive_end(end))
+    return clauses, params
+
+
 # ------------------ Bookings Reports ------------------
 
 
@@ -45,20 +90,13 @@ def bookings_count_by_day(
     try:
         conn = mysql.connection
         cursor = conn.cursor()
-        params: List[Any] = []
-        where_clauses: List[str] = []
-        if start_date is not None:
-            where_clauses.append("booking_date >= %s")
-            params.append(start_date)
-        if end_date is not None:
-            where_clauses.append("booking_date <= %s")
-            params.append(end_date)
+        where_clauses, params = _date_range("booking_date", start_date, end_date)
         where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
         sql = f"""
-            SELECT DATE(booking_date) AS day, COUNT(*) AS bookings
+            SELECT booking_day AS day, COUNT(*) AS bookings
             FROM bookings
             {where_sql}
-            GROUP BY DATE(booking_date)
+            GROUP BY booking_day
             ORDER BY day ASC
         """
         cursor.execute(sql, params)
@@ -72,6 +110,102 @@ def bookings_count_by_day(
                 pass
 
 
+def daily_booking_analytics(
+    mysql=None,
+    start_day: Optional[date] = None,
+    end_day: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """
+    get_daily_booking_analytics() for every day in [start_day, end_day] in a
+    single set-based pass: one GROUP BY day over the range for the booking
+    counts, one over their paid payments for the revenue, and ROW_NUMBER()
+    per day for the most popular route and service (ties go to the lower
+    id). Days without bookings are omitted.
+
+    Returns the procedure's columns: booking_date, total_bookings,
+    confirmed_bookings, cancelled_bookings, unique_passengers, trips_booked,
+    daily_revenue, avg_booking_value, most_popular_route, most_popular_service
+    """
+    mysql = mysql or get_mysql()
+    cursor = None
+    try:
+        conn = mysql.connection
+        cursor = conn.cursor()
+        sql = """
+            WITH day_bookings AS (
+                SELECT b.booking_day AS day, b.booking_id, b.user_id,
+                       b.trip_id, b.status, t.route_id, r.route_name, r.service_id
+                FROM bookings b
+                JOIN trips t ON b.trip_id = t.trip_id
+                JOIN routes r ON t.route_id = r.route_id
+                WHERE b.booking_date >= %s AND b.booking_date < %s
+            ),
+            -- Counts come from the bookings alone: joining payments first would
+            -- count a booking once per payment row
+            day_counts AS (
+                SELECT
+                    day,
+                    COUNT(*) AS total_bookings,
+                    SUM(CASE WHEN status = 'confirmed' THEN 1 ELSE 0 END) AS confirmed_bookings,
+                    SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) AS cancelled_bookings,
+                    COUNT(DISTINCT user_id) AS unique_passengers,
+                    COUNT(DISTINCT trip_id) AS trips_booked
+                FROM day_bookings
+                GROUP BY day
+            ),
+            day_revenue AS (
+                SELECT db.day, SUM(p.amount) AS daily_revenue, AVG(p.amount) AS avg_booking_value
+                FROM day_bookings db
+                JOIN payments p ON p.booking_id = db.booking_id AND p.status = 'paid'
+                GROUP BY db.day
+            ),
+            day_totals AS (
+                SELECT dc.*,
+                       COALESCE(dr.daily_revenue, 0) AS daily_revenue,
+                       COALESCE(dr.avg_booking_value, 0) AS avg_booking_value
+                FROM day_counts dc
+                LEFT JOIN day_revenue dr ON dr.day = dc.day
+            ),
+            route_rank AS (
+                SELECT day, route_name,
+                       ROW_NUMBER() OVER (PARTITION BY day ORDER BY COUNT(*) DESC, route_id) AS rn
+                FROM day_bookings
+                GROUP BY day, route_id, route_name
+            ),
+            service_rank AS (
+                SELECT db.day, s.service_name,
+                       ROW_NUMBER() OVER (PARTITION BY db.day ORDER BY COUNT(*) DESC, s.service_id) AS rn
+                FROM day_bookings db
+                JOIN services s ON db.service_id = s.service_id
+                GROUP BY db.day, s.service_id, s.service_name
+            )
+            SELECT
+                dt.day AS booking_date,
+                dt.total_bookings,
+                dt.confirmed_bookings,
+                dt.cancelled_bookings,
+                dt.unique_passengers,
+                dt.trips_booked,
+                dt.daily_revenue,
+                dt.avg_booking_value,
+                rr.route_name AS most_popular_route,
+                sr.service_name AS most_popular_service
+            FROM day_totals dt
+            LEFT JOIN route_rank rr ON rr.day = dt.day AND rr.rn = 1
+            LEFT JOIN service_rank sr ON sr.day = dt.day AND sr.rn = 1
+            ORDER BY dt.day ASC
+        """
+        cursor.execute(sql, (start_day, end_day + timedelta(days=1)))
+        rows = cursor.fetchall()
+        return [_row_to_dict(cursor, r) for r in rows]
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+
 def bookings_count_by_status(
     mysql=None,
     start_date: Optional[datetime] = None,
@@ -85,14 +219,12 @@ def bookings_count_by_status(
     try:
         conn = mysql.connection
         cursor = conn.cursor()
-        params: List[Any] = []
-        where_clauses: List[str] = []
-        if start_date is not None:
-            where_clauses.append("booking_date >= %s")
-            params.append(start_date)
-        if end_date is not None:
-            where_clauses.append("booking_date <= %s")
-            params.append(end_date)
+
+        window = _rollup_window(mysql, start_date, end_date)
+        if window is not None:
+            return _rollup_bookings_count_by_status(cursor, window)
+
+        where_clauses, params = _date_range("booking_date", start_date, end_date)
         where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
         sql = f"""
             SELECT status, COUNT(*) AS count
@@ -135,20 +267,18 @@ def revenue_by_day(
     try:
         conn = mysql.connection
         cursor = conn.cursor()
-        params: List[Any] = []
-        where_clauses: List[str] = ["status = 'paid'"]
-        if start_date is not None:
-            where_clauses.append("payment_date >= %s")
-            params.append(start_date)
-        if end_date is not None:
-            where_clauses.append("payment_date <= %s")
-            params.append(end_date)
-        where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
+
+        window = _rollup_window(mysql, start_date, end_date)
+        if window is not None:
+            return _rollup_revenue_by_day(cursor, window)
+
+        where_clauses, params = _date_range("payment_date", start_date, end_date)
+        where_sql = "WHERE " + " AND ".join(["status = 'paid'"] + where_clauses)
         sql = f"""
-            SELECT DATE(payment_date) AS day, SUM(amount) AS revenue
+            SELECT payment_day AS day, SUM(amount) AS revenue
             FROM payments
             {where_sql}
-            GROUP BY DATE(payment_date)
+            GROUP BY payment_day
             ORDER BY day ASC
         """
         cursor.execute(sql, params)
@@ -175,15 +305,13 @@ def total_revenue(
     try:
         conn = mysql.connection
         cursor = conn.cursor()
-        params: List[Any] = []
-        where_clauses: List[str] = ["status = 'paid'"]
-        if start_date is not None:
-            where_clauses.append("payment_date >= %s")
-            params.append(start_date)
-        if end_date is not None:
-            where_clauses.append("payment_date <= %s")
-            params.append(end_date)
-        where_sql = "WHERE " + " AND ".join(where_clauses)
+
+        window = _rollup_window(mysql, start_date, end_date)
+        if window is not None:
+            return _rollup_total_revenue(cursor, window)
+
+        where_clauses, params = _date_range("payment_date", start_date, end_date)
+        where_sql = "WHERE " + " AND ".join(["status = 'paid'"] + where_clauses)
         sql = f"""
             SELECT COALESCE(SUM(amount), 0) AS total_revenue
             FROM payments
@@ -216,14 +344,12 @@ def trips_summary_by_route(
     try:
         conn = mysql.connection
         cursor = conn.cursor()
-        params: List[Any] = []
-        where_clauses: List[str] = []
-        if start_date is not None:
-            where_clauses.append("departure_time >= %s")
-            params.append(start_date)
-        if end_date is not None:
-            where_clauses.append("departure_time <= %s")
-            params.append(end_date)
+
+        window = _rollup_window(mysql, start_date, end_date)
+        if window is not None:
+            return _rollup_trips_summary_by_route(cursor, window)
+
+        where_clauses, params = _date_range("t.departure_time", start_date, end_date)
         where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
 
         # Use LEFT JOIN to get route_name if routes table exists
@@ -264,15 +390,13 @@ def top_routes_by_bookings(
     try:
         conn = mysql.connection
         cursor = conn.cursor()
+
+        window = _rollup_window(mysql, start_date, end_date)
+        if window is not None:
+            return _rollup_top_routes_by_bookings(cursor, window, limit)
+
         # Build date where clause and params (date params must come before LIMIT)
-        date_where: List[str] = []
-        date_params: List[Any] = []
-        if start_date is not None:
-            date_where.append("b.booking_date >= %s")
-            date_params.append(start_date)
-        if end_date is not None:
-            date_where.append("b.booking_date <= %s")
-            date_params.append(end_date)
+        date_where, date_params = _date_range("b.booking_date", start_date, end_date)
         date_sql = ("AND " + " AND ".join(date_where)) if date_where else ""
 
         sql = f"""
@@ -322,50 +446,16 @@ def bookings_and_payments_summary(
     try:
         conn = mysql.connection
         cursor = conn.cursor()
-        params: List[Any] = []
-        where_clauses: List[str] = []
-        if start_date is not None:
-            where_clauses.append("b.booking_date >= %s")
-            params.append(start_date)
-            where_clauses.append("p.payment_date >= %s")
-            params.append(start_date)
-            where_clauses.append("t.issue_date >= %s")
-            params.append(start_date)
-        if end_date is not None:
-            where_clauses.append("b.booking_date <= %s")
-            params.append(end_date)
-            where_clauses.append("p.payment_date <= %s")
-            params.append(end_date)
-            where_clauses.append("t.issue_date <= %s")
-            params.append(end_date)
-
         # Three small queries with same date filter where applicable
         # Bookings count
-        b_where = ""
-        b_params: List[Any] = []
-        if start_date is not None or end_date is not None:
-            bp_clauses = []
-            if start_date is not None:
-                bp_clauses.append("b.booking_date >= %s")
-                b_params.append(start_date)
-            if end_date is not None:
-                bp_clauses.append("b.booking_date <= %s")
-                b_params.append(end_date)
-            b_where = "WHERE " + " AND ".join(bp_clauses)
+        b_clauses, b_params = _date_range("booking_date", start_date, end_date)
+        b_where = ("WHERE " + " AND ".join(b_clauses)) if b_clauses else ""
         cursor.execute(f"SELECT COUNT(*) FROM bookings {b_where}", b_params)
         bookings_count = cursor.fetchone()[0]
 
         # Paid payments and total revenue
-        p_where = ""
-        p_params: List[Any] = []
-        p_clauses = ["status = 'paid'"]
-        if start_date is not None:
-            p_clauses.append("payment_date >= %s")
-            p_params.append(start_date)
-        if end_date is not None:
-            p_clauses.append("payment_date <= %s")
-            p_params.append(end_date)
-        p_where = "WHERE " + " AND ".join(p_clauses)
+        p_clauses, p_params = _date_range("payment_date", start_date, end_date)
+        p_where = "WHERE " + " AND ".join(["status = 'paid'"] + p_clauses)
         cursor.execute(
             f"SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM payments {p_where}",
             p_params,
@@ -373,17 +463,8 @@ def bookings_and_payments_summary(
         paid_count, total_rev = cursor.fetchone()
 
         # Tickets issued
-        t_where = ""
-        t_params: List[Any] = []
-        t_clauses = []
-        if start_date is not None:
-            t_clauses.append("issue_date >= %s")
-            t_params.append(start_date)
-        if end_date is not None:
-            t_clauses.append("issue_date <= %s")
-            t_params.append(end_date)
-        if t_clauses:
-            t_where = "WHERE " + " AND ".join(t_clauses)
+        t_clauses, t_params = _date_range("issue_date", start_date, end_date)
+        t_where = ("WHERE " + " AND ".join(t_clauses)) if t_clauses else ""
         cursor.execute(f"SELECT COUNT(*) FROM tickets {t_where}", t_params)
         tickets_count = cursor.fetchone()[0]
 
@@ -401,90 +482,42 @@ def bookings_and_payments_summary(
                 pass
 
 
-def dashboard_overview(
-    mysql=None,
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
-) -> Dict[str, Any]:
-    """
-    Returns comprehensive dashboard overview with all key metrics
-    """
-    mysql = mysql or get_mysql()
-    cursor = None
-    try:
-        conn = mysql.connection
-        cursor = conn.cursor()
+def _dashboard_queries(start_date, end_date) -> Dict[str, Tuple[str, List[Any]]]:
+    """The dashboard's independent statements: {name: (sql, params)}"""
+    clauses, b_params = _date_range("booking_date", start_date, end_date)
+    b_where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
 
-        # Build date filters
-        b_where, b_params = "", []
-        if start_date or end_date:
-            clauses = []
-            if start_date:
-                clauses.append("booking_date >= %s")
-                b_params.append(start_date)
-            if end_date:
-                clauses.append("booking_date <= %s")
-                b_params.append(end_date)
-            b_where = "WHERE " + " AND ".join(clauses)
-
-        p_where, p_params = "", []
-        clauses = ["status = 'paid'"]
-        if start_date:
-            clauses.append("payment_date >= %s")
-            p_params.append(start_date)
-        if end_date:
-            clauses.append("payment_date <= %s")
-            p_params.append(end_date)
-        p_where = "WHERE " + " AND ".join(clauses)
-
-        t_where, t_params = "", []
-        if start_date or end_date:
-            clauses = []
-            if start_date:
-                clauses.append("departure_time >= %s")
-                t_params.append(start_date)
-            if end_date:
-                clauses.append("departure_time <= %s")
-                t_params.append(end_date)
-            t_where = "WHERE " + " AND ".join(clauses)
+    clauses, p_params = _date_range("payment_date", start_date, end_date)
+    p_where = "WHERE " + " AND ".join(["status = 'paid'"] + clauses)
+
+    clauses, t_params = _date_range("departure_time", start_date, end_date)
+    t_where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
 
+    return {
         # Total bookings and cancellation rate
-        cursor.execute(
+        "bookings": (
             f"""
             SELECT 
                 COUNT(*) as total,
                 SUM(CASE WHEN status = 'confirmed' THEN 1 ELSE 0 END) as confirmed,
                 SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled
             FROM bookings {b_where}
-        """,
+            """,
             b_params,
-        )
-        booking_stats = cursor.fetchone()
-        total_bookings = booking_stats[0] or 0
-        confirmed_bookings = booking_stats[1] or 0
-        cancelled_bookings = booking_stats[2] or 0
-        cancellation_rate = (
-            (cancelled_bookings / total_bookings * 100) if total_bookings > 0 else 0
-        )
-
+        ),
         # Revenue stats
-        cursor.execute(
+        "revenue": (
             f"""
             SELECT 
                 COUNT(*) as paid_count,
                 COALESCE(SUM(amount), 0) as total_revenue,
                 COALESCE(AVG(amount), 0) as avg_fare
             FROM payments {p_where}
-        """,
+            """,
             p_params,
-        )
-        revenue_stats = cursor.fetchone()
-        paid_payments = revenue_stats[0] or 0
-        total_revenue = int(revenue_stats[1] or 0)
-        avg_fare = round(float(revenue_stats[2] or 0), 2)
-
+        ),
         # Trip stats
-        cursor.execute(
+        "trips": (
             f"""
             SELECT 
                 COUNT(*) as total,
@@ -493,62 +526,229 @@ def dashboard_overview(
                 SUM(CASE WHEN status = 'scheduled' THEN 1 ELSE 0 END) as scheduled,
                 SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled
             FROM trips {t_where}
-        """,
+            """,
             t_params,
-        )
-        trip_stats = cursor.fetchone()
+        ),
+        # Resources
+        "buses": ("SELECT COUNT(*) FROM buses", []),
+        "drivers": ("SELECT COUNT(*) FROM drivers", []),
+        "passengers": ("SELECT COUNT(*) FROM users WHERE role = 'passenger'", []),
+        "routes": ("SELECT COUNT(*) FROM routes", []),
+        "stops": ("SELECT COUNT(*) FROM stops", []),
+    }
 
-        # Active buses and drivers
-        cursor.execute("SELECT COUNT(*) FROM buses")
-        total_buses = cursor.fetchone()[0] or 0
 
-        cursor.execute("SELECT COUNT(*) FROM drivers")
-        total_drivers = cursor.fetchone()[0] or 0
+def _timed_fetchone(conn, name: str, sql: str, params: List[Any]):
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        report_timings.record(f"dashboard.{name}", (time.perf_counter() - started) * 1000)
 
-        # Total users
-        cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'passenger'")
-        total_passengers = cursor.fetchone()[0] or 0
 
-        # Total routes and stops
-        cursor.execute("SELECT COUNT(*) FROM routes")
-        total_routes = cursor.fetchone()[0] or 0
+def _run_on_pool(name: str, sql: str, params: List[Any]):
+    with db_pool.connection() as conn:
+        return _timed_fetchone(conn, name, sql, params)
 
-        cursor.execute("SELECT COUNT(*) FROM stops")
-        total_stops = cursor.fetchone()[0] or 0
 
-        return {
-            "bookings": {
-                "total": total_bookings,
-                "confirmed": confirmed_bookings,
-                "cancelled": cancelled_bookings,
-                "cancellation_rate": round(cancellation_rate, 2),
-            },
-            "revenue": {
-                "total": total_revenue,
-                "paid_payments": paid_payments,
-                "average_fare": avg_fare,
-            },
-            "trips": {
-                "total": trip_stats[0] or 0,
-                "completed": trip_stats[1] or 0,
-                "running": trip_stats[2] or 0,
-                "scheduled": trip_stats[3] or 0,
-                "cancelled": trip_stats[4] or 0,
-            },
-            "resources": {
-                "buses": total_buses,
-                "drivers": total_drivers,
-                "passengers": total_passengers,
-                "routes": total_routes,
-                "stops": total_stops,
-            },
+def _run_dashboard_queries(mysql, queries) -> Dict[str, Any]:
+    """
+    Run the statements concurrently on pooled connections when the pool is
+    configured (app.py), otherwise one after another on `mysql`'s connection.
+    """
+    if db_pool.configured:
+        futures = {
+            name: _dashboard_executor.submit(_run_on_pool, name, sql, params)
+            for name, (sql, params) in queries.items()
         }
+        return {name: future.result() for name, future in futures.items()}
+    mysql = mysql or get_mysql()
+    return {
+        name: _timed_fetchone(mysql.connection, name, sql, params)
+        for name, (sql, params) in queries.items()
+    }
+
+
+def dashboard_overview(
+    mysql=None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Returns comprehensive dashboard overview with all key metrics.
+
+    The eight independent queries run in parallel (see _run_dashboard_queries)
+    and the result is cached per date range in `dashboard_cache` for
+    ADMIN_DASHBOARD_CACHE_SECONDS; admin writes clear it.
+    """
+    return dashboard_cache.get_or_compute(
+        (start_date, end_date),
+        lambda: _dashboard_overview(mysql, start_date, end_date),
+    )
+
+
+def _dashboard_overview(mysql, start_date, end_date) -> Dict[str, Any]:
+    rows = _run_dashboard_queries(mysql, _dashboard_queries(start_date, end_date))
+
+    booking_stats = rows["bookings"]
+    total_bookings = booking_stats[0] or 0
+    confirmed_bookings = booking_stats[1] or 0
+    cancelled_bookings = booking_stats[2] or 0
+    cancellation_rate = (
+        (cancelled_bookings / total_bookings * 100) if total_bookings > 0 else 0
+    )
+
+    revenue_stats = rows["revenue"]
+    paid_payments = revenue_stats[0] or 0
+    total_revenue = int(revenue_stats[1] or 0)
+    avg_fare = round(float(revenue_stats[2] or 0), 2)
+
+    trip_stats = rows["trips"]
+
+    return {
+        "bookings": {
+            "total": total_bookings,
+            "confirmed": confirmed_bookings,
+            "cancelled": cancelled_bookings,
+            "cancellation_rate": round(cancellation_rate, 2),
+        },
+        "revenue": {
+            "total": total_revenue,
+            "paid_payments": paid_payments,
+            "average_fare": avg_fare,
+        },
+        "trips": {
+            "total": trip_stats[0] or 0,
+            "completed": trip_stats[1] or 0,
+            "running": trip_stats[2] or 0,
+            "scheduled": trip_stats[3] or 0,
+            "cancelled": trip_stats[4] or 0,
+        },
+        "resources": {
+            "buses": rows["buses"][0] or 0,
+            "drivers": rows["drivers"][0] or 0,
+            "passengers": rows["passengers"][0] or 0,
+            "routes": rows["routes"][0] or 0,
+            "stops": rows["stops"][0] or 0,
+        },
+    }
+
+
+def sketch_summary(
+    mysql=None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 5,
+) -> Optional[Dict[str, Any]]:
+    """
+    Approximate unique passengers, trips booked and top routes / services /
+    passengers for a day range (default: the last 30 days), merged from the
+    per-day booking sketches (utils/booking_sketches.py) without reading
+    bookings. Returns None until the sketch migration has been applied.
+    """
+    mysql = mysql or get_mysql()
+    conn = mysql.connection
+    if not sketches_available(conn):
+        return None
+
+    end_day = end_date or date.today()
+    start_day = start_date or end_day - timedelta(days=29)
+    summary = sketch_store.summary(conn, start_day, end_day, top=limit)
+
+    cursor = conn.cursor()
+    try:
+        for key, table, name_column in (
+            ("top_routes", "routes", "route_name"),
+            ("top_services", "services", "service_name"),
+            ("top_users", "users", "username"),
+        ):
+            items = summary[key]
+            if not items:
+                continue
+            id_column = next(k for k in items[0] if k != "bookings")
+            ids = [item[id_column] for item in items]
+            cursor.execute(
+                f"""
+                SELECT {id_column}, {name_column} FROM {table}
+                WHERE {id_column} IN ({", ".join(["%s"] * len(ids))})
+                """,
+                ids,
+            )
+            names = dict(cursor.fetchall())
+            for item in items:
+                item[name_column] = names.get(item[id_column])
     finally:
-        if cursor:
-            try:
-                cursor.close()
-            except Exception:
-                pass
+        cursor.close()
+    return summary
+
+
+def _default_day_range(start_date: Optional[date], end_date: Optional[date]) -> Tuple[date, date]:
+    end_day = end_date or date.today()
+    return start_date or end_day - timedelta(days=29), end_day
+
+
+def route_od_matrix(
+    mysql=None,
+    route_id: int = 0,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Stop x stop matrix of confirmed bookings on a route (default: trips of the
+    last 30 days), with per-segment loads and the peak load point, from the
+    in-memory OD engine (utils/od_matrix.py). None if the route does not exist.
+    """
+    mysql = mysql or get_mysql()
+    route_topology.ensure_loaded(mysql)
+    route = route_topology.get_route(route_id)
+    if route is None:
+        return None
+    start_day, end_day = _default_day_range(start_date, end_date)
+    stops = route["stops"]
+    data = od_engine.route_od(route_id, [s["stop_id"] for s in stops], start_day, end_day)
+    data["route_name"] = route["route_name"]
+    data["stops"] = [{"stop_id": s["stop_id"], "stop_name": s["stop_name"]} for s in stops]
+    names = {s["stop_id"]: s["stop_name"] for s in stops}
+    for item in data["segments"] + ([data["peak_load"]] if data["peak_load"] else []):
+        item["from_stop_name"] = names.get(item["from_stop_id"])
+        item["to_stop_name"] = names.get(item["to_stop_id"])
+    return data
+
+
+def route_peak_loads(
+    mysql=None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """Peak load point of every route with bookings, busiest first"""
+    mysql = mysql or get_mysql()
+    route_topology.ensure_loaded(mysql)
+    start_day, end_day = _default_day_range(start_date, end_date)
+    result = []
+    for route_id in od_engine.route_ids():
+        route = route_topology.get_route(route_id)
+        if route is None:
+            continue
+        stop_ids = [s["stop_id"] for s in route["stops"]]
+        data = od_engine.route_od(route_id, stop_ids, start_day, end_day)
+        peak = data["peak_load"]
+        if peak is None:
+            continue
+        peak["from_stop_name"] = route_topology.get_stop_name(peak["from_stop_id"])
+        peak["to_stop_name"] = route_topology.get_stop_name(peak["to_stop_id"])
+        result.append(
+            {
+                "route_id": route_id,
+                "route_name": route["route_name"],
+                "passengers": data["passengers"],
+                "peak_load": peak,
+            }
+        )
+    result.sort(key=lambda r: (-r["peak_load"]["load"], r["route_id"]))
+    return result
 
 
 def user_analytics(
@@ -565,16 +765,8 @@ def user_analytics(
         conn = mysql.connection
         cursor = conn.cursor()
 
-        b_where, b_params = "", []
-        if start_date or end_date:
-            clauses = []
-            if start_date:
-                clauses.append("b.booking_date >= %s")
-                b_params.append(start_date)
-            if end_date:
-                clauses.append("b.booking_date <= %s")
-                b_params.append(end_date)
-            b_where = "WHERE " + " AND ".join(clauses)
+        clauses, b_params = _date_range("b.booking_date", start_date, end_date)
+        b_where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
 
         # Top users by bookings
         cursor.execute(
@@ -655,16 +847,12 @@ def bus_utilization(
         conn = mysql.connection
         cursor = conn.cursor()
 
-        t_where, t_params = "", []
-        if start_date or end_date:
-            clauses = []
-            if start_date:
-                clauses.append("t.departure_time >= %s")
-                t_params.append(start_date)
-            if end_date:
-                clauses.append("t.departure_time <= %s")
-                t_params.append(end_date)
-            t_where = "WHERE " + " AND ".join(clauses)
+        window = _rollup_window(mysql, start_date, end_date)
+        if window is not None:
+            return _rollup_bus_utilization(cursor, window)
+
+        clauses, t_params = _date_range("t.departure_time", start_date, end_date)
+        t_where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
 
         # Bus utilization: trips, bookings, capacity usage
         cursor.execute(
@@ -708,16 +896,8 @@ def payment_analytics(
         conn = mysql.connection
         cursor = conn.cursor()
 
-        p_where, p_params = "", []
-        if start_date or end_date:
-            clauses = []
-            if start_date:
-                clauses.append("payment_date >= %s")
-                p_params.append(start_date)
-            if end_date:
-                clauses.append("payment_date <= %s")
-                p_params.append(end_date)
-            p_where = "WHERE " + " AND ".join(clauses)
+        clauses, p_params = _date_range("payment_date", start_date, end_date)
+        p_where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
 
         # Payment by method
         cursor.execute(
@@ -786,16 +966,12 @@ def peak_hours_analysis(
         conn = mysql.connection
         cursor = conn.cursor()
 
-        b_where, b_params = "", []
-        if start_date or end_date:
-            clauses = []
-            if start_date:
-                clauses.append("booking_date >= %s")
-                b_params.append(start_date)
-            if end_date:
-                clauses.append("booking_date <= %s")
-                b_params.append(end_date)
-            b_where = "WHERE " + " AND ".join(clauses)
+        window = _rollup_window(mysql, start_date, end_date)
+        if window is not None:
+            return _rollup_peak_hours_analysis(cursor, window)
+
+        clauses, b_params = _date_range("booking_date", start_date, end_date)
+        b_where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
 
         cursor.execute(
             f"""
@@ -834,17 +1010,15 @@ def route_performance(
         conn = mysql.connection
         cursor = conn.cursor()
 
-        b_where, b_params = "", []
-        if start_date or end_date:
-            clauses = []
-            if start_date:
-                clauses.append("b.booking_date >= %s")
-                b_params.append(start_date)
-            if end_date:
-                clauses.append("b.booking_date <= %s")
-                b_params.append(end_date)
-            b_where = "AND " + " AND ".join(clauses)
+        window = _rollup_window(mysql, start_date, end_date)
+        if window is not None:
+            return _rollup_route_performance(cursor, window)
+
+        clauses, b_params = _date_range("b.booking_date", start_date, end_date)
+        b_where = ("AND " + " AND ".join(clauses)) if clauses else ""
 
+        # Trips and bookings are counted distinct (the joins repeat a trip per
+        # booking and a booking per payment), like the rollup path
         cursor.execute(
             f"""
             SELECT 
@@ -852,9 +1026,9 @@ def route_performance(
                 r.route_name,
                 s.service_name,
                 COUNT(DISTINCT t.trip_id) as total_trips,
-                COUNT(b.booking_id) as total_bookings,
-                SUM(CASE WHEN t.status = 'completed' THEN 1 ELSE 0 END) as completed_trips,
-                SUM(CASE WHEN t.status = 'cancelled' THEN 1 ELSE 0 END) as cancelled_trips,
+                COUNT(DISTINCT b.booking_id) as total_bookings,
+                COUNT(DISTINCT CASE WHEN t.status = 'completed' THEN t.trip_id END) as completed_trips,
+                COUNT(DISTINCT CASE WHEN t.status = 'cancelled' THEN t.trip_id END) as cancelled_trips,
                 COALESCE(SUM(p.amount), 0) as revenue
             FROM routes r
             JOIN services s ON r.service_id = s.service_id
@@ -874,3 +1048,194 @@ def route_performance(
                 cursor.close()
             except Exception:
                 pass
+
+
+# ------------------ Rollup readers ------------------
+#
+# Hour-aligned ranges (see utils/report_rollups.rollup_window) are answered
+# from the hourly rollup tables instead of the raw bookings / payments / trips
+# tables. Results match the raw queries as of the last compactor pass.
+
+
+def _rollup_window(mysql, start_date, end_date):
+    """Hour window to read from the rollups, or None to use the raw tables"""
+    window = rollup_window(start_date, end_date)
+    if window is None or not rollups_available(mysql):
+        return None
+    return window
+
+
+def _window_clauses(window, column: str = "bucket_hour") -> Tuple[List[str], List[Any]]:
+    start, end = window
+    clauses: List[str] = []
+    params: List[Any] = []
+    if start is not None:
+        clauses.append(f"{column} >= %s")
+        params.append(start)
+    if end is not None:
+        clauses.append(f"{column} < %s")
+        params.append(end)
+    return clauses, params
+
+
+def _rollup_bookings_count_by_status(cursor, window) -> List[Dict[str, Any]]:
+    clauses, params = _window_clauses(window)
+    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    cursor.execute(
+        f"""
+        SELECT status, CAST(SUM(bookings) AS SIGNED) AS count
+        FROM rollup_booking_hourly
+        {where_sql}
+        GROUP BY status
+        """,
+        params,
+    )
+    return [_row_to_dict(cursor, r) for r in cursor.fetchall()]
+
+
+def _rollup_revenue_by_day(cursor, window) -> List[Dict[str, Any]]:
+    clauses, params = _window_clauses(window)
+    where_sql = "WHERE " + " AND ".join(["status = 'paid'"] + clauses)
+    cursor.execute(
+        f"""
+        SELECT DATE(bucket_hour) AS day, SUM(amount) AS revenue
+        FROM rollup_payment_hourly
+        {where_sql}
+        GROUP BY DATE(bucket_hour)
+        ORDER BY day ASC
+        """,
+        params,
+    )
+    return [_row_to_dict(cursor, r) for r in cursor.fetchall()]
+
+
+def _rollup_total_revenue(cursor, window) -> Dict[str, Any]:
+    clauses, params = _window_clauses(window)
+    where_sql = "WHERE " + " AND ".join(["status = 'paid'"] + clauses)
+    cursor.execute(
+        f"SELECT COALESCE(SUM(amount), 0) AS total_revenue FROM rollup_payment_hourly {where_sql}",
+        params,
+    )
+    row = cursor.fetchone()
+    return {"total_revenue": row[0] if row else 0}
+
+
+def _rollup_trips_summary_by_route(cursor, window) -> List[Dict[str, Any]]:
+    clauses, params = _window_clauses(window, "x.bucket_hour")
+    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    cursor.execute(
+        f"""
+        SELECT x.route_id,
+               r.route_name,
+               CAST(SUM(x.trips) AS SIGNED) AS trips,
+               CAST(SUM(CASE WHEN x.status = 'completed' THEN x.trips ELSE 0 END) AS SIGNED) AS completed,
+               CAST(SUM(CASE WHEN x.status = 'cancelled' THEN x.trips ELSE 0 END) AS SIGNED) AS cancelled
+        FROM rollup_trip_hourly x
+        LEFT JOIN routes r ON x.route_id = r.route_id
+        {where_sql}
+        GROUP BY x.route_id, r.route_name
+        ORDER BY trips DESC, r.route_name ASC
+        """,
+        params,
+    )
+    return [_row_to_dict(cursor, r) for r in cursor.fetchall()]
+
+
+def _rollup_top_routes_by_bookings(cursor, window, limit: int) -> List[Dict[str, Any]]:
+    clauses, params = _window_clauses(window, "x.bucket_hour")
+    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    cursor.execute(
+        f"""
+        SELECT r.route_id,
+               r.route_name,
+               CAST(SUM(x.bookings) AS SIGNED) AS bookings
+        FROM rollup_booking_hourly x
+        JOIN routes r ON x.route_id = r.route_id
+        {where_sql}
+        GROUP BY r.route_id, r.route_name
+        ORDER BY bookings DESC, r.route_name ASC
+        LIMIT %s
+        """,
+        params + [limit],
+    )
+    return [_row_to_dict(cursor, r) for r in cursor.fetchall()]
+
+
+def _rollup_bus_utilization(cursor, window) -> List[Dict[str, Any]]:
+    clauses, params = _window_clauses(window, "x.bucket_hour")
+    on_sql = "".join(f" AND {c}" for c in clauses)
+    cursor.execute(
+        f"""
+        SELECT 
+            b.bus_id,
+            b.number_plate,
+            b.capacity,
+            CAST(COALESCE(SUM(x.trips), 0) AS SIGNED) as total_trips,
+            CAST(COALESCE(SUM(x.bookings), 0) AS SIGNED) as total_bookings,
+            ROUND(SUM(x.bookings) * 100.0 / (b.capacity * SUM(x.trips)), 2) as utilization_rate
+        FROM buses b
+        LEFT JOIN rollup_trip_hourly x ON x.bus_id = b.bus_id{on_sql}
+        GROUP BY b.bus_id, b.number_plate, b.capacity
+        ORDER BY utilization_rate DESC, b.number_plate ASC
+        """,
+        params,
+    )
+    return [_row_to_dict(cursor, r) for r in cursor.fetchall()]
+
+
+def _rollup_peak_hours_analysis(cursor, window) -> List[Dict[str, Any]]:
+    clauses, params = _window_clauses(window)
+    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    cursor.execute(
+        f"""
+        SELECT 
+            HOUR(bucket_hour) as hour,
+            CAST(SUM(bookings) AS SIGNED) as bookings,
+            CAST(SUM(CASE WHEN status = 'confirmed' THEN bookings ELSE 0 END) AS SIGNED) as confirmed
+        FROM rollup_booking_hourly
+        {where_sql}
+        GROUP BY HOUR(bucket_hour)
+        ORDER BY hour
+        """,
+        params,
+    )
+    return [_row_to_dict(cursor, r) for r in cursor.fetchall()]
+
+
+def _rollup_route_performance(cursor, window) -> List[Dict[str, Any]]:
+    clauses, params = _window_clauses(window)
+    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    # Trips are not date-filtered, as in the raw query; trip counts are
+    # distinct trips rather than trip x booking rows
+    cursor.execute(
+        f"""
+        SELECT 
+            r.route_id,
+            r.route_name,
+            s.service_name,
+            CAST(COALESCE(tr.total_trips, 0) AS SIGNED) as total_trips,
+            CAST(COALESCE(bk.total_bookings, 0) AS SIGNED) as total_bookings,
+            CAST(COALESCE(tr.completed_trips, 0) AS SIGNED) as completed_trips,
+            CAST(COALESCE(tr.cancelled_trips, 0) AS SIGNED) as cancelled_trips,
+            COALESCE(bk.revenue, 0) as revenue
+        FROM routes r
+        JOIN services s ON r.service_id = s.service_id
+        LEFT JOIN (
+            SELECT route_id,
+                   SUM(trips) AS total_trips,
+                   SUM(CASE WHEN status = 'completed' THEN trips ELSE 0 END) AS completed_trips,
+                   SUM(CASE WHEN status = 'cancelled' THEN trips ELSE 0 END) AS cancelled_trips
+            FROM rollup_trip_hourly
+            GROUP BY route_id
+        ) tr ON tr.route_id = r.route_id
+        LEFT JOIN (
+            SELECT route_id, SUM(bookings) AS total_bookings, SUM(paid_revenue) AS revenue
+            FROM rollup_booking_hourly
+            {where_sql}
+            GROUP BY route_id
+        ) bk ON bk.route_id = r.route_id
+        ORDER BY total_bookings DESC, r.route_id ASC
+        """,
+        params,
+    )
+    return [_row_to_dict(cursor, r) for r in cursor.fetchall()]
@@ -9,6 +9,7 @@ Table schema (from database/ksts_schema.sql):
 """
 
 from typing import Optional, Dict, Any, List
+from utils.pagination import decode_cursor, keyset_page, keyset_predicate, resolve_total
 from .. import get_mysql
 
 
@@ -18,7 +19,12 @@ def _row_to_dict(cursor, row):
 
 
 def list_routes_stops(
-    mysql=None, page: int = 1, per_page: int = 50, search: Optional[str] = None
+    mysql=None,
+    page: int = 1,
+    per_page: int = 50,
+    search: Optional[str] = None,
+    cursor_token: Optional[str] = None,
+    include_total: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     List routes_stops using route_stops_detail_view.
@@ -26,27 +32,42 @@ def list_routes_stops(
     Enhanced with database view integration:
     - Uses route_stops_detail_view (4-table JOIN pre-computed)
     - Includes route_name, service_name, stop details, coordinates
+
+    Ordered by (route_id, stop_order). With `cursor_token` the page starts
+    after the cursor (keyset) and `page` is ignored; `total` is only
+    computed with `include_total`.
     """
     mysql = mysql or get_mysql()
-    offset = max(0, (page - 1)) * per_page
+    after = decode_cursor(cursor_token, 2)
+    offset = 0 if after else max(0, (page - 1)) * per_page
     cursor = None
     try:
         conn = mysql.connection
         cursor = conn.cursor()
+        clauses: List[str] = []
         params: List[Any] = []
-        where = ""
         if search:
-            where = "WHERE v.route_id = %s OR v.stop_id = %s"
+            clauses.append("(v.route_id = %s OR v.stop_id = %s)")
             params.extend([search, search])
-        # Total count from view
-        cursor.execute(
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        # Total count from view (table statistics for approx + unfiltered)
+        totals = resolve_total(
+            cursor,
+            include_total,
             f"""
             SELECT COUNT(*)
             FROM route_stops_detail_view v {where}""",
             params,
+            table="routes_stops",
         )
-        total = cursor.fetchone()[0]
-        params_with_limit = params + [per_page, offset]
+        if after:
+            predicate, key_params = keyset_predicate(
+                [("v.route_id", "ASC"), ("v.stop_order", "ASC")], after
+            )
+            clauses.append(predicate)
+            params = params + key_params
+            where = "WHERE " + " AND ".join(clauses)
+        params_with_limit = params + [per_page + 1, offset]
         # Query from route_stops_detail_view
         query = f"""
             SELECT v.route_id, v.stop_id, v.stop_order, v.route_name, 
@@ -59,8 +80,18 @@ def list_routes_stops(
         """
         cursor.execute(query, params_with_limit)
         rows = cursor.fetchall()
-        items = [_row_to_dict(cursor, r) for r in rows]
-        return {"items": items, "total": total, "page": page, "per_page": per_page}
+        items, next_cursor = keyset_page(
+            [_row_to_dict(cursor, r) for r in rows],
+            per_page,
+            ["route_id", "stop_order"],
+        )
+        return {
+            "items": items,
+            **totals,
+            "page": None if after else page,
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+        }
     finally:
         if cursor:
             cursor.close()
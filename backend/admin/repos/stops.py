@@ -9,6 +9,7 @@ Table schema (from database/ksts_schema.sql):
 """
 
 from typing import Optional, Dict, Any, List
+from utils.pagination import decode_cursor, keyset_page, keyset_predicate, resolve_total
 from .. import get_mysql
 
 
@@ -18,28 +19,47 @@ def _row_to_dict(cursor, row) -> Dict[str, Any]:
 
 
 def list_stops(
-    mysql=None, page: int = 1, per_page: int = 50, search: Optional[str] = None
+    mysql=None,
+    page: int = 1,
+    per_page: int = 50,
+    search: Optional[str] = None,
+    cursor_token: Optional[str] = None,
+    include_total: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
-    Return paginated list of stops with total count
+    Return a page of stops ordered by stop_id, keyset-paged when
+    `cursor_token` is given; `total` only with `include_total`
     """
     mysql = mysql or get_mysql()
-    offset = max(0, (page - 1)) * per_page
+    after = decode_cursor(cursor_token, 1)
+    offset = 0 if after else max(0, (page - 1)) * per_page
     cursor = None
     try:
         conn = mysql.connection
         cursor = conn.cursor()
 
+        clauses: List[str] = []
         params: List[Any] = []
-        where = ""
         if search:
-            where = "WHERE stop_name LIKE %s"
+            clauses.append("stop_name LIKE %s")
             params.append(f"%{search}%")
 
-        cursor.execute(f"SELECT COUNT(*) FROM stops {where}", params)
-        total = cursor.fetchone()[0]
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        totals = resolve_total(
+            cursor,
+            include_total,
+            f"SELECT COUNT(*) FROM stops {where}",
+            params,
+            table="stops",
+        )
+
+        if after:
+            predicate, key_params = keyset_predicate([("stop_id", "ASC")], after)
+            clauses.append(predicate)
+            params = params + key_params
+            where = "WHERE " + " AND ".join(clauses)
 
-        params_with_limit = params + [per_page, offset]
+        params_with_limit = params + [per_page + 1, offset]
         query = f"""
             SELECT stop_id, stop_name, latitude, longitude
             FROM stops
@@ -49,8 +69,16 @@ def list_stops(
         """
         cursor.execute(query, params_with_limit)
         rows = cursor.fetchall()
-        items = [_row_to_dict(cursor, r) for r in rows]
-        return {"items": items, "total": total, "page": page, "per_page": per_page}
+        items, next_cursor = keyset_page(
+            [_row_to_dict(cursor, r) for r in rows], per_page, ["stop_id"]
+        )
+        return {
+            "items": items,
+            **totals,
+            "page": None if after else page,
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+        }
     finally:
         if cursor:
             try:
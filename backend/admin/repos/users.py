@@ -12,6 +12,7 @@ Table schema (from database/ksts_schema.sql):
 """
 
 from typing import Optional, Dict, Any
+from utils.pagination import decode_cursor, keyset_page, keyset_predicate, resolve_total
 from .. import get_mysql
 
 
@@ -21,30 +22,53 @@ def _row_to_dict(cursor, row) -> Dict[str, Any]:
 
 
 def list_users(
-    mysql=None, page: int = 1, per_page: int = 20, search: Optional[str] = None
+    mysql=None,
+    page: int = 1,
+    per_page: int = 20,
+    search: Optional[str] = None,
+    cursor_token: Optional[str] = None,
+    include_total: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
-    Return paginated users and total count.
-    Returns a dict with keys: items, total, page, per_page
+    Return a page of users ordered by user_id.
+    Returns a dict with keys: items, total, page, per_page, next_cursor
+
+    With `cursor_token` the page starts after the cursor (keyset) and `page`
+    is ignored; otherwise OFFSET paging is used. `total` is only computed
+    when `include_total` is "exact" or "approx" (see utils/pagination.py).
     """
     mysql = mysql or get_mysql()
-    offset = max(0, (page - 1)) * per_page
+    after = decode_cursor(cursor_token, 1)
+    offset = 0 if after else max(0, (page - 1)) * per_page
     cursor = None
     try:
         conn = mysql.connection
         cursor = conn.cursor()
 
+        clauses = []
         params = []
-        where = ""
         if search:
-            where = "WHERE username LIKE %s OR full_name LIKE %s OR email LIKE %s"
+            clauses.append("(username LIKE %s OR full_name LIKE %s OR email LIKE %s)")
             like = f"%{search}%"
             params.extend([like, like, like])
+        filter_params = list(params)
+
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        totals = resolve_total(
+            cursor,
+            include_total,
+            f"SELECT COUNT(*) FROM users {where}",
+            filter_params,
+            table="users",
+        )
 
-        cursor.execute(f"SELECT COUNT(*) FROM users {where}", params)
-        total = cursor.fetchone()[0]
+        if after:
+            predicate, key_params = keyset_predicate([("user_id", "ASC")], after)
+            clauses.append(predicate)
+            params.extend(key_params)
+            where = "WHERE " + " AND ".join(clauses)
 
-        params.extend([per_page, offset])
+        params.extend([per_page + 1, offset])
         query = f"""
             SELECT user_id, username, full_name, email, phone_number, role
             FROM users
@@ -54,8 +78,16 @@ def list_users(
         """
         cursor.execute(query, params)
         rows = cursor.fetchall()
-        items = [_row_to_dict(cursor, r) for r in rows]
-        return {"items": items, "total": total, "page": page, "per_page": per_page}
+        items, next_cursor = keyset_page(
+            [_row_to_dict(cursor, r) for r in rows], per_page, ["user_id"]
+        )
+        return {
+            "items": items,
+            **totals,
+            "page": None if after else page,
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+        }
     finally:
         if cursor:
             try:
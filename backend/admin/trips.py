@@ -6,7 +6,7 @@ try:
 except Exception:
     MySQLdb = None
 from flask import request, jsonify, current_app, make_response
-from . import admin_bp, admin_required, get_mysql
+from . import admin_bp, admin_required, get_mysql, parse_list_options
 from .repos import trips as trips_repo
 
 
@@ -94,6 +94,10 @@ def list_trips():
         per_page = int(request.args.get("per_page", 20))
     except (ValueError, TypeError):
         return jsonify({"error": "Invalid per_page parameter"}), 400
+    try:
+        cursor_token, include_total = parse_list_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
         bus_id = request.args.get("bus_id")
@@ -136,16 +140,21 @@ def list_trips():
                 400,
             )
 
-        result = trips_repo.list_trips(
-            mysql=get_mysql(),
-            page=page,
-            per_page=per_page,
-            bus_id=bus_id_v,
-            route_id=route_id_v,
-            status=status_v,
-            start_dt=start_dt_v,
-            end_dt=end_dt_v,
-        )
+        try:
+            result = trips_repo.list_trips(
+                mysql=get_mysql(),
+                page=page,
+                per_page=per_page,
+                bus_id=bus_id_v,
+                route_id=route_id_v,
+                status=status_v,
+                start_dt=start_dt_v,
+                end_dt=end_dt_v,
+                cursor_token=cursor_token,
+                include_total=include_total,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # Enrich with live data from bus_tracker
         from bus_tracker import bus_tracker
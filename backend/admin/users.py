@@ -3,7 +3,7 @@ from typing import Dict, Any, Optional
 from flask import request, jsonify, current_app, make_response
 from werkzeug.security import generate_password_hash
 
-from . import admin_bp, admin_required, get_mysql
+from . import admin_bp, admin_required, get_mysql, parse_list_options
 from .repos import users as users_repo
 
 
@@ -51,13 +51,24 @@ def list_users():
         per_page = int(request.args.get("per_page", "20"))
     except (ValueError, TypeError):
         return jsonify({"error": "Invalid per_page parameter"}), 400
+    try:
+        cursor_token, include_total = parse_list_options()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     search = request.args.get("search")
     try:
         result = users_repo.list_users(
-            mysql=get_mysql(), page=page, per_page=per_page, search=search
+            mysql=get_mysql(),
+            page=page,
+            per_page=per_page,
+            search=search,
+            cursor_token=cursor_token,
+            include_total=include_total,
         )
         return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception:
         current_app.logger.exception("Failed to list users")
         return jsonify({"error": "Internal server error"}), 500
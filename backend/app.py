@@ -11,6 +11,11 @@ from dotenv import load_dotenv
 # Load .env
 load_dotenv()
 
+# Structured, queue-backed logging (levels from LOG_LEVEL / LOG_LEVELS)
+from utils.logging_utils import configure_logging
+
+configure_logging()
+
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "defaultsecret")
 
@@ -34,6 +39,11 @@ app.config["MYSQL_PORT"] = int(os.getenv("DB_PORT", 3306))
 
 mysql = MySQL(app)
 
+# Pooled connections for work fanned out to helper threads (admin dashboard)
+from utils.db_pool import db_pool
+
+db_pool.init_app(app)
+
 
 # Error handling for production - prevent stack trace exposure
 @app.errorhandler(500)
@@ -83,7 +93,7 @@ CORS(
         r"/admin/.*": {"origins": ["http://localhost:5173", "http://127.0.0.1:5173"]},
     },
     supports_credentials=True,
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", "Idempotency-Key"],
     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
 )
 
@@ -92,6 +102,46 @@ from bus_tracker import bus_tracker
 
 bus_tracker.set_socketio(socketio)
 
+# Expire unconfirmed seat holds in the background
+from utils.seat_holds import hold_sweeper
+
+hold_sweeper.start()
+
+# Reject ticket tokens of cancelled bookings at the gates
+from utils.tickets import ticket_revocations
+
+ticket_revocations.start()
+
+# Keep the hourly report rollups current in the background
+from utils.report_rollups import rollup_compactor
+
+rollup_compactor.start()
+
+# Fold new bookings into the per-day analytics sketches
+from utils.booking_sketches import sketch_builder
+
+sketch_builder.start()
+
+# Keep the route x hour x weekday demand cube in memory
+from utils.demand_cube import cube_refresher
+
+cube_refresher.start()
+
+# Keep per-route origin-destination matrices in memory
+from utils.od_matrix import od_refresher
+
+od_refresher.start()
+
+# Keep the journey planner's timetable of upcoming trips in memory
+from utils.journey_planner import timetable_refresher
+
+timetable_refresher.start()
+
+# Push live dashboard counters to admins over Socket.IO
+from utils.live_metrics import live_metrics
+
+live_metrics.start(socketio)
+
 
 # Import and register blueprints
 from routes.auth import auth_bp
@@ -147,6 +197,28 @@ def handle_request_active_trips():
     emit("active_trips", {"trips": active_trips})
 
 
+@socketio.on("join_admin_metrics")
+def handle_join_admin_metrics():
+    """Admin dashboard subscribes to live counters (see utils/live_metrics.py)"""
+    from flask import session
+    from flask_socketio import join_room
+    from utils.live_metrics import ROOM, live_metrics
+
+    if not session.get("loggedin") or str(session.get("role")).lower() != "admin":
+        emit("admin_metrics_error", {"error": "Admin role required"})
+        return
+    join_room(ROOM)
+    emit("admin_metrics", {"snapshot": live_metrics.snapshot()})
+
+
+@socketio.on("leave_admin_metrics")
+def handle_leave_admin_metrics():
+    from flask_socketio import leave_room
+    from utils.live_metrics import ROOM
+
+    leave_room(ROOM)
+
+
 # ---------- MAIN ----------
 if __name__ == "__main__":
     # Only enable debug mode in development
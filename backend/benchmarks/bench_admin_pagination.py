@@ -0,0 +1,188 @@
+"""
+Admin trip listing at depth: OFFSET paging vs keyset cursors, and the cost of
+the total count (none / exact / cached / approx).
+
+Seeds `--trips` rows (default 1,000,000) on a throwaway bus, then times
+admin.repos.trips.list_trips for pages at increasing depth:
+
+- offset : page=N, i.e. LIMIT per_page OFFSET (N - 1) * per_page
+- keyset : cursor_token for the same position, i.e. WHERE
+           (departure_time, trip_id) < (...) LIMIT per_page
+
+followed by one first page per include_total mode. Requires the .env used by
+the backend; the bench bus and its trips are removed afterwards (pass
+--keep to reuse them on the next run).
+
+Usage (from backend/):
+    python benchmarks/bench_admin_pagination.py --trips 1000000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bench_seat_allocation import connect  # noqa: E402
+from admin.repos.trips import list_trips  # noqa: E402
+from utils.pagination import encode_cursor, total_counts  # noqa: E402
+
+BENCH_PLATE_PREFIX = "BENCH-PAGE-"
+BATCH = 10000
+
+
+class _MySQL:
+    """Just enough of flask_mysqldb.MySQL for the admin repos"""
+
+    def __init__(self, conn):
+        self.connection = conn
+
+
+def seed(conn, trips):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT bus_id FROM buses WHERE number_plate LIKE %s LIMIT 1",
+        (BENCH_PLATE_PREFIX + "%",),
+    )
+    row = cursor.fetchone()
+    if row:
+        bus_id = row[0]
+        cursor.execute("SELECT COUNT(*) FROM trips WHERE bus_id = %s", (bus_id,))
+        if cursor.fetchone()[0] >= trips:
+            print(f"reusing bench bus {bus_id}")
+            return bus_id
+        cursor.execute("DELETE FROM trips WHERE bus_id = %s", (bus_id,))
+    else:
+        cursor.execute(
+            "INSERT INTO buses (number_plate, capacity) VALUES (%s, %s)",
+            (f"{BENCH_PLATE_PREFIX}{uuid.uuid4().hex[:6].upper()}", 40),
+        )
+        bus_id = cursor.lastrowid
+    cursor.execute("SELECT route_id FROM routes ORDER BY route_id LIMIT 1")
+    route_id = cursor.fetchone()[0]
+
+    start = datetime(2020, 1, 1)
+    started = time.perf_counter()
+    for base in range(0, trips, BATCH):
+        rows = [
+            (
+                bus_id,
+                route_id,
+                "forward",
+                start + timedelta(minutes=i),
+                start + timedelta(minutes=i + 45),
+                "completed",
+            )
+            for i in range(base, min(base + BATCH, trips))
+        ]
+        cursor.executemany(
+            """
+            INSERT INTO trips (bus_id, route_id, direction, departure_time, arrival_time, status)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            rows,
+        )
+        conn.commit()
+    cursor.execute("ANALYZE TABLE trips")
+    cursor.fetchall()
+    cursor.close()
+    print(f"seeded {trips} trips in {time.perf_counter() - started:.1f}s")
+    return bus_id
+
+
+def cleanup(conn, bus_id):
+    cursor = conn.cursor()
+    while True:
+        cursor.execute("DELETE FROM trips WHERE bus_id = %s LIMIT %s", (bus_id, BATCH))
+        conn.commit()
+        if cursor.rowcount == 0:
+            break
+    cursor.execute("DELETE FROM buses WHERE bus_id = %s", (bus_id,))
+    conn.commit()
+    cursor.close()
+
+
+def cursor_at(conn, offset):
+    """Cursor token that resumes right after row `offset` of the listing"""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT departure_time, trip_id FROM trips
+        ORDER BY departure_time DESC, trip_id DESC
+        LIMIT 1 OFFSET %s
+        """,
+        (offset - 1,),
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    return encode_cursor(list(row))
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trips", type=int, default=1_000_000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    load_dotenv()
+    conn = connect()
+    mysql = _MySQL(conn)
+    bus_id = seed(conn, args.trips)
+    per_page = args.per_page
+
+    try:
+        print(f"\n{'page':>8} {'offset ms':>10} {'keyset ms':>10}")
+        for page in (1, 10, 100, 1000, 10000, args.trips // per_page // 2):
+            if page < 1 or (page - 1) * per_page >= args.trips:
+                continue
+            offset_ms = timed(
+                lambda: list_trips(mysql, page=page, per_page=per_page), args.repeat
+            )
+            if page == 1:
+                keyset_ms = offset_ms
+            else:
+                token = cursor_at(conn, (page - 1) * per_page)
+                keyset_ms = timed(
+                    lambda: list_trips(mysql, per_page=per_page, cursor_token=token),
+                    args.repeat,
+                )
+            print(f"{page:>8} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+        print(f"\n{'include_total':<14} {'first ms':>9} {'total':>10}")
+        for mode in (None, "exact", "approx"):
+            total_counts.invalidate()
+            started = time.perf_counter()
+            result = list_trips(mysql, per_page=per_page, include_total=mode)
+            first_ms = (time.perf_counter() - started) * 1000
+            print(f"{str(mode):<14} {first_ms:>9.2f} {str(result['total']):>10}")
+            if mode == "exact":
+                cached_ms = timed(
+                    lambda: list_trips(mysql, per_page=per_page, include_total=mode),
+                    args.repeat,
+                )
+                print(f"{'exact (cached)':<14} {cached_ms:>9.2f}")
+    finally:
+        if not args.keep:
+            cleanup(conn, bus_id)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Bookings/sec through sp_create_passenger_booking_with_payment, before and
+after ticket issuing moved into the procedure.
+
+- before: CALL (ticket key NULL) -> INSERT INTO tickets (uuid code) -> COMMIT
+          i.e. the old two round-trips and second commit from Python
+- after : CALL with the ticket key; the procedure inserts the HMAC ticket in
+          its own transaction, one round-trip
+
+Each mode books `--bookings` seats on a fresh trip using `--workers` parallel
+connections. Requires the procedures from
+database/migrations/passenger_booking_procedures.sql and the .env used by the
+backend. Test buses/trips are removed afterwards.
+
+Usage (from backend/):
+    python benchmarks/bench_booking_throughput.py --bookings 500 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bench_seat_allocation import TEST_CARD, connect, setup_trip  # noqa: E402
+from utils.tickets import ticket_code  # noqa: E402
+
+BENCH_KEY = b"\x01" * 32
+
+
+def _call(cursor, ctx, key):
+    cursor.execute(
+        "CALL sp_create_passenger_booking_with_payment(%s, %s, %s, %s, %s, %s, %s, %s)",
+        (
+            ctx["user_id"],
+            ctx["trip_id"],
+            ctx["origin_stop_id"],
+            ctx["destination_stop_id"],
+            TEST_CARD,
+            "123",
+            "Bench User",
+            key,
+        ),
+    )
+    row = cursor.fetchone()
+    while cursor.nextset():
+        pass
+    return row
+
+
+def book_before(conn, ctx):
+    cursor = conn.cursor()
+    row = _call(cursor, ctx, None)
+    cursor.execute(
+        "INSERT INTO tickets (booking_id, qr_code) VALUES (%s, %s)",
+        (row[0], f"TICKET-{row[0]}-{uuid.uuid4().hex[:8].upper()}"),
+    )
+    conn.commit()
+    cursor.close()
+
+
+def book_after(conn, ctx):
+    cursor = conn.cursor()
+    row = _call(cursor, ctx, BENCH_KEY)
+    cursor.close()
+    # Spot check: the SQL HMAC matches utils/tickets.py
+    if row[7] != ticket_code(row[0], BENCH_KEY):
+        raise AssertionError(f"ticket code mismatch for booking {row[0]}: {row[7]}")
+
+
+def run_mode(name, book, args):
+    ctx = setup_trip(args.bookings)
+    per_worker = args.bookings // args.workers
+    connections = [connect() for _ in range(args.workers)]
+    barrier = threading.Barrier(args.workers)
+    errors = []
+
+    def worker(i):
+        barrier.wait()
+        for _ in range(per_worker):
+            try:
+                book(connections[i], ctx)
+            except Exception as e:  # noqa: BLE001 - report every failure
+                errors.append(repr(e))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    for conn in connections:
+        conn.close()
+
+    done = per_worker * args.workers - len(errors)
+    print(
+        f"{name:<7} {done:>6} bookings in {elapsed:7.3f}s  "
+        f"{done / elapsed:8.1f} bookings/s  errors={len(errors)}"
+    )
+    for err in errors[:3]:
+        print(f"  error: {err}")
+
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM trips WHERE trip_id = %s", (ctx["trip_id"],))
+    cursor.execute("DELETE FROM buses WHERE bus_id = %s", (ctx["bus_id"],))
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return done / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bookings", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    load_dotenv()
+    before = run_mode("before", book_before, args)
+    after = run_mode("after", book_after, args)
+    print(f"speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Streaming export of a large bookings table: throughput and peak memory.
+
+Seeds `--bookings` rows (default 5,000,000) on a throwaway bus/trip, then
+streams /admin/exports/bookings through admin.repos.exports (SSCursor +
+chunked encoding) and reports rows/s, bytes and the process's peak RSS.
+`--fetchall` also runs the old approach (buffered cursor, fetchall() into
+dicts) for comparison; run it separately, since peak RSS never goes down.
+
+Requires the .env used by the backend; the bench rows are removed afterwards
+(pass --keep to reuse them on the next run).
+
+Usage (from backend/):
+    python benchmarks/bench_export_stream.py --bookings 5000000 --format csv
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bench_seat_allocation import connect, setup_trip  # noqa: E402
+from admin.repos import exports  # noqa: E402
+from utils.db_pool import db_pool  # noqa: E402
+
+BATCH = 10000
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def find_bench_trip(conn, bookings):
+    """Reuse a kept bench trip that already has enough bookings"""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT t.trip_id, t.bus_id FROM trips t
+        JOIN buses b ON t.bus_id = b.bus_id
+        WHERE b.number_plate LIKE 'BENCH-%%'
+          AND (SELECT COUNT(*) FROM bookings bk WHERE bk.trip_id = t.trip_id) >= %s
+        LIMIT 1
+        """,
+        (bookings,),
+    )
+    row = cursor.fetchone()
+    cursor.close()
+    return row
+
+
+def seed(conn, ctx, bookings):
+    cursor = conn.cursor()
+    start = datetime.now() - timedelta(days=365)
+    step = 365 * 86400 / max(bookings, 1)
+    started = time.perf_counter()
+    for base in range(0, bookings, BATCH):
+        rows = [
+            (
+                ctx["user_id"],
+                ctx["trip_id"],
+                ctx["origin_stop_id"],
+                ctx["destination_stop_id"],
+                i + 1,
+                start + timedelta(seconds=int(i * step)),
+            )
+            for i in range(base, min(base + BATCH, bookings))
+        ]
+        cursor.executemany(
+            """
+            INSERT INTO bookings (user_id, trip_id, origin_stop_id, destination_stop_id, seat_number, booking_date)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            rows,
+        )
+        conn.commit()
+    cursor.close()
+    print(f"seeded {bookings} bookings in {time.perf_counter() - started:.1f}s")
+
+
+def cleanup(conn, trip_id, bus_id):
+    cursor = conn.cursor()
+    while True:
+        cursor.execute("DELETE FROM bookings WHERE trip_id = %s LIMIT %s", (trip_id, BATCH))
+        conn.commit()
+        if cursor.rowcount == 0:
+            break
+    cursor.execute("DELETE FROM buses WHERE bus_id = %s", (bus_id,))
+    conn.commit()
+    cursor.close()
+
+
+def run_stream(fmt):
+    started = time.perf_counter()
+    stream = exports.open_export("bookings", fmt)
+    size = 0
+    try:
+        for chunk in stream:
+            size += len(chunk)
+    finally:
+        stream.close()
+    return time.perf_counter() - started, size
+
+
+def run_fetchall(conn):
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    template, _ = exports.DATASETS["bookings"]
+    cursor.execute(template.format(where=""))
+    cols = [c[0] for c in cursor.description]
+    rows = [dict(zip(cols, r)) for r in cursor.fetchall()]
+    cursor.close()
+    return time.perf_counter() - started, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bookings", type=int, default=5_000_000)
+    parser.add_argument("--format", choices=sorted(exports.FORMATS), default="csv")
+    parser.add_argument("--fetchall", action="store_true")
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_pool.init_app(
+        SimpleNamespace(
+            config={
+                "MYSQL_HOST": os.getenv("DB_HOST"),
+                "MYSQL_USER": os.getenv("DB_USER"),
+                "MYSQL_PASSWORD": os.getenv("DB_PASSWORD"),
+                "MYSQL_DB": os.getenv("DB_NAME"),
+                "MYSQL_PORT": int(os.getenv("DB_PORT", 3306)),
+            }
+        )
+    )
+    if not exports.format_available(args.format):
+        raise SystemExit(f"--format {args.format} needs pyarrow installed")
+
+    conn = connect()
+    existing = find_bench_trip(conn, args.bookings)
+    if existing:
+        trip_id, bus_id = existing
+        print(f"reusing bench trip {trip_id}")
+    else:
+        ctx = setup_trip(capacity=40)
+        trip_id, bus_id = ctx["trip_id"], ctx["bus_id"]
+        seed(conn, ctx, args.bookings)
+
+    try:
+        baseline = peak_rss_mb()
+        elapsed, size = run_stream(args.format)
+        print(
+            f"stream {args.format}: {elapsed:.1f}s, {size / 1e6:.1f} MB, "
+            f"peak RSS {peak_rss_mb():.0f} MB (before {baseline:.0f} MB)"
+        )
+        if args.fetchall:
+            elapsed, rows = run_fetchall(conn)
+            print(f"fetchall: {rows} rows in {elapsed:.1f}s, peak RSS {peak_rss_mb():.0f} MB")
+    finally:
+        if not args.keep:
+            cleanup(conn, trip_id, bus_id)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Latency benchmark for the journey planner (utils/journey_planner.py).
+
+Builds a synthetic city-wide network without a database: `--routes` routes
+of `--stops` stops laid out as a grid of lines over Karachi (crossing routes
+share stops, parallel ones are a short walk apart), with trips in both
+directions every `--headway` minutes for a day. Then runs `--queries` random
+stop-to-stop queries and reports the timetable size, build time and query
+latency percentiles.
+
+Usage (from backend/):
+    python benchmarks/bench_journey_planner.py --routes 60 --stops 30 --headway 10
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.journey_planner import JourneyPlanner, Timetable  # noqa: E402
+
+ORIGIN = (24.80, 66.95)  # South-west corner of the grid
+SPACING_DEG = 0.006  # ~650 m between stops
+
+
+def build_network(n_routes, n_stops, headway_minutes):
+    """Half the routes run west-east, half south-north, on a shared stop grid"""
+    routes = {}
+    for r in range(n_routes):
+        line = r // 2
+        stops = []
+        for k in range(n_stops):
+            # Every other line is offset by ~200 m so transfers need a walk
+            offset = 0.002 if line % 2 else 0.0
+            if r % 2 == 0:
+                row, col, lat_off, lon_off = line, k, offset, 0.0
+            else:
+                row, col, lat_off, lon_off = k, line, 0.0, offset
+            stop_id = 1 + row * 1000 + col if not offset else 500_000 + r * 1000 + k
+            stops.append(
+                {
+                    "stop_id": stop_id,
+                    "stop_name": f"Stop {stop_id}",
+                    "stop_order": k + 1,
+                    "latitude": ORIGIN[0] + row * SPACING_DEG + lat_off,
+                    "longitude": ORIGIN[1] + col * SPACING_DEG + lon_off,
+                }
+            )
+        routes[r + 1] = {"route_name": f"Route {r + 1}", "service_id": 1 + r % 2, "stops": stops}
+
+    start = datetime.now().replace(second=0, microsecond=0)
+    trips = []
+    trip_id = 1
+    for route_id in routes:
+        for m in range(0, 24 * 60, headway_minutes):
+            for direction in ("forward", "backward"):
+                departure = start + timedelta(minutes=m + route_id % headway_minutes)
+                trips.append((trip_id, route_id, direction, departure, None))
+                trip_id += 1
+    return routes, trips, start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--routes", type=int, default=60)
+    parser.add_argument("--stops", type=int, default=30)
+    parser.add_argument("--headway", type=int, default=10, help="minutes between trips")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    routes, trips, start = build_network(args.routes, args.stops, args.headway)
+    began = time.perf_counter()
+    timetable = Timetable(routes, trips)
+    build_seconds = time.perf_counter() - began
+    planner = JourneyPlanner()
+    planner.load(timetable)
+    print(
+        f"timetable: {len(timetable.stop_ids)} stops, {len(timetable.trips)} trips, "
+        f"{len(timetable.dep_time)} connections, built in {build_seconds:.2f}s"
+    )
+
+    rng = random.Random(args.seed)
+    latencies, found, transfers = [], 0, []
+    for _ in range(args.queries):
+        a, b = rng.sample(timetable.stop_ids, 2)
+        depart_after = start + timedelta(minutes=rng.randrange(0, 18 * 60))
+        began = time.perf_counter()
+        journeys = planner.plan(a, b, depart_after)
+        latencies.append((time.perf_counter() - began) * 1000)
+        if journeys:
+            found += 1
+            transfers.append(journeys[0]["transfers"])
+
+    latencies.sort()
+    print(f"queries: {args.queries}, journeys found: {found}")
+    if transfers:
+        print(f"transfers: mean {statistics.mean(transfers):.2f}, max {max(transfers)}")
+    print(
+        f"latency ms: p50 {latencies[len(latencies) // 2]:.1f}, "
+        f"p95 {latencies[int(len(latencies) * 0.95)]:.1f}, max {latencies[-1]:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
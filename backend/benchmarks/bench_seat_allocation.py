@@ -0,0 +1,282 @@
+"""
+Concurrency benchmark for per-trip seat allocation (trip_seats).
+
+Fires N parallel bookings (default 200) at a single trip whose bus has fewer
+seats than bookings, each on its own DB connection, and checks that:
+- no more bookings are confirmed than the bus capacity (zero oversell)
+- no seat number is handed out twice or exceeds the bus capacity
+- no booking fails with a deadlock (1213) or lock wait timeout (1205)
+and reports the throughput achieved. `--json` appends the result as one JSON
+line to a file, so runs on different hosts / modes can be compared.
+
+Requires a database with database/migrations/trip_seat_inventory.sql and
+trip_segment_load.sql applied (and passenger_booking_procedures.sql for
+--mode proc). Uses the same .env as the backend. A temporary bus and trip are created and removed afterwards.
+
+Usage (from backend/):
+    python benchmarks/bench_seat_allocation.py --bookings 200 --capacity 40
+    python benchmarks/bench_seat_allocation.py --mode proc --json bench_results.jsonl
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import MySQLdb
+from dotenv import load_dotenv
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.seat_inventory import claim_seats, journey_segments  # noqa: E402
+
+TEST_CARD = "4111111111111111"
+LOCK_ERRORS = {1205: "lock wait timeout", 1213: "deadlock"}
+
+
+def connect():
+    return MySQLdb.connect(
+        host=os.getenv("DB_HOST"),
+        user=os.getenv("DB_USER"),
+        passwd=os.getenv("DB_PASSWORD"),
+        db=os.getenv("DB_NAME"),
+        port=int(os.getenv("DB_PORT", 3306)),
+    )
+
+
+def setup_trip(capacity):
+    """Create a throwaway bus + forward trip on the first route with >= 2 stops"""
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT route_id FROM routes_stops
+        GROUP BY route_id HAVING COUNT(*) >= 2
+        ORDER BY route_id LIMIT 1
+        """
+    )
+    row = cursor.fetchone()
+    if not row:
+        raise SystemExit("No route with at least two stops found")
+    route_id = row[0]
+    cursor.execute(
+        "SELECT stop_id FROM routes_stops WHERE route_id = %s ORDER BY stop_order LIMIT 2",
+        (route_id,),
+    )
+    origin_stop_id, destination_stop_id = [r[0] for r in cursor.fetchall()]
+    cursor.execute("SELECT user_id FROM users ORDER BY user_id LIMIT 1")
+    row = cursor.fetchone()
+    if not row:
+        raise SystemExit("No user found to book with")
+    user_id = row[0]
+
+    cursor.execute(
+        "INSERT INTO buses (number_plate, capacity) VALUES (%s, %s)",
+        (f"BENCH-{uuid.uuid4().hex[:8].upper()}", capacity),
+    )
+    bus_id = cursor.lastrowid
+    cursor.execute(
+        """
+        INSERT INTO trips (bus_id, route_id, direction, departure_time, status)
+        VALUES (%s, %s, 'forward', %s, 'scheduled')
+        """,
+        (bus_id, route_id, datetime.now() + timedelta(hours=6)),
+    )
+    trip_id = cursor.lastrowid
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return {
+        "bus_id": bus_id,
+        "trip_id": trip_id,
+        "user_id": user_id,
+        "origin_stop_id": origin_stop_id,
+        "destination_stop_id": destination_stop_id,
+    }
+
+
+def book_python(conn, ctx):
+    """Seat claim + booking insert, as in the Python booking flow"""
+    cursor = conn.cursor()
+    try:
+        segments = journey_segments(
+            cursor, ctx["trip_id"], ctx["origin_stop_id"], ctx["destination_stop_id"]
+        )
+        seats = claim_seats(cursor, ctx["trip_id"], segments=segments)
+        if not seats:
+            conn.rollback()
+            return False
+        cursor.execute(
+            """
+            INSERT INTO bookings (user_id, trip_id, origin_stop_id, destination_stop_id, seat_number)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            (
+                ctx["user_id"],
+                ctx["trip_id"],
+                ctx["origin_stop_id"],
+                ctx["destination_stop_id"],
+                seats[0],
+            ),
+        )
+        conn.commit()
+        return True
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def book_proc(conn, ctx):
+    """Full stored procedure booking (card validation, seat claim, payment)"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "CALL sp_create_passenger_booking_with_payment(%s, %s, %s, %s, %s, %s, %s)",
+            (
+                ctx["user_id"],
+                ctx["trip_id"],
+                ctx["origin_stop_id"],
+                ctx["destination_stop_id"],
+                TEST_CARD,
+                "123",
+                "Bench User",
+            ),
+        )
+        cursor.fetchall()
+        while cursor.nextset():
+            pass
+        return True
+    except MySQLdb.OperationalError as e:
+        if e.args and e.args[0] == 1644 and "No seats" in str(e.args[1]):
+            return False
+        raise
+    finally:
+        cursor.close()
+
+
+def run(args):
+    load_dotenv()
+    ctx = setup_trip(args.capacity)
+    book = book_proc if args.mode == "proc" else book_python
+
+    # Open all connections up front so connect time is not measured
+    connections = [connect() for _ in range(args.bookings)]
+    barrier = threading.Barrier(args.bookings)
+    results = [None] * args.bookings
+    latencies = [0.0] * args.bookings
+    errors = []
+    lock_errors = {code: 0 for code in LOCK_ERRORS}
+
+    def worker(i):
+        barrier.wait()
+        started = time.perf_counter()
+        try:
+            results[i] = book(connections[i], ctx)
+        except MySQLdb.OperationalError as e:
+            if e.args and e.args[0] in lock_errors:
+                lock_errors[e.args[0]] += 1
+            errors.append(repr(e))
+        except Exception as e:  # noqa: BLE001 - report every failure
+            errors.append(repr(e))
+        latencies[i] = time.perf_counter() - started
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.bookings)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    for conn in connections:
+        conn.close()
+
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT COUNT(*), COUNT(DISTINCT seat_number), COALESCE(MAX(seat_number), 0)
+        FROM bookings WHERE trip_id = %s AND status = 'confirmed'
+        """,
+        (ctx["trip_id"],),
+    )
+    confirmed, distinct_seats, max_seat = cursor.fetchone()
+    cursor.execute(
+        "SELECT seats_taken, capacity FROM trip_seats WHERE trip_id = %s",
+        (ctx["trip_id"],),
+    )
+    seats_taken, capacity = cursor.fetchone()
+
+    booked = sum(1 for r in results if r)
+    rejected = sum(1 for r in results if r is False)
+    oversell = max(0, confirmed - capacity)
+
+    p50 = statistics.median(latencies) * 1000
+    p95 = statistics.quantiles(latencies, n=20)[18] * 1000
+    print(f"mode               : {args.mode}")
+    print(f"parallel bookings  : {args.bookings}")
+    print(f"bus capacity       : {capacity}")
+    print(f"booked / rejected  : {booked} / {rejected}")
+    print(f"errors             : {len(errors)}")
+    for code, name in LOCK_ERRORS.items():
+        print(f"  {name:<17}: {lock_errors[code]}")
+    print(f"confirmed in DB    : {confirmed} (trip_seats.seats_taken={seats_taken}, busiest segment)")
+    print(f"duplicate seats    : {confirmed - distinct_seats}")
+    print(f"highest seat       : {max_seat}")
+    print(f"oversell           : {oversell}")
+    print(f"elapsed            : {elapsed:.3f}s")
+    print(f"throughput         : {args.bookings / elapsed:.1f} requests/s, {booked / elapsed:.1f} bookings/s")
+    print(f"latency p50 / p95  : {p50:.1f} ms / {p95:.1f} ms")
+    for err in errors[:5]:
+        print(f"  error: {err}")
+
+    if args.json:
+        with open(args.json, "a") as f:
+            f.write(json.dumps({
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "mode": args.mode,
+                "bookings": args.bookings,
+                "capacity": capacity,
+                "booked": booked,
+                "rejected": rejected,
+                "errors": len(errors),
+                "deadlocks": lock_errors[1213],
+                "lock_wait_timeouts": lock_errors[1205],
+                "duplicate_seats": confirmed - distinct_seats,
+                "max_seat": max_seat,
+                "oversell": oversell,
+                "elapsed_s": round(elapsed, 3),
+                "bookings_per_s": round(booked / elapsed, 1),
+                "p50_ms": round(p50, 1),
+                "p95_ms": round(p95, 1),
+            }) + "\n")
+
+    if not args.keep:
+        cursor.execute("DELETE FROM trips WHERE trip_id = %s", (ctx["trip_id"],))
+        cursor.execute("DELETE FROM buses WHERE bus_id = %s", (ctx["bus_id"],))
+        conn.commit()
+    cursor.close()
+    conn.close()
+
+    return 1 if oversell or confirmed != distinct_seats or max_seat > capacity or errors else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bookings", type=int, default=200, help="parallel booking attempts")
+    parser.add_argument("--capacity", type=int, default=40, help="seats on the test bus")
+    parser.add_argument("--mode", choices=("python", "proc"), default="python")
+    parser.add_argument("--keep", action="store_true", help="keep the test bus/trip")
+    parser.add_argument("--json", metavar="PATH", help="append the result as a JSON line")
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 from datetime import datetime, timedelta, timezone
+import logging
 from threading import Thread, Lock
 import time
 from typing import Dict, Optional, List
 import MySQLdb.cursors
+from utils.live_metrics import live_metrics
+from utils.logging_utils import get_logger, sampled
+
+logger = get_logger(__name__)
 
 
 class BusTracker:
@@ -59,12 +64,12 @@ class BusTracker:
         self.socketio = socketio
         # Ensure scheduler thread is running once socket/app are ready
         self._ensure_scheduler_thread()
-        print("set_socketio called - Scheduler thread ensured (if not already running)")
+        logger.debug("set_socketio called - Scheduler thread ensured (if not already running)")
         # Recover any running trips from database on startup
         if hasattr(self, "_recover_running_trips"):
             self._recover_running_trips()
         else:
-            print("Recovery method not available, skipping trip recovery")
+            logger.debug("Recovery method not available, skipping trip recovery")
 
     def _ensure_scheduler_thread(self):
         """Start the scheduler thread if it's not already running"""
@@ -125,7 +130,7 @@ class BusTracker:
                 mysql.connection.commit()
                 cursor.close()
             except Exception as e:
-                print(f"start_trip: Failed updating DB status for trip {trip_id}: {e}")
+                logger.error("start_trip: Failed updating DB status for trip %s: %s", trip_id, e)
 
             # Emit to all connected clients
             if self.socketio:
@@ -142,10 +147,16 @@ class BusTracker:
                     namespace="/",
                 )
                 # Debug: log that trip has been added to in-memory tracker
-                print(
-                    f"start_trip: Trip #{trip_id} (route_id={route_id}) started (direction={direction}) - active_trips={len(self.active_trips)}"
+                logger.info(
+                    "start_trip: Trip #%s (route_id=%s) started (direction=%s) - active_trips=%s",
+                    trip_id,
+                    route_id,
+                    direction,
+                    len(self.active_trips),
                 )
 
+            live_metrics.trip_started(trip_id)
+
             # Start background thread if not running
             if not self.running:
                 self.running = True
@@ -184,10 +195,11 @@ class BusTracker:
                 cursor.close()
             except Exception as e:
                 # Log database errors during trip cancellation
-                print(f"cancel_trip: Failed to update database for trip {trip_id}: {e}")
+                logger.error("cancel_trip: Failed to update database for trip %s: %s", trip_id, e)
 
             # Remove from active trips
             del self.active_trips[trip_id]
+            live_metrics.trip_ended(trip_id)
 
             # Emit to clients
             if self.socketio:
@@ -272,8 +284,8 @@ class BusTracker:
                                 )
                                 db.connection.commit()
                                 cursor.close()
-                                print(
-                                    f"Trip #{trip_id} marked as completed in database"
+                                logger.info(
+                                    "Trip #%s marked as completed in database", trip_id
                                 )
 
                                 # ONLY proceed if DB update succeeded
@@ -304,17 +316,16 @@ class BusTracker:
                                 self._schedule_return_trip(trip_id, mysql)
 
                             except Exception as e:
-                                print(
-                                    f"CRITICAL: Failed to update trip #{trip_id} to completed in DB: {e}"
+                                logger.exception(
+                                    "CRITICAL: Failed to update trip #%s to completed in DB: %s",
+                                    trip_id,
+                                    e,
                                 )
-                                print(
-                                    f"Trip will retry completion on next update cycle (15s)"
+                                logger.warning(
+                                    "Trip will retry completion on next update cycle (15s)"
                                 )
                                 # Do NOT change status, do NOT remove from active_trips, do NOT emit event
                                 # Trip will attempt completion again in 15 seconds
-                                import traceback
-
-                                traceback.print_exc()
                         else:
                             # Update current stop info
                             current_stop = trip["route_stops"][
@@ -342,6 +353,7 @@ class BusTracker:
                     # Remove completed trips
                     for trip_id in trips_to_remove:
                         del self.active_trips[trip_id]
+                        live_metrics.trip_ended(trip_id)
 
                 # Stop thread if no active trips
                 if not self.active_trips:
@@ -361,21 +373,15 @@ class BusTracker:
                 try:
                     self.sync_active_trips(mysql)
                 except Exception as e:
-                    print(f"Scheduler sync_active_trips failed: {e}")
-                    import traceback
-
-                    traceback.print_exc()
+                    logger.exception("Scheduler sync_active_trips failed: %s", e)
                 try:
                     cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
                     # Set timezone for this connection
                     cursor.execute("SET time_zone = '+05:00'")
 
-                    # Get current local time from Python (since departure_time is stored in local time)
-                    current_local_time = datetime.now()
-
-                    # Debug: Print current time being used for comparison
-                    print(
-                        f"Scheduler check at {current_local_time.strftime('%Y-%m-%d %H:%M:%S')}"
+                    # Scheduler runs every 10s; keep one in 30 cycle traces
+                    logger.debug(
+                        "Scheduler check at %s", datetime.now(), extra=sampled(30)
                     )
 
                     # Use DB server NOW() within query to avoid Python/DB timezone mismatches
@@ -391,21 +397,26 @@ class BusTracker:
                     )
 
                     due_trips = cursor.fetchall()
-                    # Optionally print DB NOW to help troubleshoot scheduler timing
-                    try:
-                        cursor.execute("SELECT NOW() as db_now")
-                        db_now_val = cursor.fetchone()[0]
-                        print(f"   DB NOW(): {db_now_val}")
-                    except Exception:
-                        pass
+                    # Only query DB NOW() when debug tracing of the scheduler is enabled
+                    if logger.isEnabledFor(logging.DEBUG):
+                        try:
+                            cursor.execute("SELECT NOW() as db_now")
+                            db_now_val = cursor.fetchone()["db_now"]
+                            logger.debug(
+                                "Scheduler DB NOW(): %s", db_now_val, extra=sampled(30)
+                            )
+                        except Exception:
+                            pass
 
                     if due_trips:
-                        print(f"Found {len(due_trips)} trip(s) ready to start:")
+                        logger.info("Found %s trip(s) ready to start", len(due_trips))
                         for t in due_trips:
-                            print(
-                                f"   - Trip {t['trip_id']}: departure_time={t['departure_time']}"
+                            logger.debug(
+                                "Due trip %s: departure_time=%s",
+                                t["trip_id"],
+                                t["departure_time"],
                             )
-                    else:
+                    elif logger.isEnabledFor(logging.DEBUG):
                         # Debug: Show next upcoming trip
                         cursor.execute(
                             """
@@ -418,12 +429,15 @@ class BusTracker:
                         )
                         next_trip = cursor.fetchone()
                         if next_trip:
-                            print(
-                                f"   Next trip: #{next_trip['trip_id']} at {next_trip['departure_time']}"
+                            logger.debug(
+                                "Next trip: #%s at %s",
+                                next_trip["trip_id"],
+                                next_trip["departure_time"],
+                                extra=sampled(30),
                             )
 
                 except Exception as e:
-                    print(f"Scheduler error querying trips: {e}")
+                    logger.error("Scheduler error querying trips: %s", e)
                     continue
 
                 for trip in due_trips or []:
@@ -434,7 +448,7 @@ class BusTracker:
                     # Skip if already running
                     with self.trips_lock:
                         if trip_id in self.active_trips:
-                            print(f"Trip {trip_id} already running, skipping")
+                            logger.debug("Trip %s already running, skipping", trip_id)
                             continue
 
                     try:
@@ -450,12 +464,12 @@ class BusTracker:
                         )
                         route_stops = cursor.fetchall()
                     except Exception as e:
-                        print(f"Error fetching route stops for trip {trip_id}: {e}")
+                        logger.error("Error fetching route stops for trip %s: %s", trip_id, e)
                         continue
 
                     if not route_stops:
-                        print(
-                            f"No route stops found for trip {trip_id}, route {route_id}"
+                        logger.warning(
+                            "No route stops found for trip %s, route %s", trip_id, route_id
                         )
                         continue
 
@@ -471,16 +485,16 @@ class BusTracker:
                         )
                     except Exception as ex:
                         success = False
-                        print(
-                            f"Exception while calling start_trip for trip {trip_id}: {ex}"
+                        logger.exception(
+                            "Exception while calling start_trip for trip %s: %s", trip_id, ex
                         )
                     if success:
-                        print(
-                            f"Auto-started trip {trip_id} (route {route_id}, {direction})"
+                        logger.info(
+                            "Auto-started trip %s (route %s, %s)", trip_id, route_id, direction
                         )
                     else:
-                        print(
-                            f"Failed to auto-start trip {trip_id} (may already be running)"
+                        logger.warning(
+                            "Failed to auto-start trip %s (may already be running)", trip_id
                         )
 
                 cursor.close()
@@ -507,7 +521,7 @@ class BusTracker:
             # their own connections to avoid 'MySQL server has gone away')
             from admin import get_mysql
 
-            print(f"Scheduling return trip for original trip {completed_trip_id}")
+            logger.info("Scheduling return trip for original trip %s", completed_trip_id)
             with app.app_context():
                 cursor = None
                 origin_supported = True
@@ -625,12 +639,16 @@ class BusTracker:
                                                 (completed_trip_id, existing_id),
                                             )
                                             thread_mysql.connection.commit()
-                                            print(
-                                                f"Set origin_trip_id for existing return trip {existing_id} to {completed_trip_id}"
+                                            logger.info(
+                                                "Set origin_trip_id for existing return trip %s to %s",
+                                                existing_id,
+                                                completed_trip_id,
                                             )
                                         except Exception as e:
-                                            print(
-                                                f"Failed to set origin_trip_id on existing trip {existing_id}: {e}"
+                                            logger.warning(
+                                                "Failed to set origin_trip_id on existing trip %s: %s",
+                                                existing_id,
+                                                e,
                                             )
                                 except Exception:
                                     pass
@@ -651,12 +669,16 @@ class BusTracker:
                                             )
                                             thread_mysql.connection.commit()
                                             new_trip_id = existing_id
-                                            print(
-                                                f"Set origin_trip_id for existing return trip {existing_id} to {completed_trip_id}"
+                                            logger.info(
+                                                "Set origin_trip_id for existing return trip %s to %s",
+                                                existing_id,
+                                                completed_trip_id,
                                             )
                                         except Exception as e:
-                                            print(
-                                                f"Failed to set origin_trip_id on existing trip {existing_id}: {e}"
+                                            logger.warning(
+                                                "Failed to set origin_trip_id on existing trip %s: %s",
+                                                existing_id,
+                                                e,
                                             )
                                 except Exception:
                                     pass
@@ -693,8 +715,8 @@ class BusTracker:
                             thread_mysql.connection.commit()
                             new_trip_id = cursor.lastrowid
                         except Exception as e:
-                            print(
-                                f"_schedule_return_trip: Failed to create return trip: {e}"
+                            logger.error(
+                                "_schedule_return_trip: Failed to create return trip: %s", e
                             )
                             if cursor:
                                 try:
@@ -743,10 +765,7 @@ class BusTracker:
                         )
 
                 except Exception as e:
-                    print(f"_schedule_return_trip: Unexpected error: {e}")
-                    import traceback
-
-                    traceback.print_exc()
+                    logger.exception("_schedule_return_trip: Unexpected error: %s", e)
                 finally:
                     if cursor:
                         try:
@@ -777,13 +796,16 @@ class BusTracker:
                         created = cursor2.fetchone()
                         cursor2.close()
                         if not created:
-                            print(
-                                f"Return trip #{new_trip_id} disappeared from DB; skipping auto-start"
+                            logger.warning(
+                                "Return trip #%s disappeared from DB; skipping auto-start",
+                                new_trip_id,
                             )
                         else:
                             if created.get("status") != "scheduled":
-                                print(
-                                    f"Return trip #{new_trip_id} is not scheduled (status={created.get('status')}), skipping auto-start"
+                                logger.info(
+                                    "Return trip #%s is not scheduled (status=%s), skipping auto-start",
+                                    new_trip_id,
+                                    created.get('status'),
                                 )
                             else:
                                 # If there's a departure_time, wait until that time before attempting to auto-start.
@@ -796,8 +818,10 @@ class BusTracker:
                                         departure_time_db - now_time
                                     ).total_seconds()
                                     if remaining > 0:
-                                        print(
-                                            f"Waiting {remaining:.1f}s until scheduled departure for trip #{new_trip_id}"
+                                        logger.debug(
+                                            "Waiting %.1fs until scheduled departure for trip #%s",
+                                            remaining,
+                                            new_trip_id,
                                         )
                                         time.sleep(remaining)
                                 # Fetch route stops for this return trip and start it in-memory directly
@@ -816,8 +840,10 @@ class BusTracker:
                                 cursor3.close()
 
                                 if not route_stops:
-                                    print(
-                                        f"Cannot auto-start return trip {new_trip_id}: no route stops found for route {route_id}"
+                                    logger.warning(
+                                        "Cannot auto-start return trip %s: no route stops found for route %s",
+                                        new_trip_id,
+                                        route_id,
                                     )
                                 else:
                                     ordered_stops = (
@@ -834,20 +860,25 @@ class BusTracker:
                                             return_direction,
                                         )
                                         if started:
-                                            print(
-                                                f"Return trip {new_trip_id} auto-started successfully (direction {return_direction})"
+                                            logger.info(
+                                                "Return trip %s auto-started successfully (direction %s)",
+                                                new_trip_id,
+                                                return_direction,
                                             )
                                         else:
-                                            print(
-                                                f"Return trip {new_trip_id} was not started (maybe it's already running)"
+                                            logger.info(
+                                                "Return trip %s was not started (maybe it's already running)",
+                                                new_trip_id,
                                             )
                                     except Exception as ex:
-                                        print(
-                                            f"Failed to auto-start return trip {new_trip_id}: {ex}"
+                                        logger.exception(
+                                            "Failed to auto-start return trip %s: %s",
+                                            new_trip_id,
+                                            ex,
                                         )
                 except Exception as e:
-                    print(
-                        f"Error while attempting to auto-start return trip {new_trip_id}: {e}"
+                    logger.exception(
+                        "Error while attempting to auto-start return trip %s: %s", new_trip_id, e
                     )
 
         # Start thread to create return trip after buffer
@@ -891,8 +922,8 @@ class BusTracker:
             running_trips = cursor.fetchall()
 
             if running_trips:
-                print(
-                    f"Recovering {len(running_trips)} running trip(s) from database..."
+                logger.info(
+                    "Recovering %s running trip(s) from database...", len(running_trips)
                 )
 
             for trip in running_trips:
@@ -901,8 +932,11 @@ class BusTracker:
                     route_id = trip["route_id"]
                     route_name = trip.get("route_name")
                     direction = trip.get("direction") or "forward"
-                    print(
-                        f"recover_active_trips: Reconstructing trip {trip_id} (route {route_id}, direction={direction})"
+                    logger.info(
+                        "recover_active_trips: Reconstructing trip %s (route %s, direction=%s)",
+                        trip_id,
+                        route_id,
+                        direction,
                     )
 
                     # Get route stops
@@ -919,7 +953,7 @@ class BusTracker:
                     route_stops = cursor.fetchall()
 
                     if not route_stops:
-                        print(f"Cannot recover trip {trip_id}: no route stops found")
+                        logger.warning("Cannot recover trip %s: no route stops found", trip_id)
                         continue
 
                     ordered_stops = (
@@ -951,8 +985,11 @@ class BusTracker:
                             "total_stops": len(ordered_stops),
                         }
 
-                        print(
-                            f"Recovered trip {trip_id} (route {route_id}, {direction}) - starting from first stop"
+                        logger.info(
+                            "Recovered trip %s (route %s, %s) - starting from first stop",
+                            trip_id,
+                            route_id,
+                            direction,
                         )
 
                     # Emit to all connected clients
@@ -977,18 +1014,15 @@ class BusTracker:
                         self.update_thread.start()
 
                 except Exception as trip_error:
-                    print(
-                        f"Failed to recover trip {trip.get('trip_id', 'UNKNOWN')}: {trip_error}"
+                    logger.exception(
+                        "Failed to recover trip %s: %s", trip.get('trip_id', 'UNKNOWN'), trip_error
                     )
-                    import traceback
-
-                    traceback.print_exc()
                     # Continue with next trip
 
             cursor.close()
 
         except Exception as e:
-            print(f"Error recovering running trips: {e}")
+            logger.exception("Error recovering running trips: %s", e)
 
     def sync_active_trips(self, mysql, force: bool = False):
         """
@@ -1003,8 +1037,11 @@ class BusTracker:
             if not force and self.last_sync_time:
                 elapsed = (now - self.last_sync_time).total_seconds()
                 if elapsed < self.sync_interval_seconds:
-                    print(
-                        f"sync_active_trips: Skipping sync (elapsed {elapsed:.1f}s < interval {self.sync_interval_seconds}s)"
+                    logger.debug(
+                        "sync_active_trips: Skipping sync (elapsed %.1fs < interval %ss)",
+                        elapsed,
+                        self.sync_interval_seconds,
+                        extra=sampled(30),
                     )
                     return  # Skip sync, too soon since last one
 
@@ -1029,15 +1066,15 @@ class BusTracker:
 
             # 5. Recover missing trips
             if missing_ids:
-                print(
-                    f"Found {len(missing_ids)} running trips missing from tracker. Syncing..."
+                logger.info(
+                    "Found %s running trips missing from tracker. Syncing...", len(missing_ids)
                 )
                 self.recover_active_trips(mysql, list(missing_ids))
 
             # 6. Clean up stale trips
             if stale_ids:
-                print(
-                    f"Removing {len(stale_ids)} stale trips from tracker: {stale_ids}"
+                logger.info(
+                    "Removing %s stale trips from tracker: %s", len(stale_ids), stale_ids
                 )
                 with self.trips_lock:
                     for trip_id in stale_ids:
@@ -1050,16 +1087,13 @@ class BusTracker:
                                 )
 
         except Exception as e:
-            print(f"Sync error: {e}")
-            import traceback
-
-            traceback.print_exc()
+            logger.exception("Sync error: %s", e)
 
     def _recover_running_trips(self):
         """Recover running trips from database on startup (in case of server restart)"""
         # Prevent duplicate recovery
         if self.recovery_completed:
-            print("Recovery already completed, skipping duplicate recovery attempt")
+            logger.debug("Recovery already completed, skipping duplicate recovery attempt")
             return
 
         from app import app, mysql
@@ -1069,7 +1103,7 @@ class BusTracker:
             with app.app_context():
                 self.recover_active_trips(mysql)
                 self.recovery_completed = True  # Mark recovery as completed
-                print("Trip recovery completed")
+                logger.info("Trip recovery completed")
 
         # Run recovery in background thread
         Thread(target=recover, daemon=True).start()
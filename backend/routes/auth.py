@@ -118,6 +118,9 @@ def register():
             (username, full_name, email, hashed_password, phone_number, role),
         )
         mysql.connection.commit()
+        from utils.prefix_index import user_index
+
+        user_index.invalidate()
         return jsonify(
             {"success": True, "message": "You have successfully registered!"}
         )
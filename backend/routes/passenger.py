@@ -1,13 +1,40 @@
-from typing import Dict, Any
-from datetime import datetime
-import uuid
+import os
+from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
 
 from flask import Blueprint, jsonify, request, session, current_app
 import MySQLdb
 import MySQLdb.cursors
+from admin import admin_required
 from utils.fare_utils import calculate_fare
+from utils.pagination import encode_cursor, decode_cursor
+from utils.seat_inventory import claim_seats, journey_segments, route_segments
+from utils.idempotency import idempotent
+from utils.tickets import (
+    TicketTokenError,
+    sign_ticket_token,
+    ticket_code,
+    ticket_key,
+    ticket_revocations,
+    token_expiry,
+    verify_ticket_token,
+)
+from utils.seat_holds import (
+    MAX_HOLDS_PER_USER,
+    HoldLimitError,
+    cancel_hold,
+    consume_hold,
+    create_hold,
+    hold_sweeper,
+)
+from utils.trip_loads import trip_loads
+from utils.journey_planner import journey_planner
+from utils.route_topology import route_topology
+from utils.live_metrics import live_metrics
+from utils.logging_utils import get_logger, sampled
 
 passenger_bp = Blueprint("passenger", __name__)
+logger = get_logger(__name__)
 
 
 # ---------- GET ROUTES FOR A SERVICE ----------
@@ -75,6 +102,62 @@ def get_route_stops(route_id):
     )
 
 
+# ---------- FIND STOPS NEAR A POINT ----------
+NEARBY_DEFAULT_RADIUS = 500
+NEARBY_MAX_RADIUS = 5000
+NEARBY_DEFAULT_LIMIT = 20
+NEARBY_MAX_LIMIT = 100
+
+
+@passenger_bp.route("/stops/nearby", methods=["GET"])
+def get_nearby_stops():
+    """
+    Stops within `radius` metres of a point, nearest first, from the in-memory
+    stop grid (utils/spatial_index.py).
+
+    Query params:
+    - lat / lng: the point (required)
+    - radius: metres (default 500, max 5000)
+    - route_id: only stops on this route (optional)
+    - limit: max stops (default 20, max 100)
+    """
+    from app import mysql
+
+    lat = request.args.get("lat", type=float)
+    lng = request.args.get("lng", type=float)
+    if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return jsonify({"success": False, "message": "Valid 'lat' and 'lng' are required"}), 400
+    radius = request.args.get("radius", NEARBY_DEFAULT_RADIUS, type=float)
+    if radius is None or not (0 < radius <= NEARBY_MAX_RADIUS):
+        return jsonify(
+            {"success": False, "message": f"radius must be between 0 and {NEARBY_MAX_RADIUS} metres"}
+        ), 400
+    limit = request.args.get("limit", NEARBY_DEFAULT_LIMIT, type=int)
+    if limit is None or limit < 1:
+        return jsonify({"success": False, "message": "limit must be >= 1"}), 400
+    limit = min(limit, NEARBY_MAX_LIMIT)
+    route_id = request.args.get("route_id", type=int)
+
+    route_topology.ensure_loaded(mysql)
+    if route_id is not None and route_topology.get_route(route_id) is None:
+        return jsonify({"success": False, "message": "Route not found"}), 404
+
+    stops = []
+    for stop_id, meters in route_topology.nearby_stops(lat, lng, radius, route_id)[:limit]:
+        stop_lat, stop_lng = route_topology.get_stop_coords(stop_id)
+        stops.append(
+            {
+                "stop_id": stop_id,
+                "stop_name": route_topology.get_stop_name(stop_id),
+                "latitude": stop_lat,
+                "longitude": stop_lng,
+                "distance_m": round(meters, 1),
+                "route_ids": sorted(r for r, _ in route_topology.get_routes_for_stop(stop_id)),
+            }
+        )
+    return jsonify({"success": True, "stops": stops, "radius": radius})
+
+
 # ---------- FIND MATCHING ROUTES FOR TWO STOPS ----------
 @passenger_bp.route("/services/<int:service_id>/routes/matching", methods=["GET"])
 def get_matching_routes(service_id):
@@ -86,32 +169,56 @@ def get_matching_routes(service_id):
 
     from app import mysql
 
-    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    # Routes that contain both stops (in any order - forward or backward),
+    # from the cached route topology instead of joining routes_stops
+    route_topology.ensure_loaded(mysql)
+    routes = route_topology.matching_routes(service_id, start_stop_id, end_stop_id)
+    return jsonify({"success": True, "routes": routes})
 
-    # Find routes that contain both stops (in any order - forward or backward)
-    cursor.execute(
-        """
-        SELECT DISTINCT r.route_id, r.route_name,
-               COUNT(DISTINCT rs.stop_id) as stop_count,
-               rs1.stop_order as start_order,
-               rs2.stop_order as end_order,
-               CASE 
-                   WHEN rs2.stop_order > rs1.stop_order THEN 'forward'
-                   WHEN rs2.stop_order < rs1.stop_order THEN 'backward'
-                   ELSE 'invalid'
-               END as direction
-        FROM routes r
-        JOIN routes_stops rs1 ON r.route_id = rs1.route_id AND rs1.stop_id = %s
-        JOIN routes_stops rs2 ON r.route_id = rs2.route_id AND rs2.stop_id = %s
-        JOIN routes_stops rs ON r.route_id = rs.route_id
-        WHERE r.service_id = %s AND rs1.stop_order != rs2.stop_order
-        GROUP BY r.route_id, r.route_name, rs1.stop_order, rs2.stop_order
-        ORDER BY r.route_name
-        """,
-        (start_stop_id, end_stop_id, service_id),
+
+# ---------- PLAN A JOURNEY ACROSS ROUTES ----------
+JOURNEYS_DEFAULT_COUNT = 3
+
+
+@passenger_bp.route("/journeys", methods=["GET"])
+def plan_journeys():
+    """
+    Earliest-arrival journeys between two stops over scheduled trips, with
+    transfers between routes and services (utils/journey_planner.py).
+
+    Query params:
+    - from / to: stop ids (required)
+    - depart_after: ISO datetime (default now)
+    - count: journeys to return, each leaving after the previous one (default 3, max 5)
+    """
+    from_stop_id = request.args.get("from", type=int)
+    to_stop_id = request.args.get("to", type=int)
+    if not from_stop_id or not to_stop_id:
+        return jsonify({"success": False, "message": "Both 'from' and 'to' stops are required"}), 400
+    try:
+        depart_after = _parse_window_dt("depart_after") or datetime.now()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    count = request.args.get("count", JOURNEYS_DEFAULT_COUNT, type=int)
+    if count is None or count < 1:
+        return jsonify({"success": False, "message": "count must be >= 1"}), 400
+
+    if not journey_planner.ready:
+        return jsonify({"success": False, "message": "Journey planner is still loading"}), 503
+    for stop_id in (from_stop_id, to_stop_id):
+        if not journey_planner.has_stop(stop_id):
+            return jsonify({"success": False, "message": f"Unknown stop {stop_id}"}), 404
+
+    journeys = journey_planner.plan(from_stop_id, to_stop_id, depart_after, count)
+    return jsonify(
+        {
+            "success": True,
+            "from_stop_id": from_stop_id,
+            "to_stop_id": to_stop_id,
+            "depart_after": depart_after.isoformat(),
+            "journeys": journeys,
+        }
     )
-    routes = cursor.fetchall()
-    return jsonify({"success": True, "routes": routes})
 
 
 # ---------- GET TRIPS WITH AVAILABILITY FOR A ROUTE ----------
@@ -123,8 +230,38 @@ def _serialize_trip_dt(trip: Dict[str, Any]) -> Dict[str, Any]:
     return trip
 
 
+AVAILABILITY_DEFAULT_LIMIT = 50
+AVAILABILITY_MAX_LIMIT = 200
+# Without `from`, list trips that departed up to this long ago (buses still on the road)
+AVAILABILITY_LOOKBACK_MINUTES = int(os.getenv("AVAILABILITY_LOOKBACK_MINUTES", "180"))
+
+
+def _parse_window_dt(name: str) -> Optional[datetime]:
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid '{name}' parameter, expected ISO datetime")
+    # departure_time is stored as naive local time; keep the wall clock value
+    return dt.replace(tzinfo=None) if dt.tzinfo is not None else dt
+
+
 @passenger_bp.route("/routes/<int:route_id>/trips/availability", methods=["GET"])
 def get_route_trips_availability(route_id):
+    """
+    Trips of a route with seat availability, one page at a time.
+
+    Query params:
+    - boarding_stop_id / alighting_stop_id: passenger journey (optional)
+    - from / until: departure_time window (ISO datetimes, optional); without
+      `from`, running trips and trips departing from AVAILABILITY_LOOKBACK_MINUTES
+      ago onwards
+    - limit: page size (default 50, max 200)
+    - cursor: `next_cursor` from the previous page (keyset on departure_time, trip_id)
+    - eligible_only: omit trips the passenger cannot board instead of flagging them
+    """
     from app import mysql
     from bus_tracker import bus_tracker
 
@@ -132,13 +269,104 @@ def get_route_trips_availability(route_id):
     boarding_stop_id = request.args.get("boarding_stop_id", type=int)
     alighting_stop_id = request.args.get("alighting_stop_id", type=int)
 
+    try:
+        window_from = _parse_window_dt("from")
+        window_until = _parse_window_dt("until")
+        after = decode_cursor(request.args.get("cursor"), 2)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    limit = request.args.get("limit", AVAILABILITY_DEFAULT_LIMIT, type=int)
+    if limit is None or limit < 1:
+        return jsonify({"success": False, "message": "limit must be >= 1"}), 400
+    limit = min(limit, AVAILABILITY_MAX_LIMIT)
+    # Drop wrong-direction / already-passed trips instead of flagging them
+    eligible_only = request.args.get("eligible_only", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+
     cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
     # Set timezone for this connection
     cursor.execute("SET time_zone = '+05:00'")
 
-    # Get all trips for this route with bus details
+    # Resolve stop orders first (from the cached route topology) so the
+    # journey direction can be evaluated in SQL
+    route_topology.ensure_loaded(mysql)
+    stop_orders = route_topology.get_stop_orders(
+        route_id, [s for s in (boarding_stop_id, alighting_stop_id) if s]
+    )
+
+    required_direction = None
+    if boarding_stop_id and alighting_stop_id:
+        boarding_order = stop_orders.get(boarding_stop_id)
+        alighting_order = stop_orders.get(alighting_stop_id)
+        if boarding_order and alighting_order:
+            if alighting_order > boarding_order:
+                required_direction = "forward"
+            elif alighting_order < boarding_order:
+                required_direction = "backward"
+            else:
+                # Same stop - invalid
+                required_direction = "invalid"
+
+    select_params = []
+    direction_sql = "1"
+    if required_direction in ("forward", "backward"):
+        direction_sql = "t.direction = %s"
+        select_params.append(required_direction)
+    elif required_direction == "invalid":
+        direction_sql = "0"
+
+    where_clauses = ["t.route_id = %s", "t.status IN ('scheduled', 'running')"]
+    where_params = [route_id]
+    if eligible_only:
+        if required_direction == "invalid":
+            cursor.close()
+            return jsonify(
+                {"success": True, "trips": [], "limit": limit, "next_cursor": None}
+            )
+        if required_direction is not None:
+            where_clauses.append("t.direction = %s")
+            where_params.append(required_direction)
+        if boarding_stop_id:
+            # Running trips of this route whose bus is already past the boarding stop
+            passed = [
+                trip["trip_id"]
+                for trip in bus_tracker.get_all_active_trips()
+                if trip.get("route_id") == route_id
+                and not bus_tracker.is_trip_available_for_boarding(
+                    trip["trip_id"], boarding_stop_id
+                )
+            ]
+            if passed:
+                where_clauses.append(
+                    f"t.trip_id NOT IN ({', '.join(['%s'] * len(passed))})"
+                )
+                where_params.extend(passed)
+    if window_from is not None:
+        where_clauses.append("t.departure_time >= %s")
+        where_params.append(window_from)
+    else:
+        # Skip stale 'scheduled' rows of past days instead of paging from the oldest trip
+        where_clauses.append("(t.departure_time >= %s OR t.status = 'running')")
+        where_params.append(
+            datetime.now() - timedelta(minutes=AVAILABILITY_LOOKBACK_MINUTES)
+        )
+    if window_until is not None:
+        where_clauses.append("t.departure_time < %s")
+        where_params.append(window_until)
+    if after is not None:
+        where_clauses.append(
+            "(t.departure_time > %s OR (t.departure_time = %s AND t.trip_id > %s))"
+        )
+        where_params.extend([after[0], after[0], after[1]])
+
+    # One page of trips (plus one row to detect a next page); seat counts come
+    # from the per-trip segment load trees below
     cursor.execute(
-        """
+        f"""
         SELECT 
             t.trip_id,
             t.bus_id,
@@ -148,59 +376,51 @@ def get_route_trips_availability(route_id):
             t.status,
             b.number_plate,
             b.capacity,
-            COALESCE(COUNT(bk.booking_id), 0) as booked
+            ({direction_sql}) AS direction_ok
         FROM trips t
         JOIN buses b ON t.bus_id = b.bus_id
-        LEFT JOIN bookings bk ON t.trip_id = bk.trip_id AND bk.status = 'confirmed'
-        WHERE t.route_id = %s AND t.status IN ('scheduled', 'running')
-        GROUP BY t.trip_id, t.bus_id, t.direction, t.departure_time, t.arrival_time, t.status, b.number_plate, b.capacity
-        ORDER BY t.departure_time
+        WHERE {" AND ".join(where_clauses)}
+        ORDER BY t.departure_time, t.trip_id
+        LIMIT %s
         """,
-        (route_id,),
+        (*select_params, *where_params, limit + 1),
     )
-    trips = cursor.fetchall()
+    trips = list(cursor.fetchall())
+
+    # Seats are taken per stop segment: the journey's busiest segment decides
+    # (the whole route without a boarding / alighting pair)
+    journey = None
+    if required_direction in ("forward", "backward"):
+        journey = (
+            min(boarding_order, alighting_order),
+            max(boarding_order, alighting_order),
+        )
+    route_orders = [s["stop_order"] for s in route_topology.get_route_stops(route_id)]
+    try:
+        peak_loads = trip_loads.peak_loads(
+            cursor, {trip["trip_id"]: route_orders for trip in trips[:limit]}, journey
+        )
+    finally:
+        cursor.close()
 
-    # Debug logging
-    current_app.logger.info(
-        f"Trip availability request: route_id={route_id}, boarding_stop={boarding_stop_id}, alighting_stop={alighting_stop_id}"
-    )
-    current_app.logger.info(f"Found {len(trips)} trips for route {route_id}")
+    next_cursor = None
+    if len(trips) > limit:
+        trips = trips[:limit]
+        last = trips[-1]
+        next_cursor = encode_cursor([last["departure_time"], last["trip_id"]])
 
     # Build quick lookup for active trips to enrich response
     active_trips_map = {
         trip["trip_id"]: trip for trip in bus_tracker.get_all_active_trips()
     }
 
-    # Get stop orders if boarding/alighting specified
-    stop_orders = {}
-    stop_filters = []
-    stop_params = [route_id]
-    if boarding_stop_id:
-        stop_filters.append("stop_id = %s")
-        stop_params.append(boarding_stop_id)
-    if alighting_stop_id:
-        stop_filters.append("stop_id = %s")
-        stop_params.append(alighting_stop_id)
-    if stop_filters:
-        placeholders = " OR ".join(stop_filters)
-        cursor.execute(
-            f"""
-            SELECT stop_id, stop_order
-            FROM routes_stops
-            WHERE route_id = %s AND ({placeholders})
-            """,
-            tuple(stop_params),
-        )
-        for row in cursor.fetchall():
-            stop_orders[row["stop_id"]] = row["stop_order"]
-
-    cursor.close()
-
     # Filter trips based on real-time bus position and direction compatibility
     available_trips = []
     for trip in trips:
-        trip["available"] = trip["capacity"] - trip["booked"]
-        trip["available"] = max(0, trip["available"])
+        direction_ok = bool(trip.pop("direction_ok"))
+        # Passengers (bookings and active holds) on the journey's busiest segment
+        trip["booked"] = peak_loads.get(trip["trip_id"], 0)
+        trip["available"] = max(0, trip["capacity"] - trip["booked"])
         trip["boarding_allowed"] = True
         trip["blocked_reason"] = None
 
@@ -233,35 +453,22 @@ def get_route_trips_availability(route_id):
             trip["total_stops"] = None
             trip["progress_percentage"] = None
 
-        # Check if passenger's journey matches trip direction
-        if boarding_stop_id and alighting_stop_id:
-            boarding_order = stop_orders.get(boarding_stop_id)
-            alighting_order = stop_orders.get(alighting_stop_id)
-
-            if boarding_order and alighting_order:
-                # Determine required direction based on stop orders
-                if alighting_order > boarding_order:
-                    required_direction = "forward"
-                elif alighting_order < boarding_order:
-                    required_direction = "backward"
-                else:
-                    # Same stop - invalid
-                    trip["available"] = 0
-                    trip["status"] = "invalid"
-                    available_trips.append(trip)
-                    continue
-
-                # Check if trip direction matches
-                if trip["direction"] != required_direction:
-                    trip["available"] = 0
-                    trip["status"] = "wrong_direction"
-                    trip["boarding_allowed"] = False
-                    trip["blocked_reason"] = "wrong_direction"
-                    available_trips.append(trip)
-                    continue
+        # Passenger's journey direction was checked in SQL
+        if required_direction == "invalid":
+            trip["available"] = 0
+            trip["status"] = "invalid"
+            available_trips.append(_serialize_trip_dt(trip))
+            continue
+        if not direction_ok:
+            trip["available"] = 0
+            trip["status"] = "wrong_direction"
+            trip["boarding_allowed"] = False
+            trip["blocked_reason"] = "wrong_direction"
+            available_trips.append(_serialize_trip_dt(trip))
+            continue
 
         # If boarding stop is specified, check if bus hasn't passed it yet
-        if boarding_stop_id:
+        if boarding_stop_id and realtime:
             is_available = bus_tracker.is_trip_available_for_boarding(
                 trip["trip_id"], boarding_stop_id
             )
@@ -273,14 +480,25 @@ def get_route_trips_availability(route_id):
 
         available_trips.append(_serialize_trip_dt(trip))
 
-    # Debug logging
-    current_app.logger.info(f"Returning {len(available_trips)} trips after filtering")
-    for trip in available_trips:
-        current_app.logger.info(
-            f"  Trip #{trip['trip_id']}: status={trip.get('status')}, boarding_allowed={trip.get('boarding_allowed')}, blocked_reason={trip.get('blocked_reason')}"
-        )
+    logger.debug(
+        "Trip availability served",
+        extra={
+            "route_id": route_id,
+            "boarding_stop_id": boarding_stop_id,
+            "alighting_stop_id": alighting_stop_id,
+            "trips": len(available_trips),
+            **sampled(20),
+        },
+    )
 
-    return jsonify({"success": True, "trips": available_trips})
+    return jsonify(
+        {
+            "success": True,
+            "trips": available_trips,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
+    )
 
 
 # ---------- FARE CALCULATION ----------
@@ -367,6 +585,102 @@ def get_test_cards():
     return jsonify({"success": True, "cards": cards})
 
 
+def _parse_payment_details(data: Dict[str, Any]):
+    """
+    Build the payment context from a booking request body.
+    Returns (payment_context, error_message); exactly one of them is None.
+    """
+    card_number = (data.get("card_number") or "").replace(" ", "")
+    cvv = data.get("cvv", "")
+    expiry = data.get("expiry") or data.get("expiry_date") or ""
+    cardholder_name = data.get("cardholder_name", "")
+    transaction_reference = data.get("transaction_id")
+    card_last_four = (data.get("card_last_four") or "").strip() or None
+
+    if card_number and cvv:
+        if not expiry:
+            return None, "Expiry date is required"
+        if not cardholder_name:
+            return None, "Cardholder name is required"
+        return {
+            "mode": "card",
+            "card_number": card_number,
+            "cvv": cvv,
+            "expiry": expiry,
+            "cardholder_name": cardholder_name,
+        }, None
+    if transaction_reference:
+        return {
+            "mode": "transaction",
+            "transaction_id": transaction_reference,
+            "card_last_four": card_last_four,
+        }, None
+    return None, "Provide either card details or a transaction reference"
+
+
+def _charge_payment(payment_context: Dict[str, Any], amount):
+    """
+    Charge `amount` once using the request's payment context.
+    Returns (transaction_id, card_last_four); raises ValueError when declined.
+    """
+    payment_mode = payment_context.get("mode")
+    if payment_mode == "card":
+        from utils.payment_validator import process_payment
+
+        card_number = payment_context.get("card_number", "")
+        expiry_parts = (payment_context.get("expiry") or "").strip().split("/")
+        if len(expiry_parts) != 2:
+            raise ValueError("Invalid expiry format (use MM/YY)")
+        expiry_month, expiry_year = expiry_parts
+
+        success, message, transaction_id = process_payment(
+            card_number,
+            payment_context.get("cvv", ""),
+            expiry_month,
+            expiry_year,
+            amount,
+            payment_context.get("cardholder_name", ""),
+        )
+        if not success:
+            raise ValueError(message or "Payment failed")
+        return transaction_id, (card_number[-4:] if card_number else None)
+    if payment_mode == "transaction":
+        return (
+            payment_context.get("transaction_id") or "N/A",
+            payment_context.get("card_last_four"),
+        )
+    raise ValueError("Unsupported payment mode")
+
+
+def _insert_payments(cursor, rows):
+    """
+    Insert paid payment rows: [(booking_id, amount, transaction_reference, card_last_four), ...]
+    Falls back to the legacy column set on databases without the payment metadata migration.
+    """
+    try:
+        cursor.executemany(
+            """
+            INSERT INTO payments (booking_id, amount, method, status, transaction_reference, card_last_four)
+            VALUES (%s, %s, 'online', 'paid', %s, %s)
+            """,
+            rows,
+        )
+    except MySQLdb.OperationalError as err:
+        error_code = err.args[0] if err.args else None
+        if error_code != 1054:
+            raise
+        current_app.logger.warning(
+            "payments table missing metadata columns, using legacy insert during fallback booking"
+        )
+        cursor.executemany(
+            """
+            INSERT INTO payments (booking_id, amount, method, status)
+            VALUES (%s, %s, 'online', 'paid')
+            """,
+            [(row[0], row[1]) for row in rows],
+        )
+
+
 def _create_booking_via_proc(
     mysql,
     user_id,
@@ -377,34 +691,39 @@ def _create_booking_via_proc(
     cvv,
     cardholder_name,
 ):
+    key = ticket_key()
     cursor = mysql.connection.cursor()
 
-    # Call stored procedure with credit card details
+    # Call stored procedure with credit card details; it also issues the
+    # ticket in the same transaction, so this is the only round-trip.
     # NOTE: Card number is validated but NEVER stored in database
-    cursor.execute(
-        """
-        CALL sp_create_passenger_booking_with_payment(%s, %s, %s, %s, %s, %s, %s)
-        """,
-        (
-            user_id,
-            trip_id,
-            origin_stop_id,
-            destination_stop_id,
-            card_number,
-            cvv,
-            cardholder_name,
-        ),
-    )
+    try:
+        cursor.execute(
+            """
+            CALL sp_create_passenger_booking_with_payment(%s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (
+                user_id,
+                trip_id,
+                origin_stop_id,
+                destination_stop_id,
+                card_number,
+                cvv,
+                cardholder_name,
+                key,
+            ),
+        )
 
-    # Fetch the result from the SELECT statement in the procedure
-    row = cursor.fetchone()
+        # Fetch the result from the SELECT statement in the procedure
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
 
     if not row:
-        cursor.close()
         raise ValueError("Stored procedure returned no data")
 
     # Convert tuple to dict with known column names
-    booking_summary = {
+    return {
         "booking_id": row[0],
         "payment_id": row[1],
         "fare_amount": row[2],
@@ -412,28 +731,17 @@ def _create_booking_via_proc(
         "seat_number": row[4],
         "card_last_four": row[5],
         "message": row[6],
+        "qr_code": row[7],
+        "ticket_token": sign_ticket_token(
+            row[0],
+            trip_id,
+            origin_stop_id,
+            destination_stop_id,
+            token_expiry(row[8]),
+            key,
+        ),
     }
 
-    # Generate QR code string
-    booking_id = booking_summary["booking_id"]
-    qr_code_data = f"TICKET-{booking_id}-{uuid.uuid4().hex[:8].upper()}"
-
-    # Insert into tickets table
-    cursor.execute(
-        """
-        INSERT INTO tickets (booking_id, qr_code)
-        VALUES (%s, %s)
-        """,
-        (booking_id, qr_code_data),
-    )
-    mysql.connection.commit()
-
-    booking_summary["qr_code"] = qr_code_data
-
-    cursor.close()
-
-    return booking_summary
-
 
 def _create_booking_python_flow(
     mysql,
@@ -442,12 +750,13 @@ def _create_booking_python_flow(
     origin_stop_id,
     destination_stop_id,
     payment_context: Dict[str, Any],
+    hold_id: Optional[int] = None,
 ):
     cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
     try:
         cursor.execute(
             """
-            SELECT t.trip_id, t.route_id, t.status, t.direction, b.capacity
+            SELECT t.trip_id, t.route_id, t.status, t.direction, t.departure_time, b.capacity
             FROM trips t
             JOIN buses b ON t.bus_id = b.bus_id
             WHERE t.trip_id = %s AND t.status IN ('scheduled', 'running')
@@ -458,14 +767,6 @@ def _create_booking_python_flow(
         if not trip:
             raise ValueError("Trip not found or not available")
 
-        cursor.execute(
-            "SELECT COUNT(*) as count FROM bookings WHERE trip_id = %s AND status = 'confirmed'",
-            (trip_id,),
-        )
-        booking_count = cursor.fetchone()["count"]
-        if booking_count >= trip["capacity"]:
-            raise ValueError("No seats available")
-
         fare_info = calculate_fare(
             mysql, origin_stop_id, destination_stop_id, trip["route_id"]
         )
@@ -478,77 +779,42 @@ def _create_booking_python_flow(
                 f"This trip is going {trip_direction}, but your journey requires {detected_direction} direction"
             )
 
-        payment_mode = payment_context.get("mode")
-        if payment_mode == "card":
-            from utils.payment_validator import process_payment
-
-            card_number = payment_context.get("card_number", "")
-            cvv = payment_context.get("cvv", "")
-            expiry_value = (payment_context.get("expiry") or "").strip()
-            cardholder_name = payment_context.get("cardholder_name", "")
+        segments = journey_segments(cursor, trip_id, origin_stop_id, destination_stop_id)
+        if segments is None:
+            raise ValueError("Invalid stops for this route")
 
-            expiry_parts = expiry_value.split("/")
-            if len(expiry_parts) != 2:
-                raise ValueError("Invalid expiry format (use MM/YY)")
-            expiry_month, expiry_year = expiry_parts
-
-            success, message, transaction_id = process_payment(
-                card_number,
-                cvv,
-                expiry_month,
-                expiry_year,
-                fare_amount,
-                cardholder_name,
-            )
-            if not success:
-                raise ValueError(message or "Payment failed")
-            card_last_four = card_number[-4:] if card_number else None
-        elif payment_mode == "transaction":
-            transaction_id = payment_context.get("transaction_id") or "N/A"
-            card_last_four = payment_context.get("card_last_four")
+        if hold_id:
+            # Confirm a seat held earlier through POST /holds
+            seat_number = consume_hold(cursor, hold_id, trip_id, user_id, segments)
+            if seat_number is None:
+                raise ValueError("Seat hold not found, expired or not valid for this journey")
         else:
-            raise ValueError("Unsupported payment mode")
+            # Reserve the seat on the journey's segments before charging;
+            # rolled back with the transaction on failure
+            seats = claim_seats(cursor, trip_id, segments=segments)
+            if not seats:
+                raise ValueError("No seats available")
+            seat_number = seats[0]
 
         cursor.execute(
             """
             INSERT INTO bookings (user_id, trip_id, origin_stop_id, destination_stop_id, seat_number)
             VALUES (%s, %s, %s, %s, %s)
             """,
-            (user_id, trip_id, origin_stop_id, destination_stop_id, booking_count + 1),
+            (user_id, trip_id, origin_stop_id, destination_stop_id, seat_number),
         )
         booking_id = cursor.lastrowid
 
-        card_last_four = card_number[-4:] if card_number else None
-
-        try:
-            cursor.execute(
-                """
-                INSERT INTO payments (booking_id, amount, method, status, transaction_reference, card_last_four)
-                VALUES (%s, %s, 'online', 'paid', %s, %s)
-                """,
-                (booking_id, fare_amount, transaction_id, card_last_four),
-            )
-        except MySQLdb.OperationalError as err:
-            error_code = err.args[0] if err.args else None
-            if error_code == 1054:
-                current_app.logger.warning(
-                    "payments table missing metadata columns, using legacy insert during fallback booking"
-                )
-                cursor.execute(
-                    """
-                    INSERT INTO payments (booking_id, amount, method, status)
-                    VALUES (%s, %s, 'online', 'paid')
-                    """,
-                    (booking_id, fare_amount),
-                )
-            else:
-                mysql.connection.rollback()
-                raise
+        # Charge last: nothing after this but the payment and ticket inserts
+        transaction_id, card_last_four = _charge_payment(payment_context, fare_amount)
 
+        _insert_payments(
+            cursor, [(booking_id, fare_amount, transaction_id, card_last_four)]
+        )
         payment_id = cursor.lastrowid
 
         # Generate QR code string
-        qr_code_data = f"TICKET-{booking_id}-{uuid.uuid4().hex[:8].upper()}"
+        qr_code_data = ticket_code(booking_id)
 
         # Insert into tickets table
         cursor.execute(
@@ -560,15 +826,26 @@ def _create_booking_python_flow(
         )
 
         mysql.connection.commit()
+        if hold_id:
+            trip_loads.invalidate(trip_id)  # The hold may have covered more segments
+        else:
+            trip_loads.add(trip_id, segments)
 
         return {
             "booking_id": booking_id,
             "payment_id": payment_id,
             "fare_amount": fare_amount,
             "stops_count": fare_info["stops_count"],
-            "seat_number": booking_count + 1,
+            "seat_number": seat_number,
             "card_last_four": card_last_four,
             "qr_code": qr_code_data,
+            "ticket_token": sign_ticket_token(
+                booking_id,
+                trip_id,
+                origin_stop_id,
+                destination_stop_id,
+                token_expiry(trip["departure_time"]),
+            ),
             "message": "Booking and payment successful!",
         }
     except Exception:
@@ -578,22 +855,158 @@ def _create_booking_python_flow(
         cursor.close()
 
 
+MAX_GROUP_SEATS = 10
+
+
+def _create_group_booking_flow(
+    mysql,
+    user_id,
+    trip_id,
+    origin_stop_id,
+    destination_stop_id,
+    seat_count: int,
+    payment_context: Dict[str, Any],
+):
+    """Book `seat_count` seats for one payer in a single transaction"""
+    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    try:
+        cursor.execute(
+            """
+            SELECT t.trip_id, t.route_id, t.status, t.direction, t.departure_time
+            FROM trips t
+            WHERE t.trip_id = %s AND t.status IN ('scheduled', 'running')
+            """,
+            (trip_id,),
+        )
+        trip = cursor.fetchone()
+        if not trip:
+            raise ValueError("Trip not found or not available")
+
+        fare_info = calculate_fare(
+            mysql, origin_stop_id, destination_stop_id, trip["route_id"]
+        )
+        fare_amount = fare_info["fare_amount"]
+        detected_direction = fare_info["direction"]
+
+        trip_direction = trip.get("direction") or "forward"
+        if trip_direction != detected_direction:
+            raise ValueError(
+                f"This trip is going {trip_direction}, but your journey requires {detected_direction} direction"
+            )
+
+        segments = journey_segments(cursor, trip_id, origin_stop_id, destination_stop_id)
+        if segments is None:
+            raise ValueError("Invalid stops for this route")
+
+        # All seats are claimed on the journey's segments, or none are
+        seat_numbers = claim_seats(cursor, trip_id, seat_count, segments)
+        if not seat_numbers:
+            raise ValueError(f"Not enough seats available for {seat_count} passengers")
+
+        cursor.executemany(
+            """
+            INSERT INTO bookings (user_id, trip_id, origin_stop_id, destination_stop_id, seat_number)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            [
+                (user_id, trip_id, origin_stop_id, destination_stop_id, seat)
+                for seat in seat_numbers
+            ],
+        )
+        # The new rows are the user's bookings of these seats from the first
+        # inserted id on (auto-increment ids of a multi-row insert are not
+        # guaranteed contiguous, and a seat is reused after its passenger alights)
+        first_booking_id = cursor.lastrowid
+        cursor.execute(
+            f"""
+            SELECT booking_id, seat_number
+            FROM bookings
+            WHERE trip_id = %s AND user_id = %s AND booking_id >= %s
+              AND seat_number IN ({", ".join(["%s"] * len(seat_numbers))})
+            ORDER BY seat_number
+            """,
+            (trip_id, user_id, first_booking_id, *seat_numbers),
+        )
+        booked = cursor.fetchall()
+        if len(booked) != seat_count:
+            raise RuntimeError("Group booking rows could not be resolved")
+
+        # One charge for the whole group, once every booking row exists
+        total_fare = fare_amount * seat_count
+        transaction_id, card_last_four = _charge_payment(payment_context, total_fare)
+
+        # Each booking keeps its own payment row (one payment per booking),
+        # all sharing the single transaction reference
+        _insert_payments(
+            cursor,
+            [
+                (row["booking_id"], fare_amount, transaction_id, card_last_four)
+                for row in booked
+            ],
+        )
+
+        key = ticket_key()
+        tickets = [
+            (row["booking_id"], ticket_code(row["booking_id"], key)) for row in booked
+        ]
+        cursor.executemany(
+            """
+            INSERT INTO tickets (booking_id, qr_code)
+            VALUES (%s, %s)
+            """,
+            tickets,
+        )
+
+        mysql.connection.commit()
+        trip_loads.add(trip_id, segments, seat_count)
+
+        expires_at = token_expiry(trip["departure_time"])
+        return {
+            "bookings": [
+                {
+                    "booking_id": row["booking_id"],
+                    "seat_number": row["seat_number"],
+                    "fare_amount": fare_amount,
+                    "qr_code": qr_code,
+                    "ticket_token": sign_ticket_token(
+                        row["booking_id"],
+                        trip_id,
+                        origin_stop_id,
+                        destination_stop_id,
+                        expires_at,
+                        key,
+                    ),
+                }
+                for row, (_, qr_code) in zip(booked, tickets)
+            ],
+            "seats": seat_count,
+            "fare_amount": fare_amount,
+            "total_fare": total_fare,
+            "stops_count": fare_info["stops_count"],
+            "transaction_id": transaction_id,
+            "card_last_four": card_last_four,
+            "message": "Group booking and payment successful!",
+        }
+    except Exception:
+        mysql.connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
 # ---------- CREATE BOOKING WITH PAYMENT PROCESSING ----------
 @passenger_bp.route("/bookings", methods=["POST"])
+@idempotent
 def create_booking():
     data = request.get_json() or {}
     trip_id = data.get("trip_id")
     origin_stop_id = data.get("boarding_stop_id")
     destination_stop_id = data.get("alighting_stop_id")
+    hold_id = data.get("hold_id")
 
-    # Payment details
-    card_number = data.get("card_number", "").replace(" ", "")
-    cvv = data.get("cvv", "")
-    expiry = data.get("expiry") or data.get("expiry_date") or ""
-    cardholder_name = data.get("cardholder_name", "")
-    transaction_reference = data.get("transaction_id")
-    card_last_four = (data.get("card_last_four") or "").strip() or None
-
+    # Holds belong to logged-in passengers only
+    if hold_id and not (session.get("loggedin") and session.get("user_id")):
+        return jsonify({"success": False, "message": "Authentication required"}), 401
     user_id = session.get("user_id", 1)
 
     missing_fields = []
@@ -615,31 +1028,9 @@ def create_booking():
             400,
         )
 
-    payment_mode = None
-    if card_number and cvv:
-        payment_mode = "card"
-        if not expiry:
-            return (
-                jsonify({"success": False, "message": "Expiry date is required"}),
-                400,
-            )
-        if not cardholder_name:
-            return (
-                jsonify({"success": False, "message": "Cardholder name is required"}),
-                400,
-            )
-    elif transaction_reference:
-        payment_mode = "transaction"
-    else:
-        return (
-            jsonify(
-                {
-                    "success": False,
-                    "message": "Provide either card details or a transaction reference",
-                }
-            ),
-            400,
-        )
+    payment_context, payment_error = _parse_payment_details(data)
+    if payment_error:
+        return jsonify({"success": False, "message": payment_error}), 400
 
     # Real-time check (still done in Python for bus tracker integration)
     from bus_tracker import bus_tracker
@@ -657,7 +1048,8 @@ def create_booking():
 
     from app import mysql
 
-    if payment_mode == "card":
+    # The stored procedure claims its own seat, so held seats go through the Python flow
+    if payment_context["mode"] == "card" and not hold_id:
         try:
             booking_summary = _create_booking_via_proc(
                 mysql,
@@ -665,10 +1057,12 @@ def create_booking():
                 trip_id,
                 origin_stop_id,
                 destination_stop_id,
-                card_number,
-                cvv,
-                cardholder_name,
+                payment_context["card_number"],
+                payment_context["cvv"],
+                payment_context["cardholder_name"],
             )
+            live_metrics.record_booking(trip_id, 1, booking_summary["fare_amount"])
+            trip_loads.invalidate(trip_id)
             return jsonify(
                 {
                     "success": True,
@@ -681,7 +1075,8 @@ def create_booking():
             if error_code == 1644:
                 error_message = err.args[1] if len(err.args) > 1 else "Booking failed"
                 return jsonify({"success": False, "message": error_message}), 400
-            if error_code != 1305:
+            # 1305: procedure missing, 1318: pre-ticketing procedure signature
+            if error_code not in (1305, 1318):
                 current_app.logger.exception("Stored procedure error during booking")
                 return (
                     jsonify(
@@ -693,7 +1088,7 @@ def create_booking():
                     500,
                 )
             current_app.logger.warning(
-                "Stored procedure sp_create_passenger_booking_with_payment missing; using fallback booking flow."
+                "Stored procedure sp_create_passenger_booking_with_payment missing or outdated; using fallback booking flow."
             )
         except Exception as err:
             current_app.logger.exception("Stored procedure booking error: %s", err)
@@ -704,20 +1099,6 @@ def create_booking():
                 500,
             )
 
-        payment_context = {
-            "mode": "card",
-            "card_number": card_number,
-            "cvv": cvv,
-            "expiry": expiry,
-            "cardholder_name": cardholder_name,
-        }
-    else:
-        payment_context = {
-            "mode": "transaction",
-            "transaction_id": transaction_reference,
-            "card_last_four": card_last_four,
-        }
-
     # Stored procedure unavailable or transaction-based flow → Python implementation
     try:
         booking_summary = _create_booking_python_flow(
@@ -727,7 +1108,9 @@ def create_booking():
             origin_stop_id,
             destination_stop_id,
             payment_context,
+            hold_id=hold_id,
         )
+        live_metrics.record_booking(trip_id, 1, booking_summary["fare_amount"])
         return jsonify({"success": True, **booking_summary})
     except ValueError as err:
         return jsonify({"success": False, "message": str(err)}), 400
@@ -737,3 +1120,437 @@ def create_booking():
             jsonify({"success": False, "message": "Database error. Please try again."}),
             500,
         )
+
+
+# ---------- GROUP BOOKING (MULTIPLE SEATS, ONE PAYMENT) ----------
+@passenger_bp.route("/bookings/batch", methods=["POST"])
+@idempotent
+def create_group_booking():
+    data = request.get_json() or {}
+    trip_id = data.get("trip_id")
+    origin_stop_id = data.get("boarding_stop_id")
+    destination_stop_id = data.get("alighting_stop_id")
+    seat_count = data.get("seats")
+
+    user_id = session.get("user_id", 1)
+
+    missing_fields = []
+    if not trip_id:
+        missing_fields.append("trip_id")
+    if not origin_stop_id:
+        missing_fields.append("boarding_stop_id")
+    if not destination_stop_id:
+        missing_fields.append("alighting_stop_id")
+    if not seat_count:
+        missing_fields.append("seats")
+
+    if missing_fields:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "message": f"Missing required fields: {', '.join(missing_fields)}",
+                }
+            ),
+            400,
+        )
+
+    try:
+        seat_count = int(seat_count)
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "seats must be an integer"}), 400
+    if seat_count < 1 or seat_count > MAX_GROUP_SEATS:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "message": f"seats must be between 1 and {MAX_GROUP_SEATS}",
+                }
+            ),
+            400,
+        )
+
+    payment_context, payment_error = _parse_payment_details(data)
+    if payment_error:
+        return jsonify({"success": False, "message": payment_error}), 400
+
+    from bus_tracker import bus_tracker
+
+    if not bus_tracker.is_trip_available_for_boarding(trip_id, origin_stop_id):
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "message": "This bus has already passed your boarding stop",
+                }
+            ),
+            400,
+        )
+
+    from app import mysql
+
+    try:
+        summary = _create_group_booking_flow(
+            mysql,
+            user_id,
+            trip_id,
+            origin_stop_id,
+            destination_stop_id,
+            seat_count,
+            payment_context,
+        )
+        live_metrics.record_booking(trip_id, seat_count, summary["total_fare"])
+        return jsonify({"success": True, **summary})
+    except ValueError as err:
+        return jsonify({"success": False, "message": str(err)}), 400
+    except Exception as err:
+        current_app.logger.exception("Group booking failed: %s", err)
+        return (
+            jsonify({"success": False, "message": "Database error. Please try again."}),
+            500,
+        )
+
+
+# ---------- SEAT HOLDS ----------
+@passenger_bp.route("/holds", methods=["POST"])
+def create_seat_hold():
+    """
+    Reserve a seat for a short time while the passenger pays: for the
+    boarding_stop_id -> alighting_stop_id journey when given, else the whole route
+    """
+    if not session.get("loggedin") or not session.get("user_id"):
+        return jsonify({"success": False, "message": "Authentication required"}), 401
+    user_id = session["user_id"]
+
+    data = request.get_json() or {}
+    trip_id = data.get("trip_id")
+    origin_stop_id = data.get("boarding_stop_id")
+    destination_stop_id = data.get("alighting_stop_id")
+    if not trip_id:
+        return (
+            jsonify({"success": False, "message": "Missing required fields: trip_id"}),
+            400,
+        )
+
+    from app import mysql
+
+    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    try:
+        cursor.execute(
+            "SELECT trip_id FROM trips WHERE trip_id = %s AND status IN ('scheduled', 'running')",
+            (trip_id,),
+        )
+        if not cursor.fetchone():
+            return (
+                jsonify({"success": False, "message": "Trip not found or not available"}),
+                400,
+            )
+        if origin_stop_id and destination_stop_id:
+            segments = journey_segments(cursor, trip_id, origin_stop_id, destination_stop_id)
+            if segments is None or segments[0] == segments[1]:
+                return (
+                    jsonify({"success": False, "message": "Invalid stops for this route"}),
+                    400,
+                )
+        else:
+            segments = route_segments(cursor, trip_id)
+        try:
+            hold = create_hold(cursor, trip_id, user_id, segments)
+        except HoldLimitError:
+            mysql.connection.rollback()
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": f"At most {MAX_HOLDS_PER_USER} seats can be held at a time",
+                    }
+                ),
+                429,
+            )
+        if not hold:
+            mysql.connection.rollback()
+            return jsonify({"success": False, "message": "No seats available"}), 409
+        mysql.connection.commit()
+        trip_loads.add(trip_id, segments)
+    except Exception as err:
+        mysql.connection.rollback()
+        current_app.logger.exception("Seat hold failed: %s", err)
+        return (
+            jsonify({"success": False, "message": "Database error. Please try again."}),
+            500,
+        )
+    finally:
+        cursor.close()
+
+    hold_sweeper.schedule(hold["hold_id"], hold["expires_at"])
+    hold["expires_at"] = hold["expires_at"].isoformat()
+    return jsonify({"success": True, **hold}), 201
+
+
+@passenger_bp.route("/holds/<int:hold_id>", methods=["DELETE"])
+def release_seat_hold(hold_id):
+    """Give a held seat back before it expires"""
+    if not session.get("loggedin") or not session.get("user_id"):
+        return jsonify({"success": False, "message": "Authentication required"}), 401
+    user_id = session["user_id"]
+
+    from app import mysql
+
+    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    try:
+        released = cancel_hold(cursor, hold_id, user_id)
+        mysql.connection.commit()
+    except Exception as err:
+        mysql.connection.rollback()
+        current_app.logger.exception("Releasing seat hold failed: %s", err)
+        return (
+            jsonify({"success": False, "message": "Database error. Please try again."}),
+            500,
+        )
+    finally:
+        cursor.close()
+
+    if not released:
+        return jsonify({"success": False, "message": "Seat hold not found"}), 404
+    return jsonify({"success": True, "message": "Seat hold released"})
+
+
+# ---------- TICKET VALIDATION (BOARDING GATES) ----------
+MAX_VALIDATE_BATCH = 500
+
+
+def _validate_token(token, key, trip_id=None, stop_id=None) -> Dict[str, Any]:
+    try:
+        claims = verify_ticket_token(token, key, revoked=ticket_revocations)
+    except TicketTokenError as err:
+        return {"valid": False, "reason": err.reason}
+    if trip_id is not None and claims["trip_id"] != trip_id:
+        return {"valid": False, "reason": "wrong_trip", **claims}
+    if stop_id is not None and claims["origin_stop_id"] != stop_id:
+        return {"valid": False, "reason": "wrong_stop", **claims}
+    return {"valid": True, "reason": None, **claims}
+
+
+@passenger_bp.route("/tickets/validate", methods=["POST"])
+def validate_tickets():
+    """
+    Verify signed ticket tokens in memory (no database reads); tokens of
+    cancelled bookings are rejected from the revocation set.
+
+    Body: {"token": "..."} or {"tokens": ["...", ...]} (bulk, max 500), with
+    optional "trip_id" / "stop_id" the gate is boarding.
+    """
+    data = request.get_json() or {}
+    trip_id = data.get("trip_id")
+    stop_id = data.get("stop_id")
+    try:
+        trip_id = int(trip_id) if trip_id is not None else None
+        stop_id = int(stop_id) if stop_id is not None else None
+    except (TypeError, ValueError):
+        return (
+            jsonify({"success": False, "message": "trip_id and stop_id must be integers"}),
+            400,
+        )
+
+    key = ticket_key()
+    if "tokens" in data:
+        tokens = data.get("tokens")
+        if not isinstance(tokens, list) or len(tokens) > MAX_VALIDATE_BATCH:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": f"tokens must be a list of at most {MAX_VALIDATE_BATCH} tokens",
+                    }
+                ),
+                400,
+            )
+        results = [_validate_token(t, key, trip_id, stop_id) for t in tokens]
+        return jsonify(
+            {
+                "success": True,
+                "results": results,
+                "valid_count": sum(1 for r in results if r["valid"]),
+            }
+        )
+
+    token = data.get("token")
+    if not token:
+        return (
+            jsonify({"success": False, "message": "Missing required fields: token"}),
+            400,
+        )
+    return jsonify({"success": True, **_validate_token(token, key, trip_id, stop_id)})
+
+
+@passenger_bp.route("/trips/<int:trip_id>/manifest", methods=["GET"])
+@admin_required
+def get_trip_manifest(trip_id):
+    """
+    Whole-trip manifest for conductor devices: signed tokens of every confirmed
+    booking plus the ids of cancelled ones, synced once before departure so
+    gates can validate (and reject revoked tickets) offline.
+    """
+    from app import mysql
+
+    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    try:
+        cursor.execute(
+            "SELECT trip_id, route_id, direction, departure_time, status FROM trips WHERE trip_id = %s",
+            (trip_id,),
+        )
+        trip = cursor.fetchone()
+        if not trip:
+            return jsonify({"success": False, "message": "Trip not found"}), 404
+        cursor.execute(
+            """
+            SELECT booking_id, seat_number, origin_stop_id, destination_stop_id, status
+            FROM bookings
+            WHERE trip_id = %s
+            ORDER BY seat_number
+            """,
+            (trip_id,),
+        )
+        bookings = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    key = ticket_key()
+    expires_at = token_expiry(trip["departure_time"])
+    passengers = []
+    cancelled = []
+    for row in bookings:
+        if row["status"] != "confirmed":
+            cancelled.append(row["booking_id"])
+            continue
+        passengers.append(
+            {
+                "booking_id": row["booking_id"],
+                "seat_number": row["seat_number"],
+                "origin_stop_id": row["origin_stop_id"],
+                "destination_stop_id": row["destination_stop_id"],
+                "ticket_token": sign_ticket_token(
+                    row["booking_id"],
+                    trip_id,
+                    row["origin_stop_id"],
+                    row["destination_stop_id"],
+                    expires_at,
+                    key,
+                ),
+            }
+        )
+
+    return jsonify(
+        {
+            "success": True,
+            "trip": _serialize_trip_dt(dict(trip)),
+            "passengers": passengers,
+            "cancelled_booking_ids": cancelled,
+            "expires_at": expires_at.isoformat(),
+        }
+    )
+
+
+# ---------- PASSENGER'S OWN BOOKINGS ----------
+MY_BOOKINGS_DEFAULT_LIMIT = 20
+MY_BOOKINGS_MAX_LIMIT = 100
+
+
+@passenger_bp.route("/me/bookings", methods=["GET"])
+def get_my_bookings():
+    """
+    Logged-in passenger's bookings, newest first, one page at a time.
+
+    Keyset pagination on idx_bookings_user_date (user_id, booking_date DESC):
+    rows are ordered booking_date DESC, booking_id ASC, which is the index
+    order (InnoDB appends the primary key ascending), so every page is an
+    index range scan of `limit` rows no matter how deep the cursor is.
+    """
+    if not session.get("loggedin") or not session.get("user_id"):
+        return jsonify({"success": False, "message": "Authentication required"}), 401
+    user_id = session["user_id"]
+
+    limit = request.args.get("limit", MY_BOOKINGS_DEFAULT_LIMIT, type=int)
+    if limit is None or limit < 1:
+        return jsonify({"success": False, "message": "limit must be >= 1"}), 400
+    limit = min(limit, MY_BOOKINGS_MAX_LIMIT)
+    try:
+        after = decode_cursor(request.args.get("cursor"), 2)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    where = "b.user_id = %s"
+    params = [user_id]
+    if after is not None:
+        where += " AND (b.booking_date < %s OR (b.booking_date = %s AND b.booking_id > %s))"
+        params.extend([after[0], after[0], after[1]])
+
+    from app import mysql
+
+    cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+    try:
+        cursor.execute(
+            f"""
+            SELECT b.booking_id, b.trip_id, b.seat_number,
+                   b.origin_stop_id, b.destination_stop_id,
+                   b.booking_date, b.status,
+                   t.route_id, t.direction, t.departure_time, t.status AS trip_status
+            FROM bookings b
+            JOIN trips t ON t.trip_id = b.trip_id
+            WHERE {where}
+            ORDER BY b.booking_date DESC, b.booking_id ASC
+            LIMIT %s
+            """,
+            (*params, limit + 1),
+        )
+        rows = list(cursor.fetchall())
+    finally:
+        cursor.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1]["booking_date"], rows[-1]["booking_id"]])
+
+    # Route and stop names come from the cached topology instead of joins
+    route_topology.ensure_loaded(mysql)
+    key = ticket_key()
+    bookings = []
+    for row in rows:
+        route = route_topology.get_route(row["route_id"]) or {}
+        booking = {
+            "booking_id": row["booking_id"],
+            "trip_id": row["trip_id"],
+            "seat_number": row["seat_number"],
+            "status": row["status"],
+            "booking_date": row["booking_date"].isoformat() if row["booking_date"] else None,
+            "route_id": row["route_id"],
+            "route_name": route.get("route_name"),
+            "direction": row["direction"],
+            "departure_time": row["departure_time"].isoformat() if row["departure_time"] else None,
+            "trip_status": row["trip_status"],
+            "origin_stop_id": row["origin_stop_id"],
+            "origin_stop_name": route_topology.get_stop_name(row["origin_stop_id"]),
+            "destination_stop_id": row["destination_stop_id"],
+            "destination_stop_name": route_topology.get_stop_name(row["destination_stop_id"]),
+            "ticket_token": None,
+        }
+        if row["status"] == "confirmed":
+            booking["ticket_token"] = sign_ticket_token(
+                row["booking_id"],
+                row["trip_id"],
+                row["origin_stop_id"],
+                row["destination_stop_id"],
+                token_expiry(row["departure_time"]),
+                key,
+            )
+        bookings.append(booking)
+
+    return jsonify(
+        {
+            "success": True,
+            "bookings": bookings,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
+    )
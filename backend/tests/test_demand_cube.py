@@ -0,0 +1,52 @@
+import sys
+import os
+import unittest
+from datetime import date, timedelta
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.demand_cube import DemandCube
+
+MONDAY = date(2026, 1, 5)
+
+
+def _rows(days, hours=(7, 8, 18), routes=(1, 2)):
+    # bookings = 10 * route + hour, confirmed = route
+    return [
+        (MONDAY + timedelta(days=d), h, r, 10 * r + h, r)
+        for d in days for h in hours for r in routes
+    ]
+
+
+class TestDemandCube(unittest.TestCase):
+    def setUp(self):
+        self.cube = DemandCube()
+        self.cube.load(_rows(range(14)), {1: "Route A", 2: "Route B"}, MONDAY, MONDAY + timedelta(days=13))
+
+    def test_weekday_hour_slice(self):
+        result = self.cube.query(weekdays=[0, 6], hours=[7, 8])
+        self.assertEqual(result["weekdays"], ["Monday", "Sunday"])
+        # Two Mondays and two Sundays, routes 1 + 2: (17 + 27) * 2 at 07:00
+        self.assertEqual(result["bookings"], [[88, 92], [88, 92]])
+        self.assertEqual(result["days"], 4)
+
+    def test_route_average_over_range(self):
+        result = self.cube.query(
+            start_day=MONDAY, end_day=MONDAY + timedelta(days=6), route_ids=[2], group_by=["route"], average=True
+        )
+        self.assertEqual(result["routes"], [{"route_id": 2, "route_name": "Route B"}])
+        self.assertEqual(result["bookings"], [27 + 28 + 38])
+
+    def test_replace_days_grows_cube(self):
+        last = MONDAY + timedelta(days=14)
+        self.cube.replace_days(_rows([13, 14], routes=(3,)), MONDAY + timedelta(days=13), last)
+        result = self.cube.query(start_day=last, end_day=last, group_by=["route"])
+        self.assertEqual(result["bookings"], [0, 0, 37 + 38 + 48])
+        # Day 13 was recomputed from the new rows only
+        result = self.cube.query(start_day=last - timedelta(days=1), end_day=last - timedelta(days=1), group_by=[])
+        self.assertEqual(result["bookings"], 37 + 38 + 48)
+
+
+if __name__ == '__main__':
+    unittest.main()
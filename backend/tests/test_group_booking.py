@@ -0,0 +1,169 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import seat_inventory
+
+try:
+    from routes import passenger
+except ImportError:  # MySQLdb / Flask-MySQLdb not installed
+    passenger = None
+
+
+class _StubCursor:
+    """Records statements and answers the seat inventory reads of one trip"""
+
+    def __init__(self, capacity=4, peak=0, taken=(), fetches=None):
+        self.capacity = capacity
+        self.peak = peak
+        self.taken = list(taken)
+        self.statements = []
+        self.rowcount = 1
+        self.lastrowid = 100
+        self._fetches = list(fetches or [])
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.statements.append((" ".join(sql.split()), params))
+        if "FROM trip_seats" in sql and "FOR UPDATE" in sql:
+            self._result = [(self.capacity,)]
+        elif "MAX(passengers), 0) AS peak" in sql:
+            self._result = [(self.peak,)]
+        elif "SELECT seat_number FROM trip_segment_seats" in sql:
+            self._result = [(seat,) for seat in self.taken]
+        elif sql.lstrip().startswith("SELECT") and self._fetches:
+            self._result = self._fetches.pop(0)
+        else:
+            self._result = []
+
+    def executemany(self, sql, rows):
+        self.statements.append((" ".join(sql.split()), list(rows)))
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+    def writes(self):
+        return [sql for sql, _ in self.statements if not sql.startswith("SELECT")]
+
+
+class TestClaimSeats(unittest.TestCase):
+    def test_claims_lowest_free_seats(self):
+        cursor = _StubCursor(capacity=5, peak=2, taken=(1, 3))
+        self.assertEqual(seat_inventory.claim_seats(cursor, 7, 2, (1, 3)), [2, 4])
+        inserted = [
+            params[0] for sql, params in cursor.statements
+            if sql.startswith("INSERT IGNORE INTO trip_segment_seats")
+        ]
+        self.assertEqual(inserted, [2, 4])
+
+    def test_group_over_capacity_claims_nothing(self):
+        cursor = _StubCursor(capacity=4, peak=2)
+        self.assertIsNone(seat_inventory.claim_seats(cursor, 7, 3, (1, 3)))
+        self.assertEqual(cursor.writes(), [])
+
+    def test_group_without_enough_free_seats_claims_nothing(self):
+        # An admin overbooking left seats taken beyond the peak count
+        cursor = _StubCursor(capacity=4, peak=1, taken=(1, 2, 3))
+        self.assertIsNone(seat_inventory.claim_seats(cursor, 7, 2, (1, 3)))
+        self.assertEqual(cursor.writes(), [])
+
+
+class _Connection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = False
+        self.rolled_back = False
+
+    def cursor(self, *args):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+class _MySQL:
+    def __init__(self, cursor):
+        self.connection = _Connection(cursor)
+
+
+@unittest.skipIf(passenger is None, "MySQLdb not installed")
+class TestGroupBookingFlow(unittest.TestCase):
+    TRIP = {
+        "trip_id": 7,
+        "route_id": 1,
+        "status": "scheduled",
+        "direction": "forward",
+        "departure_time": None,
+    }
+    FARE = {"fare_amount": 50, "direction": "forward", "stops_count": 2}
+
+    def _book(self, cursor, seats, claimed, charge):
+        mysql = _MySQL(cursor)
+        with patch.object(passenger, "calculate_fare", return_value=self.FARE), \
+                patch.object(passenger, "journey_segments", return_value=(1, 3)), \
+                patch.object(passenger, "claim_seats", return_value=claimed), \
+                patch.object(passenger, "_charge_payment", side_effect=charge), \
+                patch.object(passenger, "trip_loads"), \
+                patch.object(passenger, "ticket_key", return_value=b"key"), \
+                patch.object(passenger, "token_expiry", return_value=0), \
+                patch.object(passenger, "sign_ticket_token", return_value="token"):
+            result = passenger._create_group_booking_flow(
+                mysql, 5, 7, 10, 12, seats, {"mode": "transaction"}
+            )
+        return mysql, result
+
+    def test_one_payment_row_per_booking(self):
+        booked = [{"booking_id": 100 + i, "seat_number": seat} for i, seat in enumerate((2, 3, 4))]
+        cursor = _StubCursor(fetches=[[self.TRIP], booked])
+        charges = []
+
+        def charge(context, amount):
+            # Every booking row exists before the card is charged
+            self.assertTrue(any(sql.startswith("INSERT INTO bookings") for sql in cursor.writes()))
+            charges.append(amount)
+            return "txn-1", "4242"
+
+        mysql, result = self._book(cursor, 3, [2, 3, 4], charge)
+
+        self.assertEqual(charges, [150])
+        payments = [
+            rows for sql, rows in cursor.statements if sql.startswith("INSERT INTO payments")
+        ]
+        self.assertEqual(
+            payments,
+            [[(100, 50, "txn-1", "4242"), (101, 50, "txn-1", "4242"), (102, 50, "txn-1", "4242")]],
+        )
+        self.assertEqual([b["seat_number"] for b in result["bookings"]], [2, 3, 4])
+        self.assertTrue(mysql.connection.committed)
+
+    def test_no_seats_no_charge(self):
+        cursor = _StubCursor(fetches=[[self.TRIP]])
+        charges = []
+        with self.assertRaises(ValueError):
+            self._book(cursor, 3, None, lambda *a: charges.append(a))
+        self.assertEqual(charges, [])
+        self.assertEqual(cursor.writes(), [])
+
+    def test_unresolved_rows_roll_back_before_charge(self):
+        cursor = _StubCursor(fetches=[[self.TRIP], [{"booking_id": 100, "seat_number": 2}]])
+        charges = []
+        with self.assertRaises(RuntimeError):
+            self._book(cursor, 2, [2, 3], lambda *a: charges.append(a))
+        self.assertEqual(charges, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask, jsonify, session
+
+from utils import idempotency
+from utils.idempotency import IdempotencyStore, idempotent
+
+
+class TestIdempotencyStore(unittest.TestCase):
+    def test_replay_after_complete(self):
+        store = IdempotencyStore()
+        self.assertEqual(store.begin(("u", "/p", "k"), "h"), ("new", None))
+        store.complete(("u", "/p", "k"), 201, b"{}", "application/json")
+        state, entry = store.begin(("u", "/p", "k"), "h")
+        self.assertEqual(state, "replay")
+        self.assertEqual(entry["response"], (201, b"{}", "application/json"))
+
+    def test_in_flight_and_mismatch(self):
+        store = IdempotencyStore()
+        store.begin(("u", "/p", "k"), "h")
+        self.assertEqual(store.begin(("u", "/p", "k"), "h")[0], "in_flight")
+        self.assertEqual(store.begin(("u", "/p", "k"), "other")[0], "mismatch")
+
+    def test_release_allows_retry(self):
+        store = IdempotencyStore()
+        store.begin(("u", "/p", "k"), "h")
+        store.release(("u", "/p", "k"))
+        self.assertEqual(store.begin(("u", "/p", "k"), "h")[0], "new")
+
+    def test_release_keeps_completed_response(self):
+        store = IdempotencyStore()
+        store.begin(("u", "/p", "k"), "h")
+        store.complete(("u", "/p", "k"), 200, b"ok", "text/plain")
+        store.release(("u", "/p", "k"))
+        self.assertEqual(store.begin(("u", "/p", "k"), "h")[0], "replay")
+
+    def test_ttl_expiry(self):
+        store = IdempotencyStore(ttl_seconds=10)
+        with patch.object(idempotency.time, "monotonic", return_value=100.0):
+            store.begin(("u", "/p", "k"), "h")
+            store.complete(("u", "/p", "k"), 200, b"ok", "text/plain")
+        with patch.object(idempotency.time, "monotonic", return_value=111.0):
+            self.assertEqual(store.begin(("u", "/p", "k"), "h")[0], "new")
+
+    def test_lru_eviction(self):
+        store = IdempotencyStore(max_entries=2)
+        store.begin(("u", "/p", "a"), "h")
+        store.begin(("u", "/p", "b"), "h")
+        store.begin(("u", "/p", "a"), "h")  # touch a, b is now oldest
+        store.begin(("u", "/p", "c"), "h")
+        self.assertEqual(store.begin(("u", "/p", "a"), "h")[0], "in_flight")
+        self.assertEqual(store.begin(("u", "/p", "b"), "h")[0], "new")
+
+
+class TestIdempotentDecorator(unittest.TestCase):
+    def setUp(self):
+        self.store = IdempotencyStore()
+        patcher = patch.object(idempotency, "idempotency_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.calls = []
+        self.status = 201
+        app = Flask(__name__)
+        app.secret_key = "test"
+
+        @app.route("/login/<int:user_id>")
+        def login(user_id):
+            session["user_id"] = user_id
+            return "ok"
+
+        @app.route("/book", methods=["POST"])
+        @idempotent
+        def book():
+            self.calls.append(1)
+            return jsonify({"call": len(self.calls)}), self.status
+
+        self.client = app.test_client()
+
+    def _post(self, key="k1", body=b"{}"):
+        return self.client.post(
+            "/book", data=body, headers={"Idempotency-Key": key}
+        )
+
+    def test_replays_for_logged_in_user(self):
+        self.client.get("/login/7")
+        first = self._post()
+        second = self._post()
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual(second.headers.get("Idempotent-Replayed"), "true")
+
+    def test_body_mismatch_is_422(self):
+        self.client.get("/login/7")
+        self._post(body=b'{"a": 1}')
+        self.assertEqual(self._post(body=b'{"a": 2}').status_code, 422)
+
+    def test_in_flight_is_409(self):
+        self.client.get("/login/7")
+        self.store.begin((7, "/book", "k1"), idempotency.hashlib.sha256(b"{}").hexdigest())
+        self.assertEqual(self._post().status_code, 409)
+        self.assertEqual(self.calls, [])
+
+    def test_server_error_is_not_stored(self):
+        self.client.get("/login/7")
+        self.status = 503
+        self._post()
+        self.status = 201
+        self.assertEqual(self._post().status_code, 201)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_anonymous_requests_pass_through(self):
+        self._post()
+        self._post()
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(len(self.store._entries), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
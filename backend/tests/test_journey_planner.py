@@ -0,0 +1,75 @@
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.journey_planner import JourneyPlanner, Timetable
+
+T0 = datetime(2026, 3, 2, 8, 0)
+
+
+def stop(stop_id, order, lat, lon):
+    return {
+        "stop_id": stop_id,
+        "stop_name": f"Stop {stop_id}",
+        "stop_order": order,
+        "latitude": lat,
+        "longitude": lon,
+    }
+
+
+# Route 1 (BRT) runs west-east through stop 3, route 2 (bus) north-south
+# through stop 3 too; stop 7 on route 3 is ~150 m from stop 5 on route 2
+ROUTES = {
+    1: {"route_name": "Green Line", "service_id": 1,
+        "stops": [stop(1, 1, 24.90, 67.00), stop(2, 2, 24.90, 67.01), stop(3, 3, 24.90, 67.02)]},
+    2: {"route_name": "Red Bus 1", "service_id": 2,
+        "stops": [stop(3, 1, 24.90, 67.02), stop(4, 2, 24.91, 67.02), stop(5, 3, 24.92, 67.02)]},
+    3: {"route_name": "Red Bus 2", "service_id": 2,
+        "stops": [stop(7, 1, 24.9213, 67.02), stop(8, 2, 24.93, 67.02)]},
+    4: {"route_name": "Isolated", "service_id": 2,
+        "stops": [stop(9, 1, 25.50, 67.50), stop(10, 2, 25.51, 67.50)]},
+}
+
+
+class TestJourneyPlanner(unittest.TestCase):
+    def setUp(self):
+        trips = [
+            (101, 1, "forward", T0, T0 + timedelta(minutes=10)),
+            (201, 2, "forward", T0 + timedelta(minutes=11), T0 + timedelta(minutes=21)),  # Too tight to change
+            (202, 2, "forward", T0 + timedelta(minutes=15), T0 + timedelta(minutes=25)),
+            (301, 3, "forward", T0 + timedelta(minutes=30), T0 + timedelta(minutes=35)),
+            (102, 1, "backward", T0, T0 + timedelta(minutes=10)),
+        ]
+        self.planner = JourneyPlanner(min_transfer_seconds=120)
+        self.planner.load(Timetable(ROUTES, trips))
+
+    def test_transfer_at_shared_stop_and_walk(self):
+        journeys = self.planner.plan(1, 8, T0 - timedelta(minutes=5), count=1)
+        self.assertEqual(len(journeys), 1)
+        legs = journeys[0]["legs"]
+        self.assertEqual([leg["type"] for leg in legs], ["ride", "ride", "walk", "ride"])
+        self.assertEqual([leg.get("trip_id") for leg in legs], [101, 202, None, 301])
+        self.assertEqual((legs[2]["from_stop_id"], legs[2]["to_stop_id"]), (5, 7))
+        self.assertEqual(legs[0]["stops"], 2)
+        self.assertEqual(journeys[0]["transfers"], 2)
+        self.assertEqual(journeys[0]["arrival_time"], (T0 + timedelta(minutes=35)).isoformat())
+
+    def test_direction_and_departure_time(self):
+        # Only the backward trip serves 3 -> 1
+        journeys = self.planner.plan(3, 1, T0 - timedelta(minutes=1))
+        self.assertEqual([leg["trip_id"] for leg in journeys[0]["legs"]], [102])
+        # The bus has already left
+        self.assertEqual(self.planner.plan(3, 1, T0 + timedelta(minutes=1)), [])
+
+    def test_unreachable_and_unknown_stops(self):
+        self.assertEqual(self.planner.plan(1, 10, T0), [])
+        self.assertEqual(self.planner.plan(1, 999, T0), [])
+        self.assertFalse(self.planner.has_stop(999))
+
+
+if __name__ == '__main__':
+    unittest.main()
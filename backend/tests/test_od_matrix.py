@@ -0,0 +1,52 @@
+import sys
+import os
+import unittest
+from datetime import date, timedelta
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.od_matrix import ODMatrixEngine
+
+DAY = date(2026, 3, 2)
+STOPS = [11, 12, 13, 14]  # Route stop order
+
+
+class TestODMatrix(unittest.TestCase):
+    def setUp(self):
+        self.engine = ODMatrixEngine()
+        self.engine.load(
+            [
+                (1, DAY, 11, 14, 5),  # Whole route forward
+                (1, DAY, 12, 13, 3),
+                (1, DAY, 14, 12, 2),  # Backward
+                (1, DAY + timedelta(days=1), 11, 12, 7),
+                (1, DAY, 99, 12, 4),  # Stop no longer on the route
+            ],
+            watermark=10,
+        )
+
+    def test_matrix_and_segment_loads(self):
+        data = self.engine.route_od(1, STOPS, DAY, DAY)
+        self.assertEqual(data["matrix"][0][3], 5)
+        self.assertEqual(data["matrix"][3][1], 2)
+        self.assertEqual([s["forward_load"] for s in data["segments"]], [5, 8, 5])
+        self.assertEqual([s["backward_load"] for s in data["segments"]], [0, 2, 2])
+        self.assertEqual(data["peak_load"], {"from_stop_id": 12, "to_stop_id": 13, "direction": "forward", "load": 8})
+        self.assertEqual(data["unmapped_passengers"], 4)
+
+    def test_incremental_add_and_day_range(self):
+        self.engine.add([(1, DAY + timedelta(days=1), 11, 12, 1)], watermark=11)
+        data = self.engine.route_od(1, STOPS, DAY + timedelta(days=1), DAY + timedelta(days=1))
+        self.assertEqual(data["matrix"][0][1], 8)
+        self.assertEqual(data["passengers"], 8)
+        self.assertEqual(self.engine.watermark, 11)
+
+    def test_unknown_route_is_empty(self):
+        data = self.engine.route_od(2, STOPS, DAY, DAY)
+        self.assertEqual(data["passengers"], 0)
+        self.assertIsNone(data["peak_load"])
+
+
+if __name__ == '__main__':
+    unittest.main()
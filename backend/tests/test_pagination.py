@@ -0,0 +1,158 @@
+import base64
+import json
+import sys
+import os
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import pagination
+from utils.pagination import (
+    TotalCountCache,
+    decode_cursor,
+    encode_cursor,
+    keyset_page,
+    keyset_predicate,
+    parse_include_total,
+)
+
+
+def _token(payload):
+    raw = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+class TestKeysetPredicate(unittest.TestCase):
+    def test_uniform_desc_is_row_comparison(self):
+        sql, params = keyset_predicate(
+            [("b.booking_date", "DESC"), ("b.booking_id", "desc")], ["2025-01-01", 9]
+        )
+        self.assertEqual(sql, "(b.booking_date, b.booking_id) < (%s, %s)")
+        self.assertEqual(params, ["2025-01-01", 9])
+
+    def test_uniform_asc_is_row_comparison(self):
+        sql, params = keyset_predicate([("name", "ASC"), ("id", "ASC")], ["x", 3])
+        self.assertEqual(sql, "(name, id) > (%s, %s)")
+        self.assertEqual(params, ["x", 3])
+
+    def test_mixed_directions_expand_to_or(self):
+        sql, params = keyset_predicate(
+            [("a", "DESC"), ("b", "ASC"), ("c", "DESC")], [1, 2, 3]
+        )
+        self.assertEqual(
+            sql,
+            "((a < %s) OR (a = %s AND b > %s) OR (a = %s AND b = %s AND c < %s))",
+        )
+        self.assertEqual(params, [1, 1, 2, 1, 2, 3])
+
+
+class TestCursor(unittest.TestCase):
+    def test_round_trip(self):
+        values = [datetime(2025, 3, 4, 5, 6, 7), date(2025, 3, 4), 42, "name"]
+        token = encode_cursor(values)
+        self.assertNotIn("=", token)
+        self.assertEqual(decode_cursor(token, 4), values)
+
+    def test_empty_token(self):
+        self.assertIsNone(decode_cursor(None, 2))
+        self.assertIsNone(decode_cursor("", 2))
+
+    def test_rejects_bad_base64(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("not base64!", 1)
+        with self.assertRaises(ValueError):
+            decode_cursor("é", 1)
+
+    def test_rejects_non_list_payload(self):
+        for payload in ({"dt": "2025-01-01"}, 5, "ab"):
+            with self.assertRaises(ValueError):
+                decode_cursor(_token(payload), 2)
+
+    def test_rejects_wrong_length(self):
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor([1, 2]), 3)
+
+    def test_rejects_unknown_tagged_value(self):
+        with self.assertRaises(ValueError):
+            decode_cursor(_token([{"x": 1}]), 1)
+
+
+class TestKeysetPage(unittest.TestCase):
+    def test_trims_extra_row_and_builds_cursor(self):
+        rows = [{"id": i, "day": date(2025, 1, i)} for i in (5, 4, 3)]
+        page, cursor = keyset_page(rows, 2, ["day", "id"])
+        self.assertEqual([r["id"] for r in page], [5, 4])
+        self.assertEqual(decode_cursor(cursor, 2), [date(2025, 1, 4), 4])
+
+    def test_last_page_has_no_cursor(self):
+        rows = [{"id": 2}, {"id": 1}]
+        self.assertEqual(keyset_page(rows, 2, ["id"]), (rows, None))
+        self.assertEqual(keyset_page([], 2, ["id"]), ([], None))
+
+
+class TestParseIncludeTotal(unittest.TestCase):
+    def test_values(self):
+        cases = {
+            None: None,
+            "": None,
+            "0": None,
+            "False": None,
+            "no": None,
+            "1": "exact",
+            " true ": "exact",
+            "yes": "exact",
+            "EXACT": "exact",
+            "approx": "approx",
+            "estimate": "approx",
+        }
+        for value, expected in cases.items():
+            self.assertEqual(parse_include_total(value), expected, value)
+
+    def test_rejects_unknown(self):
+        with self.assertRaises(ValueError):
+            parse_include_total("sometimes")
+
+
+class _CountCursor:
+    def __init__(self, total):
+        self.total = total
+        self.queries = 0
+
+    def execute(self, sql, params=None):
+        self.queries += 1
+
+    def fetchone(self):
+        return (self.total,)
+
+
+class TestTotalCountCache(unittest.TestCase):
+    def test_counts_once_per_ttl(self):
+        cache = TotalCountCache(ttl_seconds=30)
+        cursor = _CountCursor(7)
+        self.assertEqual(cache.count(cursor, "SELECT COUNT(*) FROM t", (1,)), 7)
+        self.assertEqual(cache.count(cursor, "SELECT COUNT(*) FROM t", (1,)), 7)
+        self.assertEqual(cursor.queries, 1)
+
+    def test_expired_entries_dropped_on_insert(self):
+        cache = TotalCountCache(ttl_seconds=30)
+        cursor = _CountCursor(1)
+        with patch.object(pagination.time, "monotonic", return_value=100.0):
+            cache.count(cursor, "q", (1,))
+            cache.count(cursor, "q", (2,))
+        with patch.object(pagination.time, "monotonic", return_value=200.0):
+            cache.count(cursor, "q", (3,))
+        self.assertEqual(list(cache._entries), [("q", (3,))])
+
+    def test_max_entries_drops_oldest(self):
+        cache = TotalCountCache(ttl_seconds=30, max_entries=2)
+        cursor = _CountCursor(1)
+        for page_filter in (1, 2, 3):
+            cache.count(cursor, "q", (page_filter,))
+        self.assertEqual(list(cache._entries), [("q", (2,)), ("q", (3,))])
+
+
+if __name__ == '__main__':
+    unittest.main()
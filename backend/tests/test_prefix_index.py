@@ -0,0 +1,100 @@
+import sys
+import os
+import unittest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    from utils import prefix_index
+except ImportError:  # MySQLdb not installed
+    prefix_index = None
+
+USERS = [
+    {"user_id": 1, "username": "ali_khan", "full_name": "Ali Khan"},
+    {"user_id": 2, "username": "sara", "full_name": "Sara Ali"},
+    {"user_id": 3, "username": "bilal", "full_name": "Bilal Ahmed Khan"},
+]
+
+
+class _StubCursor:
+    def __init__(self, rows, loads):
+        self._rows = rows
+        self._loads = loads
+
+    def execute(self, sql, params=None):
+        self._loads.append(sql)
+
+    def fetchall(self):
+        return [dict(row) for row in self._rows]
+
+    def close(self):
+        pass
+
+
+class _StubMySQL:
+    def __init__(self, rows):
+        self.rows = rows
+        self.loads = []
+        self.connection = self
+
+    def cursor(self, *args):
+        return _StubCursor(self.rows, self.loads)
+
+
+@unittest.skipIf(prefix_index is None, "MySQLdb not installed")
+class TestPrefixIndex(unittest.TestCase):
+    def setUp(self):
+        self.mysql = _StubMySQL(USERS)
+        self.index = prefix_index.PrefixIndex(
+            "SELECT user_id, username, full_name FROM users",
+            id_column="user_id",
+            key_columns=("username", "full_name"),
+        )
+        self.index.ensure_loaded(self.mysql)
+
+    def _ids(self, prefix, limit=10):
+        return [r["user_id"] for r in self.index.search(prefix, limit)]
+
+    def test_terms(self):
+        self.assertEqual(prefix_index._terms("  Bilal Ahmed Khan "), ["bilal ahmed khan", "ahmed", "khan"])
+        self.assertEqual(prefix_index._terms("Sara"), ["sara"])
+        self.assertEqual(prefix_index._terms(None), [])
+        self.assertEqual(prefix_index._terms("   "), [])
+
+    def test_matches_any_word(self):
+        self.assertEqual(sorted(self._ids("kha")), [1, 3])
+        self.assertEqual(self._ids("ahm"), [3])
+
+    def test_matches_whole_name(self):
+        self.assertEqual(self._ids("ali k"), [1])
+        self.assertEqual(self._ids("BILAL AHMED"), [3])
+
+    def test_record_matching_several_terms_is_returned_once(self):
+        # "ali" matches user 1 (username, full name) and user 2 (surname)
+        self.assertEqual(sorted(self._ids("ali")), [1, 2])
+
+    def test_limit(self):
+        self.assertEqual(len(self._ids("", limit=2)), 2)
+        self.assertEqual(len(self._ids("kha", limit=1)), 1)
+
+    def test_empty_prefix_matches_everything(self):
+        self.assertEqual(sorted(self._ids("  ")), [1, 2, 3])
+
+    def test_no_match(self):
+        self.assertEqual(self._ids("zz"), [])
+
+    def test_invalidate_forces_reload(self):
+        self.index.ensure_loaded(self.mysql)
+        self.assertEqual(len(self.mysql.loads), 1)
+
+        self.mysql.rows = USERS + [{"user_id": 4, "username": "zara", "full_name": "Zara Shah"}]
+        self.index.invalidate()
+        self.index.ensure_loaded(self.mysql)
+        self.assertEqual(len(self.mysql.loads), 2)
+        self.assertEqual(self._ids("sha"), [4])
+        self.assertEqual(len(self.index), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+import os
+import sys
+import unittest
+from datetime import date, datetime
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import MySQLdb
+    from admin.repos import reports
+except ImportError:  # MySQLdb / Flask-MySQLdb not installed
+    MySQLdb = None
+    reports = None
+
+# Date columns the reports filter on -> table
+DATE_COLUMNS = {
+    "booking_date": "bookings",
+    "payment_date": "payments",
+    "departure_time": "trips",
+    "issue_date": "tickets",
+}
+
+# Not hour aligned, so the reports read the raw tables instead of the rollups
+START = datetime(2025, 1, 1, 0, 30)
+END = datetime(2025, 1, 31, 23, 30)
+
+
+@unittest.skipIf(reports is None, "MySQLdb not installed")
+class TestDateRange(unittest.TestCase):
+    def test_datetime_end_is_exclusive_next_second(self):
+        clauses, params = reports._date_range("b.booking_date", START, END)
+        self.assertEqual(clauses, ["b.booking_date >= %s", "b.booking_date < %s"])
+        self.assertEqual(params, [START, datetime(2025, 1, 31, 23, 30, 1)])
+
+    def test_date_end_is_exclusive_next_day(self):
+        clauses, params = reports._date_range("payment_date", None, date(2025, 1, 31))
+        self.assertEqual(clauses, ["payment_date < %s"])
+        self.assertEqual(params, [date(2025, 2, 1)])
+
+    def test_open_range(self):
+        self.assertEqual(reports._date_range("departure_time"), ([], []))
+
+
+class _RecordingCursor:
+    def __init__(self, cursor, statements):
+        self._cursor = cursor
+        self._statements = statements
+
+    def execute(self, sql, params=None):
+        self._statements.append((sql, params))
+        return self._cursor.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _RecordingConnection:
+    def __init__(self, conn):
+        self._conn = conn
+        self.statements = []
+
+    def cursor(self, *args):
+        return _RecordingCursor(self._conn.cursor(*args), self.statements)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class _MySQL:
+    def __init__(self, conn):
+        self.connection = conn
+
+
+def _connect():
+    """Connection from the DB_* settings in .env; skips the test class if unreachable"""
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    except ImportError:
+        pass
+    try:
+        return MySQLdb.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            passwd=os.getenv("DB_PASSWORD", ""),
+            db=os.getenv("DB_NAME", "ksts_db"),
+            port=int(os.getenv("DB_PORT", 3306)),
+        )
+    except MySQLdb.Error as e:
+        raise unittest.SkipTest(f"database not reachable: {e}")
+
+
+@unittest.skipIf(reports is None, "MySQLdb not installed")
+class TestReportQueryPlans(unittest.TestCase):
+    """
+    EXPLAIN every statement the date-filtered reports run and check that the
+    date filter can use an index on the raw column (the predicate is sargable).
+    Needs the DB_* settings from .env and database/migrations/date_columns.sql.
+    """
+
+    REPORTS = [
+        "bookings_count_by_day",
+        "bookings_count_by_status",
+        "revenue_by_day",
+        "total_revenue",
+        "trips_summary_by_route",
+        "top_routes_by_bookings",
+        "bookings_and_payments_summary",
+        "dashboard_overview",
+        "user_analytics",
+        "bus_utilization",
+        "payment_analytics",
+        "peak_hours_analysis",
+        "route_performance",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.conn = _connect()
+
+        # {table: {index names whose first column is the table's date column}}
+        cursor = cls.conn.cursor()
+        cursor.execute(
+            """
+            SELECT TABLE_NAME, COLUMN_NAME, INDEX_NAME
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND SEQ_IN_INDEX = 1
+            """
+        )
+        cls.date_indexes = {}
+        for table, column, index in cursor.fetchall():
+            if DATE_COLUMNS.get(column) == table:
+                cls.date_indexes.setdefault(table, set()).add(index)
+        cursor.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def _explain(self, sql, params):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("EXPLAIN " + sql, params)
+            cols = [c[0] for c in cursor.description]
+            return [dict(zip(cols, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def _calls(self):
+        for name in self.REPORTS:
+            yield name, {"start_date": START, "end_date": END}
+        yield "daily_booking_analytics", {"start_day": START.date(), "end_day": END.date()}
+
+    def test_date_filters_use_indexes(self):
+        for name, kwargs in self._calls():
+            recording = _RecordingConnection(self.conn)
+            getattr(reports, name)(mysql=_MySQL(recording), **kwargs)
+            for sql, params in recording.statements:
+                filtered = [
+                    table
+                    for column, table in DATE_COLUMNS.items()
+                    if f"{column} >= %s" in sql
+                ]
+                if not filtered:
+                    continue
+                with self.subTest(report=name, sql=" ".join(sql.split())[:120]):
+                    self.assertNotIn("DATE(", sql.split("FROM", 1)[1])
+                    usable = set()
+                    for row in self._explain(sql, params):
+                        usable.update((row.get("possible_keys") or "").split(","))
+                        usable.add(row.get("key") or "")
+                    for table in filtered:
+                        self.assertTrue(
+                            usable & self.date_indexes.get(table, set()),
+                            f"no index on {table} usable for the date range",
+                        )
+
+
+@unittest.skipIf(reports is None, "MySQLdb not installed")
+class TestRollupMatchesRaw(unittest.TestCase):
+    """
+    Hour-aligned ranges are read from the rollups, others from the raw tables;
+    both must report the same numbers for the same bookings. Needs the DB_*
+    settings from .env and database/migrations/report_rollups.sql.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        from utils.report_rollups import BATCH_ROWS, compact_once, rollups_available
+
+        cls.conn = _connect()
+        cls.mysql = _MySQL(cls.conn)
+        if not rollups_available(cls.mysql):
+            cls.conn.close()
+            raise unittest.SkipTest("report_rollups.sql not applied")
+        while compact_once(cls.conn) >= BATCH_ROWS:
+            pass
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.conn.close()
+
+    def test_route_performance(self):
+        start, end = datetime(2025, 1, 1), datetime(2025, 1, 31, 23, 59, 59)
+        rollup = reports.route_performance(mysql=self.mysql, start_date=start, end_date=end)
+        with patch.object(reports, "_rollup_window", return_value=None):
+            raw = reports.route_performance(mysql=self.mysql, start_date=start, end_date=end)
+
+        def normalized(rows):
+            return sorted(
+                (
+                    row["route_id"],
+                    int(row["total_trips"]),
+                    int(row["total_bookings"]),
+                    int(row["completed_trips"]),
+                    int(row["cancelled_trips"]),
+                    float(row["revenue"]),
+                )
+                for row in rows
+            )
+
+        self.assertEqual(normalized(rollup), normalized(raw))
+
+
+if __name__ == "__main__":
+    unittest.main()
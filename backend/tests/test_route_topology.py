@@ -0,0 +1,129 @@
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    from utils import route_topology
+except ImportError:  # MySQLdb not installed
+    route_topology = None
+
+# Service 1: route 10 "A" runs stops 1 -> 2 -> 3, route 11 "B" runs 3 -> 2.
+# Service 2: route 20 "C" runs 1 -> 3. Stop 4 is on no route.
+ROUTES = [
+    {"route_id": 10, "service_id": 1, "route_name": "A"},
+    {"route_id": 11, "service_id": 1, "route_name": "B"},
+    {"route_id": 20, "service_id": 2, "route_name": "C"},
+]
+STOPS = [
+    {"stop_id": stop_id, "stop_name": f"Stop {stop_id}", "latitude": 24.8 + stop_id / 100, "longitude": 67.0}
+    for stop_id in (1, 2, 3, 4)
+]
+ROUTE_STOPS = [(10, 1, 1), (10, 2, 2), (10, 3, 3), (11, 3, 1), (11, 2, 2), (20, 1, 1), (20, 3, 2)]
+
+
+class _StubCursor:
+    def __init__(self, db):
+        self._db = db
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        if "FROM routes_stops" in sql:
+            stops = {s["stop_id"]: s for s in self._db.stops}
+            self._rows = [
+                dict(stops[stop_id], route_id=route_id, stop_order=order)
+                for route_id, stop_id, order in sorted(self._db.route_stops)
+            ]
+        elif "FROM routes" in sql:
+            self._db.loads += 1
+            self._rows = self._db.routes
+        else:
+            self._rows = self._db.stops
+
+    def fetchall(self):
+        return [dict(row) for row in self._rows]
+
+    def close(self):
+        pass
+
+
+class _StubMySQL:
+    def __init__(self):
+        self.routes = list(ROUTES)
+        self.stops = list(STOPS)
+        self.route_stops = list(ROUTE_STOPS)
+        self.loads = 0
+        self.connection = self
+
+    def cursor(self, *args):
+        return _StubCursor(self)
+
+
+@unittest.skipIf(route_topology is None, "MySQLdb not installed")
+class TestMatchingRoutes(unittest.TestCase):
+    def setUp(self):
+        self.mysql = _StubMySQL()
+        self.topology = route_topology.RouteTopology()
+        self.topology.ensure_loaded(self.mysql)
+
+    def _match(self, service_id, start, end):
+        return [
+            (m["route_id"], m["start_order"], m["end_order"], m["direction"])
+            for m in self.topology.matching_routes(service_id, start, end)
+        ]
+
+    def test_forward_and_backward(self):
+        self.assertEqual(self._match(1, 1, 3), [(10, 1, 3, "forward")])
+        self.assertEqual(self._match(1, 3, 1), [(10, 3, 1, "backward")])
+        # Both routes of the service serve 2 and 3, sorted by route name
+        self.assertEqual(
+            self._match(1, 2, 3), [(10, 2, 3, "forward"), (11, 2, 1, "backward")]
+        )
+
+    def test_route_fields(self):
+        match = self.topology.matching_routes(1, 1, 2)[0]
+        self.assertEqual((match["route_name"], match["stop_count"]), ("A", 3))
+
+    def test_filters_by_service(self):
+        self.assertEqual(self._match(2, 1, 3), [(20, 1, 2, "forward")])
+        self.assertEqual(self._match(2, 1, 2), [])
+
+    def test_stop_on_no_route(self):
+        self.assertEqual(self._match(1, 4, 1), [])
+        self.assertEqual(self._match(1, 1, 4), [])
+
+    def test_same_stop(self):
+        self.assertEqual(self._match(1, 2, 2), [])
+
+    def test_results_are_cached(self):
+        first = self.topology.matching_routes(1, 1, 3)
+        self.assertIs(self.topology.matching_routes(1, 1, 3), first)
+
+    def test_lru_evicts_least_recently_used(self):
+        with patch.object(route_topology, "MATCHING_CACHE_SIZE", 2):
+            self.topology.matching_routes(1, 1, 3)
+            self.topology.matching_routes(1, 2, 3)
+            self.topology.matching_routes(1, 1, 3)  # 2 -> 3 is now the oldest
+            self.topology.matching_routes(1, 3, 1)
+        self.assertEqual(list(self.topology._matching), [(1, 1, 3), (1, 3, 1)])
+
+    def test_invalidate_clears_cache_on_reload(self):
+        self.assertEqual(self._match(1, 1, 2), [(10, 1, 2, "forward")])
+        # Route 11 is extended to stop 1
+        self.mysql.route_stops.append((11, 1, 3))
+        self.topology.ensure_loaded(self.mysql)
+        self.assertEqual(self._match(1, 1, 2), [(10, 1, 2, "forward")])
+
+        self.topology.invalidate()
+        self.topology.ensure_loaded(self.mysql)
+        self.assertEqual(self.mysql.loads, 2)
+        self.assertEqual(
+            self._match(1, 1, 2), [(10, 1, 2, "forward"), (11, 3, 2, "backward")]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import os
+import random
+import unittest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.segment_tree import SegmentTree
+from utils.trip_loads import TripLoads
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def execute(self, sql, params=None):
+        self.queries += 1
+
+    def fetchall(self):
+        return self.rows
+
+
+class TestSegmentTree(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        size = 23
+        values = [rng.randint(0, 5) for _ in range(size)]
+        tree = SegmentTree(size, values)
+        for _ in range(500):
+            start = rng.randrange(size)
+            end = rng.randint(start, size)
+            if rng.random() < 0.5:
+                delta = rng.randint(-2, 3)
+                tree.add(start, end, delta)
+                for i in range(start, end):
+                    values[i] += delta
+            else:
+                expected = max(values[start:end]) if start < end else 0
+                self.assertEqual(tree.max(start, end), expected)
+        self.assertEqual(tree.values(), values)
+
+    def test_empty_tree(self):
+        tree = SegmentTree(0)
+        self.assertEqual(tree.max(), 0)
+        tree.add(0, 3, 1)
+        self.assertEqual(tree.values(), [])
+
+
+class TestTripLoads(unittest.TestCase):
+    def test_journey_peaks_and_range_add(self):
+        loads = TripLoads(ttl_seconds=60)
+        # Route stop orders 1..5 -> segments 1, 2, 3, 4
+        cursor = FakeCursor([(10, 1, 3), (10, 2, 1), (10, 3, 4)])
+        orders = {10: [1, 2, 3, 4, 5]}
+        self.assertEqual(loads.peak_loads(cursor, orders), {10: 4})
+        self.assertEqual(loads.peak_loads(cursor, orders, (1, 3)), {10: 3})
+        self.assertEqual(loads.peak_loads(cursor, orders, (4, 5)), {10: 0})
+
+        # Riding stop 2 -> 4 occupies segments 2 and 3; the cached tree is reused
+        loads.add(10, (2, 4), 2)
+        self.assertEqual(loads.peak_loads(cursor, orders, (2, 3)), {10: 3})
+        self.assertEqual(loads.peak_loads(cursor, orders), {10: 6})
+        self.assertEqual(cursor.queries, 1)
+
+        loads.invalidate(10)
+        loads.peak_loads(cursor, orders)
+        self.assertEqual(cursor.queries, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import sys
+import os
+import unittest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.booking_sketches import DaySketch
+from utils.sketches import CountMinSketch, HyperLogLog, TopK
+
+
+class TestHyperLogLog(unittest.TestCase):
+    def test_estimate_within_five_percent(self):
+        for n in (100, 5000, 50000):
+            hll = HyperLogLog()
+            hll.update(range(n))
+            self.assertLess(abs(hll.count() - n) / n, 0.05, n)
+
+    def test_merge_equals_union(self):
+        a, b, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        a.update(range(0, 30000))
+        b.update(range(20000, 50000))
+        union.update(range(0, 50000))
+        self.assertEqual(a.merge(b).count(), union.count())
+
+    def test_round_trip(self):
+        hll = HyperLogLog()
+        hll.update(range(1000))
+        self.assertEqual(HyperLogLog.from_dict(hll.to_dict()).count(), hll.count())
+
+
+class TestCountMin(unittest.TestCase):
+    def test_never_undercounts(self):
+        cms = CountMinSketch(width=64, depth=3)
+        for i in range(500):
+            cms.add(i % 50, i % 7 + 1)
+        exact = {}
+        for i in range(500):
+            exact[i % 50] = exact.get(i % 50, 0) + i % 7 + 1
+        for item, count in exact.items():
+            self.assertGreaterEqual(cms.estimate(item), count)
+
+
+class TestTopK(unittest.TestCase):
+    def test_finds_heavy_items_across_merges(self):
+        days = [TopK(k=5) for _ in range(3)]
+        for sketch in days:
+            for i in range(2000):
+                sketch.add(f"route-{i % 200}")  # Long tail, 10 each per day
+            for heavy, count in (("route-a", 300), ("route-b", 200), ("route-c", 100)):
+                sketch.add(heavy, count)
+        merged = days[0].merge(days[1]).merge(days[2])
+        top = merged.top(3)
+        self.assertEqual([item for item, _ in top], ["route-a", "route-b", "route-c"])
+        self.assertGreaterEqual(top[0][1], 900)
+
+
+class TestDaySketch(unittest.TestCase):
+    def test_payload_round_trip(self):
+        sketch = DaySketch()
+        for i in range(300):
+            sketch.add(user_id=i % 40, trip_id=i % 12, route_id=i % 3, service_id=1)
+        restored = DaySketch.from_payload(sketch.to_payload())
+        self.assertEqual(restored.bookings, 300)
+        self.assertEqual(restored.passengers.count(), sketch.passengers.count())
+        self.assertEqual(restored.routes.top(), sketch.routes.top())
+
+
+if __name__ == '__main__':
+    unittest.main()
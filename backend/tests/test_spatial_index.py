@@ -0,0 +1,56 @@
+import sys
+import os
+import random
+import unittest
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.geo import calculate_distance
+from utils.spatial_index import StopGrid
+
+
+class TestStopGrid(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        # Stops scattered over Karachi
+        self.coords = {
+            stop_id: (24.80 + rng.random() * 0.25, 66.95 + rng.random() * 0.30)
+            for stop_id in range(1, 801)
+        }
+        self.grid = StopGrid(self.coords, cell_meters=250)
+
+    def brute_force(self, lat, lon, radius, stop_ids=None):
+        found = []
+        for stop_id, (slat, slon) in self.coords.items():
+            if stop_ids is not None and stop_id not in stop_ids:
+                continue
+            meters = calculate_distance(lat, lon, slat, slon) * 1000
+            if meters <= radius:
+                found.append((stop_id, meters))
+        return sorted(found, key=lambda item: (item[1], item[0]))
+
+    def test_within_matches_brute_force(self):
+        rng = random.Random(5)
+        for _ in range(50):
+            lat, lon = 24.80 + rng.random() * 0.25, 66.95 + rng.random() * 0.30
+            radius = rng.choice([100, 400, 1200, 3000])
+            self.assertEqual(self.grid.within(lat, lon, radius), self.brute_force(lat, lon, radius))
+
+    def test_filtered_and_neighbours(self):
+        lat, lon = self.coords[10]
+        route = {10, 20, 30, 40}
+        self.assertEqual(
+            self.grid.within(lat, lon, 5000, route), self.brute_force(lat, lon, 5000, route)
+        )
+        neighbours = self.grid.neighbours(300)
+        for other, meters in neighbours[10]:
+            self.assertNotEqual(other, 10)
+            self.assertIn((10, meters), [(s, m) for s, m in neighbours[other]])
+
+    def test_empty_grid(self):
+        self.assertEqual(StopGrid({}).within(24.9, 67.0, 1000), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
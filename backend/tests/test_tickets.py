@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.tickets import (
+    TicketRevocations,
+    TicketTokenError,
+    sign_ticket_token,
+    ticket_code,
+    verify_ticket_code,
+    verify_ticket_token,
+)
+
+KEY = b"k" * 32
+
+
+class TestTicketCodes(unittest.TestCase):
+    def test_ticket_code_roundtrip(self):
+        code = ticket_code(123, KEY)
+        self.assertTrue(code.startswith("TICKET-123-"))
+        self.assertEqual(verify_ticket_code(code, KEY), 123)
+
+    def test_ticket_code_other_key_rejected(self):
+        code = ticket_code(123, KEY)
+        self.assertIsNone(verify_ticket_code(code, b"x" * 32))
+
+
+class TestTicketTokens(unittest.TestCase):
+    def setUp(self):
+        self.expires_at = datetime.now() + timedelta(hours=1)
+        self.token = sign_ticket_token(10, 20, 3, 7, self.expires_at, KEY)
+
+    def test_valid_token_claims(self):
+        claims = verify_ticket_token(self.token, KEY)
+        self.assertEqual(claims["booking_id"], 10)
+        self.assertEqual(claims["trip_id"], 20)
+        self.assertEqual(claims["origin_stop_id"], 3)
+        self.assertEqual(claims["destination_stop_id"], 7)
+
+    def test_tampered_payload_rejected(self):
+        forged = sign_ticket_token(11, 20, 3, 7, self.expires_at, b"x" * 32)
+        payload = forged.split(".")[0]
+        tag = self.token.split(".")[1]
+        with self.assertRaises(TicketTokenError) as ctx:
+            verify_ticket_token(f"{payload}.{tag}", KEY)
+        self.assertEqual(ctx.exception.reason, "bad_signature")
+
+    def test_expired_token_rejected(self):
+        with self.assertRaises(TicketTokenError) as ctx:
+            verify_ticket_token(self.token, KEY, now=self.expires_at.timestamp() + 1)
+        self.assertEqual(ctx.exception.reason, "expired")
+
+    def test_cancelled_booking_rejected(self):
+        revocations = TicketRevocations()
+        self.assertEqual(verify_ticket_token(self.token, KEY, revoked=revocations)["booking_id"], 10)
+        # Admin cancel path, then a reload from bookings.status keeps it revoked
+        revocations.revoke(10)
+        revocations.load([10])
+        with self.assertRaises(TicketTokenError) as ctx:
+            verify_ticket_token(self.token, KEY, revoked=revocations)
+        self.assertEqual(ctx.exception.reason, "revoked")
+        # Confirmed again
+        revocations.restore(10)
+        revocations.load([])
+        self.assertEqual(verify_ticket_token(self.token, KEY, revoked=revocations)["booking_id"], 10)
+
+    def test_deleted_booking_stays_revoked_after_reload(self):
+        revocations = TicketRevocations()
+        revocations.revoke(10, deleted=True)
+        revocations.load([])
+        self.assertIn(10, revocations)
+
+    def test_malformed_token_rejected(self):
+        with self.assertRaises(TicketTokenError) as ctx:
+            verify_ticket_token("not-a-token", KEY)
+        self.assertEqual(ctx.exception.reason, "malformed")
+
+
+if __name__ == '__main__':
+    unittest.main()
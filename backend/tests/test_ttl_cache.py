@@ -0,0 +1,78 @@
+import sys
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import ttl_cache
+from utils.ttl_cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_hit_after_miss(self):
+        cache = TTLCache(ttl_seconds=60)
+        self.assertEqual(cache.get_or_compute("k", lambda: 1), 1)
+        self.assertEqual(cache.get_or_compute("k", lambda: 2), 1)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_concurrent_misses_compute_once(self):
+        cache = TTLCache(ttl_seconds=60)
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["value"] * 8)
+
+    def test_errors_are_not_cached(self):
+        cache = TTLCache(ttl_seconds=60)
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            cache.get_or_compute("k", fail)
+        self.assertEqual(cache.get_or_compute("k", lambda: 3), 3)
+
+    def test_invalidate(self):
+        cache = TTLCache(ttl_seconds=60)
+        cache.get_or_compute("k", lambda: 1)
+        cache.invalidate()
+        self.assertEqual(cache.get_or_compute("k", lambda: 2), 2)
+
+    def test_expired_entries_dropped_on_insert(self):
+        cache = TTLCache(ttl_seconds=10)
+        with patch.object(ttl_cache.time, "monotonic", return_value=100.0):
+            cache.get_or_compute("a", lambda: 1)
+            cache.get_or_compute("b", lambda: 2)
+        with patch.object(ttl_cache.time, "monotonic", return_value=115.0):
+            cache.get_or_compute("c", lambda: 3)
+        self.assertEqual(list(cache._entries), ["c"])
+
+    def test_max_entries_drops_oldest(self):
+        cache = TTLCache(ttl_seconds=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.get_or_compute(key, lambda: key)
+        self.assertEqual(list(cache._entries), ["b", "c"])
+        self.assertEqual(cache.get_or_compute("a", lambda: "again"), "again")
+
+
+if __name__ == "__main__":
+    unittest.main()
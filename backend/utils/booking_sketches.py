@@ -0,0 +1,386 @@
+"""
+Per-day booking sketches for approximate multi-day analytics.
+
+Each booking day has one `DaySketch`:
+
+- bookings        exact count
+- passengers      HyperLogLog of user_id   (COUNT(DISTINCT user_id))
+- trips           HyperLogLog of trip_id   (COUNT(DISTINCT trip_id))
+- routes/services/users  TopK heavy hitters (most popular route, service,
+                  most active passengers)
+
+`SketchBuilder` folds bookings past the id watermark into their day's sketch
+every `SKETCH_REFRESH_SECONDS` and upserts the touched days into
+`booking_sketches` (database/migrations/booking_sketches.sql). The watermark row
+is locked for the pass, so several backend processes never fold the same
+bookings twice.
+
+Booking ids are assigned at INSERT but become visible at COMMIT, and the
+booking flow keeps its transaction open while the payment is charged, so a
+lower id can commit after a higher one has been folded. Only bookings older
+than `SKETCH_FOLD_LAG_SECONDS` are folded, and every
+`SKETCH_RECONCILE_SECONDS` the builder rebuilds today and yesterday from
+bookings to pick up any id the watermark still skipped.
+
+`SketchStore.summary()` merges the stored days of a range in memory (days
+are cached, recent ones only briefly), so a multi-week dashboard costs one
+small indexed read instead of a scan of bookings. Only the sketch-summary
+report reads it: user_analytics and the daily booking analytics need exact
+per-status counts and revenue, which the sketches do not keep.
+
+Sketches only grow: cancellations still count (as in
+get_daily_booking_analytics), and deleted bookings stay in their day's
+sketch until it is rebuilt with `rebuild_day()`.
+"""
+
+import json
+import os
+import time
+import zlib
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.logging_utils import get_logger
+from utils.sketches import HyperLogLog, TopK
+
+logger = get_logger(__name__)
+
+REFRESH_SECONDS = int(os.getenv("SKETCH_REFRESH_SECONDS", "60"))
+FOLD_LAG_SECONDS = int(os.getenv("SKETCH_FOLD_LAG_SECONDS", "300"))
+RECONCILE_SECONDS = int(os.getenv("SKETCH_RECONCILE_SECONDS", "3600"))
+BATCH_ROWS = 20000
+CACHE_DAYS = 400
+
+
+class DaySketch:
+    def __init__(self):
+        self.bookings = 0
+        self.passengers = HyperLogLog()
+        self.trips = HyperLogLog()
+        self.routes = TopK(k=20)
+        self.services = TopK(k=10)
+        self.users = TopK(k=20)
+
+    def add(self, user_id: int, trip_id: int, route_id: int, service_id: int):
+        self.bookings += 1
+        self.passengers.add(user_id)
+        self.trips.add(trip_id)
+        self.routes.add(route_id)
+        self.services.add(service_id)
+        self.users.add(user_id)
+
+    def merge(self, other: "DaySketch") -> "DaySketch":
+        self.bookings += other.bookings
+        self.passengers.merge(other.passengers)
+        self.trips.merge(other.trips)
+        self.routes.merge(other.routes)
+        self.services.merge(other.services)
+        self.users.merge(other.users)
+        return self
+
+    def to_payload(self) -> bytes:
+        data = {
+            "bookings": self.bookings,
+            "passengers": self.passengers.to_dict(),
+            "trips": self.trips.to_dict(),
+            "routes": self.routes.to_dict(),
+            "services": self.services.to_dict(),
+            "users": self.users.to_dict(),
+        }
+        return zlib.compress(json.dumps(data).encode())
+
+    @classmethod
+    def from_payload(cls, payload: bytes) -> "DaySketch":
+        data = json.loads(zlib.decompress(payload))
+        sketch = cls()
+        sketch.bookings = data["bookings"]
+        sketch.passengers = HyperLogLog.from_dict(data["passengers"])
+        sketch.trips = HyperLogLog.from_dict(data["trips"])
+        sketch.routes = TopK.from_dict(data["routes"])
+        sketch.services = TopK.from_dict(data["services"])
+        sketch.users = TopK.from_dict(data["users"])
+        return sketch
+
+
+def _booking_rows_sql(where: str) -> str:
+    return f"""
+        SELECT b.booking_id, b.booking_date, b.user_id, b.trip_id, t.route_id, r.service_id
+        FROM bookings b
+        JOIN trips t ON b.trip_id = t.trip_id
+        JOIN routes r ON t.route_id = r.route_id
+        WHERE {where}
+        ORDER BY b.booking_id
+    """
+
+
+class SketchStore:
+    """Cache of persisted day sketches plus the fold/merge operations"""
+
+    def __init__(self, refresh_seconds: int = REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = Lock()
+        # {day: (loaded_at, DaySketch)}, least recently used first
+        self._days: "OrderedDict[date, Tuple[float, DaySketch]]" = OrderedDict()
+
+    def _cached(self, day: date) -> Optional[DaySketch]:
+        with self._lock:
+            entry = self._days.get(day)
+            if entry is None:
+                return None
+            loaded_at, sketch = entry
+            # Past days rarely change; recent ones are re-read after a pass
+            recent = day >= date.today() - timedelta(days=1)
+            if recent and time.monotonic() - loaded_at >= self.refresh_seconds:
+                return None
+            self._days.move_to_end(day)
+            return sketch
+
+    def _remember(self, day: date, sketch: DaySketch):
+        with self._lock:
+            self._days[day] = (time.monotonic(), sketch)
+            self._days.move_to_end(day)
+            while len(self._days) > CACHE_DAYS:
+                self._days.popitem(last=False)
+
+    def _load(self, cursor, days: Iterable[date]) -> Dict[date, DaySketch]:
+        days = list(days)
+        if not days:
+            return {}
+        cursor.execute(
+            f"""
+            SELECT day, payload FROM booking_sketches
+            WHERE day IN ({", ".join(["%s"] * len(days))})
+            """,
+            days,
+        )
+        return {day: DaySketch.from_payload(payload) for day, payload in cursor.fetchall()}
+
+    # ---------- Reads ----------
+
+    def merged(self, conn, start_day: date, end_day: date) -> Tuple[DaySketch, int]:
+        """Merge of the days in [start_day, end_day]; returns (sketch, days with data)"""
+        days = [start_day + timedelta(days=i) for i in range((end_day - start_day).days + 1)]
+        sketches: Dict[date, DaySketch] = {}
+        missing = []
+        for day in days:
+            cached = self._cached(day)
+            if cached is None:
+                missing.append(day)
+            else:
+                sketches[day] = cached
+        if missing:
+            cursor = conn.cursor()
+            try:
+                loaded = self._load(cursor, missing)
+            finally:
+                cursor.close()
+            for day in missing:
+                # Days without bookings are cached as empty sketches too
+                sketch = loaded.get(day) or DaySketch()
+                self._remember(day, sketch)
+                sketches[day] = sketch
+
+        result = DaySketch()
+        with_data = 0
+        for sketch in sketches.values():
+            if sketch.bookings:
+                result.merge(sketch)
+                with_data += 1
+        return result, with_data
+
+    def summary(self, conn, start_day: date, end_day: date, top: int = 5) -> Dict[str, Any]:
+        """Approximate analytics for a day range, from the sketches only"""
+        merged, days_with_bookings = self.merged(conn, start_day, end_day)
+        return {
+            "start_date": start_day.isoformat(),
+            "end_date": end_day.isoformat(),
+            "days_with_bookings": days_with_bookings,
+            "total_bookings": merged.bookings,
+            "unique_passengers": merged.passengers.count() if merged.bookings else 0,
+            "trips_booked": merged.trips.count() if merged.bookings else 0,
+            "top_routes": _ranked(merged.routes, "route_id", top),
+            "top_services": _ranked(merged.services, "service_id", top),
+            "top_users": _ranked(merged.users, "user_id", top),
+            "approximate": True,
+        }
+
+    # ---------- Maintenance ----------
+
+    def fold_new_bookings(self, conn) -> int:
+        """
+        One builder pass on `conn` (committed here): add bookings past the
+        watermark and older than FOLD_LAG_SECONDS to their days and persist
+        those days. Returns the number of bookings folded; BATCH_ROWS means
+        more are waiting.
+        """
+        cursor = conn.cursor()
+        try:
+            conn.commit()  # Start a fresh transaction for the lock below
+            cursor.execute(
+                "SELECT last_id FROM booking_sketch_watermark WHERE id = 1 FOR UPDATE"
+            )
+            last_id = cursor.fetchone()[0]
+            # Lagging behind NOW() leaves time for transactions that took an
+            # id earlier to commit before the watermark passes it
+            cursor.execute(
+                _booking_rows_sql("b.booking_id > %s AND b.booking_date < %s") + " LIMIT %s",
+                (last_id, datetime.now() - timedelta(seconds=FOLD_LAG_SECONDS), BATCH_ROWS),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                conn.commit()
+                return 0
+
+            by_day: Dict[date, List[tuple]] = {}
+            for booking_id, booking_date, user_id, trip_id, route_id, service_id in rows:
+                day = (booking_date or datetime.now()).date()
+                by_day.setdefault(day, []).append((user_id, trip_id, route_id, service_id))
+                last_id = booking_id
+
+            # Start from the stored sketch, not the cache: another process may
+            # have folded into the same day since this one read it
+            sketches = self._load(cursor, by_day)
+            for day, bookings in by_day.items():
+                sketch = sketches.setdefault(day, DaySketch())
+                for booking in bookings:
+                    sketch.add(*booking)
+
+            cursor.executemany(
+                """
+                INSERT INTO booking_sketches (day, bookings, payload)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE bookings = VALUES(bookings), payload = VALUES(payload)
+                """,
+                [(day, s.bookings, s.to_payload()) for day, s in sketches.items()],
+            )
+            cursor.execute(
+                "UPDATE booking_sketch_watermark SET last_id = %s WHERE id = 1",
+                (last_id,),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        for day, sketch in sketches.items():
+            self._remember(day, sketch)
+        return len(rows)
+
+    def rebuild_day(self, conn, day: date):
+        """
+        Recompute one day's sketch from bookings (after deletes / data fixes,
+        and for ids committed after the watermark passed them). Holds the
+        watermark lock and stops at it, so the next fold adds the rest once.
+        """
+        cursor = conn.cursor()
+        try:
+            conn.commit()  # Start a fresh transaction for the lock below
+            cursor.execute(
+                "SELECT last_id FROM booking_sketch_watermark WHERE id = 1 FOR UPDATE"
+            )
+            last_id = cursor.fetchone()[0]
+            cursor.execute(
+                _booking_rows_sql(
+                    "b.booking_date >= %s AND b.booking_date < %s AND b.booking_id <= %s"
+                ),
+                (day, day + timedelta(days=1), last_id),
+            )
+            sketch = DaySketch()
+            for _, _, user_id, trip_id, route_id, service_id in cursor.fetchall():
+                sketch.add(user_id, trip_id, route_id, service_id)
+            cursor.execute(
+                """
+                INSERT INTO booking_sketches (day, bookings, payload)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE bookings = VALUES(bookings), payload = VALUES(payload)
+                """,
+                (day, sketch.bookings, sketch.to_payload()),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        self._remember(day, sketch)
+
+
+def sketches_available(conn) -> bool:
+    """True once database/migrations/booking_sketches.sql has been applied"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) FROM booking_sketch_watermark")
+        return cursor.fetchone()[0] > 0
+    except Exception:
+        return False
+    finally:
+        cursor.close()
+
+
+def _ranked(top_k: TopK, key: str, n: int) -> List[Dict[str, int]]:
+    return [{key: int(item), "bookings": count} for item, count in top_k.top(n)]
+
+
+class SketchBuilder:
+    """
+    Background thread running fold_new_bookings() every interval and
+    rebuilding today and yesterday every `reconcile_seconds`
+    """
+
+    def __init__(
+        self,
+        store: SketchStore,
+        interval_seconds: int = REFRESH_SECONDS,
+        reconcile_seconds: int = RECONCILE_SECONDS,
+    ):
+        self.store = store
+        self.interval_seconds = interval_seconds
+        self.reconcile_seconds = reconcile_seconds
+        self._wake = Event()
+        self._thread: Optional[Thread] = None
+        self._reconciled_at = time.monotonic()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        from app import app, mysql
+
+        while True:
+            backlog = False
+            with app.app_context():
+                try:
+                    conn = mysql.connection
+                    folded = 0
+                    if sketches_available(conn):
+                        folded = self.store.fold_new_bookings(conn)
+                        if time.monotonic() - self._reconciled_at >= self.reconcile_seconds:
+                            self._reconcile(conn)
+                    backlog = folded >= BATCH_ROWS
+                    if folded:
+                        logger.info("Booking sketches updated", extra={"bookings": folded})
+                except Exception:
+                    logger.exception("Booking sketch update failed")
+            if not backlog:
+                self._wake.wait(self.interval_seconds)
+                self._wake.clear()
+
+    def _reconcile(self, conn):
+        """Rebuild the days late-committing bookings can still land in"""
+        today = date.today()
+        for day in (today - timedelta(days=1), today):
+            self.store.rebuild_day(conn, day)
+        self._reconciled_at = time.monotonic()
+        logger.info("Booking sketches reconciled", extra={"days": 2})
+
+
+# Global store and builder, started from app.py
+sketch_store = SketchStore()
+sketch_builder = SketchBuilder(sketch_store)
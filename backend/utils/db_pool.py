@@ -0,0 +1,128 @@
+"""
+Small pool of MySQLdb connections for work that runs outside a request.
+
+Flask-MySQLdb opens one connection per app context, which is fine for the
+request thread but means a helper thread would connect (and disconnect) on
+every use. `ConnectionPool` keeps up to `size` autocommit connections, set to
+the same session time zone as app.py, and hands them out with
+`with db_pool.connection() as conn:`. Connections are pinged on checkout and
+replaced if the server has dropped them.
+"""
+
+import os
+import queue
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Optional
+
+import MySQLdb
+
+from utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+SESSION_TIME_ZONE = "+05:00"  # Matches app.set_mysql_timezone
+
+
+class ConnectionPool:
+    """Bounded pool of autocommit MySQLdb connections"""
+
+    def __init__(self, size: int = 8, timeout_seconds: float = 10):
+        self.size = size
+        self.timeout_seconds = timeout_seconds
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._lock = Lock()
+        self._opened = 0
+        self._connect_args: Optional[Dict[str, Any]] = None
+
+    def init_app(self, app):
+        """Take the connection settings from the Flask-MySQLdb config"""
+        self._connect_args = {
+            "host": app.config.get("MYSQL_HOST") or "localhost",
+            "user": app.config.get("MYSQL_USER"),
+            "passwd": app.config.get("MYSQL_PASSWORD") or "",
+            "db": app.config.get("MYSQL_DB"),
+            "port": app.config.get("MYSQL_PORT", 3306),
+        }
+
+    @property
+    def configured(self) -> bool:
+        return self._connect_args is not None
+
+    def _open(self):
+        conn = MySQLdb.connect(**self._connect_args)
+        conn.autocommit(True)  # Reads see the latest commits, no idle snapshots
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SET time_zone = %s", (SESSION_TIME_ZONE,))
+        finally:
+            cursor.close()
+        return conn
+
+    def connect(self):
+        """
+        New connection with the pool's settings that is not part of the pool,
+        for long-lived work (streaming exports) that should not hold a slot.
+        The caller closes it.
+        """
+        if not self.configured:
+            raise RuntimeError("Connection pool used before db_pool.init_app(app)")
+        return self._open()
+
+    def _checkout(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    return self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            try:
+                conn = self._idle.get(timeout=self.timeout_seconds)
+            except queue.Empty:
+                raise RuntimeError("Timed out waiting for a pooled database connection")
+        try:
+            conn.ping()
+            return conn
+        except MySQLdb.Error:
+            self._discard(conn)
+            return self._checkout()
+
+    def _discard(self, conn):
+        with self._lock:
+            self._opened -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it goes back to the pool unless it failed"""
+        if not self.configured:
+            raise RuntimeError("Connection pool used before db_pool.init_app(app)")
+        conn = self._checkout()
+        try:
+            yield conn
+        except MySQLdb.OperationalError:
+            self._discard(conn)
+            raise
+        except Exception:
+            self._idle.put(conn)
+            raise
+        else:
+            self._idle.put(conn)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": self.size, "open": self._opened, "idle": self._idle.qsize()}
+
+
+# Global pool, configured from app.py
+db_pool = ConnectionPool(int(os.getenv("DB_POOL_SIZE", "8")))
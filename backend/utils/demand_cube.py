@@ -0,0 +1,286 @@
+"""
+In-memory booking demand cube: day x route x hour-of-day x (bookings, confirmed).
+
+A NumPy int32 array covering the last `DEMAND_CUBE_HISTORY_DAYS` days lets the
+admin heatmap slice demand by any combination of date range, routes, weekdays
+and hours (and group by route / weekday / hour) without a query. Weekday is
+derived from the day axis, so one cube answers both calendar and weekday
+views. About 14 MB for a year of 200 routes.
+
+`CubeRefresher` keeps it current:
+
+- full load at start and every `DEMAND_CUBE_RELOAD_SECONDS` (picks up status
+  changes on old bookings and slides the history window)
+- every `DEMAND_CUBE_REFRESH_SECONDS`, only yesterday and today are re-read and
+  their day slices replaced
+
+Both read `rollup_booking_hourly` when the rollups are available (one row per
+hour x route x status) and fall back to grouping bookings otherwise.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from utils.logging_utils import get_logger
+from utils.report_rollups import rollups_available
+
+logger = get_logger(__name__)
+
+HISTORY_DAYS = int(os.getenv("DEMAND_CUBE_HISTORY_DAYS", "365"))
+REFRESH_SECONDS = int(os.getenv("DEMAND_CUBE_REFRESH_SECONDS", "60"))
+RELOAD_SECONDS = int(os.getenv("DEMAND_CUBE_RELOAD_SECONDS", "3600"))
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DIMENSIONS = ("route", "weekday", "hour")
+MEASURES = ("bookings", "confirmed")
+
+_ROLLUP_SQL = """
+    SELECT DATE(bucket_hour), HOUR(bucket_hour), route_id,
+           CAST(SUM(bookings) AS SIGNED),
+           CAST(SUM(CASE WHEN status = 'confirmed' THEN bookings ELSE 0 END) AS SIGNED)
+    FROM rollup_booking_hourly
+    WHERE bucket_hour >= %s
+    GROUP BY DATE(bucket_hour), HOUR(bucket_hour), route_id
+"""
+
+_BOOKINGS_SQL = """
+    SELECT b.booking_day, HOUR(b.booking_date), t.route_id,
+           COUNT(*),
+           SUM(CASE WHEN b.status = 'confirmed' THEN 1 ELSE 0 END)
+    FROM bookings b
+    JOIN trips t ON b.trip_id = t.trip_id
+    WHERE b.booking_date >= %s
+    GROUP BY b.booking_day, HOUR(b.booking_date), t.route_id
+"""
+
+
+class DemandCube:
+    def __init__(self):
+        self._lock = Lock()
+        self.start_day: Optional[date] = None
+        self.cells = np.zeros((0, 0, 24, len(MEASURES)), dtype=np.int32)
+        self.route_ids: List[int] = []
+        self._route_index: Dict[int, int] = {}
+        self.route_names: Dict[int, str] = {}
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    # ---------- Maintenance ----------
+
+    def _fill(self, cells, start_day: date, route_index: Dict[int, int], rows):
+        for day, hour, route_id, bookings, confirmed in rows:
+            d = (day - start_day).days
+            if 0 <= d < cells.shape[0]:
+                cells[d, route_index[route_id], hour] += (bookings, confirmed or 0)
+
+    def load(self, rows: Iterable[tuple], route_names: Dict[int, str], start_day: date, end_day: date):
+        """Replace the whole cube with `rows` (day, hour, route_id, bookings, confirmed)"""
+        rows = list(rows)
+        route_ids = sorted(set(route_names) | {row[2] for row in rows})
+        route_index = {route_id: i for i, route_id in enumerate(route_ids)}
+        cells = np.zeros(
+            ((end_day - start_day).days + 1, len(route_ids), 24, len(MEASURES)), dtype=np.int32
+        )
+        self._fill(cells, start_day, route_index, rows)
+        with self._lock:
+            self.start_day = start_day
+            self.cells = cells
+            self.route_ids = route_ids
+            self._route_index = route_index
+            self.route_names = dict(route_names)
+            self.loaded_at = datetime.now()
+
+    def replace_days(self, rows: Iterable[tuple], from_day: date, end_day: date):
+        """Recompute the days from `from_day` to `end_day` from `rows`, growing the cube as needed"""
+        rows = list(rows)
+        with self._lock:
+            cells = self.cells
+            new_routes = sorted({row[2] for row in rows} - set(self._route_index))
+            if new_routes:
+                cells = np.pad(cells, ((0, 0), (0, len(new_routes)), (0, 0), (0, 0)))
+                for route_id in new_routes:
+                    self._route_index[route_id] = len(self.route_ids)
+                    self.route_ids.append(route_id)
+            extra_days = (end_day - self.start_day).days + 1 - cells.shape[0]
+            if extra_days > 0:
+                cells = np.pad(cells, ((0, extra_days), (0, 0), (0, 0), (0, 0)))
+            else:
+                cells = cells.copy()  # Readers may hold the old array
+            cells[max((from_day - self.start_day).days, 0):] = 0
+            self._fill(cells, self.start_day, self._route_index, rows)
+            self.cells = cells
+            self.loaded_at = datetime.now()
+
+    # ---------- Reads ----------
+
+    def query(
+        self,
+        start_day: Optional[date] = None,
+        end_day: Optional[date] = None,
+        route_ids: Optional[Sequence[int]] = None,
+        weekdays: Optional[Sequence[int]] = None,
+        hours: Optional[Sequence[int]] = None,
+        group_by: Sequence[str] = ("weekday", "hour"),
+        average: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Sum (or per-day average) of bookings / confirmed over the selected
+        cells, as nested lists over `group_by` in DIMENSIONS order. Weekdays
+        are 0 = Monday .. 6 = Sunday. Unknown routes and days outside the
+        cube contribute nothing.
+        """
+        with self._lock:
+            cube_start, cells = self.start_day, self.cells
+            route_ids_all, route_index = list(self.route_ids), dict(self._route_index)
+            route_names, loaded_at = self.route_names, self.loaded_at
+
+        dims = [dim for dim in DIMENSIONS if dim in group_by]
+        weekdays = sorted(set(weekdays)) if weekdays is not None else list(range(7))
+        hours = sorted(set(hours)) if hours is not None else list(range(24))
+        routes = route_ids_all if route_ids is None else [r for r in route_ids if r in route_index]
+
+        cube_end = cube_start + timedelta(days=cells.shape[0] - 1)
+        first = max(start_day or cube_start, cube_start)
+        last = min(end_day or cube_end, cube_end)
+        n_days = max((last - first).days + 1, 0)
+        day_offset = (first - cube_start).days
+        day_weekdays = (first.weekday() + np.arange(n_days)) % 7
+        day_mask = np.isin(day_weekdays, weekdays)
+
+        sub = cells[day_offset : day_offset + n_days][day_mask]
+        sub = sub[:, [route_index[r] for r in routes]][:, :, hours].astype(np.int64)
+        # sub: (days, routes, hours, measures)
+
+        if "weekday" in dims:
+            by_weekday = np.zeros((7,) + sub.shape[1:], dtype=np.int64)
+            np.add.at(by_weekday, day_weekdays[day_mask], sub)
+            grouped = by_weekday[weekdays]  # (weekdays, routes, hours, measures)
+            divisor = np.bincount(day_weekdays[day_mask], minlength=7)[weekdays]
+        else:
+            grouped = sub.sum(axis=0, keepdims=True)
+            divisor = np.array([int(day_mask.sum())])
+        days_counted = int(day_mask.sum())
+
+        if average:
+            grouped = grouped / np.maximum(divisor, 1)[:, None, None, None]
+        # Axis order to DIMENSIONS (route, weekday, hour) then drop ungrouped ones
+        grouped = grouped.transpose(1, 0, 2, 3)
+        for axis, dim in reversed(list(enumerate(DIMENSIONS))):
+            if dim not in dims:
+                grouped = grouped.sum(axis=axis)
+
+        result: Dict[str, Any] = {
+            "start_date": first.isoformat() if n_days else None,
+            "end_date": last.isoformat() if n_days else None,
+            "days": days_counted,
+            "group_by": dims,
+            "average": average,
+            "as_of": loaded_at.isoformat() if loaded_at else None,
+        }
+        if "route" in dims:
+            result["routes"] = [
+                {"route_id": r, "route_name": route_names.get(r)} for r in routes
+            ]
+        if "weekday" in dims:
+            result["weekdays"] = [WEEKDAYS[w] for w in weekdays]
+        if "hour" in dims:
+            result["hours"] = hours
+        for i, measure in enumerate(MEASURES):
+            values = grouped[..., i]
+            result[measure] = (np.round(values, 2) if average else values).tolist()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "start_date": self.start_day.isoformat() if self.start_day else None,
+                "days": int(self.cells.shape[0]),
+                "routes": len(self.route_ids),
+                "bytes": int(self.cells.nbytes),
+                "as_of": self.loaded_at.isoformat() if self.loaded_at else None,
+            }
+
+
+def _read_rows(mysql, since: date) -> List[tuple]:
+    cursor = mysql.connection.cursor()
+    try:
+        sql = _ROLLUP_SQL if rollups_available(mysql) else _BOOKINGS_SQL
+        cursor.execute(sql, (since,))
+        return [
+            (day, int(hour), int(route_id), int(bookings), int(confirmed or 0))
+            for day, hour, route_id, bookings, confirmed in cursor.fetchall()
+        ]
+    finally:
+        cursor.close()
+
+
+def _route_names(mysql) -> Dict[int, str]:
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute("SELECT route_id, route_name FROM routes")
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def reload_cube(cube: DemandCube, mysql, history_days: int = HISTORY_DAYS):
+    today = date.today()
+    start_day = today - timedelta(days=history_days - 1)
+    cube.load(_read_rows(mysql, start_day), _route_names(mysql), start_day, today)
+
+
+def refresh_recent(cube: DemandCube, mysql):
+    """Re-read yesterday and today (late compaction lands on the previous day too)"""
+    today = date.today()
+    since = today - timedelta(days=1)
+    cube.replace_days(_read_rows(mysql, since), since, today)
+
+
+class CubeRefresher:
+    """Background thread: full reload every RELOAD_SECONDS, recent days every REFRESH_SECONDS"""
+
+    def __init__(self, cube: DemandCube):
+        self.cube = cube
+        self._wake = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        from app import app, mysql
+
+        last_reload: Optional[datetime] = None
+        while True:
+            with app.app_context():
+                try:
+                    now = datetime.now()
+                    if (
+                        last_reload is None
+                        or (now - last_reload).total_seconds() >= RELOAD_SECONDS
+                        or now.date() != last_reload.date()
+                    ):
+                        reload_cube(self.cube, mysql)
+                        last_reload = now
+                        logger.info("Demand cube loaded", extra=self.cube.stats())
+                    else:
+                        refresh_recent(self.cube, mysql)
+                except Exception:
+                    logger.exception("Demand cube refresh failed")
+            self._wake.wait(REFRESH_SECONDS)
+            self._wake.clear()
+
+
+# Global cube and refresher, started from app.py
+demand_cube = DemandCube()
+cube_refresher = CubeRefresher(demand_cube)
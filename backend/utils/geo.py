@@ -0,0 +1,14 @@
+from math import radians, sin, cos, sqrt, atan2
+
+
+# Haversine distance calculator (in kilometers)
+def calculate_distance(lat1, lon1, lat2, lon2):
+    radius_earth = 6371  # Earth radius in km
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = (
+        sin(dlat / 2) ** 2
+        + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    )
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+    return radius_earth * c
@@ -0,0 +1,151 @@
+"""
+Idempotency-Key support for non-idempotent POST endpoints (bookings).
+
+The first response for a (user, endpoint, key) is stored in an in-memory
+LRU with a TTL and replayed for retries, so a client retry after a timeout
+costs one dictionary lookup instead of another booking transaction.
+
+- A retry that arrives while the first request is still running gets 409.
+- Reusing a key with a different request body gets 422.
+- 5xx responses and exceptions are not stored, so the client may retry.
+- Requests without a logged-in user are passed through unchanged.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from typing import Optional, Tuple
+
+from flask import jsonify, make_response, request, session
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+_IN_FLIGHT = object()
+
+
+class IdempotencyStore:
+    """Thread-safe LRU of stored responses with a TTL"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: int = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock = Lock()
+
+    def begin(self, scope: tuple, body_hash: str) -> Tuple[str, Optional[dict]]:
+        """
+        Claim `scope` for a new request.
+        Returns ("new", None), ("replay", entry), ("in_flight", None) or ("mismatch", None).
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is not None and entry["expires_at"] <= now:
+                del self._entries[scope]
+                entry = None
+            if entry is None:
+                self._entries[scope] = {
+                    "body_hash": body_hash,
+                    "response": _IN_FLIGHT,
+                    "expires_at": now + self.ttl_seconds,
+                }
+                self._evict()
+                return "new", None
+            self._entries.move_to_end(scope)
+            if entry["body_hash"] != body_hash:
+                return "mismatch", None
+            if entry["response"] is _IN_FLIGHT:
+                return "in_flight", None
+            return "replay", entry
+
+    def complete(self, scope: tuple, status: int, body: bytes, mimetype: str):
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is not None:
+                entry["response"] = (status, body, mimetype)
+
+    def release(self, scope: tuple):
+        """Forget an in-flight key (request failed) so it can be retried"""
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is not None and entry["response"] is _IN_FLIGHT:
+                del self._entries[scope]
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Global store shared by all idempotent endpoints
+idempotency_store = IdempotencyStore()
+
+
+def idempotent(f):
+    """Replay the stored response for requests carrying a known Idempotency-Key"""
+
+    @wraps(f)
+    def wrapped(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        user_id = session.get("user_id")
+        # Keys are only namespaced per user; anonymous callers would share one
+        if not key or user_id is None:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters",
+                    }
+                ),
+                400,
+            )
+
+        scope = (user_id, request.path, key)
+        body_hash = hashlib.sha256(request.get_data()).hexdigest()
+        state, entry = idempotency_store.begin(scope, body_hash)
+
+        if state == "replay":
+            status, body, mimetype = entry["response"]
+            response = make_response(body, status)
+            response.mimetype = mimetype
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+        if state == "in_flight":
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "A request with this Idempotency-Key is still being processed",
+                    }
+                ),
+                409,
+            )
+        if state == "mismatch":
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "Idempotency-Key was already used with a different request body",
+                    }
+                ),
+                422,
+            )
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            idempotency_store.release(scope)
+            raise
+        if response.status_code >= 500:
+            idempotency_store.release(scope)
+        else:
+            idempotency_store.complete(
+                scope, response.status_code, response.get_data(), response.mimetype
+            )
+        return response
+
+    return wrapped
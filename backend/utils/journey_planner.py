@@ -0,0 +1,415 @@
+"""
+Multi-route journey planner (Connection Scan Algorithm) over scheduled trips.
+
+The timetable is a flat list of connections: one per trip per pair of
+consecutive stops, sorted by departure time. Stop times are interpolated
+along the route by distance between the trip's departure_time and
+arrival_time (or `JOURNEY_BUS_SPEED_KMH` when the trip has no arrival time
+yet). A query scans the connections once from `depart_after` and stops at the
+first departure later than the best arrival found (at most
+`JOURNEY_MAX_HOURS` after `depart_after`), so the cost is bounded by the
+connections in that time window rather than by the size of the network.
+Stops in different parts of the network are rejected before scanning.
+
+Transfers:
+- the same stop on another route (stop_ids are shared between routes), with
+  `JOURNEY_MIN_TRANSFER_SECONDS` to change buses
+- walking to any stop within `JOURNEY_TRANSFER_METERS` at
+  `JOURNEY_WALK_SPEED_MPS` (found with the stop grid of
+  utils/spatial_index.py), so BRT and Peoples Bus stops a short walk apart
+  connect
+
+`TimetableRefresher` rebuilds the timetable from the route topology and the
+scheduled / running trips of the next `JOURNEY_HORIZON_HOURS` every
+`JOURNEY_REFRESH_SECONDS`, and right away after admin route / stop / trip
+writes. Seats are not checked here: the booking of each leg does that.
+"""
+
+import math
+import os
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.geo import calculate_distance
+from utils.logging_utils import get_logger
+from utils.spatial_index import StopGrid
+
+logger = get_logger(__name__)
+
+HORIZON_HOURS = int(os.getenv("JOURNEY_HORIZON_HOURS", "24"))
+REFRESH_SECONDS = int(os.getenv("JOURNEY_REFRESH_SECONDS", "60"))
+TRANSFER_METERS = float(os.getenv("JOURNEY_TRANSFER_METERS", "400"))
+WALK_SPEED_MPS = float(os.getenv("JOURNEY_WALK_SPEED_MPS", "1.2"))
+MIN_TRANSFER_SECONDS = int(os.getenv("JOURNEY_MIN_TRANSFER_SECONDS", "120"))
+BUS_SPEED_KMH = float(os.getenv("JOURNEY_BUS_SPEED_KMH", "20"))
+MAX_JOURNEY_HOURS = float(os.getenv("JOURNEY_MAX_HOURS", "4"))
+
+# Running trips started up to this long ago are still in the timetable
+LOOKBACK_HOURS = 6
+MAX_JOURNEYS = 5
+_INF = float("inf")
+
+
+class Timetable:
+    """Connections sorted by departure, plus the stop and trip lookups of a snapshot"""
+
+    def __init__(
+        self,
+        routes: Dict[int, Dict],
+        trips: Iterable[tuple],
+        bus_speed_kmh: float = BUS_SPEED_KMH,
+        transfer_meters: float = TRANSFER_METERS,
+        walk_speed_mps: float = WALK_SPEED_MPS,
+    ):
+        """
+        `routes` is {route_id: {"route_name", "service_id", "stops": [{stop_id,
+        stop_name, stop_order, latitude, longitude}, ...] in stop order}} (the
+        route topology); `trips` are (trip_id, route_id, direction,
+        departure_time, arrival_time) rows.
+        """
+        self.base = datetime.now().replace(microsecond=0)
+        self.routes = routes
+        self.stop_names: Dict[int, str] = {}
+        coords: Dict[int, Tuple[float, float]] = {}
+        for route in routes.values():
+            for stop in route["stops"]:
+                self.stop_names[stop["stop_id"]] = stop["stop_name"]
+                coords[stop["stop_id"]] = (stop["latitude"], stop["longitude"])
+
+        # Dense stop indices keep the per-query arrays as plain lists
+        self.stop_ids = sorted(coords)
+        self.stop_index = {stop_id: i for i, stop_id in enumerate(self.stop_ids)}
+        # Walking transfers: every other stop within transfer_meters
+        paths = StopGrid(coords, cell_meters=transfer_meters).neighbours(transfer_meters)
+        self.footpaths: List[List[Tuple[int, int]]] = [
+            [
+                (self.stop_index[other], max(int(meters / walk_speed_mps), 1))
+                for other, meters in paths[stop_id]
+            ]
+            for stop_id in self.stop_ids
+        ]
+
+        # Per (route, direction): stops in travel order and the share of the
+        # route length covered at each of them
+        shapes: Dict[Tuple[int, str], Tuple[List[int], List[float], float]] = {}
+        for route_id, route in routes.items():
+            forward = route["stops"]
+            for direction, stops in (("forward", forward), ("backward", forward[::-1])):
+                km = [0.0]
+                for a, b in zip(stops, stops[1:]):
+                    km.append(km[-1] + calculate_distance(
+                        a["latitude"], a["longitude"], b["latitude"], b["longitude"]
+                    ))
+                total = km[-1]
+                n = len(stops)
+                shares = [d / total if total else i / max(n - 1, 1) for i, d in enumerate(km)]
+                shapes[(route_id, direction)] = (
+                    [self.stop_index[s["stop_id"]] for s in stops], shares, total
+                )
+
+        # Stops linked by a route or a walk share a component; queries between
+        # components return at once instead of scanning the whole horizon
+        self.component = list(range(len(self.stop_ids)))
+        for stops, _, _ in shapes.values():
+            for a, b in zip(stops, stops[1:]):
+                self._union(a, b)
+        for a, paths_from in enumerate(self.footpaths):
+            for b, _ in paths_from:
+                self._union(a, b)
+        self.component = [self._find(i) for i in range(len(self.component))]
+
+        self.trips: List[Tuple[int, int, str]] = []
+        connections = []
+        for trip_id, route_id, direction, departure, arrival in trips:
+            shape = shapes.get((route_id, direction))
+            if shape is None or len(shape[0]) < 2:
+                continue
+            stops, shares, total_km = shape
+            start = (departure - self.base).total_seconds()
+            if arrival is not None and arrival > departure:
+                duration = (arrival - departure).total_seconds()
+            else:
+                duration = total_km / bus_speed_kmh * 3600
+            times = [int(start + share * duration) for share in shares]
+            trip = len(self.trips)
+            self.trips.append((trip_id, route_id, direction))
+            for k in range(len(stops) - 1):
+                connections.append((times[k], times[k + 1], stops[k], stops[k + 1], trip, k))
+        connections.sort()
+
+        self.dep_time = [c[0] for c in connections]
+        self.arr_time = [c[1] for c in connections]
+        self.dep_stop = [c[2] for c in connections]
+        self.arr_stop = [c[3] for c in connections]
+        self.trip = [c[4] for c in connections]
+        self.hop = [c[5] for c in connections]  # Position of the connection along its trip
+
+    def _find(self, i: int) -> int:
+        while self.component[i] != i:
+            self.component[i] = self.component[self.component[i]]
+            i = self.component[i]
+        return i
+
+    def _union(self, a: int, b: int):
+        self.component[self._find(a)] = self._find(b)
+
+    def seconds(self, moment: datetime) -> int:
+        return int((moment - self.base).total_seconds())
+
+    def moment(self, seconds: float) -> datetime:
+        return self.base + timedelta(seconds=seconds)
+
+
+class JourneyPlanner:
+    def __init__(
+        self,
+        min_transfer_seconds: int = MIN_TRANSFER_SECONDS,
+        max_journey_hours: float = MAX_JOURNEY_HOURS,
+    ):
+        self.min_transfer_seconds = min_transfer_seconds
+        self.max_journey_seconds = int(max_journey_hours * 3600)
+        self._lock = Lock()
+        self.timetable: Optional[Timetable] = None
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.timetable is not None
+
+    def load(self, timetable: Timetable):
+        with self._lock:
+            self.timetable = timetable
+            self.loaded_at = datetime.now()
+
+    def has_stop(self, stop_id: int) -> bool:
+        timetable = self.timetable
+        return timetable is not None and stop_id in timetable.stop_index
+
+    # ---------- Search ----------
+
+    def plan(
+        self, from_stop_id: int, to_stop_id: int, depart_after: datetime, count: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Up to `count` earliest-arrival journeys, each leaving after the
+        previous one's first bus. Unknown stops and unreachable targets give [].
+        """
+        with self._lock:
+            timetable = self.timetable
+        if timetable is None:
+            return []
+        origin = timetable.stop_index.get(from_stop_id)
+        target = timetable.stop_index.get(to_stop_id)
+        if (
+            origin is None
+            or target is None
+            or origin == target
+            or timetable.component[origin] != timetable.component[target]
+        ):
+            return []
+
+        journeys = []
+        start = timetable.seconds(depart_after)
+        for _ in range(min(max(count, 1), MAX_JOURNEYS)):
+            legs = self._scan(timetable, origin, target, start)
+            if legs is None:
+                break
+            rides = [leg for leg in legs if leg[0] == "ride"]
+            journeys.append(self._describe(timetable, legs))
+            if not rides:
+                break  # Walking only: later departures give the same answer
+            # Next journey must leave after this one's first bus
+            start = timetable.dep_time[rides[0][1]] + 1
+        return journeys
+
+    def _scan(self, timetable: Timetable, origin: int, target: int, start: int):
+        dep_time, arr_time = timetable.dep_time, timetable.arr_time
+        dep_stop, arr_stop, trips = timetable.dep_stop, timetable.arr_stop, timetable.trip
+        footpaths = timetable.footpaths
+        change = self.min_transfer_seconds
+
+        # ready[s]: earliest time a bus can be boarded at s
+        # reached_by[s]: (boarding connection, alighting connection, walk seconds
+        # after alighting); boarding -1 = walked from the origin
+        ready = [_INF] * len(timetable.stop_ids)
+        reached_by: List[Optional[Tuple[int, int, int]]] = [None] * len(ready)
+        boarded = [-1] * len(timetable.trips)
+        ready[origin] = start
+        # Journeys longer than max_journey_seconds are not worth finding
+        best, best_by = start + self.max_journey_seconds, None
+        for stop, walk in footpaths[origin]:
+            if start + walk < ready[stop]:
+                ready[stop] = start + walk
+                reached_by[stop] = (-1, origin, walk)
+            if stop == target and start + walk < best:
+                best, best_by = start + walk, (-1, origin, walk)
+
+        for i in range(bisect_left(dep_time, start), len(dep_time)):
+            if dep_time[i] >= best:
+                break
+            trip = trips[i]
+            board = boarded[trip]
+            if board < 0:
+                if ready[dep_stop[i]] > dep_time[i]:
+                    continue
+                board = boarded[trip] = i
+            arrival, stop = arr_time[i], arr_stop[i]
+            if stop == target and arrival < best:
+                best, best_by = arrival, (board, i, 0)
+            if arrival + change < ready[stop]:
+                ready[stop] = arrival + change
+                reached_by[stop] = (board, i, 0)
+            for other, walk in footpaths[stop]:
+                if arrival + walk < ready[other]:
+                    ready[other] = arrival + walk
+                    reached_by[other] = (board, i, walk)
+                if other == target and arrival + walk < best:
+                    best, best_by = arrival + walk, (board, i, walk)
+
+        if best_by is None:
+            return None
+
+        # Walk back from the target to the origin
+        legs = []
+        step, stop = best_by, target
+        for _ in range(len(ready) + 1):
+            board, alight, walk = step
+            if board < 0:
+                legs.append(("walk", origin, stop, walk, start))
+                break
+            if walk:
+                legs.append(("walk", arr_stop[alight], stop, walk, arr_time[alight]))
+            legs.append(("ride", board, alight))
+            stop = dep_stop[board]
+            if stop == origin:
+                break
+            step = reached_by[stop]
+        legs.reverse()
+        return legs
+
+    def _describe(self, timetable: Timetable, legs: List[tuple]) -> Dict[str, Any]:
+        described = []
+        for leg in legs:
+            if leg[0] == "walk":
+                _, from_idx, to_idx, seconds, at = leg
+                described.append(
+                    {
+                        "type": "walk",
+                        "from_stop_id": timetable.stop_ids[from_idx],
+                        "from_stop_name": timetable.stop_names[timetable.stop_ids[from_idx]],
+                        "to_stop_id": timetable.stop_ids[to_idx],
+                        "to_stop_name": timetable.stop_names[timetable.stop_ids[to_idx]],
+                        "departure_time": timetable.moment(at).isoformat(),
+                        "arrival_time": timetable.moment(at + seconds).isoformat(),
+                        "minutes": math.ceil(seconds / 60),
+                    }
+                )
+                continue
+            _, board, alight = leg
+            trip_id, route_id, direction = timetable.trips[timetable.trip[board]]
+            route = timetable.routes[route_id]
+            from_id = timetable.stop_ids[timetable.dep_stop[board]]
+            to_id = timetable.stop_ids[timetable.arr_stop[alight]]
+            described.append(
+                {
+                    "type": "ride",
+                    "trip_id": trip_id,
+                    "route_id": route_id,
+                    "route_name": route["route_name"],
+                    "service_id": route["service_id"],
+                    "direction": direction,
+                    "from_stop_id": from_id,
+                    "from_stop_name": timetable.stop_names[from_id],
+                    "to_stop_id": to_id,
+                    "to_stop_name": timetable.stop_names[to_id],
+                    "departure_time": timetable.moment(timetable.dep_time[board]).isoformat(),
+                    "arrival_time": timetable.moment(timetable.arr_time[alight]).isoformat(),
+                    "stops": timetable.hop[alight] - timetable.hop[board] + 1,
+                }
+            )
+        rides = [leg for leg in described if leg["type"] == "ride"]
+        departure = datetime.fromisoformat(described[0]["departure_time"])
+        arrival = datetime.fromisoformat(described[-1]["arrival_time"])
+        return {
+            "departure_time": described[0]["departure_time"],
+            "arrival_time": described[-1]["arrival_time"],
+            "duration_minutes": math.ceil((arrival - departure).total_seconds() / 60),
+            "transfers": max(len(rides) - 1, 0),
+            "legs": described,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            timetable = self.timetable
+            return {
+                "stops": len(timetable.stop_ids) if timetable else 0,
+                "trips": len(timetable.trips) if timetable else 0,
+                "connections": len(timetable.dep_time) if timetable else 0,
+                "as_of": self.loaded_at.isoformat() if self.loaded_at else None,
+            }
+
+
+def reload_timetable(planner: JourneyPlanner, mysql, horizon_hours: int = HORIZON_HOURS):
+    # Imported here: the planner itself only needs plain route dicts
+    from utils.route_topology import route_topology
+
+    route_topology.ensure_loaded(mysql)
+    routes = {
+        route_id: route_topology.get_route(route_id)
+        for route_id in route_topology.route_ids()
+    }
+    now = datetime.now()
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT trip_id, route_id, direction, departure_time, arrival_time
+            FROM trips
+            WHERE status IN ('scheduled', 'running')
+              AND departure_time >= %s AND departure_time < %s
+            """,
+            (now - timedelta(hours=LOOKBACK_HOURS), now + timedelta(hours=horizon_hours)),
+        )
+        trips = cursor.fetchall()
+    finally:
+        cursor.close()
+    planner.load(Timetable(routes, trips))
+
+
+class TimetableRefresher:
+    """Background thread rebuilding the timetable every REFRESH_SECONDS (or when woken)"""
+
+    def __init__(self, planner: JourneyPlanner):
+        self.planner = planner
+        self._wake = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        """Rebuild now (after route, stop or trip changes)"""
+        self._wake.set()
+
+    def _run(self):
+        from app import app, mysql
+
+        while True:
+            with app.app_context():
+                try:
+                    reload_timetable(self.planner, mysql)
+                    logger.debug("Journey timetable loaded", extra=self.planner.stats())
+                except Exception:
+                    logger.exception("Journey timetable refresh failed")
+            self._wake.wait(REFRESH_SECONDS)
+            self._wake.clear()
+
+
+# Global planner and refresher, started from app.py
+journey_planner = JourneyPlanner()
+timetable_refresher = TimetableRefresher(journey_planner)
@@ -0,0 +1,219 @@
+"""
+Live admin dashboard counters pushed over Socket.IO.
+
+Instead of every open admin tab polling the report endpoints, the server
+keeps today's headline numbers in memory and pushes what changed to the
+`admin_metrics` room every `LIVE_METRICS_INTERVAL_SECONDS`:
+
+- bookings_today / revenue_today: seeded from the database once per day and
+  bumped by the passenger booking endpoints (`record_booking`)
+- running_trips / seats_booked_running / seats_capacity_running /
+  utilization_rate: trips added and removed by the bus tracker
+  (`trip_started` / `trip_ended`), with capacity and confirmed bookings of a
+  newly running trip loaded in one query on the next tick
+
+The pusher thread also re-reads the counters every
+`LIVE_METRICS_RESEED_SECONDS` so changes made elsewhere (admin edits,
+cancellations, other processes) are folded in. Database cost is therefore
+independent of the number of connected admins.
+
+Clients emit `join_admin_metrics` (admins only, see app.py) and receive
+`admin_metrics` events: `{"snapshot": {...}}` on join, then
+`{"delta": {...}, "at": ...}` with only the changed fields.
+"""
+
+import os
+import time
+from datetime import date, datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Any, Dict, Iterable, Optional
+
+from utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+ROOM = "admin_metrics"
+PUSH_INTERVAL_SECONDS = float(os.getenv("LIVE_METRICS_INTERVAL_SECONDS", "5"))
+RESEED_SECONDS = int(os.getenv("LIVE_METRICS_RESEED_SECONDS", "300"))
+
+
+class LiveMetrics:
+    def __init__(
+        self,
+        interval_seconds: float = PUSH_INTERVAL_SECONDS,
+        reseed_seconds: int = RESEED_SECONDS,
+    ):
+        self.interval_seconds = interval_seconds
+        self.reseed_seconds = reseed_seconds
+        self._lock = Lock()
+        self._socketio = None
+        self._thread: Optional[Thread] = None
+        self._stop = Event()
+
+        self._day: Optional[date] = None
+        self._seeded_at: Optional[float] = None
+        self._bookings_today = 0
+        self._revenue_today = 0
+        # {trip_id: [capacity, confirmed bookings]}; None until loaded
+        self._running: Dict[int, Optional[list]] = {}
+        self._last_pushed: Dict[str, Any] = {}
+
+    # ---------- Updates (request threads / bus tracker) ----------
+
+    def record_booking(self, trip_id: int, seats: int = 1, paid_amount: int = 0):
+        """Count a committed booking of `seats` seats and its paid amount"""
+        with self._lock:
+            if self._day != date.today():
+                return  # Not seeded for today yet; the next seed counts it
+            self._bookings_today += seats
+            self._revenue_today += int(paid_amount or 0)
+            running = self._running.get(int(trip_id))
+            if running is not None:
+                running[1] += seats
+
+    def trip_started(self, trip_id: int):
+        with self._lock:
+            self._running.setdefault(trip_id, None)
+
+    def trip_ended(self, trip_id: int):
+        with self._lock:
+            self._running.pop(trip_id, None)
+
+    # ---------- Reads ----------
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded = [v for v in self._running.values() if v is not None]
+            capacity = sum(v[0] for v in loaded)
+            booked = sum(v[1] for v in loaded)
+            return {
+                "day": self._day.isoformat() if self._day else None,
+                "bookings_today": self._bookings_today,
+                "revenue_today": self._revenue_today,
+                "running_trips": len(self._running),
+                "seats_booked_running": booked,
+                "seats_capacity_running": capacity,
+                "utilization_rate": round(booked * 100.0 / capacity, 2) if capacity else 0,
+            }
+
+    # ---------- Pusher thread ----------
+
+    def start(self, socketio):
+        self._socketio = socketio
+        if self._thread is not None:
+            return
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        from utils.db_pool import db_pool
+
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                if db_pool.configured:
+                    with db_pool.connection() as conn:
+                        self.refresh(conn)
+                self.push()
+            except Exception:
+                logger.exception("Live metrics update failed")
+
+    def refresh(self, conn):
+        """Reseed daily counters when due and load newly running trips"""
+        self._sync_running_trips()
+        today = date.today()
+        now = time.monotonic()
+        with self._lock:
+            due = (
+                self._day != today
+                or self._seeded_at is None
+                or now - self._seeded_at >= self.reseed_seconds
+            )
+        if due:
+            self._seed(conn, today)
+        with self._lock:
+            pending = [trip_id for trip_id, v in self._running.items() if v is None]
+        if pending:
+            self._load_trips(conn, pending)
+
+    def _sync_running_trips(self):
+        """Pick up trips the tracker recovered or dropped without a hook"""
+        from bus_tracker import bus_tracker
+
+        with bus_tracker.trips_lock:
+            active = set(bus_tracker.active_trips)
+        with self._lock:
+            for trip_id in active - set(self._running):
+                self._running[trip_id] = None
+            for trip_id in set(self._running) - active:
+                del self._running[trip_id]
+
+    def _seed(self, conn, today: date):
+        start, end = today, today + timedelta(days=1)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT COUNT(*) FROM bookings WHERE booking_date >= %s AND booking_date < %s",
+                (start, end),
+            )
+            bookings = cursor.fetchone()[0] or 0
+            cursor.execute(
+                """
+                SELECT COALESCE(SUM(amount), 0) FROM payments
+                WHERE status = 'paid' AND payment_date >= %s AND payment_date < %s
+                """,
+                (start, end),
+            )
+            revenue = int(cursor.fetchone()[0] or 0)
+        finally:
+            cursor.close()
+        with self._lock:
+            self._day = today
+            self._seeded_at = time.monotonic()
+            self._bookings_today = bookings
+            self._revenue_today = revenue
+            # Booked seats of running trips are re-read as well
+            for trip_id in self._running:
+                self._running[trip_id] = None
+
+    def _load_trips(self, conn, trip_ids: Iterable[int]):
+        trip_ids = list(trip_ids)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"""
+                SELECT t.trip_id, b.capacity,
+                       (SELECT COUNT(*) FROM bookings bk
+                        WHERE bk.trip_id = t.trip_id AND bk.status = 'confirmed') AS booked
+                FROM trips t
+                JOIN buses b ON t.bus_id = b.bus_id
+                WHERE t.trip_id IN ({", ".join(["%s"] * len(trip_ids))})
+                """,
+                trip_ids,
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        with self._lock:
+            for trip_id, capacity, booked in rows:
+                if trip_id in self._running:
+                    self._running[trip_id] = [int(capacity or 0), int(booked or 0)]
+
+    def push(self):
+        """Emit the fields that changed since the last push to the admin room"""
+        if self._socketio is None:
+            return
+        current = self.snapshot()
+        delta = {k: v for k, v in current.items() if self._last_pushed.get(k) != v}
+        if not delta:
+            return
+        self._last_pushed = current
+        self._socketio.emit(
+            "admin_metrics",
+            {"delta": delta, "at": datetime.now().isoformat()},
+            to=ROOM,
+            namespace="/",
+        )
+
+
+# Global instance, started from app.py
+live_metrics = LiveMetrics()
@@ -0,0 +1,139 @@
+"""
+Structured, sampled, non-blocking logging setup for the backend.
+
+- Records are handed to a QueueHandler so request threads never block on
+  stream/file I/O; a single QueueListener thread does the writing.
+- Levels are configurable per module through the environment:
+    LOG_LEVEL=INFO                        # root level
+    LOG_LEVELS=bus_tracker=WARNING,admin=INFO,routes.passenger=DEBUG
+- Hot-path messages can be sampled: `logger.debug(msg, extra=sampled(30))`
+  emits the first record and then one in every 30 for that call site.
+- Output is one `key=value` line per record; `extra` fields are appended.
+"""
+
+import atexit
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+from threading import Lock
+from typing import Dict, Optional
+
+# Attributes present on every LogRecord; anything else came from `extra`
+_RECORD_ATTRS = set(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__.keys()
+) | {"message", "asctime", "sample_every"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = Lock()
+
+
+def sampled(every: int) -> Dict[str, int]:
+    """`extra` payload marking a record as sampled (keep 1 in `every`)"""
+    return {"sample_every": every}
+
+
+class SamplingFilter(logging.Filter):
+    """Drop all but one in N records that carry a `sample_every` attribute"""
+
+    def __init__(self):
+        super().__init__()
+        self._counters: Dict[tuple, int] = {}
+        self._lock = Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = getattr(record, "sample_every", 1)
+        if every <= 1:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        with self._lock:
+            count = self._counters.get(key, 0)
+            self._counters[key] = count + 1
+        return count % every == 0
+
+
+class StructuredFormatter(logging.Formatter):
+    """Render records as `ts=... level=... logger=... msg="..." key=value`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = [
+            f"ts={self.formatTime(record, '%Y-%m-%dT%H:%M:%S')}",
+            f"level={record.levelname}",
+            f"logger={record.name}",
+            f"msg={_quote(record.getMessage())}",
+        ]
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                fields.append(f"{key}={_quote(value)}")
+        line = " ".join(fields)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class _StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the message and traceback as separate fields"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _quote(value) -> str:
+    text = str(value)
+    if not text or any(c in text for c in ' "='):
+        return '"' + text.replace('"', '\\"') + '"'
+    return text
+
+
+def _parse_levels(spec: str) -> Dict[str, int]:
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        name, level = name.strip(), level.strip().upper()
+        if name and level in logging._nameToLevel:
+            levels[name] = logging._nameToLevel[level]
+    return levels
+
+
+def configure_logging():
+    """Install the queue-based structured handler on the root logger (idempotent)"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(StructuredFormatter())
+
+        log_queue: queue.Queue = queue.Queue(-1)
+        queue_handler = _StructuredQueueHandler(log_queue)
+        # Sample before enqueueing so dropped records cost almost nothing
+        queue_handler.addFilter(SamplingFilter())
+
+        root = logging.getLogger()
+        root.handlers[:] = [queue_handler]
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+        for name, level in _parse_levels(os.getenv("LOG_LEVELS", "")).items():
+            logging.getLogger(name).setLevel(level)
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, stream_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Module logger; configured by `configure_logging()`"""
+    return logging.getLogger(name)
@@ -0,0 +1,45 @@
+"""
+In-process timing counters for named operations (report queries).
+
+`timings.record(name, ms)` keeps count / total / max / last per name;
+`snapshot()` returns them with the mean, for the admin stats endpoints.
+"""
+
+from threading import Lock
+from typing import Any, Dict
+
+
+class TimingStats:
+    def __init__(self):
+        self._lock = Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, elapsed_ms: float):
+        with self._lock:
+            entry = self._stats.get(name)
+            if entry is None:
+                entry = self._stats[name] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["last_ms"] = elapsed_ms
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "count": int(e["count"]),
+                    "avg_ms": round(e["total_ms"] / e["count"], 2),
+                    "max_ms": round(e["max_ms"], 2),
+                    "last_ms": round(e["last_ms"], 2),
+                }
+                for name, e in self._stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+# Per-query timings of the admin dashboard (admin/repos/reports.py)
+report_timings = TimingStats()
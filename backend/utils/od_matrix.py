@@ -0,0 +1,304 @@
+"""
+Per-route origin-destination (OD) matrices of confirmed bookings.
+
+Every route keeps a sparse list of (travel day, origin stop, destination stop,
+passengers) records in NumPy arrays sorted by day. A date-range query slices
+them with `searchsorted`, sums equal stop pairs, and returns:
+
+- the stop x stop OD matrix in route stop order
+- the passenger load on every segment, per direction. Each OD pair adds +n
+  at its boarding stop and -n at its alighting stop of a difference array,
+  and the prefix sum gives the load between consecutive stops.
+- the peak load point (busiest segment), for capacity planning
+
+`ODRefresher` keeps the records current. It does a full load of the last
+`OD_HISTORY_DAYS` days of trips every `OD_RELOAD_SECONDS`. Every
+`OD_REFRESH_SECONDS` it appends bookings past the booking_id watermark. The
+full load is the only way to drop bookings cancelled after they were
+appended, and to pick up bookings whose id committed after the watermark
+had passed it (the booking flow holds its transaction open while it charges
+the payment). Travel day is the trip's departure day.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+HISTORY_DAYS = int(os.getenv("OD_HISTORY_DAYS", "365"))
+REFRESH_SECONDS = int(os.getenv("OD_REFRESH_SECONDS", "60"))
+RELOAD_SECONDS = int(os.getenv("OD_RELOAD_SECONDS", "3600"))
+
+
+class _RouteRecords:
+    """Sparse OD records of one route; appends are buffered until the next read"""
+
+    def __init__(self):
+        self.days = np.zeros(0, dtype=np.int32)  # date.toordinal()
+        self.origins = np.zeros(0, dtype=np.int32)
+        self.destinations = np.zeros(0, dtype=np.int32)
+        self.passengers = np.zeros(0, dtype=np.int32)
+        self._pending: List[Tuple[int, int, int, int]] = []
+
+    def append(self, day: int, origin: int, destination: int, passengers: int):
+        self._pending.append((day, origin, destination, passengers))
+
+    def _compact(self):
+        if not self._pending:
+            return
+        pending = np.array(self._pending, dtype=np.int32)
+        self._pending = []
+        days = np.concatenate([self.days, pending[:, 0]])
+        order = np.argsort(days, kind="stable")
+        self.days = days[order]
+        self.origins = np.concatenate([self.origins, pending[:, 1]])[order]
+        self.destinations = np.concatenate([self.destinations, pending[:, 2]])[order]
+        self.passengers = np.concatenate([self.passengers, pending[:, 3]])[order]
+
+    def pairs(self, first_day: int, last_day: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(origins, destinations, passengers) summed per distinct pair over the days"""
+        self._compact()
+        lo = np.searchsorted(self.days, first_day, side="left")
+        hi = np.searchsorted(self.days, last_day, side="right")
+        # One int64 key per pair: 1-D unique is much faster than unique(axis=0)
+        keys = (self.origins[lo:hi].astype(np.int64) << 32) | self.destinations[lo:hi]
+        unique, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=self.passengers[lo:hi], minlength=len(unique))
+        return unique >> 32, unique & 0xFFFFFFFF, totals.astype(np.int64)
+
+    @property
+    def size(self) -> int:
+        return len(self.days) + len(self._pending)
+
+
+def segment_loads(n_stops: int, origin_idx: np.ndarray, dest_idx: np.ndarray, passengers: np.ndarray):
+    """
+    Load on the n_stops - 1 segments between consecutive stops, per direction.
+    forward[i]  = passengers riding stop i -> i + 1
+    backward[i] = passengers riding stop i + 1 -> i
+    """
+    forward = np.zeros(n_stops + 1, dtype=np.int64)
+    backward = np.zeros(n_stops + 1, dtype=np.int64)
+    up = origin_idx < dest_idx
+    down = origin_idx > dest_idx
+    # Forward riders occupy segments origin .. dest - 1
+    np.add.at(forward, origin_idx[up], passengers[up])
+    np.add.at(forward, dest_idx[up], -passengers[up])
+    # Backward riders occupy segments dest .. origin - 1
+    np.add.at(backward, dest_idx[down], passengers[down])
+    np.add.at(backward, origin_idx[down], -passengers[down])
+    return np.cumsum(forward)[: n_stops - 1], np.cumsum(backward)[: n_stops - 1]
+
+
+class ODMatrixEngine:
+    def __init__(self):
+        self._lock = Lock()
+        self._routes: Dict[int, _RouteRecords] = {}
+        self.watermark = 0
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    # ---------- Maintenance ----------
+
+    def load(self, rows: Iterable[tuple], watermark: int):
+        """Replace everything with rows (route_id, day, origin, destination, passengers)"""
+        routes: Dict[int, _RouteRecords] = {}
+        for route_id, day, origin, destination, passengers in rows:
+            routes.setdefault(route_id, _RouteRecords()).append(
+                day.toordinal(), origin, destination, passengers
+            )
+        for records in routes.values():
+            records._compact()
+        with self._lock:
+            self._routes = routes
+            self.watermark = watermark
+            self.loaded_at = datetime.now()
+
+    def add(self, rows: Iterable[tuple], watermark: int):
+        """Append new bookings (same row shape as load) and advance the watermark"""
+        with self._lock:
+            for route_id, day, origin, destination, passengers in rows:
+                self._routes.setdefault(route_id, _RouteRecords()).append(
+                    day.toordinal(), origin, destination, passengers
+                )
+            self.watermark = max(self.watermark, watermark)
+            self.loaded_at = datetime.now()
+
+    # ---------- Reads ----------
+
+    def route_od(
+        self,
+        route_id: int,
+        stop_ids: Sequence[int],
+        start_day: date,
+        end_day: date,
+    ) -> Dict[str, Any]:
+        """
+        OD matrix and segment loads of one route for [start_day, end_day].
+        `stop_ids` is the route's stop order (route_topology); bookings between
+        stops no longer on the route are reported as `unmapped_passengers`.
+        """
+        n = len(stop_ids)
+        with self._lock:
+            records = self._routes.get(route_id)
+            if records is None:
+                origins = destinations = passengers = np.zeros(0, dtype=np.int64)
+            else:
+                origins, destinations, passengers = records.pairs(
+                    start_day.toordinal(), end_day.toordinal()
+                )
+
+        position = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+        origin_idx = np.array([position.get(int(s), -1) for s in origins], dtype=np.int64)
+        dest_idx = np.array([position.get(int(s), -1) for s in destinations], dtype=np.int64)
+        mapped = (origin_idx >= 0) & (dest_idx >= 0)
+
+        matrix = np.zeros((n, n), dtype=np.int64)
+        np.add.at(matrix, (origin_idx[mapped], dest_idx[mapped]), passengers[mapped])
+        if n >= 2:
+            forward, backward = segment_loads(n, origin_idx[mapped], dest_idx[mapped], passengers[mapped])
+        else:
+            forward = backward = np.zeros(0, dtype=np.int64)
+
+        segments = [
+            {
+                "from_stop_id": stop_ids[i],
+                "to_stop_id": stop_ids[i + 1],
+                "forward_load": int(forward[i]),
+                "backward_load": int(backward[i]),
+            }
+            for i in range(n - 1)
+        ]
+        return {
+            "route_id": route_id,
+            "start_date": start_day.isoformat(),
+            "end_date": end_day.isoformat(),
+            "stop_ids": list(stop_ids),
+            "matrix": matrix.tolist(),
+            "passengers": int(passengers[mapped].sum()),
+            "unmapped_passengers": int(passengers[~mapped].sum()),
+            "boardings": matrix.sum(axis=1).tolist(),
+            "alightings": matrix.sum(axis=0).tolist(),
+            "segments": segments,
+            "peak_load": _peak(segments),
+        }
+
+    def route_ids(self) -> List[int]:
+        with self._lock:
+            return sorted(self._routes)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "routes": len(self._routes),
+                "records": sum(r.size for r in self._routes.values()),
+                "watermark": self.watermark,
+                "as_of": self.loaded_at.isoformat() if self.loaded_at else None,
+            }
+
+
+def _peak(segments: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    best = None
+    for segment in segments:
+        for direction in ("forward", "backward"):
+            load = segment[f"{direction}_load"]
+            if load and (best is None or load > best["load"]):
+                best = {
+                    "from_stop_id": segment["from_stop_id"] if direction == "forward" else segment["to_stop_id"],
+                    "to_stop_id": segment["to_stop_id"] if direction == "forward" else segment["from_stop_id"],
+                    "direction": direction,
+                    "load": load,
+                }
+    return best
+
+
+def reload_od(engine: ODMatrixEngine, mysql, history_days: int = HISTORY_DAYS):
+    since = date.today() - timedelta(days=history_days - 1)
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(booking_id), 0) FROM bookings")
+        watermark = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            SELECT t.route_id, t.departure_day, b.origin_stop_id, b.destination_stop_id, COUNT(*)
+            FROM bookings b
+            JOIN trips t ON b.trip_id = t.trip_id
+            WHERE b.status = 'confirmed' AND b.booking_id <= %s AND t.departure_time >= %s
+            GROUP BY t.route_id, t.departure_day, b.origin_stop_id, b.destination_stop_id
+            """,
+            (watermark, since),
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    engine.load(rows, watermark)
+
+
+def refresh_od(engine: ODMatrixEngine, mysql) -> int:
+    """Append confirmed bookings past the watermark; returns how many"""
+    cursor = mysql.connection.cursor()
+    try:
+        cursor.execute(
+            """
+            SELECT b.booking_id, t.route_id, t.departure_day, b.origin_stop_id, b.destination_stop_id
+            FROM bookings b
+            JOIN trips t ON b.trip_id = t.trip_id
+            WHERE b.booking_id > %s AND b.status = 'confirmed'
+            ORDER BY b.booking_id
+            """,
+            (engine.watermark,),
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if rows:
+        engine.add(((r[1], r[2], r[3], r[4], 1) for r in rows), rows[-1][0])
+    return len(rows)
+
+
+class ODRefresher:
+    """Background thread: full reload every RELOAD_SECONDS, new bookings every REFRESH_SECONDS"""
+
+    def __init__(self, engine: ODMatrixEngine):
+        self.engine = engine
+        self._wake = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        from app import app, mysql
+
+        last_reload: Optional[datetime] = None
+        while True:
+            with app.app_context():
+                try:
+                    now = datetime.now()
+                    if last_reload is None or (now - last_reload).total_seconds() >= RELOAD_SECONDS:
+                        reload_od(self.engine, mysql)
+                        last_reload = now
+                        logger.info("OD matrices loaded", extra=self.engine.stats())
+                    else:
+                        refresh_od(self.engine, mysql)
+                except Exception:
+                    logger.exception("OD matrix refresh failed")
+            self._wake.wait(REFRESH_SECONDS)
+            self._wake.clear()
+
+
+# Global engine and refresher, started from app.py
+od_engine = ODMatrixEngine()
+od_refresher = ODRefresher(od_engine)
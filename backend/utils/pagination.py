@@ -0,0 +1,213 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, URL-safe token holding the sort-key values of the last
+row on the previous page. Callers use the decoded values in a
+``(col_a, col_b) > (%s, %s)`` style predicate instead of ``OFFSET`` so deep
+pages cost the same as the first one.
+
+Total counts are opt-in for list endpoints: an exact `COUNT(*)` is cached
+briefly by `total_counts`, and unfiltered lists can use InnoDB's row estimate
+instead.
+"""
+
+import base64
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, date
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("Invalid cursor value")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort-key values of the last row into an opaque cursor"""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Optional[str], size: int) -> Optional[List[Any]]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    Returns None for an empty token; raises ValueError for a malformed one.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_decode_value(v) for v in raw]
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(raw, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+# ---------- Keyset predicates ----------
+
+
+def keyset_predicate(
+    columns: Sequence[Tuple[str, str]], values: Sequence[Any]
+) -> Tuple[str, List[Any]]:
+    """
+    WHERE fragment selecting rows after `values` in the order given by
+    `columns` ([(column, "ASC" | "DESC"), ...]).
+
+    A uniform direction becomes a row comparison `(a, b) < (%s, %s)`; mixed
+    directions expand to `a < %s OR (a = %s AND b > %s)`.
+    """
+    directions = {direction.upper() for _, direction in columns}
+    if len(directions) == 1:
+        op = "<" if directions == {"DESC"} else ">"
+        names = ", ".join(column for column, _ in columns)
+        marks = ", ".join(["%s"] * len(columns))
+        return f"({names}) {op} ({marks})", list(values)
+
+    clauses = []
+    params: List[Any] = []
+    for i, (column, direction) in enumerate(columns):
+        op = "<" if direction.upper() == "DESC" else ">"
+        parts = [f"{prev} = %s" for prev, _ in columns[:i]] + [f"{column} {op} %s"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(list(values[:i]) + [values[i]])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def keyset_page(
+    rows: List[Dict[str, Any]], limit: int, key_columns: Sequence[str]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Trim a `LIMIT limit + 1` result to `limit` rows and build the cursor for
+    the next page (None on the last page).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([last[c] for c in key_columns])
+
+
+# ---------- Total counts ----------
+
+TOTAL_EXACT = "exact"
+TOTAL_APPROX = "approx"
+
+
+def parse_include_total(value: Optional[str]) -> Optional[str]:
+    """
+    Map the `include_total` query parameter to None / "exact" / "approx".
+    Raises ValueError for anything else.
+    """
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in ("", "0", "false", "no"):
+        return None
+    if value in ("1", "true", "yes", TOTAL_EXACT):
+        return TOTAL_EXACT
+    if value in (TOTAL_APPROX, "estimate"):
+        return TOTAL_APPROX
+    raise ValueError("include_total must be one of: true, false, exact, approx")
+
+
+class TotalCountCache:
+    """
+    Short-lived cache of `SELECT COUNT(*)` results keyed by query and
+    parameters, so paging through a list counts once per TTL instead of once
+    per page. Admin writes clear it (see admin/__init__.py). Expired entries
+    are dropped on insert and at most `max_entries` are kept.
+    """
+
+    def __init__(self, ttl_seconds: int = 30, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = Lock()
+        # Insertion order = expiry order (one TTL for all entries)
+        self._entries: "OrderedDict[Tuple, Tuple[float, int]]" = OrderedDict()
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def count(self, cursor, sql: str, params: Sequence[Any] = ()) -> int:
+        key = (sql, tuple(params))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        cursor.execute(sql, list(params))
+        row = cursor.fetchone()
+        total = int(row[0]) if row else 0
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl_seconds, total)
+            while self._entries:
+                expires_at, _ = next(iter(self._entries.values()))
+                if expires_at > now and len(self._entries) <= self.max_entries:
+                    break
+                self._entries.popitem(last=False)
+        return total
+
+
+def approximate_row_count(cursor, table: str) -> Optional[int]:
+    """InnoDB's row estimate for `table` (no scan); None if unavailable"""
+    cursor.execute(
+        """
+        SELECT TABLE_ROWS FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table,),
+    )
+    row = cursor.fetchone()
+    if not row or row[0] is None:
+        return None
+    return int(row[0])
+
+
+def resolve_total(
+    cursor,
+    mode: Optional[str],
+    count_sql: str,
+    params: Sequence[Any] = (),
+    table: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Total-count fields for a list response according to `mode`.
+
+    - None     -> {"total": None}, no query at all
+    - "exact"  -> cached COUNT(*)
+    - "approx" -> table statistics when the list is unfiltered (`table` set
+                  and no params), otherwise the cached exact count
+    """
+    if mode is None:
+        return {"total": None}
+    if mode == TOTAL_APPROX and table and not params:
+        estimate = approximate_row_count(cursor, table)
+        if estimate is not None:
+            return {"total": estimate, "total_is_estimate": True}
+    return {"total": total_counts.count(cursor, count_sql, params)}
+
+
+# Global cache shared by the admin list repos
+total_counts = TotalCountCache(int(os.getenv("ADMIN_TOTAL_CACHE_SECONDS", "30")))
@@ -0,0 +1,123 @@
+"""
+In-memory prefix indexes for admin typeahead lookups (users, stops).
+
+Each index keeps a sorted array of `(search_key, id)` pairs, with one pair per
+searchable term (whole name plus each word of it, lower-cased), so a prefix
+query is a `bisect` to the first candidate followed by a short forward scan
+that stops at `limit` distinct records. Like utils/route_topology.py the
+snapshot is reloaded after `ttl_seconds` and dropped by `invalidate()`, which
+the admin blueprint calls after user/stop writes.
+"""
+
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import MySQLdb.cursors
+
+
+def _terms(text: Optional[str]) -> List[str]:
+    """Lower-cased search terms for `text`: the whole string and each word"""
+    text = (text or "").strip().lower()
+    if not text:
+        return []
+    words = text.split()
+    return [text] + words[1:] if len(words) > 1 else [text]
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over one table"""
+
+    def __init__(
+        self,
+        query: str,
+        id_column: str,
+        key_columns: Iterable[str],
+        ttl_seconds: int = 120,
+    ):
+        self.query = query
+        self.id_column = id_column
+        self.key_columns = tuple(key_columns)
+        self.ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self._loaded_at: Optional[float] = None
+        self._keys: List[Tuple[str, Any]] = []
+        self._records: Dict[Any, Dict[str, Any]] = {}
+
+    def invalidate(self):
+        """Drop the snapshot; the next lookup reloads it from the database"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.ttl_seconds
+        )
+
+    def ensure_loaded(self, mysql):
+        """Load the index if it has not been loaded yet or is stale"""
+        if self._is_fresh():
+            return
+        with self._lock:
+            if self._is_fresh():
+                return
+            self._load(mysql)
+
+    def _load(self, mysql):
+        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        try:
+            cursor.execute(self.query)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        records: Dict[Any, Dict[str, Any]] = {}
+        keys: List[Tuple[str, Any]] = []
+        for row in rows:
+            record = dict(row)
+            record_id = record[self.id_column]
+            records[record_id] = record
+            terms = set()
+            for column in self.key_columns:
+                terms.update(_terms(record.get(column)))
+            keys.extend((term, record_id) for term in terms)
+        keys.sort()
+
+        self._keys = keys
+        self._records = records
+        self._loaded_at = time.monotonic()
+
+    def search(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        """Up to `limit` records with a term starting with `prefix` (call ensure_loaded first)"""
+        prefix = (prefix or "").strip().lower()
+        keys = self._keys
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        i = bisect_left(keys, (prefix,))
+        while i < len(keys) and len(results) < limit:
+            term, record_id = keys[i]
+            if not term.startswith(prefix):
+                break
+            if record_id not in seen:
+                seen.add(record_id)
+                results.append(self._records[record_id])
+            i += 1
+        return results
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+# Global indexes used by the admin bookings form
+user_index = PrefixIndex(
+    "SELECT user_id, username, full_name FROM users",
+    id_column="user_id",
+    key_columns=("username", "full_name"),
+)
+stop_index = PrefixIndex(
+    "SELECT stop_id, stop_name FROM stops",
+    id_column="stop_id",
+    key_columns=("stop_name",),
+)
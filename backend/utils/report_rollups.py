@@ -0,0 +1,297 @@
+"""
+Hourly report rollups and the background compactor that keeps them current.
+
+The rollup tables (database/migrations/report_rollups.sql) hold booking,
+payment and trip aggregates per hour bucket. `RollupCompactor` runs one pass
+every `ROLLUP_COMPACT_SECONDS`:
+
+1. new rows past the per-table id watermark -> the hours they touch
+2. hours marked by the update/delete triggers in `rollup_dirty_hours`
+3. the last `RECENT_HOURS` booking/payment hours, so rows committed out of id
+   order are still picked up
+
+and re-derives each of those hours from the raw tables (DELETE + INSERT ...
+SELECT over `[hour, hour + 1h)`), then advances the watermarks, all in one
+READ COMMITTED transaction. Report queries read the rollups only for
+hour-aligned ranges (`rollup_window`), so results lag the raw tables by at
+most one pass.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Dict, Optional, Set, Tuple
+
+from utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+HOUR = timedelta(hours=1)
+COMPACT_INTERVAL_SECONDS = int(os.getenv("ROLLUP_COMPACT_SECONDS", "60"))
+# New raw rows folded per table per pass
+BATCH_ROWS = 5000
+RECENT_HOURS = 2
+
+# kind -> (rollup table, INSERT ... SELECT for one hour: params (hour, start, end))
+_REBUILD_SQL = {
+    "booking": (
+        "rollup_booking_hourly",
+        """
+        INSERT INTO rollup_booking_hourly (bucket_hour, route_id, status, bookings, paid_revenue)
+        SELECT %s, t.route_id, b.status, COUNT(*),
+               COALESCE(SUM(CASE WHEN p.status = 'paid' THEN p.amount ELSE 0 END), 0)
+        FROM bookings b
+        JOIN trips t ON b.trip_id = t.trip_id
+        LEFT JOIN payments p ON p.booking_id = b.booking_id
+        WHERE b.booking_date >= %s AND b.booking_date < %s
+        GROUP BY t.route_id, b.status
+        """,
+    ),
+    "payment": (
+        "rollup_payment_hourly",
+        """
+        INSERT INTO rollup_payment_hourly (bucket_hour, method, status, payments, amount)
+        SELECT %s, method, status, COUNT(*), COALESCE(SUM(amount), 0)
+        FROM payments
+        WHERE payment_date >= %s AND payment_date < %s
+        GROUP BY method, status
+        """,
+    ),
+    "trip": (
+        "rollup_trip_hourly",
+        """
+        INSERT INTO rollup_trip_hourly (bucket_hour, route_id, bus_id, status, trips, bookings)
+        SELECT %s, x.route_id, x.bus_id, x.status, COUNT(*), COALESCE(SUM(x.n), 0)
+        FROM (
+            SELECT t.route_id, t.bus_id, t.status,
+                   (SELECT COUNT(*) FROM bookings b WHERE b.trip_id = t.trip_id) AS n
+            FROM trips t
+            WHERE t.departure_time >= %s AND t.departure_time < %s
+        ) x
+        GROUP BY x.route_id, x.bus_id, x.status
+        """,
+    ),
+}
+
+
+def truncate_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_window(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Optional[Tuple[Optional[datetime], Optional[datetime]]]:
+    """
+    Map an inclusive report range onto whole rollup hours.
+
+    Returns a half-open `(start_hour, end_hour)` window (either side may be
+    None for an open range), or None when a bound falls inside an hour and
+    the report has to read the raw tables. `start` must be on the hour and
+    `end` at HH:59:59 (what the admin UI sends for a day range).
+    """
+    if start is not None and start != truncate_hour(start):
+        return None
+    end_hour = None
+    if end is not None:
+        if end.minute != 59 or end.second != 59:
+            return None
+        end_hour = truncate_hour(end) + HOUR
+    return start, end_hour
+
+
+class _Availability:
+    """Whether the rollup migration has been applied, re-checked every minute"""
+
+    ttl_seconds = 60
+
+    def __init__(self):
+        self._lock = Lock()
+        self._checked_at: Optional[float] = None
+        self._available = False
+
+    def check(self, mysql) -> bool:
+        with self._lock:
+            if (
+                self._checked_at is not None
+                and time.monotonic() - self._checked_at < self.ttl_seconds
+            ):
+                return self._available
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM rollup_watermarks")
+            available = cursor.fetchone()[0] >= 3
+        except Exception:
+            available = False
+        finally:
+            cursor.close()
+        with self._lock:
+            self._available = available
+            self._checked_at = time.monotonic()
+        return available
+
+
+_availability = _Availability()
+
+
+def rollups_available(mysql) -> bool:
+    """True once database/migrations/report_rollups.sql has been applied"""
+    return _availability.check(mysql)
+
+
+def _add_hour(hours: Set[datetime], value: Optional[datetime]):
+    if value is not None:
+        hours.add(truncate_hour(value))
+
+
+def compact_once(conn) -> int:
+    """
+    One compaction pass on `conn` (committed here). Returns the number of new
+    raw rows folded in; BATCH_ROWS for any table means more are waiting.
+    """
+    dirty: Dict[str, Set[datetime]] = {"booking": set(), "payment": set(), "trip": set()}
+    cursor = conn.cursor()
+    try:
+        # Each statement sees the latest committed rows; see module docstring
+        cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED")
+        conn.commit()  # Ends any open transaction so the setting applies below
+
+        cursor.execute("SELECT kind, bucket_hour FROM rollup_dirty_hours FOR UPDATE")
+        marked = cursor.fetchall()
+        # Clear the marks before re-deriving: a concurrent trigger re-marking
+        # one of these hours waits for this transaction and leaves its mark
+        # for the next pass
+        cursor.executemany(
+            "DELETE FROM rollup_dirty_hours WHERE kind = %s AND bucket_hour = %s",
+            [(kind, hour) for kind, hour in marked if hour is not None],
+        )
+        if any(hour is None for _, hour in marked):
+            # Marks for rows without a timestamp (zero dates)
+            cursor.execute("DELETE FROM rollup_dirty_hours WHERE bucket_hour < '1000-01-01'")
+        for kind, bucket_hour in marked:
+            _add_hour(dirty[kind], bucket_hour)
+
+        cursor.execute("SELECT source, last_id FROM rollup_watermarks")
+        marks = dict(cursor.fetchall())
+        new_marks = dict(marks)
+
+        # New bookings: their booking hour and their trip's departure hour
+        cursor.execute(
+            """
+            SELECT b.booking_id, b.booking_date, t.departure_time
+            FROM bookings b
+            JOIN trips t ON b.trip_id = t.trip_id
+            WHERE b.booking_id > %s
+            ORDER BY b.booking_id
+            LIMIT %s
+            """,
+            (marks.get("bookings", 0), BATCH_ROWS),
+        )
+        bookings = cursor.fetchall()
+        for booking_id, booking_date, departure_time in bookings:
+            _add_hour(dirty["booking"], booking_date)
+            _add_hour(dirty["trip"], departure_time)
+            new_marks["bookings"] = booking_id
+
+        # New payments: their payment hour and their booking's hour (paid revenue)
+        cursor.execute(
+            """
+            SELECT p.payment_id, p.payment_date, b.booking_date
+            FROM payments p
+            JOIN bookings b ON p.booking_id = b.booking_id
+            WHERE p.payment_id > %s
+            ORDER BY p.payment_id
+            LIMIT %s
+            """,
+            (marks.get("payments", 0), BATCH_ROWS),
+        )
+        payments = cursor.fetchall()
+        for payment_id, payment_date, booking_date in payments:
+            _add_hour(dirty["payment"], payment_date)
+            _add_hour(dirty["booking"], booking_date)
+            new_marks["payments"] = payment_id
+
+        # New trips (daily generation, admin inserts)
+        cursor.execute(
+            """
+            SELECT trip_id, departure_time FROM trips
+            WHERE trip_id > %s
+            ORDER BY trip_id
+            LIMIT %s
+            """,
+            (marks.get("trips", 0), BATCH_ROWS),
+        )
+        trips = cursor.fetchall()
+        for trip_id, departure_time in trips:
+            _add_hour(dirty["trip"], departure_time)
+            new_marks["trips"] = trip_id
+
+        now_hour = truncate_hour(datetime.now())
+        for i in range(RECENT_HOURS):
+            dirty["booking"].add(now_hour - i * HOUR)
+            dirty["payment"].add(now_hour - i * HOUR)
+
+        for kind, hours in dirty.items():
+            table, insert_sql = _REBUILD_SQL[kind]
+            for hour in sorted(hours):
+                cursor.execute(f"DELETE FROM {table} WHERE bucket_hour = %s", (hour,))
+                cursor.execute(insert_sql, (hour, hour, hour + HOUR))
+
+        for source, last_id in new_marks.items():
+            if last_id != marks.get(source):
+                cursor.execute(
+                    "UPDATE rollup_watermarks SET last_id = %s WHERE source = %s",
+                    (last_id, source),
+                )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    folded = len(bookings) + len(payments) + len(trips)
+    if folded or marked:
+        logger.info(
+            "Rollups compacted",
+            extra={
+                "new_rows": folded,
+                "marked_hours": len(marked),
+                "hours": sum(len(h) for h in dirty.values()),
+            },
+        )
+    return max(len(bookings), len(payments), len(trips))
+
+
+class RollupCompactor:
+    """Background thread running compact_once() every interval"""
+
+    def __init__(self, interval_seconds: int = COMPACT_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._wake = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        from app import app, mysql
+
+        while True:
+            backlog = False
+            with app.app_context():
+                try:
+                    if rollups_available(mysql):
+                        backlog = compact_once(mysql.connection) >= BATCH_ROWS
+                except Exception:
+                    logger.exception("Rollup compaction failed")
+            if not backlog:
+                self._wake.wait(self.interval_seconds)
+                self._wake.clear()
+
+
+# Global compactor, started from app.py
+rollup_compactor = RollupCompactor()
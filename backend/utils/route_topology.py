@@ -0,0 +1,232 @@
+"""
+In-memory cache of the route network (routes, ordered stops, coordinates).
+
+All stops (served by a route or not) are also kept in a `StopGrid`
+(utils/spatial_index.py) for radius / nearest-stop queries.
+
+Routes serving two stops are the intersection of the stops' entries in the
+stop -> (route, stop_order) index; results are kept in an LRU of
+`MATCHING_CACHE_SIZE` stop pairs that is cleared on every reload.
+
+The route topology only changes through the admin routes / stops /
+routes-stops endpoints, so passenger endpoints read it from memory instead of
+querying `routes_stops` on every request. The cache is reloaded after
+`ttl_seconds` as a safety net and dropped immediately by `invalidate()`.
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import MySQLdb.cursors
+
+from utils.spatial_index import StopGrid
+
+MATCHING_CACHE_SIZE = 4096
+
+
+class RouteTopology:
+    """Snapshot of routes -> ordered stops, with reverse lookups"""
+
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self._loaded_at: Optional[float] = None
+        # {route_id: {"service_id", "route_name", "stops": [{stop_id, stop_name, stop_order, latitude, longitude}]}}
+        self._routes: Dict[int, Dict] = {}
+        # {(route_id, stop_id): stop_order}
+        self._stop_order: Dict[Tuple[int, int], int] = {}
+        # {stop_id: [(route_id, stop_order), ...]}
+        self._stop_routes: Dict[int, List[Tuple[int, int]]] = {}
+        # {stop_id: stop_name}
+        self._stop_names: Dict[int, str] = {}
+        # Every stop, for radius queries
+        self._stop_grid = StopGrid({})
+        # {route_id: distinct stops on the route}
+        self._stop_counts: Dict[int, int] = {}
+        # {(service_id, start_stop_id, end_stop_id): matching routes}, least recently used first
+        self._matching_lock = Lock()
+        self._matching: "OrderedDict[Tuple[int, int, int], List[Dict[str, Any]]]" = OrderedDict()
+
+    def invalidate(self):
+        """Drop the snapshot; the next lookup reloads it from the database"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.ttl_seconds
+        )
+
+    def ensure_loaded(self, mysql):
+        """Load the topology if it has not been loaded yet or is stale"""
+        if self._is_fresh():
+            return
+        with self._lock:
+            if self._is_fresh():
+                return
+            self._load(mysql)
+
+    def _load(self, mysql):
+        cursor = mysql.connection.cursor(MySQLdb.cursors.DictCursor)
+        try:
+            cursor.execute("SELECT route_id, service_id, route_name FROM routes")
+            routes = {
+                row["route_id"]: {
+                    "service_id": row["service_id"],
+                    "route_name": row["route_name"],
+                    "stops": [],
+                }
+                for row in cursor.fetchall()
+            }
+            cursor.execute(
+                """
+                SELECT rs.route_id, rs.stop_id, rs.stop_order,
+                       s.stop_name, s.latitude, s.longitude
+                FROM routes_stops rs
+                JOIN stops s ON rs.stop_id = s.stop_id
+                ORDER BY rs.route_id, rs.stop_order
+                """
+            )
+            rows = cursor.fetchall()
+            cursor.execute("SELECT stop_id, stop_name, latitude, longitude FROM stops")
+            all_stops = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        stop_order: Dict[Tuple[int, int], int] = {}
+        stop_routes: Dict[int, List[Tuple[int, int]]] = {}
+        stop_names: Dict[int, str] = {}
+        for row in rows:
+            route = routes.get(row["route_id"])
+            if route is None:
+                continue
+            route["stops"].append(
+                {
+                    "stop_id": row["stop_id"],
+                    "stop_name": row["stop_name"],
+                    "stop_order": row["stop_order"],
+                    "latitude": float(row["latitude"]),
+                    "longitude": float(row["longitude"]),
+                }
+            )
+            stop_order[(row["route_id"], row["stop_id"])] = row["stop_order"]
+            stop_routes.setdefault(row["stop_id"], []).append(
+                (row["route_id"], row["stop_order"])
+            )
+            stop_names[row["stop_id"]] = row["stop_name"]
+
+        self._routes = routes
+        self._stop_order = stop_order
+        self._stop_routes = stop_routes
+        for row in all_stops:
+            stop_names.setdefault(row["stop_id"], row["stop_name"])
+
+        self._stop_names = stop_names
+        self._stop_grid = StopGrid(
+            {
+                row["stop_id"]: (float(row["latitude"]), float(row["longitude"]))
+                for row in all_stops
+            }
+        )
+        self._stop_counts = {
+            route_id: len({stop["stop_id"] for stop in route["stops"]})
+            for route_id, route in routes.items()
+        }
+        with self._matching_lock:
+            self._matching.clear()
+        self._loaded_at = time.monotonic()
+
+    # ---------- Lookups (call ensure_loaded first) ----------
+
+    def get_route(self, route_id: int) -> Optional[Dict]:
+        return self._routes.get(route_id)
+
+    def get_route_stops(self, route_id: int) -> List[Dict]:
+        route = self._routes.get(route_id)
+        return route["stops"] if route else []
+
+    def get_stop_order(self, route_id: int, stop_id: int) -> Optional[int]:
+        return self._stop_order.get((route_id, stop_id))
+
+    def get_stop_orders(self, route_id: int, stop_ids: Iterable[int]) -> Dict[int, int]:
+        orders = {}
+        for stop_id in stop_ids:
+            order = self._stop_order.get((route_id, stop_id))
+            if order is not None:
+                orders[stop_id] = order
+        return orders
+
+    def route_ids(self) -> List[int]:
+        return list(self._routes)
+
+    def get_stop_name(self, stop_id: int) -> Optional[str]:
+        return self._stop_names.get(stop_id)
+
+    def get_routes_for_stop(self, stop_id: int) -> List[Tuple[int, int]]:
+        """[(route_id, stop_order), ...] for every route serving the stop"""
+        return self._stop_routes.get(stop_id, [])
+
+    def matching_routes(
+        self, service_id: int, start_stop_id: int, end_stop_id: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Routes of a service that serve both stops, by route name, with the
+        route's stop count, both stop orders and the travel direction.
+        """
+        key = (service_id, start_stop_id, end_stop_id)
+        with self._matching_lock:
+            cached = self._matching.get(key)
+            if cached is not None:
+                self._matching.move_to_end(key)
+                return cached
+
+            end_orders: Dict[int, List[int]] = {}
+            for route_id, order in self._stop_routes.get(end_stop_id, []):
+                end_orders.setdefault(route_id, []).append(order)
+            matches = []
+            for route_id, start_order in self._stop_routes.get(start_stop_id, []):
+                route = self._routes[route_id]
+                if route["service_id"] != service_id:
+                    continue
+                for end_order in end_orders.get(route_id, []):
+                    if end_order == start_order:
+                        continue
+                    matches.append(
+                        {
+                            "route_id": route_id,
+                            "route_name": route["route_name"],
+                            "stop_count": self._stop_counts[route_id],
+                            "start_order": start_order,
+                            "end_order": end_order,
+                            "direction": "forward" if end_order > start_order else "backward",
+                        }
+                    )
+            matches.sort(key=lambda m: (m["route_name"], m["route_id"]))
+
+            self._matching[key] = matches
+            while len(self._matching) > MATCHING_CACHE_SIZE:
+                self._matching.popitem(last=False)
+            return matches
+
+    def get_stop_coords(self, stop_id: int) -> Optional[Tuple[float, float]]:
+        return self._stop_grid.coords.get(stop_id)
+
+    def nearby_stops(
+        self,
+        lat: float,
+        lon: float,
+        radius_meters: float,
+        route_id: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """[(stop_id, metres), ...] nearest first within the radius, optionally on one route"""
+        stop_ids = None
+        if route_id is not None:
+            stop_ids = [stop["stop_id"] for stop in self.get_route_stops(route_id)]
+        return self._stop_grid.within(lat, lon, radius_meters, stop_ids)
+
+
+# Global instance shared by passenger and admin endpoints
+route_topology = RouteTopology()
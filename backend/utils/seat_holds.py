@@ -0,0 +1,255 @@
+"""
+Short-lived seat holds (`seat_holds` table) and their expiry sweeper.
+
+A hold claims a seat from the trip's inventory (utils/seat_inventory.py) for
+the passenger's journey segments (the whole route when no stops are given)
+before the passenger pays; confirming the booking consumes the hold and keeps
+the seat for the booked journey. Expired holds are removed by one background thread that keeps a
+min-heap keyed by expiry time and deletes every due hold with a single bulk
+DELETE, then gives the seats back per trip.
+
+Expiry times are stored and compared in application local time
+(`datetime.now()`), like trip departure times.
+
+A passenger may hold at most `SEAT_HOLD_MAX_PER_USER` seats at a time, so one
+client cannot block a trip's seats until the holds expire.
+"""
+
+import heapq
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from threading import Condition, Thread
+from typing import Dict, List, Optional
+
+import MySQLdb.cursors
+
+from utils.logging_utils import get_logger
+from utils.seat_inventory import (
+    Segments,
+    claim_seats,
+    occupy_seats,
+    release_seats,
+    route_segments,
+)
+
+logger = get_logger(__name__)
+
+HOLD_TTL_SECONDS = int(os.getenv("SEAT_HOLD_TTL_SECONDS", "300"))
+MAX_HOLDS_PER_USER = int(os.getenv("SEAT_HOLD_MAX_PER_USER", "4"))
+
+
+class HoldLimitError(Exception):
+    """The passenger already has MAX_HOLDS_PER_USER active holds"""
+
+
+def create_hold(
+    cursor, trip_id: int, user_id: int, segments: Optional[Segments] = None
+) -> Optional[Dict]:
+    """
+    Claim a seat for the journey `segments` (default: whole route) and
+    record the hold; None if full. Raises HoldLimitError when the user
+    already holds MAX_HOLDS_PER_USER seats.
+    """
+    # Lock the user's row so concurrent requests of one user count in turn
+    cursor.execute("SELECT user_id FROM users WHERE user_id = %s FOR UPDATE", (user_id,))
+    cursor.execute(
+        "SELECT COUNT(*) AS holds FROM seat_holds WHERE user_id = %s AND expires_at > %s",
+        (user_id, datetime.now()),
+    )
+    if _dict_row(cursor, cursor.fetchone())["holds"] >= MAX_HOLDS_PER_USER:
+        raise HoldLimitError()
+    if segments is None:
+        segments = route_segments(cursor, trip_id)
+    seats = claim_seats(cursor, trip_id, segments=segments)
+    if not seats:
+        return None
+    expires_at = datetime.now() + timedelta(seconds=HOLD_TTL_SECONDS)
+    cursor.execute(
+        """
+        INSERT INTO seat_holds (trip_id, user_id, seat_number, first_segment, end_segment, expires_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """,
+        (trip_id, user_id, seats[0], *segments, expires_at),
+    )
+    return {
+        "hold_id": cursor.lastrowid,
+        "trip_id": trip_id,
+        "seat_number": seats[0],
+        "expires_at": expires_at,
+    }
+
+
+def _hold_segments(cursor, row) -> Segments:
+    if row["first_segment"] is None:
+        # Hold created before trip_segment_load.sql: it claimed the whole route
+        return route_segments(cursor, row["trip_id"])
+    return row["first_segment"], row["end_segment"]
+
+
+def consume_hold(
+    cursor, hold_id: int, trip_id: int, user_id: int, segments: Segments
+) -> Optional[int]:
+    """
+    Turn an active hold into the booking seat for the journey `segments`:
+    deletes the hold and returns its seat number. The seat stays claimed
+    for the journey and the rest of the held segments are released. None
+    if the hold is missing, expired or does not cover the journey.
+    """
+    cursor.execute(
+        """
+        SELECT hold_id, trip_id, seat_number, first_segment, end_segment FROM seat_holds
+        WHERE hold_id = %s AND trip_id = %s AND user_id = %s AND expires_at > %s
+        FOR UPDATE
+        """,
+        (hold_id, trip_id, user_id, datetime.now()),
+    )
+    row = _dict_row(cursor, cursor.fetchone())
+    if not row:
+        return None
+    held = _hold_segments(cursor, row)
+    if not (held[0] <= segments[0] and segments[1] <= held[1]):
+        return None
+    cursor.execute("DELETE FROM seat_holds WHERE hold_id = %s", (hold_id,))
+    if held != tuple(segments):
+        # Same seat, narrowed to the journey (free there: the hold covered it)
+        release_seats(cursor, trip_id, [row["seat_number"]], held)
+        occupy_seats(cursor, trip_id, [row["seat_number"]], segments)
+    return row["seat_number"]
+
+
+def cancel_hold(cursor, hold_id: int, user_id: int) -> bool:
+    """Delete a user's hold and give its seat back"""
+    cursor.execute(
+        """
+        SELECT hold_id, trip_id, seat_number, first_segment, end_segment FROM seat_holds
+        WHERE hold_id = %s AND user_id = %s
+        FOR UPDATE
+        """,
+        (hold_id, user_id),
+    )
+    row = _dict_row(cursor, cursor.fetchone())
+    if not row:
+        return False
+    cursor.execute("DELETE FROM seat_holds WHERE hold_id = %s", (hold_id,))
+    release_seats(cursor, row["trip_id"], [row["seat_number"]], _hold_segments(cursor, row))
+    return True
+
+
+def _dict_row(cursor, row) -> Optional[Dict]:
+    if row is None or isinstance(row, dict):
+        return row
+    return dict(zip([c[0] for c in cursor.description], row))
+
+
+class HoldSweeper:
+    """Background thread expiring holds in bulk, driven by a min-heap"""
+
+    # Upper bound on a single sleep
+    idle_seconds = 30
+
+    def __init__(self):
+        self._heap: List[tuple] = []  # (expires_at, hold_id)
+        self._cond = Condition()
+        self._thread: Optional[Thread] = None
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def schedule(self, hold_id: int, expires_at: datetime):
+        with self._cond:
+            heapq.heappush(self._heap, (expires_at, hold_id))
+            if self._heap[0][1] == hold_id:
+                self._cond.notify()  # New earliest expiry: re-arm the sleep
+
+    def _run(self):
+        from app import app, mysql
+
+        with app.app_context():
+            try:
+                self._load_pending(mysql)
+            except Exception:
+                logger.exception("Failed to load pending seat holds")
+
+        while True:
+            with self._cond:
+                now = datetime.now()
+                if self._heap:
+                    wait = (self._heap[0][0] - now).total_seconds()
+                else:
+                    wait = self.idle_seconds
+                if wait > 0:
+                    self._cond.wait(min(wait, self.idle_seconds))
+                    continue
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[1])
+
+            with app.app_context():
+                try:
+                    self._expire(mysql, due)
+                except Exception:
+                    logger.exception("Seat hold sweep failed")
+                    # Retry shortly; rows still present will be swept again
+                    time.sleep(1)
+                    with self._cond:
+                        for hold_id in due:
+                            heapq.heappush(self._heap, (now, hold_id))
+
+    def _load_pending(self, mysql):
+        cursor = mysql.connection.cursor()
+        try:
+            cursor.execute("SELECT hold_id, expires_at FROM seat_holds")
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        with self._cond:
+            for hold_id, expires_at in rows:
+                heapq.heappush(self._heap, (expires_at, hold_id))
+
+    def _expire(self, mysql, hold_ids: List[int]):
+        if not hold_ids:
+            return
+        conn = mysql.connection
+        cursor = conn.cursor(MySQLdb.cursors.DictCursor)
+        placeholders = ", ".join(["%s"] * len(hold_ids))
+        try:
+            # Holds consumed by a booking are already gone and are skipped here
+            cursor.execute(
+                f"""
+                SELECT hold_id, trip_id, seat_number, first_segment, end_segment FROM seat_holds
+                WHERE hold_id IN ({placeholders}) AND expires_at <= %s
+                FOR UPDATE
+                """,
+                (*hold_ids, datetime.now()),
+            )
+            expired = cursor.fetchall()
+            if expired:
+                cursor.execute(
+                    f"DELETE FROM seat_holds WHERE hold_id IN ({', '.join(['%s'] * len(expired))})",
+                    [row["hold_id"] for row in expired],
+                )
+                released = defaultdict(list)
+                for row in expired:
+                    released[(row["trip_id"], _hold_segments(cursor, row))].append(
+                        row["seat_number"]
+                    )
+                for (trip_id, segments), seat_numbers in released.items():
+                    release_seats(cursor, trip_id, seat_numbers, segments)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        if expired:
+            logger.info("Expired %s seat hold(s)", len(expired))
+
+
+# Global sweeper, started from app.py
+hold_sweeper = HoldSweeper()
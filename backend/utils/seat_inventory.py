@@ -0,0 +1,258 @@
+"""
+Per-trip seat inventory (`trip_seats`), per-segment load (`trip_segment_load`)
+and per-segment seats (`trip_segment_seats`).
+
+A seat is only occupied between the passenger's boarding and alighting
+stops. Segment k of a trip is the stretch from the route stop with
+stop_order k to the next stop, and a journey between stop orders a and b
+rides segments min(a, b) <= k < max(a, b). `trip_segment_load` counts the
+passengers (confirmed bookings and active holds) on each segment and
+`trip_segment_seats` records which seat they sit in. A claim succeeds while
+the busiest segment of the journey is below capacity and takes the lowest
+seat in 1..capacity that is free on all of its segments, so a seat freed at
+one stop is sold again for the rest of the trip.
+
+"Seats taken" means passengers on the busiest segment throughout:
+`trip_seats.seats_taken` for the whole trip, and the availability API's
+`booked` for the requested journey (`available` = capacity - `booked`).
+
+Claims lock the trip's `trip_seats` row (serializing claims on one trip only)
+and then use locking reads only, so they see claims committed while they
+waited rather than their transaction's older snapshot. Releases take the
+same lock first. Releases of confirmed bookings (cancel / delete / journey
+change) are handled by the triggers in database/migrations/trip_segment_load.sql.
+
+All helpers run on the caller's cursor and leave commit/rollback to the
+caller, so a claim is undone if the surrounding booking transaction fails.
+"""
+
+from typing import List, Optional, Sequence, Set, Tuple
+
+# (first segment, end segment): stop orders, first <= k < end
+Segments = Tuple[int, int]
+
+
+def _row(row) -> tuple:
+    """Tuple or DictCursor row as a tuple"""
+    return tuple(row.values()) if isinstance(row, dict) else row
+
+
+def ensure_trip_seats(cursor, trip_id: int) -> None:
+    """Create the inventory row for a trip that predates the migration"""
+    cursor.execute(
+        """
+        INSERT IGNORE INTO trip_seats (trip_id, capacity, seats_taken)
+        SELECT t.trip_id,
+               b.capacity,
+               (SELECT COALESCE(MAX(l.passengers), 0) FROM trip_segment_load l
+                WHERE l.trip_id = t.trip_id)
+        FROM trips t
+        JOIN buses b ON t.bus_id = b.bus_id
+        WHERE t.trip_id = %s
+        """,
+        (trip_id,),
+    )
+
+
+def _lock_trip(cursor, trip_id: int) -> Optional[int]:
+    """Lock the trip's inventory row (creating it if needed); its capacity, None if no such trip"""
+    for _ in range(2):
+        cursor.execute(
+            "SELECT capacity FROM trip_seats WHERE trip_id = %s FOR UPDATE",
+            (trip_id,),
+        )
+        row = cursor.fetchone()
+        if row:
+            return int(_row(row)[0])
+        # Trip predates the inventory migration
+        ensure_trip_seats(cursor, trip_id)
+        if cursor.rowcount == 0:
+            return None
+    return None
+
+
+def journey_segments(
+    cursor, trip_id: int, origin_stop_id: int, destination_stop_id: int
+) -> Optional[Segments]:
+    """Segments ridden between two stops of the trip's route; None if a stop is not on it"""
+    cursor.execute(
+        """
+        SELECT LEAST(o.stop_order, d.stop_order) AS first_segment,
+               GREATEST(o.stop_order, d.stop_order) AS end_segment
+        FROM trips t
+        JOIN routes_stops o ON o.route_id = t.route_id AND o.stop_id = %s
+        JOIN routes_stops d ON d.route_id = t.route_id AND d.stop_id = %s
+        WHERE t.trip_id = %s
+        """,
+        (origin_stop_id, destination_stop_id, trip_id),
+    )
+    row = cursor.fetchone()
+    return _row(row) if row else None
+
+
+def route_segments(cursor, trip_id: int) -> Segments:
+    """All segments of the trip's route (a journey from the first to the last stop)"""
+    cursor.execute(
+        """
+        SELECT COALESCE(MIN(rs.stop_order), 0) AS first_segment,
+               COALESCE(MAX(rs.stop_order), 0) AS end_segment
+        FROM trips t
+        JOIN routes_stops rs ON rs.route_id = t.route_id
+        WHERE t.trip_id = %s
+        """,
+        (trip_id,),
+    )
+    return _row(cursor.fetchone())
+
+
+def peak_load(cursor, trip_id: int, segments: Segments) -> int:
+    """Most passengers on any of the segments (locking read: sees the latest claims)"""
+    cursor.execute(
+        """
+        SELECT COALESCE(MAX(passengers), 0) AS peak
+        FROM trip_segment_load
+        WHERE trip_id = %s AND segment_order >= %s AND segment_order < %s
+        FOR UPDATE
+        """,
+        (trip_id, *segments),
+    )
+    return int(_row(cursor.fetchone())[0])
+
+
+def add_segment_load(cursor, trip_id: int, segments: Segments, count: int = 1) -> None:
+    """Range-add `count` passengers (negative to remove) to the segments; not capacity checked"""
+    if count > 0:
+        cursor.execute(
+            """
+            INSERT INTO trip_segment_load (trip_id, segment_order, passengers)
+            SELECT t.trip_id, rs.stop_order, %s
+            FROM trips t
+            JOIN routes_stops rs ON rs.route_id = t.route_id
+            WHERE t.trip_id = %s AND rs.stop_order >= %s AND rs.stop_order < %s
+            ON DUPLICATE KEY UPDATE passengers = passengers + VALUES(passengers)
+            """,
+            (count, trip_id, *segments),
+        )
+    elif count < 0:
+        cursor.execute(
+            """
+            UPDATE trip_segment_load
+            SET passengers = GREATEST(passengers - %s, 0)
+            WHERE trip_id = %s AND segment_order >= %s AND segment_order < %s
+            """,
+            (-count, trip_id, *segments),
+        )
+
+
+def taken_seats(cursor, trip_id: int, segments: Segments) -> Set[int]:
+    """Seats occupied on any of the segments (locking read)"""
+    cursor.execute(
+        """
+        SELECT seat_number FROM trip_segment_seats
+        WHERE trip_id = %s AND segment_order >= %s AND segment_order < %s
+        FOR UPDATE
+        """,
+        (trip_id, *segments),
+    )
+    return {int(_row(row)[0]) for row in cursor.fetchall()}
+
+
+def _sync_seats_taken(cursor, trip_id: int) -> None:
+    cursor.execute(
+        """
+        UPDATE trip_seats
+        SET seats_taken = (
+            SELECT COALESCE(MAX(passengers), 0) FROM trip_segment_load WHERE trip_id = %s
+        )
+        WHERE trip_id = %s
+        """,
+        (trip_id, trip_id),
+    )
+
+
+def occupy_seats(
+    cursor, trip_id: int, seat_numbers: Sequence[int], segments: Segments
+) -> None:
+    """Put passengers in the given seats on the segments; not capacity checked"""
+    add_segment_load(cursor, trip_id, segments, len(seat_numbers))
+    for seat_number in seat_numbers:
+        # IGNORE: an admin booking may share a seat that is already taken
+        cursor.execute(
+            """
+            INSERT IGNORE INTO trip_segment_seats (trip_id, seat_number, segment_order)
+            SELECT t.trip_id, %s, rs.stop_order
+            FROM trips t
+            JOIN routes_stops rs ON rs.route_id = t.route_id
+            WHERE t.trip_id = %s AND rs.stop_order >= %s AND rs.stop_order < %s
+            """,
+            (seat_number, trip_id, *segments),
+        )
+    _sync_seats_taken(cursor, trip_id)
+
+
+def claim_seats(
+    cursor, trip_id: int, count: int = 1, segments: Optional[Segments] = None
+) -> Optional[List[int]]:
+    """
+    Atomically reserve `count` seats on a trip for the journey `segments`
+    (default: the whole route).
+
+    Returns the claimed seat numbers (the lowest free on every segment of
+    the journey, all <= capacity), or None if some segment of the journey
+    does not have `count` free seats.
+    """
+    if count < 1:
+        raise ValueError("count must be >= 1")
+    if segments is None:
+        segments = route_segments(cursor, trip_id)
+
+    # Lock the inventory row: claims on this trip queue here, other trips are unaffected
+    capacity = _lock_trip(cursor, trip_id)
+    if capacity is None:
+        return None
+
+    if peak_load(cursor, trip_id, segments) + count > capacity:
+        return None
+    taken = taken_seats(cursor, trip_id, segments)
+    seats = [seat for seat in range(1, capacity + 1) if seat not in taken][:count]
+    if len(seats) < count:
+        return None
+    occupy_seats(cursor, trip_id, seats, segments)
+    return seats
+
+
+def record_assigned_seat(
+    cursor, trip_id: int, seat_number: int, segments: Optional[Segments] = None
+) -> None:
+    """
+    Account for a confirmed booking inserted with an explicit seat (admin
+    bookings). Not capacity checked: admins may deliberately overbook.
+    Call after inserting the booking.
+    """
+    if _lock_trip(cursor, trip_id) is None or segments is None:
+        return
+    occupy_seats(cursor, trip_id, [seat_number], segments)
+
+
+def release_seats(
+    cursor,
+    trip_id: int,
+    seat_numbers: Sequence[int],
+    segments: Optional[Segments] = None,
+) -> None:
+    """Give back seats claimed with `claim_seats` that were never booked"""
+    if not seat_numbers:
+        return
+    if segments is None:
+        segments = route_segments(cursor, trip_id)
+    _lock_trip(cursor, trip_id)
+    add_segment_load(cursor, trip_id, segments, -len(seat_numbers))
+    cursor.execute(
+        f"""
+        DELETE FROM trip_segment_seats
+        WHERE trip_id = %s AND segment_order >= %s AND segment_order < %s
+          AND seat_number IN ({", ".join(["%s"] * len(seat_numbers))})
+        """,
+        (trip_id, *segments, *seat_numbers),
+    )
+    _sync_seats_taken(cursor, trip_id)
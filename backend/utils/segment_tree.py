@@ -0,0 +1,80 @@
+"""
+Segment tree with lazy propagation: range add and range max in O(log n).
+
+Used for per-trip passenger load over stop segments (utils/trip_loads.py). A
+booking adds 1 to every segment it rides; seats are available for a
+journey when capacity - max(load over its segments) > 0.
+"""
+
+from typing import List, Sequence
+
+
+class SegmentTree:
+    def __init__(self, size: int, values: Sequence[int] = ()):
+        self.size = size
+        self._max = [0] * (4 * max(size, 1))
+        self._pending = [0] * (4 * max(size, 1))
+        if values:
+            if len(values) != size:
+                raise ValueError("values must have `size` items")
+            self._build(1, 0, size - 1, values)
+
+    def _build(self, node: int, lo: int, hi: int, values: Sequence[int]):
+        if lo == hi:
+            self._max[node] = values[lo]
+            return
+        mid = (lo + hi) // 2
+        self._build(2 * node, lo, mid, values)
+        self._build(2 * node + 1, mid + 1, hi, values)
+        self._max[node] = max(self._max[2 * node], self._max[2 * node + 1])
+
+    def _push(self, node: int):
+        pending = self._pending[node]
+        if pending:
+            for child in (2 * node, 2 * node + 1):
+                self._max[child] += pending
+                self._pending[child] += pending
+            self._pending[node] = 0
+
+    def add(self, start: int, end: int, delta: int):
+        """Add `delta` to positions start <= i < end"""
+        if start < end:
+            self._add(1, 0, self.size - 1, max(start, 0), min(end, self.size) - 1, delta)
+
+    def _add(self, node: int, lo: int, hi: int, start: int, end: int, delta: int):
+        if end < lo or hi < start:
+            return
+        if start <= lo and hi <= end:
+            self._max[node] += delta
+            self._pending[node] += delta
+            return
+        self._push(node)
+        mid = (lo + hi) // 2
+        self._add(2 * node, lo, mid, start, end, delta)
+        self._add(2 * node + 1, mid + 1, hi, start, end, delta)
+        self._max[node] = max(self._max[2 * node], self._max[2 * node + 1])
+
+    def max(self, start: int = 0, end: int = None) -> int:
+        """Largest value at positions start <= i < end (0 for an empty range)"""
+        end = self.size if end is None else min(end, self.size)
+        start = max(start, 0)
+        if start >= end:
+            return 0
+        return self._query(1, 0, self.size - 1, start, end - 1)
+
+    def _query(self, node: int, lo: int, hi: int, start: int, end: int) -> int:
+        if start <= lo and hi <= end:
+            return self._max[node]
+        self._push(node)
+        mid = (lo + hi) // 2
+        if end <= mid:
+            return self._query(2 * node, lo, mid, start, end)
+        if start > mid:
+            return self._query(2 * node + 1, mid + 1, hi, start, end)
+        return max(
+            self._query(2 * node, lo, mid, start, end),
+            self._query(2 * node + 1, mid + 1, hi, start, end),
+        )
+
+    def values(self) -> List[int]:
+        return [self.max(i, i + 1) for i in range(self.size)]
@@ -0,0 +1,168 @@
+"""
+Mergeable probabilistic sketches for approximate report metrics.
+
+- `HyperLogLog`   : distinct count (unique passengers / trips), ~1.6% error
+                    at the default precision, merge = register-wise max
+- `CountMinSketch`: frequency estimates that never undercount, merge = add
+- `TopK`          : heavy hitters (popular routes / services / users), a
+                    Count-Min sketch plus the current top candidates
+
+All three merge exactly as if the inputs had been added to one sketch, so
+per-day sketches combine into any date range without rescanning rows. Items
+are hashed with BLAKE2b (stable across processes, unlike `hash()`), and every
+sketch round-trips through `to_dict()` / `from_dict()` for persistence.
+"""
+
+import base64
+import hashlib
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def _hash64(item: Any) -> int:
+    digest = hashlib.blake2b(str(item).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _hash_pair(item: Any) -> Tuple[int, int]:
+    digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, item: Any):
+        h = _hash64(item)
+        index = h >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        rest = h & ((1 << rest_bits) - 1)
+        # Position of the first 1-bit in the remaining bits
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, items: Iterable[Any]):
+        for item in items:
+            self.add(item)
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "p": self.precision,
+            "r": base64.b64encode(bytes(self.registers)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HyperLogLog":
+        sketch = cls(data["p"])
+        sketch.registers = bytearray(base64.b64decode(data["r"]))
+        return sketch
+
+
+class CountMinSketch:
+    def __init__(self, width: int = 1024, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = [array("I", bytes(4 * width)) for _ in range(depth)]
+        self.total = 0
+
+    def _columns(self, item: Any) -> List[int]:
+        h1, h2 = _hash_pair(item)
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item: Any, count: int = 1):
+        for row, column in zip(self.table, self._columns(item)):
+            row[column] += count
+        self.total += count
+
+    def estimate(self, item: Any) -> int:
+        return min(row[column] for row, column in zip(self.table, self._columns(item)))
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge Count-Min sketches of different shape")
+        for row, other_row in zip(self.table, other.table):
+            for i, value in enumerate(other_row):
+                if value:
+                    row[i] += value
+        self.total += other.total
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "w": self.width,
+            "d": self.depth,
+            "n": self.total,
+            "t": [base64.b64encode(row.tobytes()).decode("ascii") for row in self.table],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CountMinSketch":
+        sketch = cls(data["w"], data["d"])
+        for row, encoded in zip(sketch.table, data["t"]):
+            row[:] = array("I", base64.b64decode(encoded))
+        sketch.total = data["n"]
+        return sketch
+
+
+class TopK:
+    """Approximate top-k items by count (Count-Min estimates + candidate set)"""
+
+    def __init__(self, k: int = 20, width: int = 1024, depth: int = 4):
+        self.k = k
+        self.counts = CountMinSketch(width, depth)
+        self.candidates: Dict[str, int] = {}
+
+    def add(self, item: Any, count: int = 1):
+        key = str(item)
+        self.counts.add(key, count)
+        self.candidates[key] = self.counts.estimate(key)
+        if len(self.candidates) > 2 * self.k:
+            self._prune()
+
+    def _prune(self):
+        ranked = sorted(self.candidates.items(), key=lambda kv: (-kv[1], kv[0]))
+        self.candidates = dict(ranked[: self.k])
+
+    def merge(self, other: "TopK") -> "TopK":
+        self.counts.merge(other.counts)
+        keys = set(self.candidates) | set(other.candidates)
+        self.candidates = {key: self.counts.estimate(key) for key in keys}
+        self._prune()
+        return self
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """[(item, estimated count), ...] highest first"""
+        ranked = sorted(self.candidates.items(), key=lambda kv: (-kv[1], kv[0]))
+        return ranked[: n or self.k]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "cms": self.counts.to_dict(), "c": self.candidates}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TopK":
+        sketch = cls(data["k"])
+        sketch.counts = CountMinSketch.from_dict(data["cms"])
+        sketch.candidates = dict(data["c"])
+        return sketch
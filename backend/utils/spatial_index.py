@@ -0,0 +1,81 @@
+"""
+Uniform grid over stop coordinates for radius and nearest-stop queries.
+
+`idx_stops_lat_lng` is a B-tree on (latitude, longitude): it can bound the
+latitude but still walks every stop in that band. Here stops are bucketed
+into square cells of `cell_meters` (lat/lon projected to metres around the
+network's mean latitude, accurate to well under 1% across a city). A radius
+query only visits the cells overlapping the circle and checks the exact
+haversine distance of the stops in them.
+
+Used by the route topology (GET /api/stops/nearby) and by the journey planner
+to find walking transfers.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.geo import calculate_distance
+
+METERS_PER_DEGREE = 111_320
+
+
+class StopGrid:
+    def __init__(self, coords: Dict[int, Tuple[float, float]], cell_meters: float = 250):
+        """`coords` is {stop_id: (latitude, longitude)}"""
+        self.cell_meters = cell_meters
+        self.coords = dict(coords)
+        mean_lat = (
+            sum(lat for lat, _ in self.coords.values()) / len(self.coords) if self.coords else 0.0
+        )
+        self._lon_scale = max(math.cos(math.radians(mean_lat)), 0.01)
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for stop_id, (lat, lon) in self.coords.items():
+            self._cells.setdefault(self._cell(lat, lon), []).append(stop_id)
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (
+            int(math.floor(lat * METERS_PER_DEGREE / self.cell_meters)),
+            int(math.floor(lon * METERS_PER_DEGREE * self._lon_scale / self.cell_meters)),
+        )
+
+    def within(
+        self,
+        lat: float,
+        lon: float,
+        radius_meters: float,
+        stop_ids: Optional[Iterable[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        [(stop_id, metres), ...] nearest first for the stops within the
+        radius; `stop_ids` restricts the candidates (e.g. one route's stops).
+        """
+        allowed = set(stop_ids) if stop_ids is not None else None
+        reach = int(math.ceil(radius_meters / self.cell_meters))
+        cy, cx = self._cell(lat, lon)
+        found = []
+        for dy in range(-reach, reach + 1):
+            for dx in range(-reach, reach + 1):
+                for stop_id in self._cells.get((cy + dy, cx + dx), ()):
+                    if allowed is not None and stop_id not in allowed:
+                        continue
+                    slat, slon = self.coords[stop_id]
+                    meters = calculate_distance(lat, lon, slat, slon) * 1000
+                    if meters <= radius_meters:
+                        found.append((stop_id, meters))
+        found.sort(key=lambda item: (item[1], item[0]))
+        return found
+
+    def neighbours(self, radius_meters: float) -> Dict[int, List[Tuple[int, float]]]:
+        """{stop_id: [(other stop_id, metres), ...]} for every pair of stops within the radius"""
+        pairs: Dict[int, List[Tuple[int, float]]] = {}
+        for stop_id, (lat, lon) in self.coords.items():
+            pairs[stop_id] = [
+                (other, meters)
+                for other, meters in self.within(lat, lon, radius_meters)
+                if other != stop_id
+            ]
+        return pairs
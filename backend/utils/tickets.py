@@ -0,0 +1,256 @@
+"""
+Ticket codes and signed ticket tokens.
+
+A ticket code is `TICKET-<booking_id>-<tag>` where `tag` is the first 16 hex
+characters (upper case) of HMAC-SHA256(key, str(booking_id)). The stored
+procedure computes the same code with `fn_hmac_sha256`, so the ticket is
+issued inside the booking transaction and never needs a uniqueness re-check.
+
+Ticket tokens are the offline-verifiable form used at boarding gates:
+`<payload>.<tag>` (both base64url), where the payload carries
+`v1|booking_id|trip_id|origin_stop_id|destination_stop_id|expires_unix` and the
+tag is a truncated HMAC-SHA256 over it. Gates verify them in memory, with no
+database read.
+
+A signature stays valid after its booking is cancelled, so verification also
+checks `ticket_revocations`: the ids of cancelled bookings whose tokens have
+not expired yet. The set is reloaded from bookings.status every
+`TICKET_REVOCATION_REFRESH_SECONDS` and updated at once by the admin cancel /
+delete path.
+
+The key is SHA-256 of `TICKET_SECRET` (falls back to the Flask secret key).
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Any, Container, Dict, Iterable, Optional, Set
+
+from utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+TAG_LENGTH = 16
+
+_CODE_RE = re.compile(r"^TICKET-(\d+)-([0-9A-F]{%d})$" % TAG_LENGTH)
+
+
+def ticket_key() -> bytes:
+    """32-byte HMAC key shared with sp_create_passenger_booking_with_payment"""
+    secret = os.getenv("TICKET_SECRET")
+    if not secret:
+        from flask import current_app
+
+        secret = current_app.secret_key or ""
+    return hashlib.sha256(secret.encode("utf-8")).digest()
+
+
+def _tag(booking_id: int, key: bytes) -> str:
+    digest = hmac.new(key, str(booking_id).encode("ascii"), hashlib.sha256)
+    return digest.hexdigest()[:TAG_LENGTH].upper()
+
+
+def ticket_code(booking_id: int, key: Optional[bytes] = None) -> str:
+    """Ticket/QR code for a booking"""
+    return f"TICKET-{booking_id}-{_tag(booking_id, key or ticket_key())}"
+
+
+def verify_ticket_code(code: str, key: Optional[bytes] = None) -> Optional[int]:
+    """Return the booking_id if `code` was issued with this key, else None"""
+    match = _CODE_RE.match((code or "").strip())
+    if not match:
+        return None
+    booking_id = int(match.group(1))
+    expected = _tag(booking_id, key or ticket_key())
+    if not hmac.compare_digest(expected, match.group(2)):
+        return None
+    return booking_id
+
+
+# ---------- Signed ticket tokens ----------
+
+TOKEN_VERSION = "v1"
+TOKEN_TAG_BYTES = 16
+# Tokens stay valid this long after the trip's scheduled departure
+TOKEN_GRACE_HOURS = int(os.getenv("TICKET_TOKEN_GRACE_HOURS", "6"))
+REVOCATION_REFRESH_SECONDS = int(os.getenv("TICKET_REVOCATION_REFRESH_SECONDS", "30"))
+
+
+class TicketTokenError(ValueError):
+    """Token rejected; `reason` is one of malformed / bad_signature / expired / revoked"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _token_tag(payload: bytes, key: bytes) -> bytes:
+    return hmac.new(key, payload, hashlib.sha256).digest()[:TOKEN_TAG_BYTES]
+
+
+def token_expiry(departure_time: Optional[datetime]) -> datetime:
+    """Expiry for a ticket on a trip departing at `departure_time`"""
+    return (departure_time or datetime.now()) + timedelta(hours=TOKEN_GRACE_HOURS)
+
+
+def sign_ticket_token(
+    booking_id: int,
+    trip_id: int,
+    origin_stop_id: int,
+    destination_stop_id: int,
+    expires_at: datetime,
+    key: Optional[bytes] = None,
+) -> str:
+    """Compact signed token carrying the ticket's journey"""
+    payload = "|".join(
+        str(v)
+        for v in (
+            TOKEN_VERSION,
+            booking_id,
+            trip_id,
+            origin_stop_id,
+            destination_stop_id,
+            int(expires_at.timestamp()),
+        )
+    ).encode("ascii")
+    return f"{_b64encode(payload)}.{_b64encode(_token_tag(payload, key or ticket_key()))}"
+
+
+def verify_ticket_token(
+    token: str,
+    key: Optional[bytes] = None,
+    now: Optional[float] = None,
+    revoked: Optional[Container[int]] = None,
+) -> Dict[str, Any]:
+    """
+    Verify a ticket token in memory; `revoked` holds cancelled booking ids.
+    Returns its claims; raises TicketTokenError when it is invalid.
+    """
+    try:
+        payload_part, tag_part = (token or "").strip().split(".")
+        payload = _b64decode(payload_part)
+        tag = _b64decode(tag_part)
+    except (ValueError, TypeError):
+        raise TicketTokenError("malformed")
+
+    if not hmac.compare_digest(tag, _token_tag(payload, key or ticket_key())):
+        raise TicketTokenError("bad_signature")
+
+    try:
+        version, booking_id, trip_id, origin, destination, expires = payload.decode(
+            "ascii"
+        ).split("|")
+        if version != TOKEN_VERSION:
+            raise ValueError(version)
+        claims = {
+            "booking_id": int(booking_id),
+            "trip_id": int(trip_id),
+            "origin_stop_id": int(origin),
+            "destination_stop_id": int(destination),
+            "expires_at": int(expires),
+        }
+    except ValueError:
+        raise TicketTokenError("malformed")
+
+    if claims["expires_at"] <= (time.time() if now is None else now):
+        raise TicketTokenError("expired")
+    if revoked is not None and claims["booking_id"] in revoked:
+        raise TicketTokenError("revoked")
+    return claims
+
+
+# ---------- Revocation ----------
+
+
+class TicketRevocations:
+    """Ids of cancelled (or deleted) bookings whose tokens may still be presented"""
+
+    def __init__(self, refresh_seconds: int = REVOCATION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = Lock()
+        self._ids: Set[int] = set()
+        # Deleted bookings leave no row to reload them from
+        self._deleted: Set[int] = set()
+        # Revoked while a reload was reading (it may predate their commit)
+        self._pending: Set[int] = set()
+        self._wake = Event()
+        self._thread: Optional[Thread] = None
+
+    def __contains__(self, booking_id: int) -> bool:
+        with self._lock:
+            return booking_id in self._ids
+
+    def revoke(self, booking_id: int, deleted: bool = False):
+        """Cancel path: reject the booking's tokens from now on"""
+        with self._lock:
+            self._ids.add(booking_id)
+            self._pending.add(booking_id)
+            if deleted:
+                self._deleted.add(booking_id)
+
+    def restore(self, booking_id: int):
+        """Booking confirmed again"""
+        with self._lock:
+            self._ids.discard(booking_id)
+
+    def load(self, booking_ids: Iterable[int]):
+        """Replace the set with the cancelled bookings read from the database"""
+        ids = set(booking_ids)
+        with self._lock:
+            self._ids = ids | self._deleted | self._pending
+            self._pending = set()
+
+    def refresh(self, conn):
+        # Tokens expire TOKEN_GRACE_HOURS after departure, so older trips can be skipped
+        with self._lock:
+            self._pending = set()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT b.booking_id
+                FROM bookings b
+                JOIN trips t ON t.trip_id = b.trip_id
+                WHERE b.status = 'cancelled' AND t.departure_time >= %s
+                """,
+                (datetime.now() - timedelta(hours=TOKEN_GRACE_HOURS),),
+            )
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        self.load(row[0] for row in rows)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        from app import app, mysql
+
+        while True:
+            with app.app_context():
+                try:
+                    self.refresh(mysql.connection)
+                except Exception:
+                    logger.exception("Ticket revocation refresh failed")
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+
+
+# Global revocation set, refreshed from app.py
+ticket_revocations = TicketRevocations()
@@ -0,0 +1,122 @@
+"""
+Per-trip segment load trees for seat availability reads.
+
+Each cached trip holds a `SegmentTree` over its route's segments, built from
+`trip_segment_load` (utils/seat_inventory.py). Availability for a journey is
+capacity - max(load over the journey's segments), an O(log n) range-max.
+Bookings and holds made by this process range-add into the cached tree after
+they commit. Changes from other processes (and cancellations, which the
+triggers apply) show up when the entry expires after
+`SEGMENT_LOAD_CACHE_SECONDS`.
+
+Reads only: claims are always checked against the table under the trip's
+row lock, so a stale tree can show a seat that the booking then refuses.
+"""
+
+import os
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.segment_tree import SegmentTree
+
+CACHE_SECONDS = float(os.getenv("SEGMENT_LOAD_CACHE_SECONDS", "2"))
+
+
+class _TripLoad:
+    def __init__(self, stop_orders: Sequence[int], loads: Dict[int, int]):
+        # Segment i starts at stop_orders[i]; the last stop starts none
+        self.segment_orders = list(stop_orders[:-1])
+        self.tree = SegmentTree(
+            len(self.segment_orders), [loads.get(o, 0) for o in self.segment_orders]
+        )
+        self.loaded_at = time.monotonic()
+
+    def positions(self, segments: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+        if segments is None:
+            return 0, len(self.segment_orders)
+        return (
+            bisect_left(self.segment_orders, segments[0]),
+            bisect_left(self.segment_orders, segments[1]),
+        )
+
+
+class TripLoads:
+    def __init__(self, ttl_seconds: float = CACHE_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self._trips: Dict[int, _TripLoad] = {}
+
+    def _fresh(self, trip_id: int, stop_orders: Sequence[int]) -> bool:
+        entry = self._trips.get(trip_id)
+        return (
+            entry is not None
+            and time.monotonic() - entry.loaded_at < self.ttl_seconds
+            and len(entry.segment_orders) == max(len(stop_orders) - 1, 0)
+        )
+
+    def peak_loads(
+        self,
+        cursor,
+        stop_orders: Dict[int, List[int]],
+        segments: Optional[Tuple[int, int]] = None,
+    ) -> Dict[int, int]:
+        """
+        {trip_id: most passengers on any segment of the journey} for the
+        trips in `stop_orders` ({trip_id: its route's stop orders, ascending}).
+        `segments` = (first, end) stop orders; None = the whole route. Trips
+        that are not cached are loaded with one query on `cursor`.
+        """
+        with self._lock:
+            entries = {
+                t: self._trips[t] for t, orders in stop_orders.items() if self._fresh(t, orders)
+            }
+        missing = [t for t in stop_orders if t not in entries]
+        if missing:
+            cursor.execute(
+                f"""
+                SELECT trip_id, segment_order, passengers
+                FROM trip_segment_load
+                WHERE trip_id IN ({", ".join(["%s"] * len(missing))})
+                """,
+                missing,
+            )
+            loads: Dict[int, Dict[int, int]] = {t: {} for t in missing}
+            for row in cursor.fetchall():
+                trip_id, segment_order, passengers = row.values() if isinstance(row, dict) else row
+                loads[trip_id][segment_order] = passengers
+            built = {t: _TripLoad(stop_orders[t], loads[t]) for t in missing}
+            entries.update(built)
+            with self._lock:
+                self._trips.update(built)
+                self._evict()
+
+        # Tree reads push pending adds down, so they share the lock with add()
+        with self._lock:
+            return {
+                trip_id: entry.tree.max(*entry.positions(segments))
+                for trip_id, entry in entries.items()
+            }
+
+    def add(self, trip_id: int, segments: Tuple[int, int], count: int = 1):
+        """Range-add a committed booking / hold (negative count: release) to a cached trip"""
+        with self._lock:
+            entry = self._trips.get(trip_id)
+            if entry is not None:
+                entry.tree.add(*entry.positions(segments), count)
+
+    def invalidate(self, trip_id: int):
+        with self._lock:
+            self._trips.pop(trip_id, None)
+
+    def _evict(self):
+        now = time.monotonic()
+        if len(self._trips) > 5000:
+            self._trips = {
+                t: e for t, e in self._trips.items() if now - e.loaded_at < self.ttl_seconds
+            }
+
+
+# Global cache shared by the passenger endpoints
+trip_loads = TripLoads()
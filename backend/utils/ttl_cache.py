@@ -0,0 +1,105 @@
+"""
+Keyed TTL cache for expensive read-only results (admin report payloads).
+
+`get_or_compute(key, fn)` returns the cached value while it is fresh.
+On a miss only one caller runs `fn` for a given key; concurrent callers for
+the same key wait for that result instead of all hitting the database at
+once (stampede protection). If `fn` raises, the waiters get the same
+exception and nothing is cached. `invalidate()` drops everything; the admin
+blueprint calls it after writes. Hit / miss counters are kept for `stats()`.
+
+Expired entries are dropped on insert, and at most `max_entries` are kept
+(the oldest go first), so keys that are never asked for again (e.g. one per
+date range) do not pile up.
+"""
+
+import time
+from collections import OrderedDict
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Flight:
+    """One in-progress computation that other callers can wait on"""
+
+    def __init__(self):
+        self.done = Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    def __init__(self, ttl_seconds: float = 15, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = Lock()
+        # Insertion order = expiry order (one TTL for all entries)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            # Results of computations already running are not stored
+            self._generation += 1
+
+    def get_or_compute(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                generation = self._generation
+                self.misses += 1
+            else:
+                self.waits += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                if flight.error is None and generation == self._generation:
+                    self._store(key, flight.value)
+            flight.done.set()
+        return flight.value
+
+    def _store(self, key: Hashable, value: Any):
+        now = time.monotonic()
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self.ttl_seconds, value)
+        # Expired entries sit at the front; then trim to the cap
+        while self._entries:
+            expires_at, _ = next(iter(self._entries.values()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.waits
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,  # Served by another caller's computation
+                "hit_ratio": round((self.hits + self.waits) / lookups, 4) if lookups else None,
+                "ttl_seconds": self.ttl_seconds,
+            }
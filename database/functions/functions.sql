@@ -50,7 +50,8 @@ END$$
 DELIMITER ;
 
 -- =============================================================================
--- Get available seats: bus capacity - confirmed bookings
+-- Get available seats: bus capacity - passengers on the trip's busiest segment
+-- (migrations/trip_segment_load.sql; a seat counts only between boarding and alighting)
 -- NOTE: This function is not used in the system and is for demonstration purposes only
 -- =============================================================================
 DROP FUNCTION IF EXISTS get_available_seats;
@@ -61,7 +62,7 @@ CREATE FUNCTION get_available_seats(p_trip_id INT)
 RETURNS INT
 DETERMINISTIC
 READS SQL DATA
-COMMENT 'Returns available seats: capacity - confirmed bookings'
+COMMENT 'Returns available seats: capacity - peak segment load'
 BEGIN
     DECLARE v_capacity INT DEFAULT 0;
     DECLARE v_booked_seats INT DEFAULT 0;
@@ -72,9 +73,9 @@ BEGIN
     JOIN buses b ON t.bus_id = b.bus_id
     WHERE t.trip_id = p_trip_id;
 
-    SELECT COUNT(*) INTO v_booked_seats
-    FROM bookings
-    WHERE trip_id = p_trip_id AND status = 'confirmed';
+    SELECT COALESCE(MAX(passengers), 0) INTO v_booked_seats
+    FROM trip_segment_load
+    WHERE trip_id = p_trip_id;
 
     SET v_available = v_capacity - v_booked_seats;
 
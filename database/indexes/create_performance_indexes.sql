@@ -45,8 +45,10 @@ CREATE INDEX idx_trips_route_departure_status ON trips(route_id, departure_time,
 -- "Find all running trips for a specific route"
 CREATE INDEX idx_trips_status_route ON trips(status, route_id);
 
--- Date-based trip lookups (used in daily trip generation check)
-CREATE INDEX idx_trips_departure_date ON trips(DATE(departure_time));
+-- Date-based trip lookups (daily trip generation / clearing) filter with a
+-- half-open range on departure_time, served by idx_trips_departure_time and
+-- idx_trips_route_departure_status above. Grouping by day uses the generated
+-- trips.departure_day column (database/migrations/date_columns.sql).
 
 
 -- ============================================================================
@@ -159,11 +161,12 @@ CREATE INDEX idx_drivers_name ON drivers(full_name);
 CREATE INDEX idx_assignments_driver_id ON drivers_assignments(driver_id);
 CREATE INDEX idx_assignments_bus_id ON drivers_assignments(bus_id);
 
--- Date-based queries (find current assignments)
-CREATE INDEX idx_assignments_date ON drivers_assignments(DATE(start_time));
+-- Date-based queries (find current assignments) use a half-open range on
+-- start_time, served by idx_assignments_start_time below
 
 -- Composite index: "Find driver assigned to bus X on date Y"
-CREATE INDEX idx_assignments_bus_date ON drivers_assignments(bus_id, DATE(start_time));
+-- (bus_id = X AND start_time >= Y AND start_time < Y + INTERVAL 1 DAY)
+CREATE INDEX idx_assignments_bus_start ON drivers_assignments(bus_id, start_time);
 
 
 -- ============================================================================
@@ -217,3 +220,16 @@ SELECT
 FROM information_schema.STATISTICS
 WHERE TABLE_SCHEMA = 'ksts_db'
 ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX;
+
+
+-- ============================================================================
+-- KEYSET PAGINATION INDEXES (admin list endpoints, backend/utils/pagination.py)
+-- ============================================================================
+
+-- Admin driver assignments: ORDER BY start_time DESC, driver_id DESC, bus_id DESC
+-- (the primary key columns ride along in the secondary index)
+CREATE INDEX idx_assignments_start_time ON drivers_assignments(start_time);
+
+-- Admin trips (ORDER BY departure_time DESC, trip_id DESC) uses idx_trips_departure_time,
+-- admin bookings (ORDER BY booking_date DESC, booking_id DESC) uses idx_bookings_date and
+-- admin route-stops (route_id, stop_order) uses the ux_route_stop_order unique key.
@@ -138,6 +138,8 @@ create table trips (
     arrival_time datetime,
     origin_trip_id int null, -- Links return trips to their originating trip; prevents return trips from generating their own returns; used in backend/bus_tracker.py for bidirectional trip management
     status enum('scheduled', 'running', 'completed', 'cancelled') not null default 'scheduled',
+    departure_day date generated always as (date(departure_time)) virtual, -- Day of departure for grouping; filter on departure_time ranges (see database/migrations/date_columns.sql)
+    index idx_trips_departure_day (departure_day),
     
     constraint ux_trips_bus_route_departure unique (bus_id, route_id, departure_time), -- Prevent duplicate same bus on same route at same time
 
@@ -161,6 +163,8 @@ create table bookings (
     destination_stop_id int not null,
     booking_date datetime default current_timestamp, -- Timestamp when booking was created
     status enum('confirmed', 'cancelled') default 'confirmed', -- Booking status; confirmed allows travel (counts toward seat usage), cancelled prevents it (frees seats); see backend/routes/passenger.py lines 150, 435
+    booking_day date generated always as (date(booking_date)) virtual, -- Day of booking for per-day reports (see database/migrations/date_columns.sql)
+    index idx_bookings_day (booking_day),
 
     constraint fk_booking_user
 		foreign key (user_id) references users(user_id)
@@ -186,6 +190,8 @@ create table payments (
     status enum('pending', 'paid', 'failed') default 'pending',
     transaction_reference varchar(100) null,  -- Payment gateway transaction ID; used in backend/routes/passenger.py for payment processing
     card_last_four char(4) null,              -- Last 4 digits of card (PCI compliant); used in backend/routes/passenger.py for secure card reference
+    payment_day date generated always as (date(payment_date)) virtual, -- Day of payment for per-day reports (see database/migrations/date_columns.sql)
+    index idx_payments_day (payment_day),
 
     constraint ux_booking_payment unique (booking_id), -- One payment per booking
 
@@ -208,6 +214,126 @@ create table tickets (
         on update cascade
 );
 
+-- Per-trip seat inventory; claims lock this row (see database/migrations/trip_seat_inventory.sql, backend/utils/seat_inventory.py)
+create table trip_seats (
+    trip_id int primary key,
+    capacity int not null,              -- Copied from buses.capacity when the trip is created
+    seats_taken int not null default 0, -- Passengers on the trip's busiest segment (MAX of trip_segment_load.passengers)
+
+    constraint fk_trip_seats_trip
+        foreign key (trip_id) references trips(trip_id)
+        on delete cascade
+        on update cascade
+);
+
+-- Passengers per stop segment of a trip (segment = stop_order it starts at); seats are reused after alighting (see database/migrations/trip_segment_load.sql, backend/utils/seat_inventory.py)
+create table trip_segment_load (
+    trip_id int not null,
+    segment_order int not null,         -- stop_order of the stop the segment starts at
+    passengers int not null default 0,  -- Confirmed bookings and active holds riding the segment
+    primary key (trip_id, segment_order),
+
+    constraint fk_trip_segment_load_trip
+        foreign key (trip_id) references trips(trip_id)
+        on delete cascade
+        on update cascade
+);
+
+-- Seat occupied on each stop segment of a trip; claims take the lowest seat free on all of the journey's segments
+create table trip_segment_seats (
+    trip_id int not null,
+    seat_number int not null,
+    segment_order int not null,         -- stop_order of the stop the segment starts at
+    primary key (trip_id, seat_number, segment_order),
+
+    constraint fk_trip_segment_seats_trip
+        foreign key (trip_id) references trips(trip_id)
+        on delete cascade
+        on update cascade
+);
+
+-- Short-lived seat reservations while a passenger pays (see database/migrations/seat_holds.sql, backend/utils/seat_holds.py)
+create table seat_holds (
+    hold_id int auto_increment primary key,
+    trip_id int not null,
+    user_id int not null,
+    seat_number int not null,           -- Seat claimed for this hold (free on its segments)
+    first_segment int null,             -- Held journey: segments first_segment <= k < end_segment (NULL = whole route)
+    end_segment int null,
+    expires_at datetime not null,       -- Expired holds are swept by the backend and their seats released
+    created_at datetime default current_timestamp,
+
+    index idx_seat_holds_trip_expires (trip_id, expires_at),
+    index idx_seat_holds_expires (expires_at),
+
+    constraint fk_seat_holds_trip
+        foreign key (trip_id) references trips(trip_id)
+        on delete cascade
+        on update cascade,
+    constraint fk_seat_holds_user
+        foreign key (user_id) references users(user_id)
+        on delete cascade
+        on update cascade
+);
+
+-- Hourly report rollups, kept current by the backend compactor (see database/migrations/report_rollups.sql, backend/utils/report_rollups.py)
+create table rollup_booking_hourly (
+    bucket_hour datetime not null,          -- booking_date truncated to the hour
+    route_id int not null,
+    status varchar(20) not null,            -- Booking status
+    bookings int not null default 0,
+    paid_revenue bigint not null default 0, -- Sum of 'paid' payment amounts of these bookings
+    primary key (bucket_hour, route_id, status)
+);
+
+create table rollup_payment_hourly (
+    bucket_hour datetime not null,          -- payment_date truncated to the hour
+    method varchar(20) not null,
+    status varchar(20) not null,
+    payments int not null default 0,
+    amount bigint not null default 0,
+    primary key (bucket_hour, method, status)
+);
+
+create table rollup_trip_hourly (
+    bucket_hour datetime not null,          -- departure_time truncated to the hour
+    route_id int not null,
+    bus_id int not null,
+    status varchar(20) not null,
+    trips int not null default 0,
+    bookings int not null default 0,        -- Bookings (any status) on these trips
+    primary key (bucket_hour, route_id, bus_id, status),
+    index idx_rollup_trip_bus (bus_id, bucket_hour)
+);
+
+create table rollup_dirty_hours (
+    kind enum('booking', 'payment', 'trip') not null, -- Rollup to re-derive for this hour (marked by update/delete triggers)
+    bucket_hour datetime not null,
+    primary key (kind, bucket_hour)
+);
+
+create table rollup_watermarks (
+    source varchar(20) primary key,         -- 'bookings' | 'payments' | 'trips'
+    last_id int not null default 0,         -- Highest id already folded into the rollups
+    updated_at datetime default current_timestamp on update current_timestamp
+);
+
+-- Per-day booking sketches for approximate analytics (see database/migrations/booking_sketches.sql, backend/utils/booking_sketches.py)
+create table booking_sketches (
+    day date primary key,                   -- Booking day
+    bookings int not null default 0,        -- Exact number of bookings folded in
+    payload mediumblob not null,            -- zlib-compressed JSON sketches
+    updated_at datetime default current_timestamp on update current_timestamp
+);
+
+create table booking_sketch_watermark (
+    id tinyint primary key,                 -- Always 1
+    last_id int not null default 0,         -- Highest booking_id already folded into the sketches
+    updated_at datetime default current_timestamp on update current_timestamp
+);
+
+insert into booking_sketch_watermark (id, last_id) values (1, 0);
+
 ----------------------------------------------------------------------------------------------------
 
 show tables;
@@ -0,0 +1,44 @@
+USE ksts_db;
+
+-- ============================================================================
+-- PER-DAY BOOKING SKETCHES
+-- ============================================================================
+--
+-- Linking files (backend usage):
+--   - backend/utils/booking_sketches.py : SketchBuilder folds new bookings into the day sketches; SketchStore merges them
+--   - backend/utils/sketches.py         : HyperLogLog / Count-Min / TopK implementations
+--   - backend/admin/reports.py          : GET /admin/reports/sketch-summary
+--   - backend/app.py                    : starts the builder thread
+--
+-- One row per booking day holds a compressed JSON bundle of mergeable sketches:
+-- HyperLogLogs of the distinct passengers and trips, and Count-Min based top-k
+-- of routes, services and passengers. Multi-day "unique passengers" and
+-- "most popular route" figures merge these rows instead of running
+-- COUNT(DISTINCT ...) / GROUP BY over bookings. Results are approximate
+-- (~1.6% error on distinct counts; top-k counts never undercount).
+--
+-- Maintenance: the builder reads bookings past booking_sketch_watermark.last_id
+-- (locking the row for the pass) that are older than SKETCH_FOLD_LAG_SECONDS,
+-- and upserts the days they fall on. Every SKETCH_RECONCILE_SECONDS it rebuilds
+-- today and yesterday up to last_id, for ids that committed late. Sketches
+-- only grow, so updates and deletes of existing bookings are not reflected; to
+-- rebuild everything, clear booking_sketches and reset last_id to 0.
+--
+-- Run after ksts_schema.sql. Safe to re-run: an existing watermark is kept. The
+-- builder catches up on existing bookings in batches after the first run.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS booking_sketches (
+    day date primary key,                   -- Booking day (booking_date in session time)
+    bookings int not null default 0,        -- Exact number of bookings folded in
+    payload mediumblob not null,            -- zlib-compressed JSON sketches
+    updated_at datetime default current_timestamp on update current_timestamp
+);
+
+CREATE TABLE IF NOT EXISTS booking_sketch_watermark (
+    id tinyint primary key,                 -- Always 1
+    last_id int not null default 0,         -- Highest booking_id already folded into the sketches
+    updated_at datetime default current_timestamp on update current_timestamp
+);
+
+INSERT IGNORE INTO booking_sketch_watermark (id, last_id) VALUES (1, 0);
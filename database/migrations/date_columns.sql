@@ -0,0 +1,95 @@
+USE ksts_db;
+
+-- ============================================================================
+-- GENERATED DATE COLUMNS (sargable day filters and day grouping)
+-- ============================================================================
+--
+-- Linking files (backend usage):
+--   - backend/admin/repos/reports.py : per-day reports GROUP BY booking_day / payment_day,
+--                                      date filters use half-open ranges on the raw columns
+--   - backend/tests/test_report_queries.py : EXPLAINs every report query
+--
+-- Wrapping an indexed column in a function (WHERE DATE(booking_date) = ...)
+-- hides it from the optimizer, so those filters scanned the whole table.
+-- Filters now compare the raw DATETIME against a half-open range:
+--
+--     booking_date >= '2025-01-01' AND booking_date < '2025-01-02'
+--
+-- which uses idx_bookings_date / idx_payments_date / idx_trips_departure_time.
+-- Reports that group by day read the virtual generated columns below instead of
+-- repeating DATE(...), and the indexes on them serve single-day equality
+-- lookups (the optimizer also rewrites DATE(col) = x onto these indexes).
+--
+-- Run after ksts_schema.sql. Safe to re-run.
+-- ============================================================================
+
+DROP PROCEDURE IF EXISTS ksts_add_date_column;
+
+DELIMITER //
+
+CREATE PROCEDURE ksts_add_date_column(
+    IN p_table VARCHAR(64),
+    IN p_column VARCHAR(64),
+    IN p_source VARCHAR(64),
+    IN p_index VARCHAR(64)
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_table AND COLUMN_NAME = p_column
+    ) THEN
+        SET @ddl = CONCAT(
+            'ALTER TABLE ', p_table,
+            ' ADD COLUMN ', p_column, ' date GENERATED ALWAYS AS (DATE(', p_source, ')) VIRTUAL'
+        );
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_table AND INDEX_NAME = p_index
+    ) THEN
+        SET @ddl = CONCAT('CREATE INDEX ', p_index, ' ON ', p_table, ' (', p_column, ')');
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END//
+
+DELIMITER ;
+
+CALL ksts_add_date_column('bookings', 'booking_day', 'booking_date', 'idx_bookings_day');
+CALL ksts_add_date_column('payments', 'payment_day', 'payment_date', 'idx_payments_day');
+CALL ksts_add_date_column('trips', 'departure_day', 'departure_time', 'idx_trips_departure_day');
+
+DROP PROCEDURE ksts_add_date_column;
+
+-- The old functional index definitions in create_performance_indexes.sql were
+-- invalid (missing the extra parentheses) and never created; drop them in case
+-- they were added by hand.
+DROP PROCEDURE IF EXISTS ksts_drop_index_if_exists;
+
+DELIMITER //
+
+CREATE PROCEDURE ksts_drop_index_if_exists(IN p_table VARCHAR(64), IN p_index VARCHAR(64))
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = p_table AND INDEX_NAME = p_index
+    ) THEN
+        SET @ddl = CONCAT('DROP INDEX ', p_index, ' ON ', p_table);
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END//
+
+DELIMITER ;
+
+CALL ksts_drop_index_if_exists('trips', 'idx_trips_departure_date');
+CALL ksts_drop_index_if_exists('drivers_assignments', 'idx_assignments_date');
+CALL ksts_drop_index_if_exists('drivers_assignments', 'idx_assignments_bus_date');
+
+DROP PROCEDURE ksts_drop_index_if_exists;
@@ -6,6 +6,8 @@ USE ksts_db;
 --
 -- Linking files (backend usage):
 --   - backend/routes/passenger.py : Calls sp_create_passenger_booking_with_payment for booking/payment
+--   - migrations/trip_seat_inventory.sql : trip_seats table used for seat allocation (run it first)
+--   - migrations/trip_segment_load.sql   : trip_segment_load / trip_segment_seats, per-segment seat counts and seats (run it first)
 --   - frontend (indirect): Uses backend API endpoints that trigger this procedure
 --
 -- This migration demonstrates:
@@ -153,6 +155,31 @@ BEGIN
     RETURN v_amount;
 END $
 
+-- ============================================================================
+-- FUNCTION: fn_hmac_sha256
+-- HMAC-SHA256 (RFC 2104) of a message, returned as 64 hex characters.
+-- Used to derive deterministic, verifiable ticket codes from booking_id;
+-- backend/utils/tickets.py computes the same value with Python's hmac module.
+-- Requires MySQL 8.0+ (bitwise XOR on binary strings).
+-- ============================================================================
+DROP FUNCTION IF EXISTS fn_hmac_sha256 $
+CREATE FUNCTION fn_hmac_sha256(
+    p_key VARBINARY(64),
+    p_message VARCHAR(255)
+)
+RETURNS CHAR(64)
+DETERMINISTIC   -- Always returns the same result for the same input (no randomness or side effects)
+BEGIN
+    DECLARE v_key VARBINARY(64);
+
+    SET v_key = RPAD(p_key, 64, UNHEX('00'));   -- Zero-pad the key to the SHA-256 block size (64 bytes)
+
+    RETURN SHA2(CONCAT(
+        v_key ^ REPEAT(UNHEX('5c'), 64),                                          -- Outer pad: K xor opad
+        UNHEX(SHA2(CONCAT(v_key ^ REPEAT(UNHEX('36'), 64), p_message), 256))      -- Inner hash: H(K xor ipad || m)
+    ), 256);
+END $
+
 -- ============================================================================
 -- STORED PROCEDURE: sp_create_passenger_booking_with_payment
 -- Complete booking flow with credit card validation and payment processing
@@ -163,7 +190,8 @@ END $
 -- - Conditional Logic (IF/ELSE statements)
 -- - Loops (WHILE loop for counting stops)
 -- - Error Handling (SIGNAL for custom errors)
--- - Row Locking (FOR UPDATE to prevent race conditions)
+-- - Atomic seat claim per stop segment (trip_seats row lock + range check on trip_segment_load, seats reused after alighting)
+-- - Ticket issued in the same transaction (HMAC ticket code, no second round-trip)
 -- 
 -- ROLLBACK SCENARIOS:
 -- 1. Invalid credit card number (fails Luhn check)
@@ -180,12 +208,14 @@ CREATE PROCEDURE sp_create_passenger_booking_with_payment(
     IN p_destination_stop_id INT,
     IN p_card_number VARCHAR(19),
     IN p_cvv VARCHAR(4),
-    IN p_cardholder_name VARCHAR(100)
+    IN p_cardholder_name VARCHAR(100),
+    IN p_ticket_key VARBINARY(64)      -- HMAC key for the ticket code; NULL = caller issues the ticket itself
 )
 BEGIN
     DECLARE v_route_id INT;
     DECLARE v_trip_status ENUM('scheduled','running','completed','cancelled');
     DECLARE v_trip_direction ENUM('forward','backward');
+    DECLARE v_departure_time DATETIME;
     DECLARE v_bus_capacity INT;
     DECLARE v_service_id INT;
     DECLARE v_origin_order INT;
@@ -199,11 +229,15 @@ BEGIN
     DECLARE v_fare_amount INT;
     DECLARE v_booking_id INT;
     DECLARE v_payment_id INT;
-    DECLARE v_confirmed_count INT DEFAULT 0;
+    DECLARE v_seat_number INT;
+    DECLARE v_capacity INT;
+    DECLARE v_peak_load INT;
+    DECLARE v_seat_taken INT;
     DECLARE v_loop_cursor INT;
     DECLARE v_stops_between INT DEFAULT 0;
     DECLARE v_card_valid BOOLEAN;
     DECLARE v_card_last_four CHAR(4);
+    DECLARE v_qr_code VARCHAR(255) DEFAULT NULL;
 
     -- Error handler: rollback on any exception
     DECLARE EXIT HANDLER FOR SQLEXCEPTION
@@ -233,14 +267,14 @@ BEGIN
     SET v_card_last_four = RIGHT(REPLACE(p_card_number, ' ', ''), 4);
 
     -- ========================================================================
-    -- STEP 2: VALIDATE TRIP AND GET DETAILS (with row locking)
+    -- STEP 2: VALIDATE TRIP AND GET DETAILS (with shared row lock)
     -- ========================================================================
-    SELECT t.route_id, t.status, t.direction, b.capacity
-    INTO v_route_id, v_trip_status, v_trip_direction, v_bus_capacity
+    SELECT t.route_id, t.status, t.direction, t.departure_time, b.capacity
+    INTO v_route_id, v_trip_status, v_trip_direction, v_departure_time, v_bus_capacity
     FROM trips t
     JOIN buses b ON t.bus_id = b.bus_id
     WHERE t.trip_id = p_trip_id
-    FOR UPDATE;  -- Acquire exclusive row lock (prevents concurrent changes to this trip/bus during validation)
+    LOCK IN SHARE MODE;  -- Shared lock: blocks status changes while booking, but concurrent bookings on the trip proceed
 
     IF v_route_id IS NULL THEN
         ROLLBACK;
@@ -277,8 +311,7 @@ BEGIN
     JOIN stops s_origin ON rs_origin.stop_id = s_origin.stop_id
     JOIN stops s_dest ON rs_dest.stop_id = s_dest.stop_id
     WHERE r.route_id = v_route_id
-    LIMIT 1
-    FOR UPDATE;  -- Lock the selected route/stop rows to prevent concurrent modifications
+    LIMIT 1;  -- Plain consistent read: route/stop rows are reference data and must not serialize bookings
 
     IF v_origin_order IS NULL OR v_destination_order IS NULL THEN
         ROLLBACK;
@@ -307,18 +340,83 @@ BEGIN
     END IF;
 
     -- ========================================================================
-    -- STEP 5: CHECK SEAT AVAILABILITY (with row locking)
+    -- STEP 5: CLAIM A SEAT ON THE JOURNEY'S SEGMENTS (trip_segment_load.sql)
     -- ========================================================================
-    SELECT COUNT(*) INTO v_confirmed_count
-    FROM bookings
-    WHERE trip_id = p_trip_id AND status = 'confirmed'
-    FOR UPDATE;  -- Lock booking rows for this trip to get a consistent confirmed count (prevents overbooking)
+    -- Lock the trip's inventory row: claims on one trip are serialized here
+    SELECT capacity INTO v_capacity
+    FROM trip_seats
+    WHERE trip_id = p_trip_id
+    FOR UPDATE;
+
+    IF v_capacity IS NULL THEN
+        -- Trip created before trip_seat_inventory.sql: seed its row once. Only
+        -- this path reads the trip's segment loads without the lock; every
+        -- later claim locks just the trip_seats row above.
+        INSERT IGNORE INTO trip_seats (trip_id, capacity, seats_taken)
+        SELECT p_trip_id,
+               v_bus_capacity,
+               (SELECT COALESCE(MAX(passengers), 0) FROM trip_segment_load WHERE trip_id = p_trip_id);
+
+        SELECT capacity INTO v_capacity
+        FROM trip_seats
+        WHERE trip_id = p_trip_id
+        FOR UPDATE;
+    END IF;
+
+    -- Busiest segment the passenger rides (segments LEAST..GREATEST - 1 of the stop orders)
+    SELECT COALESCE(MAX(passengers), 0) INTO v_peak_load
+    FROM trip_segment_load
+    WHERE trip_id = p_trip_id
+      AND segment_order >= LEAST(v_origin_order, v_destination_order)
+      AND segment_order < GREATEST(v_origin_order, v_destination_order)
+    FOR UPDATE;
 
-    IF v_confirmed_count >= v_bus_capacity THEN
+    IF v_peak_load + 1 > v_capacity THEN                -- Prevents overbooking any segment
         ROLLBACK;
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'No seats available';  -- Custom error signal
     END IF;
 
+    -- Lowest seat (1..capacity) nobody occupies on any of those segments. The
+    -- reads are locking so they see claims committed while this transaction
+    -- waited for the trip_seats lock, not its older snapshot.
+    SET v_seat_number = 0;
+    SET v_seat_taken = 1;
+    WHILE v_seat_taken > 0 AND v_seat_number < v_capacity DO
+        SET v_seat_number = v_seat_number + 1;
+        SELECT COUNT(*) INTO v_seat_taken
+        FROM trip_segment_seats
+        WHERE trip_id = p_trip_id
+          AND seat_number = v_seat_number
+          AND segment_order >= LEAST(v_origin_order, v_destination_order)
+          AND segment_order < GREATEST(v_origin_order, v_destination_order)
+        FOR UPDATE;
+    END WHILE;
+
+    IF v_seat_taken > 0 THEN                            -- Every seat is taken somewhere on the journey
+        ROLLBACK;
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'No seats available';
+    END IF;
+
+    INSERT INTO trip_segment_seats (trip_id, seat_number, segment_order)
+    SELECT p_trip_id, v_seat_number, stop_order
+    FROM routes_stops
+    WHERE route_id = v_route_id
+      AND stop_order >= LEAST(v_origin_order, v_destination_order)
+      AND stop_order < GREATEST(v_origin_order, v_destination_order);
+
+    INSERT INTO trip_segment_load (trip_id, segment_order, passengers)
+    SELECT p_trip_id, stop_order, 1
+    FROM routes_stops
+    WHERE route_id = v_route_id
+      AND stop_order >= LEAST(v_origin_order, v_destination_order)
+      AND stop_order < GREATEST(v_origin_order, v_destination_order)
+    ON DUPLICATE KEY UPDATE passengers = passengers + 1;
+
+    -- seats_taken = passengers on the trip's busiest segment
+    UPDATE trip_seats
+    SET seats_taken = (SELECT COALESCE(MAX(passengers), 0) FROM trip_segment_load WHERE trip_id = p_trip_id)
+    WHERE trip_id = p_trip_id;
+
     -- ========================================================================
     -- STEP 6: COUNT STOPS BETWEEN ORIGIN AND DESTINATION (Loop demonstration)
     -- ========================================================================
@@ -342,14 +440,14 @@ BEGIN
 
     -- ========================================================================
     -- STEP 8: CREATE BOOKING RECORD
-    -- Assign the next available seat number (confirmed_count + 1) and create booking row
+    -- Use the seat number claimed in STEP 5 and create booking row
     -- ========================================================================
     INSERT INTO bookings (
         user_id, trip_id, seat_number,
         origin_stop_id, destination_stop_id, status
     )
     VALUES (
-        p_user_id, p_trip_id, v_confirmed_count + 1,
+        p_user_id, p_trip_id, v_seat_number,
         p_origin_stop_id, p_destination_stop_id, 'confirmed'
     );
 
@@ -380,6 +478,20 @@ BEGIN
     
     SET v_payment_id = LAST_INSERT_ID();  -- Get the auto-incremented payment_id from the last insert
 
+    -- ========================================================================
+    -- STEP 9b: ISSUE TICKET
+    -- Deterministic code TICKET-<booking_id>-<first 16 hex of HMAC(key, booking_id)>:
+    -- unique because booking_id is, and verifiable without a lookup
+    -- ========================================================================
+    IF p_ticket_key IS NOT NULL THEN
+        SET v_qr_code = CONCAT(
+            'TICKET-', v_booking_id, '-',
+            UPPER(LEFT(fn_hmac_sha256(p_ticket_key, CAST(v_booking_id AS CHAR)), 16))
+        );
+        INSERT INTO tickets (booking_id, qr_code)
+        VALUES (v_booking_id, v_qr_code);
+    END IF;
+
     -- ========================================================================
     -- STEP 10: COMMIT TRANSACTION
     -- All validations passed - make changes permanent
@@ -394,9 +506,11 @@ BEGIN
         v_payment_id AS payment_id,
         v_fare_amount AS fare_amount,
         v_stops_between AS stops_count,
-        v_confirmed_count + 1 AS seat_number,
+        v_seat_number AS seat_number,
         v_card_last_four AS card_last_four,
-        'Payment successful' AS message;
+        'Payment successful' AS message,
+        v_qr_code AS qr_code,
+        v_departure_time AS departure_time;   -- Lets the backend sign the ticket token without another query
 END $
 
 -- ============================================================================
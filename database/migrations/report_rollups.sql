@@ -0,0 +1,311 @@
+USE ksts_db;
+
+-- ============================================================================
+-- HOURLY REPORT ROLLUPS
+-- ============================================================================
+--
+-- Linking files (backend usage):
+--   - backend/utils/report_rollups.py : RollupCompactor keeps the rollups current; rollup_window() / rollups_available()
+--   - backend/admin/repos/reports.py  : report queries read the rollups for hour-aligned ranges
+--   - backend/app.py                  : starts the compactor thread
+--
+-- Admin reports used to aggregate the raw bookings / payments / trips tables on
+-- every request, so dashboard cost grew with history. Three rollup tables hold
+-- the same aggregates per hour bucket (DATETIME truncated to the hour):
+--
+--   rollup_booking_hourly  booking hour   x route x booking status  -> bookings, paid revenue
+--   rollup_payment_hourly  payment hour   x method x payment status -> payments, amount
+--   rollup_trip_hourly     departure hour x route x bus x trip status -> trips, bookings on them
+--
+-- Day totals are the sum of 24 hour rows, peak-hour reports read HOUR(bucket_hour).
+--
+-- Maintenance (no trigger on the INSERT hot path):
+--   - New rows: the compactor scans bookings / payments / trips past the ids in
+--     rollup_watermarks and re-derives the hours they touch.
+--   - Updates / deletes: the triggers below only record the affected hours in
+--     rollup_dirty_hours (INSERT IGNORE); the compactor re-derives them and
+--     clears the marks. Cascaded deletes do not fire child triggers in MySQL,
+--     so parent BEFORE DELETE triggers mark their children's hours.
+--
+-- Re-deriving an hour = DELETE its rollup rows + INSERT ... SELECT over a
+-- half-open [hour, hour + 1h) range of the raw table, in one transaction.
+--
+-- Run after ksts_schema.sql. Safe to re-run: the tables are rebuilt from the raw
+-- data below and the watermarks reset to the current maximum ids.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS rollup_booking_hourly (
+    bucket_hour datetime not null,          -- booking_date truncated to the hour
+    route_id int not null,                  -- Route of the booked trip
+    status varchar(20) not null,            -- Booking status
+    bookings int not null default 0,
+    paid_revenue bigint not null default 0, -- Sum of 'paid' payment amounts of these bookings
+    primary key (bucket_hour, route_id, status)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_payment_hourly (
+    bucket_hour datetime not null,          -- payment_date truncated to the hour
+    method varchar(20) not null,
+    status varchar(20) not null,            -- Payment status
+    payments int not null default 0,
+    amount bigint not null default 0,
+    primary key (bucket_hour, method, status)
+);
+
+CREATE TABLE IF NOT EXISTS rollup_trip_hourly (
+    bucket_hour datetime not null,          -- departure_time truncated to the hour
+    route_id int not null,
+    bus_id int not null,
+    status varchar(20) not null,            -- Trip status
+    trips int not null default 0,
+    bookings int not null default 0,        -- Bookings (any status) on these trips
+    primary key (bucket_hour, route_id, bus_id, status),
+    index idx_rollup_trip_bus (bus_id, bucket_hour)
+);
+
+-- Hours whose rollup rows must be re-derived (written by the triggers below)
+CREATE TABLE IF NOT EXISTS rollup_dirty_hours (
+    kind enum('booking', 'payment', 'trip') not null,
+    bucket_hour datetime not null,
+    primary key (kind, bucket_hour)
+);
+
+-- Highest raw ids already folded into the rollups
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    source varchar(20) primary key,         -- 'bookings' | 'payments' | 'trips'
+    last_id int not null default 0,
+    updated_at datetime default current_timestamp on update current_timestamp
+);
+
+
+-- ----------------------------------------------------------------------------
+-- Initial build from the raw tables
+-- ----------------------------------------------------------------------------
+
+DELETE FROM rollup_booking_hourly;
+DELETE FROM rollup_payment_hourly;
+DELETE FROM rollup_trip_hourly;
+DELETE FROM rollup_dirty_hours;
+
+INSERT INTO rollup_watermarks (source, last_id)
+SELECT 'bookings', COALESCE(MAX(booking_id), 0) FROM bookings
+UNION ALL SELECT 'payments', COALESCE(MAX(payment_id), 0) FROM payments
+UNION ALL SELECT 'trips', COALESCE(MAX(trip_id), 0) FROM trips
+ON DUPLICATE KEY UPDATE last_id = VALUES(last_id);
+
+INSERT INTO rollup_booking_hourly (bucket_hour, route_id, status, bookings, paid_revenue)
+SELECT DATE_FORMAT(b.booking_date, '%Y-%m-%d %H:00:00'), t.route_id, b.status,
+       COUNT(*),
+       COALESCE(SUM(CASE WHEN p.status = 'paid' THEN p.amount ELSE 0 END), 0)
+FROM bookings b
+JOIN trips t ON b.trip_id = t.trip_id
+LEFT JOIN payments p ON p.booking_id = b.booking_id
+WHERE b.booking_date IS NOT NULL
+GROUP BY 1, t.route_id, b.status;
+
+INSERT INTO rollup_payment_hourly (bucket_hour, method, status, payments, amount)
+SELECT DATE_FORMAT(payment_date, '%Y-%m-%d %H:00:00'), method, status,
+       COUNT(*), COALESCE(SUM(amount), 0)
+FROM payments
+WHERE payment_date IS NOT NULL
+GROUP BY 1, method, status;
+
+INSERT INTO rollup_trip_hourly (bucket_hour, route_id, bus_id, status, trips, bookings)
+SELECT DATE_FORMAT(t.departure_time, '%Y-%m-%d %H:00:00'), t.route_id, t.bus_id, t.status,
+       COUNT(*), COALESCE(SUM(bc.n), 0)
+FROM trips t
+LEFT JOIN (SELECT trip_id, COUNT(*) AS n FROM bookings GROUP BY trip_id) bc
+       ON bc.trip_id = t.trip_id
+GROUP BY 1, t.route_id, t.bus_id, t.status;
+
+
+-- ----------------------------------------------------------------------------
+-- Dirty-hour triggers (updates and deletes only)
+-- ----------------------------------------------------------------------------
+
+DROP TRIGGER IF EXISTS trg_bookings_after_update_rollup;
+DROP TRIGGER IF EXISTS trg_bookings_before_delete_rollup;
+DROP TRIGGER IF EXISTS trg_payments_after_update_rollup;
+DROP TRIGGER IF EXISTS trg_payments_after_delete_rollup;
+DROP TRIGGER IF EXISTS trg_trips_after_update_rollup;
+DROP TRIGGER IF EXISTS trg_trips_before_delete_rollup;
+DROP TRIGGER IF EXISTS trg_buses_before_delete_rollup;
+DROP TRIGGER IF EXISTS trg_routes_before_delete_rollup;
+DROP TRIGGER IF EXISTS trg_users_before_delete_rollup;
+
+DELIMITER //
+
+-- ----------------------------------------------------------------------------
+-- Booking cancelled / moved: its booking hour(s), and the trip hours when it changed trip
+CREATE TRIGGER trg_bookings_after_update_rollup
+AFTER UPDATE ON bookings
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.status <=> NEW.status)
+       OR NOT (OLD.booking_date <=> NEW.booking_date)
+       OR OLD.trip_id <> NEW.trip_id THEN
+        INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+        VALUES ('booking', DATE_FORMAT(OLD.booking_date, '%Y-%m-%d %H:00:00')),
+               ('booking', DATE_FORMAT(NEW.booking_date, '%Y-%m-%d %H:00:00'));
+    END IF;
+    IF OLD.trip_id <> NEW.trip_id THEN
+        INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+        SELECT 'trip', DATE_FORMAT(departure_time, '%Y-%m-%d %H:00:00')
+        FROM trips WHERE trip_id IN (OLD.trip_id, NEW.trip_id);
+    END IF;
+END;
+//
+
+-- ----------------------------------------------------------------------------
+-- Booking deleted: its hour, its trip's hour and its payment (cascaded) hour
+CREATE TRIGGER trg_bookings_before_delete_rollup
+BEFORE DELETE ON bookings
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    VALUES ('booking', DATE_FORMAT(OLD.booking_date, '%Y-%m-%d %H:00:00'));
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT 'trip', DATE_FORMAT(departure_time, '%Y-%m-%d %H:00:00')
+    FROM trips WHERE trip_id = OLD.trip_id;
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT 'payment', DATE_FORMAT(payment_date, '%Y-%m-%d %H:00:00')
+    FROM payments WHERE booking_id = OLD.booking_id;
+END;
+//
+
+-- ----------------------------------------------------------------------------
+-- Payment status / amount changed: its payment hour(s) and its booking's hour (paid revenue)
+CREATE TRIGGER trg_payments_after_update_rollup
+AFTER UPDATE ON payments
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.status <=> NEW.status)
+       OR OLD.amount <> NEW.amount
+       OR OLD.method <> NEW.method
+       OR NOT (OLD.payment_date <=> NEW.payment_date) THEN
+        INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+        VALUES ('payment', DATE_FORMAT(OLD.payment_date, '%Y-%m-%d %H:00:00')),
+               ('payment', DATE_FORMAT(NEW.payment_date, '%Y-%m-%d %H:00:00'));
+        INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+        SELECT 'booking', DATE_FORMAT(booking_date, '%Y-%m-%d %H:00:00')
+        FROM bookings WHERE booking_id = NEW.booking_id;
+    END IF;
+END;
+//
+
+-- ----------------------------------------------------------------------------
+-- Payment deleted directly
+CREATE TRIGGER trg_payments_after_delete_rollup
+AFTER DELETE ON payments
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    VALUES ('payment', DATE_FORMAT(OLD.payment_date, '%Y-%m-%d %H:00:00'));
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT 'booking', DATE_FORMAT(booking_date, '%Y-%m-%d %H:00:00')
+    FROM bookings WHERE booking_id = OLD.booking_id;
+END;
+//
+
+-- ----------------------------------------------------------------------------
+-- Trip status / time / route / bus changed: its departure hour(s); a route
+-- change also moves its bookings between booking-rollup rows
+CREATE TRIGGER trg_trips_after_update_rollup
+AFTER UPDATE ON trips
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.status <=> NEW.status)
+       OR OLD.departure_time <> NEW.departure_time
+       OR OLD.route_id <> NEW.route_id
+       OR OLD.bus_id <> NEW.bus_id THEN
+        INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+        VALUES ('trip', DATE_FORMAT(OLD.departure_time, '%Y-%m-%d %H:00:00')),
+               ('trip', DATE_FORMAT(NEW.departure_time, '%Y-%m-%d %H:00:00'));
+    END IF;
+    IF OLD.route_id <> NEW.route_id THEN
+        INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+        SELECT DISTINCT 'booking', DATE_FORMAT(booking_date, '%Y-%m-%d %H:00:00')
+        FROM bookings WHERE trip_id = NEW.trip_id AND booking_date IS NOT NULL;
+    END IF;
+END;
+//
+
+-- ----------------------------------------------------------------------------
+-- Trip deleted (also sp_clear_daily_trips): its hour plus its cascaded bookings / payments
+CREATE TRIGGER trg_trips_before_delete_rollup
+BEFORE DELETE ON trips
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    VALUES ('trip', DATE_FORMAT(OLD.departure_time, '%Y-%m-%d %H:00:00'));
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'booking', DATE_FORMAT(b.booking_date, '%Y-%m-%d %H:00:00')
+    FROM bookings b WHERE b.trip_id = OLD.trip_id AND b.booking_date IS NOT NULL;
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'payment', DATE_FORMAT(p.payment_date, '%Y-%m-%d %H:00:00')
+    FROM bookings b JOIN payments p ON p.booking_id = b.booking_id
+    WHERE b.trip_id = OLD.trip_id AND p.payment_date IS NOT NULL;
+END;
+//
+
+-- ----------------------------------------------------------------------------
+-- Bus / route deleted: cascades to trips (whose triggers do not fire)
+CREATE TRIGGER trg_buses_before_delete_rollup
+BEFORE DELETE ON buses
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'trip', DATE_FORMAT(departure_time, '%Y-%m-%d %H:00:00')
+    FROM trips WHERE bus_id = OLD.bus_id;
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'booking', DATE_FORMAT(b.booking_date, '%Y-%m-%d %H:00:00')
+    FROM trips t JOIN bookings b ON b.trip_id = t.trip_id
+    WHERE t.bus_id = OLD.bus_id AND b.booking_date IS NOT NULL;
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'payment', DATE_FORMAT(p.payment_date, '%Y-%m-%d %H:00:00')
+    FROM trips t JOIN bookings b ON b.trip_id = t.trip_id
+    JOIN payments p ON p.booking_id = b.booking_id
+    WHERE t.bus_id = OLD.bus_id AND p.payment_date IS NOT NULL;
+END;
+//
+
+CREATE TRIGGER trg_routes_before_delete_rollup
+BEFORE DELETE ON routes
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'trip', DATE_FORMAT(departure_time, '%Y-%m-%d %H:00:00')
+    FROM trips WHERE route_id = OLD.route_id;
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'booking', DATE_FORMAT(b.booking_date, '%Y-%m-%d %H:00:00')
+    FROM trips t JOIN bookings b ON b.trip_id = t.trip_id
+    WHERE t.route_id = OLD.route_id AND b.booking_date IS NOT NULL;
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'payment', DATE_FORMAT(p.payment_date, '%Y-%m-%d %H:00:00')
+    FROM trips t JOIN bookings b ON b.trip_id = t.trip_id
+    JOIN payments p ON p.booking_id = b.booking_id
+    WHERE t.route_id = OLD.route_id AND p.payment_date IS NOT NULL;
+END;
+//
+
+-- ----------------------------------------------------------------------------
+-- User deleted: cascades to their bookings and payments
+CREATE TRIGGER trg_users_before_delete_rollup
+BEFORE DELETE ON users
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'booking', DATE_FORMAT(booking_date, '%Y-%m-%d %H:00:00')
+    FROM bookings WHERE user_id = OLD.user_id AND booking_date IS NOT NULL;
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'trip', DATE_FORMAT(t.departure_time, '%Y-%m-%d %H:00:00')
+    FROM bookings b JOIN trips t ON t.trip_id = b.trip_id
+    WHERE b.user_id = OLD.user_id;
+    INSERT IGNORE INTO rollup_dirty_hours (kind, bucket_hour)
+    SELECT DISTINCT 'payment', DATE_FORMAT(p.payment_date, '%Y-%m-%d %H:00:00')
+    FROM bookings b JOIN payments p ON p.booking_id = b.booking_id
+    WHERE b.user_id = OLD.user_id AND p.payment_date IS NOT NULL;
+END;
+//
+
+DELIMITER ;
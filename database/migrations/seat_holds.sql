@@ -0,0 +1,39 @@
+USE ksts_db;
+
+-- ============================================================================
+-- SEAT HOLDS (two-phase booking)
+-- ============================================================================
+--
+-- Linking files (backend usage):
+--   - backend/utils/seat_holds.py  : create_hold / consume_hold / cancel_hold and the expiry sweeper
+--   - backend/routes/passenger.py  : POST /api/holds, DELETE /api/holds/<id>, POST /api/bookings with hold_id,
+--                                    trip availability subtracts active holds
+--
+-- A hold claims a seat from trip_seats (see trip_seat_inventory.sql) for a short
+-- TTL while the passenger pays. Booking with the hold_id deletes the hold and
+-- keeps the seat; expired holds are bulk deleted by the backend sweeper, which
+-- gives their seats back to trip_seats.
+--
+-- Run after trip_seat_inventory.sql. Safe to re-run.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS seat_holds (
+    hold_id int auto_increment primary key,
+    trip_id int not null,
+    user_id int not null,
+    seat_number int not null,              -- Seat claimed from trip_seats for this hold
+    expires_at datetime not null,          -- Application local time, like trips.departure_time
+    created_at datetime default current_timestamp,
+
+    index idx_seat_holds_trip_expires (trip_id, expires_at),  -- Active holds per trip (availability)
+    index idx_seat_holds_expires (expires_at),                -- Sweeper / recovery scans
+
+    constraint fk_seat_holds_trip
+        foreign key (trip_id) references trips(trip_id)
+        on delete cascade
+        on update cascade,
+    constraint fk_seat_holds_user
+        foreign key (user_id) references users(user_id)
+        on delete cascade
+        on update cascade
+);
@@ -0,0 +1,123 @@
+USE ksts_db;
+
+-- ============================================================================
+-- PER-TRIP SEAT INVENTORY
+-- ============================================================================
+--
+-- Linking files (backend usage):
+--   - backend/utils/seat_inventory.py : claim_seats() / ensure_trip_seats()
+--   - backend/routes/passenger.py     : Python booking flow claims seats through utils/seat_inventory.py
+--   - migrations/passenger_booking_procedures.sql : sp_create_passenger_booking_with_payment claims seats (STEP 5)
+--   - migrations/trip_segment_load.sql : per-segment loads and seats, booking triggers
+--
+-- Before this migration a seat was derived by counting the trip's confirmed
+-- bookings (SELECT COUNT(*) ... FOR UPDATE, then seat = count + 1). That range
+-- locks every booking row of the trip and the Python path could hand out the
+-- same seat twice. Each trip now owns one trip_seats row, and every claim on
+-- the trip starts by locking it:
+--
+--   SELECT capacity FROM trip_seats WHERE trip_id = ? FOR UPDATE;
+--
+-- so claims on one trip queue on a single row and other trips are unaffected.
+-- Under that lock the claim checks the journey's busiest segment against the
+-- capacity and takes the lowest seat in 1..capacity that is free on all of
+-- its segments (trip_segment_load / trip_segment_seats, created by
+-- trip_segment_load.sql). Seats are reused after the passenger alights.
+--
+--   trip_seats.seats_taken = passengers on the trip's busiest segment
+--
+-- Run after ksts_schema.sql, then trip_segment_load.sql (which fills
+-- seats_taken and owns the booking triggers), then re-run
+-- passenger_booking_procedures.sql.
+-- Safe to re-run (CREATE TABLE IF NOT EXISTS, backfill upserts, DROP TRIGGER IF EXISTS).
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS trip_seats (
+    trip_id int primary key,
+    capacity int not null,                 -- Copied from buses.capacity when the trip is created
+    seats_taken int not null default 0,    -- Passengers on the trip's busiest segment
+
+    constraint fk_trip_seats_trip
+        foreign key (trip_id) references trips(trip_id)
+        on delete cascade
+        on update cascade
+);
+
+-- Installs from before per-segment seats still have the old seat sequence
+DROP PROCEDURE IF EXISTS ksts_drop_trip_seats_next_seat;
+
+DELIMITER //
+
+CREATE PROCEDURE ksts_drop_trip_seats_next_seat()
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'trip_seats' AND COLUMN_NAME = 'next_seat'
+    ) THEN
+        ALTER TABLE trip_seats DROP COLUMN next_seat;
+    END IF;
+END//
+
+DELIMITER ;
+
+CALL ksts_drop_trip_seats_next_seat();
+DROP PROCEDURE ksts_drop_trip_seats_next_seat;
+
+-- Inventory rows for existing trips; seats_taken is computed from the
+-- segment loads by trip_segment_load.sql
+INSERT INTO trip_seats (trip_id, capacity)
+SELECT t.trip_id, b.capacity
+FROM trips t
+JOIN buses b ON t.bus_id = b.bus_id
+ON DUPLICATE KEY UPDATE
+    capacity = VALUES(capacity);
+
+
+DROP TRIGGER IF EXISTS trg_trips_after_insert_seats;
+DROP TRIGGER IF EXISTS trg_trips_after_update_seats;
+DROP TRIGGER IF EXISTS trg_buses_after_update_seats;
+
+DELIMITER //
+
+-- ----------------------------------------------------------------------------
+-- New trip: create its (empty) seat inventory with the bus capacity
+CREATE TRIGGER trg_trips_after_insert_seats
+AFTER INSERT ON trips
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO trip_seats (trip_id, capacity)
+    SELECT NEW.trip_id, capacity FROM buses WHERE bus_id = NEW.bus_id;
+END;
+//
+
+-- ----------------------------------------------------------------------------
+-- Trip moved to another bus: take over the new bus capacity
+CREATE TRIGGER trg_trips_after_update_seats
+AFTER UPDATE ON trips
+FOR EACH ROW
+BEGIN
+    IF NEW.bus_id <> OLD.bus_id THEN
+        UPDATE trip_seats ts
+        JOIN buses b ON b.bus_id = NEW.bus_id
+        SET ts.capacity = b.capacity
+        WHERE ts.trip_id = NEW.trip_id;
+    END IF;
+END;
+//
+
+-- ----------------------------------------------------------------------------
+-- Bus capacity changed: apply it to the bus's open trips
+CREATE TRIGGER trg_buses_after_update_seats
+AFTER UPDATE ON buses
+FOR EACH ROW
+BEGIN
+    IF NEW.capacity <> OLD.capacity THEN
+        UPDATE trip_seats ts
+        JOIN trips t ON t.trip_id = ts.trip_id
+        SET ts.capacity = NEW.capacity
+        WHERE t.bus_id = NEW.bus_id AND t.status IN ('scheduled', 'running');
+    END IF;
+END;
+//
+
+DELIMITER ;
@@ -0,0 +1,264 @@
+USE ksts_db;
+
+-- ============================================================================
+-- PER-SEGMENT SEAT OCCUPANCY
+-- ============================================================================
+--
+-- Linking files (backend usage):
+--   - backend/utils/seat_inventory.py : claim_seats() checks and range-adds the journey's segments
+--                                       and picks a seat free on all of them
+--   - backend/utils/seat_holds.py     : holds claim (and release) the segments of their journey
+--   - backend/utils/trip_loads.py     : segment tree per trip for availability reads
+--   - migrations/passenger_booking_procedures.sql : sp_create_passenger_booking_with_payment (STEP 5)
+--
+-- A confirmed booking used to take a seat for the whole trip, so a passenger
+-- riding two stops blocked it for all of them. Seats are now counted per stop
+-- segment: segment k of a trip is the stretch from the route stop with
+-- stop_order k to the next stop, and a journey between stop orders a and b
+-- rides segments LEAST(a, b) <= k < GREATEST(a, b) in either direction.
+--
+--   trip_segment_load(trip_id, segment_order) = passengers on that segment
+--                                               (confirmed bookings + active holds)
+--   trip_segment_seats(trip_id, seat_number, segment_order)
+--                                             = seat occupied on that segment
+--   trip_seats.seats_taken                    = passengers on the trip's busiest
+--                                               segment (MAX of trip_segment_load)
+--
+-- A claim locks the trip's trip_seats row, reads the journey's peak load and,
+-- when peak + 1 <= capacity, takes the lowest seat in 1..capacity that is
+-- free on every segment of the journey. The seat is sold again after the
+-- passenger alights, so seat numbers never exceed the bus capacity. Cancels,
+-- deletes and journey changes are applied by the booking triggers below
+-- (they replace the booking triggers older versions of
+-- trip_seat_inventory.sql created).
+--
+-- Run after trip_seat_inventory.sql and seat_holds.sql, then re-run
+-- passenger_booking_procedures.sql. Safe to re-run: loads are rebuilt from
+-- the confirmed bookings and active holds of open trips. Seats numbered
+-- from the old ever-growing sequence keep their number until they are
+-- cancelled; new claims only hand out 1..capacity.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS trip_segment_load (
+    trip_id int not null,
+    segment_order int not null,            -- stop_order of the stop the segment starts at
+    passengers int not null default 0,     -- Confirmed bookings and active holds riding the segment
+    primary key (trip_id, segment_order),
+
+    constraint fk_trip_segment_load_trip
+        foreign key (trip_id) references trips(trip_id)
+        on delete cascade
+        on update cascade
+);
+
+CREATE TABLE IF NOT EXISTS trip_segment_seats (
+    trip_id int not null,
+    seat_number int not null,
+    segment_order int not null,            -- stop_order of the stop the segment starts at
+    primary key (trip_id, seat_number, segment_order),
+
+    constraint fk_trip_segment_seats_trip
+        foreign key (trip_id) references trips(trip_id)
+        on delete cascade
+        on update cascade
+);
+
+-- Journey of each hold (NULL = whole route, holds created before this migration)
+DROP PROCEDURE IF EXISTS ksts_add_hold_segment_columns;
+
+DELIMITER //
+
+CREATE PROCEDURE ksts_add_hold_segment_columns()
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'seat_holds' AND COLUMN_NAME = 'first_segment'
+    ) THEN
+        ALTER TABLE seat_holds
+            ADD COLUMN first_segment int null AFTER seat_number,
+            ADD COLUMN end_segment int null AFTER first_segment;
+    END IF;
+END//
+
+DELIMITER ;
+
+CALL ksts_add_hold_segment_columns();
+DROP PROCEDURE ksts_add_hold_segment_columns;
+
+
+-- ----------------------------------------------------------------------------
+-- Rebuild the loads of open trips
+-- ----------------------------------------------------------------------------
+
+DELETE FROM trip_segment_load;
+
+INSERT INTO trip_segment_load (trip_id, segment_order, passengers)
+SELECT j.trip_id, rs.stop_order, COUNT(*)
+FROM (
+    SELECT b.trip_id, t.route_id,
+           LEAST(o.stop_order, d.stop_order) AS first_segment,
+           GREATEST(o.stop_order, d.stop_order) AS end_segment
+    FROM bookings b
+    JOIN trips t ON t.trip_id = b.trip_id
+    JOIN routes_stops o ON o.route_id = t.route_id AND o.stop_id = b.origin_stop_id
+    JOIN routes_stops d ON d.route_id = t.route_id AND d.stop_id = b.destination_stop_id
+    WHERE b.status = 'confirmed' AND t.status IN ('scheduled', 'running')
+
+    UNION ALL
+
+    SELECT h.trip_id, t.route_id,
+           COALESCE(h.first_segment, (SELECT MIN(stop_order) FROM routes_stops WHERE route_id = t.route_id)),
+           COALESCE(h.end_segment, (SELECT MAX(stop_order) FROM routes_stops WHERE route_id = t.route_id))
+    FROM seat_holds h
+    JOIN trips t ON t.trip_id = h.trip_id
+    WHERE t.status IN ('scheduled', 'running')
+) j
+JOIN routes_stops rs
+  ON rs.route_id = j.route_id
+ AND rs.stop_order >= j.first_segment
+ AND rs.stop_order < j.end_segment
+GROUP BY j.trip_id, rs.stop_order;
+
+DELETE FROM trip_segment_seats;
+
+-- IGNORE: admin bookings may share a seat number with another booking
+INSERT IGNORE INTO trip_segment_seats (trip_id, seat_number, segment_order)
+SELECT j.trip_id, j.seat_number, rs.stop_order
+FROM (
+    SELECT b.trip_id, b.seat_number, t.route_id,
+           LEAST(o.stop_order, d.stop_order) AS first_segment,
+           GREATEST(o.stop_order, d.stop_order) AS end_segment
+    FROM bookings b
+    JOIN trips t ON t.trip_id = b.trip_id
+    JOIN routes_stops o ON o.route_id = t.route_id AND o.stop_id = b.origin_stop_id
+    JOIN routes_stops d ON d.route_id = t.route_id AND d.stop_id = b.destination_stop_id
+    WHERE b.status = 'confirmed' AND t.status IN ('scheduled', 'running')
+
+    UNION ALL
+
+    SELECT h.trip_id, h.seat_number, t.route_id,
+           COALESCE(h.first_segment, (SELECT MIN(stop_order) FROM routes_stops WHERE route_id = t.route_id)),
+           COALESCE(h.end_segment, (SELECT MAX(stop_order) FROM routes_stops WHERE route_id = t.route_id))
+    FROM seat_holds h
+    JOIN trips t ON t.trip_id = h.trip_id
+    WHERE t.status IN ('scheduled', 'running')
+) j
+JOIN routes_stops rs
+  ON rs.route_id = j.route_id
+ AND rs.stop_order >= j.first_segment
+ AND rs.stop_order < j.end_segment;
+
+-- seats_taken = passengers on the busiest segment (it used to count bookings)
+UPDATE trip_seats ts
+SET ts.seats_taken = (
+    SELECT COALESCE(MAX(l.passengers), 0) FROM trip_segment_load l WHERE l.trip_id = ts.trip_id
+);
+
+
+-- ----------------------------------------------------------------------------
+-- Range-add `p_delta` passengers to the segments of a booking's journey and
+-- take (+1) or free (-1) its seat on them
+-- ----------------------------------------------------------------------------
+
+DROP PROCEDURE IF EXISTS sp_add_booking_segment_load;
+
+DELIMITER //
+
+CREATE PROCEDURE sp_add_booking_segment_load(
+    IN p_trip_id INT,
+    IN p_origin_stop_id INT,
+    IN p_destination_stop_id INT,
+    IN p_seat_number INT,
+    IN p_delta INT
+)
+BEGIN
+    DECLARE v_route_id INT;
+    DECLARE v_first INT;
+    DECLARE v_end INT;
+    DECLARE v_capacity INT;
+
+    -- Same lock order as the claims (trip_seats, then the segment rows)
+    SELECT capacity INTO v_capacity
+    FROM trip_seats
+    WHERE trip_id = p_trip_id
+    FOR UPDATE;
+
+    SELECT t.route_id, LEAST(o.stop_order, d.stop_order), GREATEST(o.stop_order, d.stop_order)
+    INTO v_route_id, v_first, v_end
+    FROM trips t
+    JOIN routes_stops o ON o.route_id = t.route_id AND o.stop_id = p_origin_stop_id
+    JOIN routes_stops d ON d.route_id = t.route_id AND d.stop_id = p_destination_stop_id
+    WHERE t.trip_id = p_trip_id;
+
+    IF v_first IS NOT NULL THEN
+        IF p_delta > 0 THEN
+            INSERT INTO trip_segment_load (trip_id, segment_order, passengers)
+            SELECT p_trip_id, stop_order, p_delta
+            FROM routes_stops
+            WHERE route_id = v_route_id AND stop_order >= v_first AND stop_order < v_end
+            ON DUPLICATE KEY UPDATE passengers = passengers + VALUES(passengers);
+
+            INSERT IGNORE INTO trip_segment_seats (trip_id, seat_number, segment_order)
+            SELECT p_trip_id, p_seat_number, stop_order
+            FROM routes_stops
+            WHERE route_id = v_route_id AND stop_order >= v_first AND stop_order < v_end;
+        ELSE
+            UPDATE trip_segment_load
+            SET passengers = GREATEST(passengers + p_delta, 0)
+            WHERE trip_id = p_trip_id AND segment_order >= v_first AND segment_order < v_end;
+
+            DELETE FROM trip_segment_seats
+            WHERE trip_id = p_trip_id AND seat_number = p_seat_number
+              AND segment_order >= v_first AND segment_order < v_end;
+        END IF;
+
+        UPDATE trip_seats
+        SET seats_taken = (
+            SELECT COALESCE(MAX(passengers), 0) FROM trip_segment_load WHERE trip_id = p_trip_id
+        )
+        WHERE trip_id = p_trip_id;
+    END IF;
+END//
+
+DELIMITER ;
+
+
+DROP TRIGGER IF EXISTS trg_bookings_after_update_seats;
+DROP TRIGGER IF EXISTS trg_bookings_after_delete_seats;
+
+DELIMITER //
+
+-- ----------------------------------------------------------------------------
+-- Booking cancelled / re-confirmed / moved to another trip or journey:
+-- release or take its seat and its segments
+CREATE TRIGGER trg_bookings_after_update_seats
+AFTER UPDATE ON bookings
+FOR EACH ROW
+BEGIN
+    IF OLD.status <> NEW.status OR OLD.trip_id <> NEW.trip_id
+       OR OLD.origin_stop_id <> NEW.origin_stop_id
+       OR OLD.destination_stop_id <> NEW.destination_stop_id
+       OR OLD.seat_number <> NEW.seat_number THEN
+        IF OLD.status = 'confirmed' THEN
+            CALL sp_add_booking_segment_load(OLD.trip_id, OLD.origin_stop_id, OLD.destination_stop_id, OLD.seat_number, -1);
+        END IF;
+        IF NEW.status = 'confirmed' THEN
+            CALL sp_add_booking_segment_load(NEW.trip_id, NEW.origin_stop_id, NEW.destination_stop_id, NEW.seat_number, 1);
+        END IF;
+    END IF;
+END;
+//
+
+-- ----------------------------------------------------------------------------
+-- Confirmed booking deleted: release its seat and segments
+CREATE TRIGGER trg_bookings_after_delete_seats
+AFTER DELETE ON bookings
+FOR EACH ROW
+BEGIN
+    IF OLD.status = 'confirmed' THEN
+        CALL sp_add_booking_segment_load(OLD.trip_id, OLD.origin_stop_id, OLD.destination_stop_id, OLD.seat_number, -1);
+    END IF;
+END;
+//
+
+DELIMITER ;
@@ -25,7 +25,8 @@ BEGIN
 
     -- Delete only scheduled/cancelled trips for today (safe for repeated use)
     DELETE FROM trips
-    WHERE DATE(departure_time) = CURDATE()
+    WHERE departure_time >= CURDATE()                  -- Range on the raw column (index usable),
+      AND departure_time < CURDATE() + INTERVAL 1 DAY  -- not DATE(departure_time) = CURDATE()
       AND status IN ('scheduled', 'cancelled');
 
     -- Get count of deleted rows (ROW_COUNT returns affected rows from last statement)
@@ -56,11 +57,11 @@ DELIMITER ;
 -- Verify deletion
 -- SELECT COUNT(*) as remaining_trips
 -- FROM trips
--- WHERE DATE(departure_time) = CURDATE()
+-- WHERE departure_time >= CURDATE() AND departure_time < CURDATE() + INTERVAL 1 DAY
 --   AND status IN ('scheduled', 'cancelled');
 
 -- Verify running/completed trips are preserved
 -- SELECT COUNT(*) as preserved_trips
 -- FROM trips
--- WHERE DATE(departure_time) = CURDATE()
+-- WHERE departure_time >= CURDATE() AND departure_time < CURDATE() + INTERVAL 1 DAY
 --   AND status IN ('running', 'completed');
@@ -73,7 +73,8 @@ BEGIN
                 SELECT COUNT(*) INTO v_check_existing_count
                 FROM trips
                 WHERE route_id = v_current_route_id
-                    AND DATE(departure_time) = CURDATE()
+                    AND departure_time >= CURDATE()                     -- Half-open range on the raw column
+                    AND departure_time < CURDATE() + INTERVAL 1 DAY     -- so idx_trips_route_departure_status is used
                     AND status IN ('scheduled', 'running');
 
         IF v_check_existing_count > 0 THEN
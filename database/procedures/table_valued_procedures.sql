@@ -63,7 +63,7 @@ COMMENT 'Get daily booking and revenue analytics'
 BEGIN
     -- Aggregate daily booking and revenue statistics for the given date
     SELECT 
-        DATE(b.booking_date) AS booking_date,  -- The report date
+        p_report_date AS booking_date,  -- The report date
         COUNT(DISTINCT b.booking_id) AS total_bookings,  -- Total bookings made that day
         SUM(CASE WHEN b.status = 'confirmed' THEN 1 ELSE 0 END) AS confirmed_bookings,  -- Confirmed bookings
         SUM(CASE WHEN b.status = 'cancelled' THEN 1 ELSE 0 END) AS cancelled_bookings,  -- Cancelled bookings
@@ -76,7 +76,7 @@ BEGIN
          FROM bookings b2
          JOIN trips t ON b2.trip_id = t.trip_id
          JOIN routes r ON t.route_id = r.route_id
-         WHERE DATE(b2.booking_date) = p_report_date
+         WHERE b2.booking_date >= p_report_date AND b2.booking_date < p_report_date + INTERVAL 1 DAY
          GROUP BY r.route_id, r.route_name
          ORDER BY COUNT(*) DESC
          LIMIT 1) AS most_popular_route,
@@ -86,14 +86,15 @@ BEGIN
          JOIN trips t ON b3.trip_id = t.trip_id
          JOIN routes r ON t.route_id = r.route_id
          JOIN services s ON r.service_id = s.service_id
-         WHERE DATE(b3.booking_date) = p_report_date
+         WHERE b3.booking_date >= p_report_date AND b3.booking_date < p_report_date + INTERVAL 1 DAY
          GROUP BY s.service_id, s.service_name
          ORDER BY COUNT(*) DESC
          LIMIT 1) AS most_popular_service
     FROM bookings b
     LEFT JOIN payments p ON b.booking_id = p.booking_id  -- Join payments for revenue
-    WHERE DATE(b.booking_date) = p_report_date  -- Only bookings for the report date
-    GROUP BY DATE(b.booking_date);  -- One row per day
+    WHERE b.booking_date >= p_report_date  -- Only bookings for the report date, as a half-open
+      AND b.booking_date < p_report_date + INTERVAL 1 DAY  -- range so idx_bookings_date is used
+    HAVING COUNT(*) > 0;  -- One row for the day, none when it had no bookings
 END$$
 
 DELIMITER ;
@@ -25,7 +25,8 @@ SELECT
     COUNT(DISTINCT CASE WHEN bk.status = 'confirmed' THEN bk.booking_id END) AS confirmed_bookings,   -- Confirmed bookings
     COUNT(DISTINCT CASE WHEN bk.status = 'cancelled' THEN bk.booking_id END) AS cancelled_bookings,   -- Cancelled bookings
     COUNT(DISTINCT bk.booking_id) AS total_bookings,                                                  -- All bookings
-    b.capacity - COUNT(DISTINCT CASE WHEN bk.status = 'confirmed' THEN bk.booking_id END) AS available_seats -- Seats left
+    GREATEST(b.capacity - COALESCE((SELECT MAX(l.passengers) FROM trip_segment_load l
+                                    WHERE l.trip_id = t.trip_id), 0), 0) AS available_seats -- Seats left on the busiest segment
 FROM trips t                              -- Base trip records
 INNER JOIN buses b ON t.bus_id = b.bus_id -- Join bus assigned to trip
 INNER JOIN routes r ON t.route_id = r.route_id -- Join route for trip
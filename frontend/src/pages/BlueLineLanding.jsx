@@ -13,6 +13,7 @@ import {
 } from "lucide-react";
 import { logout } from "../utils/auth";
 import { socketService } from "../utils/socket";
+import { fetchAllTrips } from "../utils/trips";
 
 const API_BASE = "http://localhost:5000";
 
@@ -128,11 +129,11 @@ const BlueLineLanding = () => {
   const reloadTrips = useCallback(() => {
     const url = buildTripsUrl();
     if (!url) return;
-    fetch(url, { credentials: "include" })
-      .then((res) => res.json())
+    // Every page: the list is cut at the backend's page size otherwise
+    fetchAllTrips(url)
       .then((data) => {
         if (data.success) {
-          setTrips(data.trips || []);
+          setTrips(data.trips);
         }
       })
       .catch((err) => console.error("Failed to reload trips:", err));
@@ -156,18 +157,14 @@ const BlueLineLanding = () => {
           fetch(`${API_BASE}/api/routes/${selectedRouteId}/stops`, {
             credentials: "include",
           }),
-          fetch(tripsUrl, { credentials: "include" }),
+          fetchAllTrips(tripsUrl),
         ]);
         const stopsJson = await stopsRes.json();
-        const tripsJson = await tripsRes.json();
         if (!ignore) {
           if (stopsRes.ok) setStops(stopsJson.stops || []);
           else setError(stopsJson.message || "Failed to load stops");
-          if (tripsRes.ok) setTrips(tripsJson.trips || []);
-          else
-            setError(
-              (prev) => prev || tripsJson.message || "Failed to load trips",
-            );
+          if (tripsRes.success) setTrips(tripsRes.trips);
+          else setError((prev) => prev || tripsRes.message);
         }
       } catch (e) {
         if (!ignore) setError(e.message || "Network error");
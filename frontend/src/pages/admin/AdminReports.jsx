@@ -3,6 +3,7 @@ import DatePicker from "react-datepicker";
 import "react-datepicker/dist/react-datepicker.css";
 import { Spinner } from "@/components/ui/spinner";
 import PropTypes from "prop-types";
+import { socketService } from "../../utils/socket";
 import {
   BarChart3,
   TrendingUp,
@@ -87,11 +88,26 @@ const AdminReports = () => {
   const [tripRevenue, setTripRevenue] = useState(null);
   const [selectedDate, setSelectedDate] = useState(new Date());
 
+  // Today's counters pushed over Socket.IO (backend/utils/live_metrics.py)
+  const [liveMetrics, setLiveMetrics] = useState(null);
+
   // Fetch dashboard overview on mount
   useEffect(() => {
     fetchDashboard();
   }, []);
 
+  // Live counters: a snapshot on join, then only the fields that changed
+  useEffect(() => {
+    const handleMetrics = (data) => {
+      if (data.snapshot) {
+        setLiveMetrics(data.snapshot);
+      } else if (data.delta) {
+        setLiveMetrics((prev) => (prev ? { ...prev, ...data.delta } : prev));
+      }
+    };
+    return socketService.joinAdminMetrics(handleMetrics);
+  }, []);
+
   const fetchDashboard = async () => {
     setLoading(true);
     setError(null);
@@ -343,6 +359,43 @@ const AdminReports = () => {
         {/* Overview Tab */}
         {activeTab === "overview" && dashboard && !loading && (
           <div className="space-y-6">
+            {/* Live Today */}
+            {liveMetrics && (
+              <div>
+                <h2 className="text-xl font-bold mb-3 text-slate-900 dark:text-slate-100 flex items-center gap-2">
+                  <Activity className="w-5 h-5 text-green-600" />
+                  Today (Live)
+                </h2>
+                <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-4">
+                  <StatCard
+                    title="Bookings Today"
+                    value={liveMetrics.bookings_today.toLocaleString()}
+                    icon={<Ticket className="w-5 h-5 text-blue-600" />}
+                    color="blue"
+                  />
+                  <StatCard
+                    title="Revenue Today"
+                    value={`Rs ${Number(liveMetrics.revenue_today).toLocaleString()}`}
+                    icon={<DollarSign className="w-5 h-5 text-green-600" />}
+                    color="green"
+                  />
+                  <StatCard
+                    title="Running Trips"
+                    value={liveMetrics.running_trips.toLocaleString()}
+                    icon={<Bus className="w-5 h-5 text-orange-600" />}
+                    color="orange"
+                  />
+                  <StatCard
+                    title="Seat Utilization"
+                    value={`${liveMetrics.utilization_rate}%`}
+                    subtitle={`${liveMetrics.seats_booked_running} of ${liveMetrics.seats_capacity_running} seats on running trips`}
+                    icon={<Activity className="w-5 h-5 text-purple-600" />}
+                    color="purple"
+                  />
+                </div>
+              </div>
+            )}
+
             {/* Bookings Stats */}
             <div>
               <h2 className="text-xl font-bold mb-3 text-slate-900 dark:text-slate-100 flex items-center gap-2">
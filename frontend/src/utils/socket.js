@@ -42,6 +42,8 @@ class SocketService {
       reconnection: true,
       reconnectionDelay: 1000,
       reconnectionAttempts: 5,
+      // Send the session cookie: admin rooms check the logged-in role
+      withCredentials: true,
     });
 
     this.socket.on("connect", () => {
@@ -97,6 +99,25 @@ class SocketService {
     this.socket.emit(event, data);
   }
 
+  /**
+   * Subscribe to the live admin counters (`admin_metrics` room).
+   * `callback` receives `{snapshot}` on join and `{delta, at}` afterwards.
+   * Rooms are lost on reconnect, so the join is re-sent on every connect.
+   * @returns {Function} unsubscribe
+   */
+  joinAdminMetrics(callback) {
+    const join = () => this.socket?.emit("join_admin_metrics");
+    this.on("admin_metrics", callback);
+    this.on("connect", join);
+    if (this.socket.connected) join();
+
+    return () => {
+      this.socket?.emit("leave_admin_metrics");
+      this.off("admin_metrics", callback);
+      this.off("connect", join);
+    };
+  }
+
   removeAllListeners(event) {
     if (this.socket) {
       this.socket.removeAllListeners(event);
@@ -0,0 +1,30 @@
+/**
+ * Trip availability helpers
+ */
+
+/**
+ * Fetch every page of GET /api/routes/<id>/trips/availability by following
+ * `next_cursor` until the backend reports no more trips.
+ * @param {string} url - availability URL, with or without query params
+ * @returns {Promise<{success: boolean, trips: object[], message?: string}>}
+ */
+export async function fetchAllTrips(url) {
+  const trips = [];
+  let cursor = null;
+  do {
+    const pageUrl = new URL(url);
+    if (cursor) pageUrl.searchParams.set("cursor", cursor);
+    const response = await fetch(pageUrl, { credentials: "include" });
+    const data = await response.json();
+    if (!response.ok || !data.success) {
+      return {
+        success: false,
+        trips,
+        message: data.message || "Failed to load trips",
+      };
+    }
+    trips.push(...(data.trips || []));
+    cursor = data.next_cursor;
+  } while (cursor);
+  return { success: true, trips };
+}